@@ -274,6 +274,89 @@ class BpoKpiLogisticsCustomersTest:
             test_description="PageSize > 200 - should be capped/normalized"
         )
 
+    def test_bpo_agent_kpi_and_dashboard(self):
+        """Test /api/bpo/agent-kpi and /api/bpo/dashboard (SQL-side aggregation)"""
+        print("\n🎯 Testing /api/bpo/agent-kpi and /api/bpo/dashboard")
+        print("=" * 80)
+        
+        today = datetime.now()
+        params = {
+            "startDate": (today - timedelta(days=60)).strftime("%Y-%m-%d"),
+            "endDate": today.strftime("%Y-%m-%d")
+        }
+        
+        self.test_endpoint(
+            "/api/bpo/agent-kpi",
+            method="GET",
+            params=params,
+            test_description="Valid 60-day range - should return 200 with items sorted by totalCalls"
+        )
+        
+        self.test_endpoint(
+            "/api/bpo/dashboard",
+            method="GET",
+            params={"ventureId": "1"},
+            test_description="Last 7 days - should return summary, campaigns and top-10 leaderboard"
+        )
+
+    def validate_bpo_agent_kpi_response_structure(self, response_data: Dict) -> bool:
+        """Validate agent KPI items keep their fields and ordering"""
+        items = response_data.get("items")
+        if not isinstance(items, list):
+            print("❌ 'items' should be an array")
+            return False
+        
+        item_fields = ["agentId", "agentName", "campaignId", "campaignName", "totalCalls",
+                       "totalTalkTimeSec", "totalAppointments", "totalSales",
+                       "avgTalkTimeSec", "callsPerDay"]
+        for item in items:
+            for field in item_fields:
+                if field not in item:
+                    print(f"❌ Missing item field: {field}")
+                    return False
+        
+        calls = [item["totalCalls"] for item in items]
+        if calls != sorted(calls, reverse=True):
+            print("❌ Items should be sorted by totalCalls descending")
+            return False
+        
+        print("✅ BPO agent KPI response structure is valid")
+        return True
+
+    def validate_bpo_dashboard_response_structure(self, response_data: Dict) -> bool:
+        """Validate dashboard summary totals add up to the campaign cards"""
+        for field in ["summary", "campaigns", "leaderboard"]:
+            if field not in response_data:
+                print(f"❌ Missing required field: {field}")
+                return False
+        
+        summary = response_data["summary"]
+        campaigns = response_data["campaigns"]
+        pairs = {
+            "totalTalk": "talkTimeMin",
+            "totalHandled": "handledCalls",
+            "totalOutbound": "outboundCalls",
+            "totalLeads": "leadsCreated",
+            "totalDemos": "demosBooked",
+            "totalSales": "salesClosed",
+            "totalRevenue": "revenue",
+            "totalCost": "cost",
+        }
+        for total_field, card_field in pairs.items():
+            expected = sum(c.get(card_field, 0) for c in campaigns)
+            if abs(summary.get(total_field, 0) - expected) > 0.01:
+                print(f"❌ summary.{total_field} ({summary.get(total_field)}) != sum of campaigns ({expected})")
+                return False
+        
+        leaderboard = response_data["leaderboard"]
+        leads = [a.get("leadsCreated", 0) for a in leaderboard]
+        if len(leaderboard) > 10 or leads != sorted(leads, reverse=True):
+            print("❌ Leaderboard should hold at most 10 agents sorted by leadsCreated")
+            return False
+        
+        print("✅ BPO dashboard response structure is valid")
+        return True
+
     def validate_bpo_kpi_response_structure(self, response_data: Dict) -> bool:
         """Validate BPO KPI response structure matches expected contract"""
         required_fields = ["from", "to", "agents", "totals"]
@@ -338,6 +421,9 @@ class BpoKpiLogisticsCustomersTest:
         # Test BPO KPI endpoint
         self.test_bpo_kpi_endpoint()
         
+        # Test BPO agent KPI and dashboard endpoints
+        self.test_bpo_agent_kpi_and_dashboard()
+        
         # Test Logistics Customers endpoint
         self.test_logistics_customers_endpoint()
         
@@ -358,6 +444,19 @@ class BpoKpiLogisticsCustomersTest:
                 is_valid = self.validate_bpo_kpi_response_structure(response["response"])
                 print(f"   Response structure valid: {'✅' if is_valid else '❌'}")
         
+        # Analyze BPO agent KPI and dashboard results
+        for path, validate in [
+            ("/api/bpo/agent-kpi", self.validate_bpo_agent_kpi_response_structure),
+            ("/api/bpo/dashboard", self.validate_bpo_dashboard_response_structure),
+        ]:
+            path_results = [r for r in self.results if r["endpoint"] == path and r["status_code"] == 200]
+            print(f"\n🎯 {path} Analysis:")
+            print(f"   Successful responses (200): {len(path_results)}")
+            for response in path_results:
+                if isinstance(response["response"], dict):
+                    is_valid = validate(response["response"])
+                    print(f"   Response structure valid: {'✅' if is_valid else '❌'}")
+        
         # Analyze Logistics Customers results
         customers_results = [r for r in self.results if "/api/logistics/customers" in r["endpoint"]]
         successful_customers_responses = [r for r in customers_results if r["status_code"] == 200]
@@ -293,6 +293,49 @@ class BusinessFlowTester:
             self.log_result("Hotels", "Hospitality Dashboard", "FAIL", 
                           f"Status: {status_code}, Response: {response}")
 
+        # Dashboard figures are read from property rollups; portfolio totals must
+        # still equal the sum of the per-hotel cards
+        if status_code == 200 and "summary" in response and "hotels" in response:
+            summary = response["summary"]
+            card_revenue = sum(h.get("totalRevenue", 0) for h in response["hotels"])
+            source_total = sum(summary.get("sourceCounts", {}).values())
+            mismatches = []
+            if abs(card_revenue - summary.get("totalRevenue7d", 0)) > 0.01:
+                mismatches.append(f"7d revenue {summary.get('totalRevenue7d')} != cards {card_revenue}")
+            if source_total != summary.get("totalReviews", 0):
+                mismatches.append(f"reviews {summary.get('totalReviews')} != by source {source_total}")
+            if summary.get("recentReviewCount", 0) > summary.get("totalReviews", 0):
+                mismatches.append("recent reviews exceed total reviews")
+            if mismatches:
+                self.log_result("Hotels", "Dashboard Rollup Parity", "FAIL", "; ".join(mismatches))
+            else:
+                self.log_result("Hotels", "Dashboard Rollup Parity", "PASS",
+                              "Portfolio totals match per-hotel cards and review sources")
+
+        # Step 5b: KPI comparison periods (MTD is contained in YTD, so its totals can't exceed YTD's)
+        status_code, response = self.make_request("GET", "/api/hotels/kpi-comparison")
+
+        if status_code == 200 and all(k in response for k in ("mtd", "ytd", "lyMtd", "lyYtd", "dailyTrend")):
+            mtd, ytd = response["mtd"], response["ytd"]
+            ly_mtd, ly_ytd = response["lyMtd"], response["lyYtd"]
+            contained = (
+                mtd["daysInPeriod"] <= ytd["daysInPeriod"]
+                and mtd["roomsSold"] <= ytd["roomsSold"]
+                and mtd["totalRevenue"] <= ytd["totalRevenue"] + 0.01
+                and ly_mtd["daysInPeriod"] <= ly_ytd["daysInPeriod"]
+                and ly_mtd["totalRevenue"] <= ly_ytd["totalRevenue"] + 0.01
+            )
+            if contained:
+                self.log_result("Hotels", "KPI Comparison", "PASS",
+                              f"MTD {mtd['daysInPeriod']}d / YTD {ytd['daysInPeriod']}d, "
+                              f"{len(response['dailyTrend'])} trend points")
+            else:
+                self.log_result("Hotels", "KPI Comparison", "FAIL",
+                              f"MTD totals exceed YTD: mtd={mtd}, ytd={ytd}")
+        else:
+            self.log_result("Hotels", "KPI Comparison", "FAIL",
+                          f"Status: {status_code}, Response: {response}")
+
         # Step 6: Test Hotel Snapshot (rate-shopping placeholder)
         status_code, response = self.make_request("GET", "/api/hotels/snapshot")
         
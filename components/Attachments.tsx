@@ -38,9 +38,10 @@ export function Attachments({
     setUploading(true);
     try {
       const formData = new FormData();
-      formData.append("file", file);
+      // Fields first: the server streams the file to storage as it arrives
       if (taskId) formData.append("taskId", String(taskId));
       if (ventureId) formData.append("ventureId", String(ventureId));
+      formData.append("file", file);
 
       const res = await fetch("/api/files/upload", {
         method: "POST",
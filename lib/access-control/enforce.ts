@@ -1,4 +1,4 @@
-import { ROUTE_REGISTRY, getRouteByPath, getRouteByApiPath } from "./routes";
+import { ROUTE_REGISTRY, getRouteById, getRouteByPath, getRouteByApiPath } from "./routes";
 
 export type RouteAuditResult = {
   path: string;
@@ -47,7 +47,7 @@ export function validateNewRoute(config: {
     errors.push("Route path must start with /");
   }
   
-  const existingById = ROUTE_REGISTRY.find((r) => r.id === config.id);
+  const existingById = getRouteById(config.id);
   if (existingById) {
     errors.push(`Route with id '${config.id}' already exists`);
   }
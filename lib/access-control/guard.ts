@@ -1,5 +1,13 @@
 import type { UserRole } from "@/lib/permissions";
-import { ROUTE_REGISTRY, getRouteByPath, getRouteByApiPath, type RouteConfig, type ModuleId } from "./routes";
+import {
+  ROUTE_REGISTRY,
+  getRouteById,
+  getRouteByPath,
+  getRouteByApiPath,
+  routeAllowsRole,
+  type RouteConfig,
+  type ModuleId,
+} from "./routes";
 import { isModuleEnabled } from "./feature-flags";
 
 export type AccessCheckResult = {
@@ -32,12 +40,8 @@ export function checkPageAccess(path: string, ctx: AccessContext): AccessCheckRe
     return { allowed: false, reason: "unauthenticated", route };
   }
   
-  if (!route.roles || route.roles.length === 0) {
-    return { allowed: true, route };
-  }
-  
   const userRole = ctx.role || "EMPLOYEE";
-  if (!route.roles.includes(userRole)) {
+  if (!routeAllowsRole(route, userRole)) {
     return { allowed: false, reason: "role_denied", route };
   }
   
@@ -67,12 +71,8 @@ export function checkApiAccess(apiPath: string, ctx: AccessContext): AccessCheck
     return { allowed: false, reason: "unauthenticated", route };
   }
   
-  if (!route.roles || route.roles.length === 0) {
-    return { allowed: true, route };
-  }
-  
   const userRole = ctx.role || "EMPLOYEE";
-  if (!route.roles.includes(userRole)) {
+  if (!routeAllowsRole(route, userRole)) {
     return { allowed: false, reason: "role_denied", route };
   }
   
@@ -80,21 +80,18 @@ export function checkApiAccess(apiPath: string, ctx: AccessContext): AccessCheck
 }
 
 export function canAccessRoute(routeId: string, role: UserRole): boolean {
-  const route = ROUTE_REGISTRY.find((r) => r.id === routeId);
+  const route = getRouteById(routeId);
   if (!route) return false;
   
   if (!isModuleEnabled(route.module)) return false;
   
-  if (!route.roles || route.roles.length === 0) return true;
-  
-  return route.roles.includes(role);
+  return routeAllowsRole(route, role);
 }
 
 export function getAccessibleRoutes(role: UserRole): RouteConfig[] {
   return ROUTE_REGISTRY.filter((route) => {
     if (!isModuleEnabled(route.module)) return false;
-    if (!route.roles || route.roles.length === 0) return true;
-    return route.roles.includes(role);
+    return routeAllowsRole(route, role);
   });
 }
 
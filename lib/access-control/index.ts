@@ -1,4 +1,5 @@
 export * from "./routes";
+export * from "./matcher";
 export * from "./guard";
 export * from "./feature-flags";
 export * from "./enforce";
@@ -0,0 +1,129 @@
+import type { RouteConfig } from "./routes";
+
+// Compiled form of ROUTE_REGISTRY. Built once at module load so that the
+// per-request lookups in middleware, guard and enforce cost one walk over the
+// path's segments instead of a scan of every registered route.
+//
+// Matching semantics are those of the registry scan it replaces: the first
+// route in registry order wins, a route matches its own path and (unless
+// `exact`) any path below it.
+
+type TrieNode = {
+  children: Map<string, TrieNode>;
+  /** Lowest registry index of a route whose path ends here (exact or prefix) */
+  equalIndex: number;
+  /** Lowest registry index of a non-exact route whose path ends here */
+  prefixIndex: number;
+};
+
+export type CompiledRouteRegistry = {
+  routes: readonly RouteConfig[];
+  byId: Map<string, RouteConfig>;
+  matchPath: (path: string) => RouteConfig | undefined;
+  matchApiPath: (apiPath: string) => RouteConfig | undefined;
+  allowsRole: (route: RouteConfig, role: string | null | undefined) => boolean;
+};
+
+const NONE = Number.MAX_SAFE_INTEGER;
+
+function createNode(): TrieNode {
+  return { children: new Map(), equalIndex: NONE, prefixIndex: NONE };
+}
+
+function segmentsOf(path: string): string[] {
+  return (path.startsWith("/") ? path.slice(1) : path).split("/");
+}
+
+function insert(root: TrieNode, path: string, index: number, exact: boolean) {
+  let node = root;
+  for (const segment of segmentsOf(path)) {
+    let child = node.children.get(segment);
+    if (!child) {
+      child = createNode();
+      node.children.set(segment, child);
+    }
+    node = child;
+  }
+  node.equalIndex = Math.min(node.equalIndex, index);
+  if (!exact) {
+    node.prefixIndex = Math.min(node.prefixIndex, index);
+  }
+}
+
+function lookup(root: TrieNode, path: string): number {
+  if (!path.startsWith("/")) return NONE;
+
+  const segments = segmentsOf(path);
+  let node = root;
+  let best = NONE;
+
+  for (let i = 0; i < segments.length; i++) {
+    const child = node.children.get(segments[i]);
+    if (!child) break;
+    node = child;
+    best = Math.min(best, i === segments.length - 1 ? node.equalIndex : node.prefixIndex);
+  }
+
+  return best;
+}
+
+/**
+ * Compile a route registry into path tries (pages and APIs), an id map and
+ * per-route role bitmasks.
+ */
+export function compileRouteRegistry(routes: readonly RouteConfig[]): CompiledRouteRegistry {
+  const pageRoot = createNode();
+  const apiRoot = createNode();
+  const byId = new Map<string, RouteConfig>();
+
+  // One bit per role named anywhere in the registry. A role that no route
+  // names has no bit and is therefore denied by every restricted route.
+  const roleBits = new Map<string, number>();
+  const roleMasks = new Map<RouteConfig, number>();
+
+  routes.forEach((route, index) => {
+    if (!byId.has(route.id)) {
+      byId.set(route.id, route);
+    }
+
+    insert(pageRoot, route.path, index, route.exact === true);
+    if (route.apiPath) {
+      insert(apiRoot, route.apiPath, index, false);
+    }
+
+    let mask = 0;
+    for (const role of route.roles ?? []) {
+      if (!roleBits.has(role)) {
+        if (roleBits.size >= 31) {
+          throw new Error("Route registry names more than 31 roles; widen the role bitmask");
+        }
+        roleBits.set(role, 1 << roleBits.size);
+      }
+      mask |= roleBits.get(role)!;
+    }
+    roleMasks.set(route, mask);
+  });
+
+  return {
+    routes,
+    byId,
+    matchPath(path) {
+      const index = lookup(pageRoot, path);
+      return index === NONE ? undefined : routes[index];
+    },
+    matchApiPath(apiPath) {
+      const index = lookup(apiRoot, apiPath);
+      return index === NONE ? undefined : routes[index];
+    },
+    allowsRole(route, role) {
+      const mask = roleMasks.get(route);
+      if (mask === undefined) {
+        // Not part of this registry: fall back to the route's own list
+        return !route.roles || route.roles.length === 0 || (!!role && route.roles.includes(role as any));
+      }
+      if (mask === 0) return true;
+      const bit = role ? roleBits.get(role) : undefined;
+      return bit !== undefined && (mask & bit) !== 0;
+    },
+  };
+}
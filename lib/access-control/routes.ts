@@ -1,4 +1,5 @@
 import type { UserRole } from "@/lib/permissions";
+import { compileRouteRegistry, type CompiledRouteRegistry } from "./matcher";
 
 export type ModuleId =
   | "command_center"
@@ -881,24 +882,37 @@ export const MODULE_LABELS: Record<ModuleId, string> = {
   public: "Public",
 };
 
+let compiled: CompiledRouteRegistry = compileRouteRegistry(ROUTE_REGISTRY);
+
+/**
+ * Compiled matcher for ROUTE_REGISTRY (path tries, id map, role bitmasks).
+ * Recompiled if the registry array is modified at runtime.
+ */
+export function getCompiledRoutes(): CompiledRouteRegistry {
+  if (compiled.routes.length !== ROUTE_REGISTRY.length) {
+    compiled = compileRouteRegistry(ROUTE_REGISTRY);
+  }
+  return compiled;
+}
+
 export function getRouteById(id: string): RouteConfig | undefined {
-  return ROUTE_REGISTRY.find((r) => r.id === id);
+  return getCompiledRoutes().byId.get(id);
 }
 
 export function getRouteByPath(path: string): RouteConfig | undefined {
-  return ROUTE_REGISTRY.find((route) => {
-    if (route.exact) {
-      return route.path === path;
-    }
-    return path === route.path || path.startsWith(route.path + "/");
-  });
+  return getCompiledRoutes().matchPath(path);
 }
 
 export function getRouteByApiPath(apiPath: string): RouteConfig | undefined {
-  return ROUTE_REGISTRY.find((route) => {
-    if (!route.apiPath) return false;
-    return apiPath === route.apiPath || apiPath.startsWith(route.apiPath + "/");
-  });
+  return getCompiledRoutes().matchApiPath(apiPath);
+}
+
+/**
+ * Whether `role` may use `route`. Routes without a role list are open to
+ * every authenticated user.
+ */
+export function routeAllowsRole(route: RouteConfig, role: string | null | undefined): boolean {
+  return getCompiledRoutes().allowsRole(route, role);
 }
 
 export function getRoutesByModule(module: ModuleId): RouteConfig[] {
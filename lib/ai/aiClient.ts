@@ -1,5 +1,11 @@
 import { logger } from "@/lib/logger";
 import { aiConfig } from "@/lib/config/ai";
+import {
+  cachedCompletion,
+  completionCacheKey,
+  PROMPT_TEMPLATE_VERSIONS,
+  type CompletionResult,
+} from "./completionCache";
 
 export class AiDisabledError extends Error {
   constructor(message = "AI assistant is disabled by configuration") {
@@ -13,23 +19,65 @@ export type FreightAssistantCallOptions = {
   context?: Record<string, unknown>;
   userId?: string | number;
   requestId?: string;
+  /** Assistant name, for per-assistant cache stats and its prompt template version */
+  assistant?: string;
+  /** Overrides the assistant's entry in PROMPT_TEMPLATE_VERSIONS */
+  templateVersion?: string;
+  /** Set false to always call the provider */
+  cache?: boolean;
 };
 
+export type ChatMessage = { role: "system" | "user" | "assistant"; content: string };
+
+export type CompletionProviderRequest = {
+  model: string;
+  messages: ChatMessage[];
+  maxTokens: number;
+  temperature: number;
+};
+
+export type CompletionProvider = (
+  request: CompletionProviderRequest,
+) => Promise<{ text: string; tokensUsed: number }>;
+
 function estimateTokens(text: string): number {
   // Very rough heuristic: 4 characters per token
   return Math.ceil(text.length / 4);
 }
 
+const openAiProvider: CompletionProvider = async ({ model, messages, maxTokens, temperature }) => {
+  // Import OpenAI dynamically to avoid errors if package is not installed
+  const { default: OpenAI } = await import('openai');
+  const openai = new OpenAI({ apiKey: process.env.OPENAI_API_KEY });
+
+  const response = await openai.chat.completions.create({
+    model,
+    messages,
+    max_tokens: maxTokens,
+    temperature,
+  });
+
+  return {
+    text: response.choices[0]?.message?.content || 'No response from AI provider',
+    tokensUsed: response.usage?.total_tokens || 0,
+  };
+};
+
+let overrideProvider: CompletionProvider | null = null;
+
+/** Replace the OpenAI provider (local fakes in tests and dev); null restores it. */
+export function setCompletionProvider(provider: CompletionProvider | null): void {
+  overrideProvider = provider;
+}
+
 async function callProvider(
   options: FreightAssistantCallOptions & { model: string },
-): Promise<string> {
+): Promise<CompletionResult> {
   const { prompt, context, userId, requestId } = options;
   const { model } = options;
 
   // Check if OpenAI is configured
-  const openaiApiKey = process.env.OPENAI_API_KEY;
-  
-  if (!openaiApiKey) {
+  if (!overrideProvider && !process.env.OPENAI_API_KEY) {
     // Fallback to stub if no API key is configured
     const disabledMessage =
       "AI assistant is configured but provider is not wired yet. Please set OPENAI_API_KEY environment variable.";
@@ -39,15 +87,15 @@ async function callProvider(
       requestId,
       userId,
     });
-    return disabledMessage + "\n\nPrompt preview: " + prompt.slice(0, 400);
+    return {
+      text: disabledMessage + "\n\nPrompt preview: " + prompt.slice(0, 400),
+      tokensUsed: 0,
+      cacheable: false,
+    };
   }
 
   try {
-    // Import OpenAI dynamically to avoid errors if package is not installed
-    const { default: OpenAI } = await import('openai');
-    const openai = new OpenAI({ apiKey: openaiApiKey });
-
-    const messages: Array<{ role: 'system' | 'user' | 'assistant'; content: string }> = [
+    const messages: ChatMessage[] = [
       {
         role: 'system',
         content: 'You are a freight logistics assistant. Provide helpful, accurate, and concise responses about freight operations, load management, carrier matching, and logistics best practices.',
@@ -60,24 +108,23 @@ async function callProvider(
       },
     ];
 
-    const response = await openai.chat.completions.create({
+    const provider = overrideProvider ?? openAiProvider;
+    const { text, tokensUsed } = await provider({
       model: model || 'gpt-4o-mini',
       messages,
-      max_tokens: aiConfig.maxTokensPerRequest,
+      maxTokens: aiConfig.maxTokensPerRequest,
       temperature: 0.7,
     });
 
-    const result = response.choices[0]?.message?.content || 'No response from AI provider';
-    
     logger.info("ai_call_success", {
       feature: "freight_internal_assistant",
       model,
-      tokensUsed: response.usage?.total_tokens || 0,
+      tokensUsed,
       requestId,
       userId,
     });
 
-    return result;
+    return { text, tokensUsed, cacheable: true };
   } catch (err: any) {
     logger.error("ai_call_error", {
       feature: "freight_internal_assistant",
@@ -89,14 +136,18 @@ async function callProvider(
 
     // Fallback to stub on error
     const errorMessage = `AI provider error: ${err.message || 'Unknown error'}. Falling back to stub response.`;
-    return errorMessage + "\n\nPrompt preview: " + prompt.slice(0, 400);
+    return {
+      text: errorMessage + "\n\nPrompt preview: " + prompt.slice(0, 400),
+      tokensUsed: 0,
+      cacheable: false,
+    };
   }
 }
 
 export async function callFreightAssistant(
   options: FreightAssistantCallOptions,
 ): Promise<string> {
-  const { prompt, context, userId, requestId } = options;
+  const { prompt, context, userId, requestId, assistant = "freight_assistant", templateVersion } = options;
 
   if (!aiConfig.enabled || !aiConfig.freightAssistantEnabled) {
     throw new AiDisabledError();
@@ -111,12 +162,23 @@ export async function callFreightAssistant(
 
   logger.info("ai_call", {
     feature: "freight_internal_assistant",
+    assistant,
     model,
     estimatedTokens,
     requestId,
     userId,
   });
 
-  const result = await callProvider({ ...options, model });
-  return result;
+  if (options.cache === false) {
+    const result = await callProvider({ ...options, model });
+    return result.text;
+  }
+
+  const key = completionCacheKey({
+    model,
+    prompt,
+    context,
+    templateVersion: templateVersion ?? PROMPT_TEMPLATE_VERSIONS[assistant],
+  });
+  return cachedCompletion(assistant, key, () => callProvider({ ...options, model }));
 }
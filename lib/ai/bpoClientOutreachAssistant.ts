@@ -96,6 +96,7 @@ export async function generateBpoClientOutreachDraft(
 
   const text = await callFreightAssistant({
     prompt,
+    assistant: "bpo_client_outreach",
     context: opts,
     userId: String(opts.userId),
     requestId: opts.requestId,
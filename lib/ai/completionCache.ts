@@ -0,0 +1,168 @@
+import { createHash } from "crypto";
+
+// Content-addressed cache for assistant completions.
+//
+// Keyed on (model, normalized prompt, context, template version), so the same
+// draft requested by several people within the TTL costs one provider call.
+// Concurrent identical requests share a single in-flight call. Only real
+// provider output is cached; stub and error fallbacks are not.
+//
+// Guardrails (auth, rate limits, usage logging) run before the assistant is
+// invoked, so cached answers still count against per-user quotas.
+
+export type CompletionResult = {
+  text: string;
+  tokensUsed: number;
+  /** False for fallbacks that must not be served to later callers */
+  cacheable: boolean;
+};
+
+export type CompletionCacheKeyInput = {
+  model: string;
+  prompt: string;
+  context?: Record<string, unknown>;
+  templateVersion?: string;
+};
+
+export type AssistantCacheStats = {
+  assistant: string;
+  requests: number;
+  hits: number;
+  coalesced: number;
+  misses: number;
+  hitRate: number;
+  tokensSaved: number;
+};
+
+type Entry = { text: string; tokensUsed: number; expiresAt: number };
+type Counters = Omit<AssistantCacheStats, "assistant" | "hitRate">;
+
+const TTL_MS = Number(process.env.AI_COMPLETION_CACHE_TTL_MS ?? 10 * 60 * 1000);
+const MAX_ENTRIES = 500;
+
+// Prompt template version per assistant, part of the cache key. Bump an
+// assistant's entry when its prompt builder changes so cached completions
+// are not reused.
+export const PROMPT_TEMPLATE_VERSIONS: Record<string, string> = {
+  bpo_client_outreach: "1",
+  freight_carrier_outreach: "1",
+  freight_ceo_eod: "1",
+  freight_ops: "1",
+  freight_ops_diagnostics: "1",
+  freight_summary: "1",
+  hotel_outreach: "1",
+};
+
+// Per-caller fields that do not change what the model is asked
+const VOLATILE_CONTEXT_KEYS = new Set(["userId", "requestId"]);
+
+const entries = new Map<string, Entry>();
+const inFlight = new Map<string, Promise<CompletionResult>>();
+const counters = new Map<string, Counters>();
+
+function normalizePrompt(prompt: string): string {
+  return prompt
+    .replace(/\r\n/g, "\n")
+    .split("\n")
+    .map((line) => line.trimEnd())
+    .join("\n")
+    .replace(/\n{3,}/g, "\n\n")
+    .trim();
+}
+
+function stableStringify(value: unknown, depth = 0): string {
+  if (value === null || typeof value !== "object") {
+    return JSON.stringify(value) ?? "null";
+  }
+  if (Array.isArray(value)) {
+    return `[${value.map((v) => stableStringify(v, depth + 1)).join(",")}]`;
+  }
+  const obj = value as Record<string, unknown>;
+  const keys = Object.keys(obj)
+    .filter((k) => obj[k] !== undefined && !(depth === 0 && VOLATILE_CONTEXT_KEYS.has(k)))
+    .sort();
+  return `{${keys.map((k) => `${JSON.stringify(k)}:${stableStringify(obj[k], depth + 1)}`).join(",")}}`;
+}
+
+export function completionCacheKey(input: CompletionCacheKeyInput): string {
+  return createHash("sha256")
+    .update(input.model)
+    .update("\0")
+    .update(input.templateVersion ?? "")
+    .update("\0")
+    .update(normalizePrompt(input.prompt))
+    .update("\0")
+    .update(stableStringify(input.context ?? {}))
+    .digest("hex");
+}
+
+function countersFor(assistant: string): Counters {
+  let c = counters.get(assistant);
+  if (!c) {
+    c = { requests: 0, hits: 0, coalesced: 0, misses: 0, tokensSaved: 0 };
+    counters.set(assistant, c);
+  }
+  return c;
+}
+
+/**
+ * Return the cached completion for `key`, join an identical call already in
+ * flight, or run `produce` and cache its result.
+ */
+export async function cachedCompletion(
+  assistant: string,
+  key: string,
+  produce: () => Promise<CompletionResult>
+): Promise<string> {
+  const stats = countersFor(assistant);
+  stats.requests++;
+
+  const cached = entries.get(key);
+  if (cached && cached.expiresAt > Date.now()) {
+    stats.hits++;
+    stats.tokensSaved += cached.tokensUsed;
+    return cached.text;
+  }
+  if (cached) entries.delete(key);
+
+  const pending = inFlight.get(key);
+  if (pending) {
+    stats.coalesced++;
+    const result = await pending;
+    if (result.cacheable) stats.tokensSaved += result.tokensUsed;
+    return result.text;
+  }
+
+  stats.misses++;
+  const promise = produce()
+    .then((result) => {
+      if (result.cacheable && TTL_MS > 0) {
+        if (entries.size >= MAX_ENTRIES) {
+          const oldest = entries.keys().next().value;
+          if (oldest !== undefined) entries.delete(oldest);
+        }
+        entries.set(key, { text: result.text, tokensUsed: result.tokensUsed, expiresAt: Date.now() + TTL_MS });
+      }
+      return result;
+    })
+    .finally(() => inFlight.delete(key));
+
+  inFlight.set(key, promise);
+  return (await promise).text;
+}
+
+export function getCompletionCacheStats(): AssistantCacheStats[] {
+  return Array.from(counters.entries())
+    .map(([assistant, c]) => ({
+      assistant,
+      ...c,
+      hitRate: c.requests > 0 ? Math.round(((c.hits + c.coalesced) / c.requests) * 1000) / 10 : 0,
+    }))
+    .sort((a, b) => b.requests - a.requests);
+}
+
+/** Drop cached completions and counters (tests, config changes). */
+export function clearCompletionCache(): void {
+  entries.clear();
+  counters.clear();
+}
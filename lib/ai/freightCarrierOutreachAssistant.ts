@@ -142,6 +142,7 @@ export async function generateCarrierOutreachDraft(
 
   const text = await callFreightAssistant({
     prompt,
+    assistant: "freight_carrier_outreach",
     context: opts,
     userId: String(opts.userId),
     requestId: opts.requestId,
@@ -158,6 +158,7 @@ export async function generateFreightCeoEodDraft(
 
   const text = await callFreightAssistant({
     prompt,
+    assistant: "freight_ceo_eod",
     context: {
       metrics: opts.metrics,
       intelligence: opts.intelligence,
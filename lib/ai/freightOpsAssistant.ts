@@ -55,6 +55,7 @@ export async function analyzeFreightLogs(
 
   const text = await callFreightAssistant({
     prompt,
+    assistant: "freight_ops",
     context: {
       sampleSize: options.recentLogSample.length,
     },
@@ -70,6 +70,7 @@ export async function generateFreightOpsDiagnosticsDraft(
 
   const text = await callFreightAssistant({
     prompt,
+    assistant: "freight_ops_diagnostics",
     context: { sampleSize: opts.recentLogSample.length, draftType: opts.draftType },
     userId: String(opts.userId),
     requestId: opts.requestId,
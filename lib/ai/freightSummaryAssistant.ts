@@ -130,6 +130,7 @@ export async function generateFreightSummary(
 
   const text = await callFreightAssistant({
     prompt,
+    assistant: "freight_summary",
     context: {
       metrics: options.metrics,
       intelligence: options.intelligence,
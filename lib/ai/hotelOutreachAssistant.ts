@@ -99,6 +99,7 @@ export async function generateHotelOutreachDraft(
 
   const text = await callFreightAssistant({
     prompt,
+    assistant: "hotel_outreach",
     context: opts,
     userId: String(opts.userId),
     requestId: opts.requestId,
@@ -1,4 +1,5 @@
 import { prisma } from "@/lib/prisma";
+import { chunk, runWithConcurrency } from "@/lib/utils/workerPool";
 
 // Local aliases for audit enums. These are kept as string-based types
 // to decouple build-time types from the Prisma client codegen.
@@ -6,147 +7,207 @@ type AuditModule = string;
 type AuditSeverity = string;
 type AuditIssueStatus = string;
 
+const OPEN: AuditIssueStatus = "OPEN";
+const RESOLVED: AuditIssueStatus = "RESOLVED";
+
+// Checks share the Prisma pool (5 connections) with request traffic
+const CHECK_CONCURRENCY = 4;
+const WRITE_BATCH_SIZE = 1000;
+
 type RunAuditArgs = {
   initiatedByUserId?: number;
   scopeVentureId?: number;
   scopeOfficeId?: number;
   scopePropertyId?: number;
+  /** Ignore the previous run and rescan every row */
+  full?: boolean;
+};
+
+type AuditIssueInput = {
+  targetType: string;
+  targetId: string;
+  message: string;
+  details?: Record<string, unknown>;
 };
 
 type CheckResult = {
   checkKey: string;
   module: AuditModule;
   severity: AuditSeverity;
-  issues: {
-    targetType: string;
-    targetId: string;
-    message: string;
-    details?: Record<string, unknown>;
-  }[];
+  issues: AuditIssueInput[];
+  /**
+   * Targets this check re-evaluated. Open issues on these targets that are
+   * not in `issues` are resolved. "all" means every open issue of the check
+   * was in view; an empty set means open issues are left untouched.
+   */
+  evaluated: "all" | Set<string>;
 };
 
-async function getCheckMeta(key: string) {
-  const check = await prisma.auditCheck.findUnique({ where: { key } });
-  if (!check) {
-    throw new Error(`AuditCheck not found for key ${key}`);
-  }
-  return check;
-}
+type CheckMeta = {
+  id: number;
+  key: string;
+  module: AuditModule;
+  severity: AuditSeverity;
+};
 
-async function checkFreightNegativeMarginLoads(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "freight.negative_margin_loads";
-  const check = await getCheckMeta(checkKey);
+type OpenIssue = { id: number; targetType: string; targetId: string | null };
 
-  const where: Record<string, unknown> = {
-    loadStatus: "DELIVERED",
-  };
-  if (args.scopeVentureId) where.ventureId = args.scopeVentureId;
-  if (args.scopeOfficeId) where.officeId = args.scopeOfficeId;
+type CheckContext = {
+  args: RunAuditArgs;
+  /** Start of the previous finished run with the same scope; null = full scan */
+  since: Date | null;
+  scoped: boolean;
+  meta: CheckMeta;
+  open: OpenIssue[];
+};
 
-  const loads = await prisma.load.findMany({
-    where,
-    select: {
-      id: true,
-      billAmount: true,
-      costAmount: true,
-      ventureId: true,
-      officeId: true,
-    },
-  });
+export type AuditRunStats = {
+  mode: "full" | "incremental";
+  scannedSince: Date | null;
+  checksRun: number;
+  checksFailed: number;
+  issuesFound: number;
+  issuesOpened: number;
+  issuesResolved: number;
+  durationMs: number;
+};
 
-  const issues = loads
-    .filter((l: any) => l.costAmount && l.billAmount && l.costAmount > l.billAmount)
-    .map((l: any) => ({
-      targetType: "LOAD",
-      targetId: String(l.id),
-      message: "Load has negative margin (costAmount > billAmount).",
-      details: {
-        ventureId: l.ventureId,
-        officeId: l.officeId,
-        billAmount: l.billAmount,
-        costAmount: l.costAmount,
-      },
-    }));
+// ---------------------------------------------------------------------------
+// Row-level checks
+//
+// A row check is a predicate over Load or HotelDailyReport rows. On an
+// incremental run only rows updated since the previous run, plus rows that
+// currently have an open issue, are read; everything else is unchanged and
+// keeps its existing issue state.
+// ---------------------------------------------------------------------------
+
+type RowModel = "load" | "hotelDailyReport";
+
+type RowCheck = {
+  key: string;
+  model: RowModel;
+  /** Predicate depends on the clock, not only on row contents: always full scan */
+  timeBased?: boolean;
+  where: () => Record<string, unknown>;
+  select: Record<string, unknown>;
+  /** Conditions Prisma cannot express (column-to-column comparisons) */
+  filter?: (row: any) => boolean;
+  toIssue: (row: any) => AuditIssueInput;
+};
 
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
+function rowScopeWhere(model: RowModel, args: RunAuditArgs) {
+  const where: Record<string, unknown> = {};
+  if (model === "load") {
+    if (args.scopeVentureId) where.ventureId = args.scopeVentureId;
+    if (args.scopeOfficeId) where.officeId = args.scopeOfficeId;
+  } else {
+    if (args.scopePropertyId) where.hotelId = args.scopePropertyId;
+    if (args.scopeVentureId) where.hotel = { ventureId: args.scopeVentureId };
+  }
+  return where;
 }
 
-async function checkFreightCompletedMissingDeliveredAt(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "freight.completed_missing_delivered_at";
-  const check = await getCheckMeta(checkKey);
+function rowDelegate(model: RowModel): any {
+  return model === "load" ? prisma.load : prisma.hotelDailyReport;
+}
 
-  const where: Record<string, unknown> = {
-    loadStatus: "DELIVERED",
-    actualDeliveryAt: null,
-  };
-  if (args.scopeVentureId) where.ventureId = args.scopeVentureId;
-  if (args.scopeOfficeId) where.officeId = args.scopeOfficeId;
+function numericIds(ids: Iterable<string | null>): number[] {
+  const out: number[] = [];
+  for (const id of ids) {
+    const n = Number(id);
+    if (id != null && Number.isInteger(n)) out.push(n);
+  }
+  return out;
+}
 
-  const loads = await prisma.load.findMany({
-    where,
-    select: {
-      id: true,
-      ventureId: true,
-      officeId: true,
-      createdAt: true,
-    },
+async function runRowCheck(spec: RowCheck, ctx: CheckContext): Promise<CheckResult> {
+  const delegate = rowDelegate(spec.model);
+  const scope = rowScopeWhere(spec.model, ctx.args);
+  const incremental = ctx.since !== null && !spec.timeBased;
+  const openIds = numericIds(ctx.open.map((i) => i.targetId));
+
+  const and: Record<string, unknown>[] = [scope, spec.where()];
+  if (incremental) {
+    and.push({
+      OR: [
+        { updatedAt: { gt: ctx.since } },
+        ...(openIds.length > 0 ? [{ id: { in: openIds } }] : []),
+      ],
+    });
+  }
+
+  const rows = await delegate.findMany({
+    where: { AND: and },
+    select: { id: true, ...spec.select },
   });
 
-  const issues = loads.map((l: any) => ({
-    targetType: "LOAD",
-    targetId: String(l.id),
-    message: "Delivered load missing actualDeliveryAt.",
-    details: {
-      ventureId: l.ventureId,
-      officeId: l.officeId,
-      createdAt: l.createdAt,
-    },
-  }));
+  const issues = (spec.filter ? rows.filter(spec.filter) : rows).map(spec.toIssue);
+
+  // Unscoped runs see every open issue of the check. Scoped runs may only
+  // resolve issues whose target row still falls inside the scope.
+  let evaluated: CheckResult["evaluated"] = "all";
+  if (ctx.scoped) {
+    const inScope =
+      openIds.length > 0
+        ? await delegate.findMany({
+            where: { AND: [scope, { id: { in: openIds } }] },
+            select: { id: true },
+          })
+        : [];
+    evaluated = new Set(inScope.map((r: any) => String(r.id)));
+  }
 
   return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
+    checkKey: spec.key,
+    module: ctx.meta.module,
+    severity: ctx.meta.severity,
     issues,
+    evaluated,
   };
 }
 
-async function checkFreightZeroMilesWithRevenue(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "freight.zero_miles_with_revenue";
-  const check = await getCheckMeta(checkKey);
-
-  const where: Record<string, unknown> = {
-    billAmount: { gt: 0 },
-  };
-  if (args.scopeVentureId) where.ventureId = args.scopeVentureId;
-  if (args.scopeOfficeId) where.officeId = args.scopeOfficeId;
-
-  const loads = await prisma.load.findMany({
-    where,
-    select: {
-      id: true,
-      ventureId: true,
-      officeId: true,
-      billAmount: true,
-      rate: true,
-      loadStatus: true,
-    },
-  });
-
-  const issues = loads
-    .filter((l: any) => !l.rate || l.rate === 0)
-    .map((l: any) => ({
+const ROW_CHECKS: RowCheck[] = [
+  {
+    key: "freight.negative_margin_loads",
+    model: "load",
+    where: () => ({ loadStatus: "DELIVERED" }),
+    select: { billAmount: true, costAmount: true, ventureId: true, officeId: true },
+    filter: (l) => l.costAmount && l.billAmount && l.costAmount > l.billAmount,
+    toIssue: (l) => ({
+      targetType: "LOAD",
+      targetId: String(l.id),
+      message: "Load has negative margin (costAmount > billAmount).",
+      details: {
+        ventureId: l.ventureId,
+        officeId: l.officeId,
+        billAmount: l.billAmount,
+        costAmount: l.costAmount,
+      },
+    }),
+  },
+  {
+    key: "freight.completed_missing_delivered_at",
+    model: "load",
+    where: () => ({ loadStatus: "DELIVERED", actualDeliveryAt: null }),
+    select: { ventureId: true, officeId: true, createdAt: true },
+    toIssue: (l) => ({
+      targetType: "LOAD",
+      targetId: String(l.id),
+      message: "Delivered load missing actualDeliveryAt.",
+      details: {
+        ventureId: l.ventureId,
+        officeId: l.officeId,
+        createdAt: l.createdAt,
+      },
+    }),
+  },
+  {
+    key: "freight.zero_miles_with_revenue",
+    model: "load",
+    where: () => ({ billAmount: { gt: 0 } }),
+    select: { ventureId: true, officeId: true, billAmount: true, rate: true, loadStatus: true },
+    filter: (l) => !l.rate || l.rate === 0,
+    toIssue: (l) => ({
       targetType: "LOAD",
       targetId: String(l.id),
       message: "Load has revenue but no rate/RPM set.",
@@ -157,130 +218,57 @@ async function checkFreightZeroMilesWithRevenue(
         rate: l.rate ?? 0,
         loadStatus: l.loadStatus,
       },
-    }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
-}
-
-async function checkFreightCompletedMissingCarrier(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "freight.completed_missing_carrier";
-  const check = await getCheckMeta(checkKey);
-
-  const where: Record<string, unknown> = {
-    loadStatus: "DELIVERED",
-    carrierId: null,
-  };
-  if (args.scopeVentureId) where.ventureId = args.scopeVentureId;
-  if (args.scopeOfficeId) where.officeId = args.scopeOfficeId;
-
-  const loads = await prisma.load.findMany({
-    where,
-    select: {
-      id: true,
-      ventureId: true,
-      officeId: true,
-    },
-  });
-
-  const issues = loads.map((l: any) => ({
-    targetType: "LOAD",
-    targetId: String(l.id),
-    message: "Delivered load missing carrierId.",
-    details: {
-      ventureId: l.ventureId,
-      officeId: l.officeId,
-    },
-  }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
-}
-
-async function checkFreightOldDraftLoads(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "freight.old_draft_loads";
-  const check = await getCheckMeta(checkKey);
-
-  const cutoff = new Date();
-  cutoff.setDate(cutoff.getDate() - 14);
-
-  const where: Record<string, unknown> = {
-    loadStatus: "OPEN",
-    createdAt: { lt: cutoff },
-  };
-  if (args.scopeVentureId) where.ventureId = args.scopeVentureId;
-  if (args.scopeOfficeId) where.officeId = args.scopeOfficeId;
-
-  const loads = await prisma.load.findMany({
-    where,
-    select: {
-      id: true,
-      ventureId: true,
-      officeId: true,
-      createdAt: true,
-    },
-  });
-
-  const issues = loads.map((l: any) => ({
-    targetType: "LOAD",
-    targetId: String(l.id),
-    message: "Open load older than 14 days.",
-    details: {
-      ventureId: l.ventureId,
-      officeId: l.officeId,
-      createdAt: l.createdAt,
+    }),
+  },
+  {
+    key: "freight.completed_missing_carrier",
+    model: "load",
+    where: () => ({ loadStatus: "DELIVERED", carrierId: null }),
+    select: { ventureId: true, officeId: true },
+    toIssue: (l) => ({
+      targetType: "LOAD",
+      targetId: String(l.id),
+      message: "Delivered load missing carrierId.",
+      details: {
+        ventureId: l.ventureId,
+        officeId: l.officeId,
+      },
+    }),
+  },
+  {
+    key: "freight.old_draft_loads",
+    model: "load",
+    timeBased: true,
+    where: () => {
+      const cutoff = new Date();
+      cutoff.setDate(cutoff.getDate() - 14);
+      return { loadStatus: "OPEN", createdAt: { lt: cutoff } };
     },
-  }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
-}
-
-async function checkHotelRoomsSoldGtAvailable(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "hotel.rooms_sold_gt_available";
-  const check = await getCheckMeta(checkKey);
-
-  const where: Record<string, unknown> = {
-    roomSold: { gt: 0 },
-  };
-  if (args.scopePropertyId) where.hotelId = args.scopePropertyId;
-  if (args.scopeVentureId) {
-    where.hotel = { ventureId: args.scopeVentureId };
-  }
-
-  const rows = await prisma.hotelDailyReport.findMany({
-    where,
+    select: { ventureId: true, officeId: true, createdAt: true },
+    toIssue: (l) => ({
+      targetType: "LOAD",
+      targetId: String(l.id),
+      message: "Open load older than 14 days.",
+      details: {
+        ventureId: l.ventureId,
+        officeId: l.officeId,
+        createdAt: l.createdAt,
+      },
+    }),
+  },
+  {
+    key: "hotel.rooms_sold_gt_available",
+    model: "hotelDailyReport",
+    where: () => ({ roomSold: { gt: 0 } }),
     select: {
-      id: true,
       hotelId: true,
       date: true,
       totalRoom: true,
       roomSold: true,
       hotel: { select: { ventureId: true } },
     },
-  });
-
-  const issues = rows
-    .filter((r: any) => r.roomSold && r.totalRoom && r.roomSold > r.totalRoom)
-    .map((r: any) => ({
+    filter: (r) => r.roomSold && r.totalRoom && r.roomSold > r.totalRoom,
+    toIssue: (r) => ({
       targetType: "HOTEL_DAILY_REPORT",
       targetId: String(r.id),
       message: "Rooms sold exceeds total rooms available.",
@@ -291,70 +279,108 @@ async function checkHotelRoomsSoldGtAvailable(
         totalRoom: r.totalRoom,
         roomSold: r.roomSold,
       },
-    }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
-}
-
-async function checkHotelRevenueZeroButOccupied(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "hotel.revenue_zero_but_occupied";
-  const check = await getCheckMeta(checkKey);
-
-  const where: Record<string, unknown> = {
-    roomSold: { gt: 0 },
-    total: 0,
-  };
-  if (args.scopePropertyId) where.hotelId = args.scopePropertyId;
-  if (args.scopeVentureId) {
-    where.hotel = { ventureId: args.scopeVentureId };
-  }
-
-  const rows = await prisma.hotelDailyReport.findMany({
-    where,
+    }),
+  },
+  {
+    key: "hotel.revenue_zero_but_occupied",
+    model: "hotelDailyReport",
+    where: () => ({ roomSold: { gt: 0 }, total: 0 }),
     select: {
-      id: true,
       hotelId: true,
       date: true,
       roomSold: true,
       total: true,
       hotel: { select: { ventureId: true } },
     },
-  });
-
-  const issues = rows.map((r: any) => ({
-    targetType: "HOTEL_DAILY_REPORT",
-    targetId: String(r.id),
-    message: "Rooms sold > 0 but total revenue = 0.",
-    details: {
-      ventureId: r.hotel.ventureId,
-      hotelId: r.hotelId,
-      date: r.date,
-      roomSold: r.roomSold,
-      total: r.total,
+    toIssue: (r) => ({
+      targetType: "HOTEL_DAILY_REPORT",
+      targetId: String(r.id),
+      message: "Rooms sold > 0 but total revenue = 0.",
+      details: {
+        ventureId: r.hotel.ventureId,
+        hotelId: r.hotelId,
+        date: r.date,
+        roomSold: r.roomSold,
+        total: r.total,
+      },
+    }),
+  },
+  {
+    key: "hotel.negative_room_counts",
+    model: "hotelDailyReport",
+    where: () => ({ OR: [{ totalRoom: { lt: 0 } }, { roomSold: { lt: 0 } }] }),
+    select: {
+      hotelId: true,
+      date: true,
+      totalRoom: true,
+      roomSold: true,
+      hotel: { select: { ventureId: true } },
     },
-  }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
-}
+    toIssue: (r) => ({
+      targetType: "HOTEL_DAILY_REPORT",
+      targetId: String(r.id),
+      message: "Negative room counts detected.",
+      details: {
+        ventureId: r.hotel.ventureId,
+        hotelId: r.hotelId,
+        date: r.date,
+        totalRoom: r.totalRoom,
+        roomSold: r.roomSold,
+      },
+    }),
+  },
+  {
+    key: "rbac.freight_loads_missing_venture_or_office",
+    model: "load",
+    where: () => ({
+      loadStatus: { not: "OPEN" },
+      OR: [{ ventureId: null }, { officeId: null }],
+    }),
+    select: { ventureId: true, officeId: true, loadStatus: true },
+    toIssue: (l) => ({
+      targetType: "LOAD",
+      targetId: String(l.id),
+      message:
+        "Non-draft load missing ventureId or officeId (breaks scoping / visibility).",
+      details: {
+        ventureId: l.ventureId,
+        officeId: l.officeId,
+        loadStatus: l.loadStatus,
+      },
+    }),
+  },
+  {
+    key: "rbac.hotel_reports_missing_property_link",
+    model: "hotelDailyReport",
+    where: () => ({ hotelId: null }),
+    select: { hotelId: true, date: true },
+    toIssue: (r) => ({
+      targetType: "HOTEL_DAILY_REPORT",
+      targetId: String(r.id),
+      message: "HotelDailyReport missing hotelId (propertyId).",
+      details: {
+        hotelId: r.hotelId,
+        date: r.date,
+      },
+    }),
+  },
+];
+
+// ---------------------------------------------------------------------------
+// Aggregate checks
+//
+// These look at properties or route config rather than individual changed
+// rows, and are cheap enough to evaluate in full on every run.
+// ---------------------------------------------------------------------------
+
+type AggregateCheck = {
+  key: string;
+  run: (args: RunAuditArgs) => Promise<AuditIssueInput[]>;
+};
 
 async function checkHotelMissingRecentReportsPerProperty(
   args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "hotel.missing_recent_reports_per_property";
-  const check = await getCheckMeta(checkKey);
-
+): Promise<AuditIssueInput[]> {
   const today = new Date();
   const cutoff = new Date();
   cutoff.setDate(today.getDate() - 3);
@@ -377,7 +403,7 @@ async function checkHotelMissingRecentReportsPerProperty(
     },
   });
 
-  const issues: CheckResult["issues"] = [];
+  const issues: AuditIssueInput[] = [];
 
   for (const p of properties) {
     const lastDate = p.dailyReports[0]?.date;
@@ -396,20 +422,12 @@ async function checkHotelMissingRecentReportsPerProperty(
     }
   }
 
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
+  return issues;
 }
 
 async function checkHotelExcessiveLossNights(
   args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "hotel.excessive_loss_nights";
-  const check = await getCheckMeta(checkKey);
-
+): Promise<AuditIssueInput[]> {
   const cutoff = new Date();
   cutoff.setDate(cutoff.getDate() - 7);
 
@@ -428,174 +446,30 @@ async function checkHotelExcessiveLossNights(
     _count: { _all: true },
   });
 
-  const hotelIds = rows.filter((r: any) => r._count._all >= 3).map((r: any) => r.hotelId);
+  const flagged = rows.filter((r: any) => r._count._all >= 3);
   const hotels = await prisma.hotelProperty.findMany({
-    where: { id: { in: hotelIds } },
+    where: { id: { in: flagged.map((r: any) => r.hotelId) } },
     select: { id: true, name: true, ventureId: true },
   });
   const hotelMap = new Map(hotels.map((h: any) => [h.id, h]));
 
-  const issues = rows
-    .filter((r: any) => r._count._all >= 3)
-    .map((r: any) => {
-      const hotel = hotelMap.get(r.hotelId) as any;
-      return {
-        targetType: "HOTEL_PROPERTY",
-        targetId: String(r.hotelId),
-        message: "3+ high loss nights in the last 7 days.",
-        details: {
-          hotelId: r.hotelId,
-          hotelName: hotel?.name,
-          ventureId: hotel?.ventureId,
-          highLossCount: r._count._all,
-        },
-      };
-    });
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
-}
-
-async function checkHotelNegativeRoomCounts(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "hotel.negative_room_counts";
-  const check = await getCheckMeta(checkKey);
-
-  const where: Record<string, unknown> = {
-    OR: [{ totalRoom: { lt: 0 } }, { roomSold: { lt: 0 } }],
-  };
-  if (args.scopePropertyId) where.hotelId = args.scopePropertyId;
-  if (args.scopeVentureId) {
-    where.hotel = { ventureId: args.scopeVentureId };
-  }
-
-  const rows = await prisma.hotelDailyReport.findMany({
-    where,
-    select: {
-      id: true,
-      hotelId: true,
-      date: true,
-      totalRoom: true,
-      roomSold: true,
-      hotel: { select: { ventureId: true } },
-    },
-  });
-
-  const issues = rows.map((r: any) => ({
-    targetType: "HOTEL_DAILY_REPORT",
-    targetId: String(r.id),
-    message: "Negative room counts detected.",
-    details: {
-      ventureId: r.hotel.ventureId,
-      hotelId: r.hotelId,
-      date: r.date,
-      totalRoom: r.totalRoom,
-      roomSold: r.roomSold,
-    },
-  }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
-}
-
-async function checkRbacFreightLoadsMissingVentureOrOffice(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "rbac.freight_loads_missing_venture_or_office";
-  const check = await getCheckMeta(checkKey);
-
-  const where: Record<string, unknown> = {
-    loadStatus: { not: "OPEN" },
-  };
-  if (args.scopeVentureId) where.ventureId = args.scopeVentureId;
-  if (args.scopeOfficeId) where.officeId = args.scopeOfficeId;
-
-  const loads = await prisma.load.findMany({
-    where: {
-      ...where,
-      OR: [{ ventureId: null }, { officeId: null }],
-    },
-    select: {
-      id: true,
-      ventureId: true,
-      officeId: true,
-      loadStatus: true,
-    },
-  });
-
-  const issues = loads.map((l: any) => ({
-    targetType: "LOAD",
-    targetId: String(l.id),
-    message:
-      "Non-draft load missing ventureId or officeId (breaks scoping / visibility).",
-    details: {
-      ventureId: l.ventureId,
-      officeId: l.officeId,
-      loadStatus: l.loadStatus,
-    },
-  }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
-}
-
-async function checkRbacHotelReportsMissingPropertyLink(
-  args: RunAuditArgs
-): Promise<CheckResult> {
-  const checkKey = "rbac.hotel_reports_missing_property_link";
-  const check = await getCheckMeta(checkKey);
-
-  const where: Record<string, unknown> = {
-    hotelId: null,
-  };
-  if (args.scopeVentureId) {
-    where.hotel = { ventureId: args.scopeVentureId };
-  }
-
-  const rows = await prisma.hotelDailyReport.findMany({
-    where,
-    select: {
-      id: true,
-      hotelId: true,
-      date: true,
-    },
+  return flagged.map((r: any) => {
+    const hotel = hotelMap.get(r.hotelId) as any;
+    return {
+      targetType: "HOTEL_PROPERTY",
+      targetId: String(r.hotelId),
+      message: "3+ high loss nights in the last 7 days.",
+      details: {
+        hotelId: r.hotelId,
+        hotelName: hotel?.name,
+        ventureId: hotel?.ventureId,
+        highLossCount: r._count._all,
+      },
+    };
   });
-
-  const issues = rows.map((r: any) => ({
-    targetType: "HOTEL_DAILY_REPORT",
-    targetId: String(r.id),
-    message: "HotelDailyReport missing hotelId (propertyId).",
-    details: {
-      hotelId: r.hotelId,
-      date: r.date,
-    },
-  }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
 }
 
-async function checkSecurityApiRoutesMissingConfig(): Promise<CheckResult> {
-  const checkKey = "security.api_routes_missing_config";
-  const check = await getCheckMeta(checkKey);
-
+async function checkSecurityApiRoutesMissingConfig(): Promise<AuditIssueInput[]> {
   const criticalPaths = [
     "/api/logistics/customer-approval-requests",
     "/api/logistics/fmcsa-carrier-lookup",
@@ -608,7 +482,7 @@ async function checkSecurityApiRoutesMissingConfig(): Promise<CheckResult> {
   });
 
   const existingPaths = new Set(configs.map((c: any) => c.path));
-  const issues = criticalPaths
+  return criticalPaths
     .filter((p: any) => !existingPaths.has(p))
     .map((p) => ({
       targetType: "API_ROUTE",
@@ -616,19 +490,9 @@ async function checkSecurityApiRoutesMissingConfig(): Promise<CheckResult> {
       message: "Critical API route missing ApiRouteConfig entry.",
       details: { path: p },
     }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
 }
 
-async function checkSecurityApiRoutesMissingAuth(): Promise<CheckResult> {
-  const checkKey = "security.api_routes_missing_auth";
-  const check = await getCheckMeta(checkKey);
-
+async function checkSecurityApiRoutesMissingAuth(): Promise<AuditIssueInput[]> {
   const routes = await prisma.apiRouteConfig.findMany({
     where: {
       requiresAuth: true,
@@ -636,7 +500,7 @@ async function checkSecurityApiRoutesMissingAuth(): Promise<CheckResult> {
     },
   });
 
-  const issues = routes.map((r: any) => ({
+  return routes.map((r: any) => ({
     targetType: "API_ROUTE",
     targetId: r.path,
     message:
@@ -646,19 +510,9 @@ async function checkSecurityApiRoutesMissingAuth(): Promise<CheckResult> {
       description: r.description,
     },
   }));
-
-  return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
-    issues,
-  };
 }
 
-async function checkSecurityApiRoutesMissingRateLimit(): Promise<CheckResult> {
-  const checkKey = "security.api_routes_missing_rate_limit";
-  const check = await getCheckMeta(checkKey);
-
+async function checkSecurityApiRoutesMissingRateLimit(): Promise<AuditIssueInput[]> {
   const routes = await prisma.apiRouteConfig.findMany({
     where: {
       usesExternalService: true,
@@ -667,7 +521,7 @@ async function checkSecurityApiRoutesMissingRateLimit(): Promise<CheckResult> {
     },
   });
 
-  const issues = routes.map((r: any) => ({
+  return routes.map((r: any) => ({
     targetType: "API_ROUTE",
     targetId: r.path,
     message:
@@ -677,92 +531,196 @@ async function checkSecurityApiRoutesMissingRateLimit(): Promise<CheckResult> {
       description: r.description,
     },
   }));
+}
 
+const AGGREGATE_CHECKS: AggregateCheck[] = [
+  { key: "hotel.missing_recent_reports_per_property", run: checkHotelMissingRecentReportsPerProperty },
+  { key: "hotel.excessive_loss_nights", run: checkHotelExcessiveLossNights },
+  { key: "security.api_routes_missing_config", run: () => checkSecurityApiRoutesMissingConfig() },
+  { key: "security.api_routes_missing_auth", run: () => checkSecurityApiRoutesMissingAuth() },
+  { key: "security.api_routes_missing_rate_limit", run: () => checkSecurityApiRoutesMissingRateLimit() },
+];
+
+async function runAggregateCheck(spec: AggregateCheck, ctx: CheckContext): Promise<CheckResult> {
+  const issues = await spec.run(ctx.args);
   return {
-    checkKey,
-    module: check.module,
-    severity: check.severity,
+    checkKey: spec.key,
+    module: ctx.meta.module,
+    severity: ctx.meta.severity,
     issues,
+    // A scoped run cannot tell which open issues lie outside its scope, so it
+    // only opens new issues and leaves resolution to unscoped runs.
+    evaluated: ctx.scoped ? new Set(issues.map((i) => i.targetId)) : "all",
   };
 }
 
+// ---------------------------------------------------------------------------
+// Issue reconciliation
+// ---------------------------------------------------------------------------
+
+function issueKey(targetType: string, targetId: string | null) {
+  return `${targetType}:${targetId ?? ""}`;
+}
+
+/**
+ * Bring the check's open issues in line with its result: open an issue for
+ * every new finding and resolve open issues whose target was re-evaluated and
+ * no longer fails. Findings that already have an open issue are left alone.
+ */
+async function reconcileIssues(
+  runId: number,
+  meta: CheckMeta,
+  open: OpenIssue[],
+  result: CheckResult
+): Promise<{ opened: number; resolved: number }> {
+  const openKeys = new Set(open.map((i) => issueKey(i.targetType, i.targetId)));
+  const foundKeys = new Set(result.issues.map((i) => issueKey(i.targetType, i.targetId)));
+
+  const toCreate = result.issues.filter(
+    (i) => !openKeys.has(issueKey(i.targetType, i.targetId))
+  );
+  const toResolve = open
+    .filter((i) => !foundKeys.has(issueKey(i.targetType, i.targetId)))
+    .filter((i) => result.evaluated === "all" || result.evaluated.has(i.targetId ?? ""))
+    .map((i) => i.id);
+
+  const ops: any[] = [];
+  for (const batch of chunk(toCreate, WRITE_BATCH_SIZE)) {
+    ops.push(
+      prisma.auditIssue.createMany({
+        data: batch.map((issue) => ({
+          auditRunId: runId,
+          auditCheckId: meta.id,
+          module: meta.module,
+          severity: meta.severity,
+          status: OPEN,
+          targetType: issue.targetType,
+          targetId: issue.targetId,
+          message: issue.message,
+          details: (issue.details as object) ?? undefined,
+        })),
+      })
+    );
+  }
+  for (const batch of chunk(toResolve, WRITE_BATCH_SIZE)) {
+    ops.push(
+      prisma.auditIssue.updateMany({
+        where: { id: { in: batch }, status: OPEN },
+        data: { status: RESOLVED, resolvedAt: new Date() },
+      })
+    );
+  }
+
+  if (ops.length > 0) {
+    await prisma.$transaction(ops);
+  }
+
+  return { opened: toCreate.length, resolved: toResolve.length };
+}
+
+function severityWeight(severity: AuditSeverity): number {
+  return severity === "CRITICAL"
+    ? 30
+    : severity === "HIGH"
+    ? 20
+    : severity === "MEDIUM"
+    ? 10
+    : 5;
+}
+
+/**
+ * Run all active audit checks.
+ *
+ * Row checks only read rows changed since the previous finished run with the
+ * same scope (plus rows with an open issue), unless `full` is set or there is
+ * no previous run. Checks run concurrently, and each check's issues are
+ * reconciled against the open issues in bulk, so an unchanged problem keeps a
+ * single OPEN issue across runs instead of being re-inserted every time.
+ */
 export async function runAudit(args: RunAuditArgs) {
+  const startedAt = Date.now();
+  const scoped = Boolean(args.scopeVentureId || args.scopeOfficeId || args.scopePropertyId);
+
+  const previous = args.full
+    ? null
+    : await prisma.auditRun.findFirst({
+        where: {
+          finishedAt: { not: null },
+          scopeVentureId: args.scopeVentureId ?? null,
+          scopeOfficeId: args.scopeOfficeId ?? null,
+          scopePropertyId: args.scopePropertyId ?? null,
+        },
+        orderBy: { createdAt: "desc" },
+        select: { createdAt: true },
+      });
+  // The previous run's start, not finish: rows written while it ran are rescanned
+  const since = previous?.createdAt ?? null;
+
   const run = await prisma.auditRun.create({
     data: {
       initiatedByUserId: args.initiatedByUserId,
       scopeVentureId: args.scopeVentureId,
       scopeOfficeId: args.scopeOfficeId,
       scopePropertyId: args.scopePropertyId,
+      scannedSince: since,
     },
   });
 
-  const checks: (() => Promise<CheckResult>)[] = [
-    () => checkFreightNegativeMarginLoads(args),
-    () => checkFreightCompletedMissingDeliveredAt(args),
-    () => checkFreightZeroMilesWithRevenue(args),
-    () => checkFreightCompletedMissingCarrier(args),
-    () => checkFreightOldDraftLoads(args),
-    () => checkHotelRoomsSoldGtAvailable(args),
-    () => checkHotelRevenueZeroButOccupied(args),
-    () => checkHotelMissingRecentReportsPerProperty(args),
-    () => checkHotelExcessiveLossNights(args),
-    () => checkHotelNegativeRoomCounts(args),
-    () => checkRbacFreightLoadsMissingVentureOrOffice(args),
-    () => checkRbacHotelReportsMissingPropertyLink(args),
-    () => checkSecurityApiRoutesMissingConfig(),
-    () => checkSecurityApiRoutesMissingAuth(),
-    () => checkSecurityApiRoutesMissingRateLimit(),
-  ];
+  const metas = await prisma.auditCheck.findMany({
+    where: { isActive: true },
+    select: { id: true, key: true, module: true, severity: true },
+  });
+  const metaByKey = new Map<string, CheckMeta>(metas.map((m: any) => [m.key, m]));
 
-  const results: CheckResult[] = [];
-  for (const checkFn of checks) {
-    try {
-      const result = await checkFn();
-      results.push(result);
-    } catch (err) {
-      console.error(`Audit check failed`, err);
-    }
+  const openIssues = await prisma.auditIssue.findMany({
+    where: { status: OPEN, auditCheckId: { in: metas.map((m: any) => m.id) } },
+    select: { id: true, auditCheckId: true, targetType: true, targetId: true },
+  });
+  const openByCheck = new Map<number, OpenIssue[]>();
+  for (const issue of openIssues) {
+    const list = openByCheck.get(issue.auditCheckId) ?? [];
+    list.push(issue);
+    openByCheck.set(issue.auditCheckId, list);
   }
 
-  let issueCount = 0;
+  type Task = {
+    key: string;
+    exec: (ctx: CheckContext) => Promise<CheckResult>;
+  };
+  const tasks: Task[] = [
+    ...ROW_CHECKS.map((spec) => ({ key: spec.key, exec: (ctx: CheckContext) => runRowCheck(spec, ctx) })),
+    ...AGGREGATE_CHECKS.map((spec) => ({ key: spec.key, exec: (ctx: CheckContext) => runAggregateCheck(spec, ctx) })),
+  ].filter((t) => metaByKey.has(t.key));
+
+  const settled = await runWithConcurrency(tasks, CHECK_CONCURRENCY, async (task) => {
+    const meta = metaByKey.get(task.key)!;
+    const open = openByCheck.get(meta.id) ?? [];
+    const result = await task.exec({ args, since, scoped, meta, open });
+    const written = await reconcileIssues(run.id, meta, open, result);
+    return { result, ...written };
+  });
+
   let maxScore = 0;
   let weightedScore = 0;
-
-  for (const r of results) {
-    const check = await prisma.auditCheck.findUnique({
-      where: { key: r.checkKey },
-    });
-    if (!check) continue;
-
-    const weight =
-      check.severity === "CRITICAL"
-        ? 30
-        : check.severity === "HIGH"
-        ? 20
-        : check.severity === "MEDIUM"
-        ? 10
-        : 5;
-
-    maxScore += weight;
-    weightedScore += Math.max(0, weight - r.issues.length);
-
-    for (const issue of r.issues) {
-      await prisma.auditIssue.create({
-        data: {
-          auditRunId: run.id,
-          auditCheckId: check.id,
-          module: check.module,
-          severity: check.severity,
-          status: "OPEN",
-          targetType: issue.targetType,
-          targetId: issue.targetId,
-          message: issue.message,
-          details: (issue.details as object) ?? undefined,
-        },
-      });
-      issueCount++;
+  let checksFailed = 0;
+  let issuesFound = 0;
+  let issuesOpened = 0;
+  let issuesResolved = 0;
+
+  settled.forEach((s, i) => {
+    if (!s.ok) {
+      checksFailed++;
+      console.error(`Audit check failed: ${tasks[i].key}`, s.error);
+      return;
     }
-  }
+    const { result, opened, resolved } = s.value;
+    const weight = severityWeight(result.severity);
+    maxScore += weight;
+    weightedScore += Math.max(0, weight - result.issues.length);
+    issuesFound += result.issues.length;
+    issuesOpened += opened;
+    issuesResolved += resolved;
+  });
 
   const overallScore =
     maxScore > 0 ? Math.round((weightedScore / maxScore) * 100) : 100;
@@ -778,5 +736,16 @@ export async function runAudit(args: RunAuditArgs) {
     },
   });
 
-  return finalRun;
+  const stats: AuditRunStats = {
+    mode: since ? "incremental" : "full",
+    scannedSince: since,
+    checksRun: tasks.length,
+    checksFailed,
+    issuesFound,
+    issuesOpened,
+    issuesResolved,
+    durationMs: Date.now() - startedAt,
+  };
+
+  return { ...finalRun, stats };
 }
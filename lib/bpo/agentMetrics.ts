@@ -0,0 +1,173 @@
+import { Prisma } from "@prisma/client";
+import prisma from "@/lib/prisma";
+import { coverWithPeriods, spanFilter } from "@/lib/utils/rollupPeriods";
+
+// Grouped SQL behind /api/bpo/agent-kpi and /api/bpo/dashboard.
+//
+// BpoAgentMetricWeekly holds per-(campaign, agent, ISO week) sums of
+// BpoAgentMetric, maintained by a statement trigger on the daily table (see
+// the bpo_agent_metric_weekly migration). Long ranges read whole weeks from
+// it and only the partial weeks at either edge from the daily rows; names
+// are joined in the same query instead of hydrating users afterwards.
+
+export type AgentKpiTotals = {
+  agentId: number;
+  agentName: string;
+  campaignId: number;
+  campaignName: string | null;
+  totalCalls: number;
+  totalTalkTimeSec: number;
+  totalAppointments: number;
+  totalSales: number;
+  days: number;
+};
+
+const toTimestamps = (dates: Date[]) => dates.map((d) => d.toISOString());
+
+/** Per-agent, per-campaign totals for BpoAgentMetric rows dated in [from, toExclusive). */
+export async function readAgentKpiTotals(from: Date, toExclusive: Date): Promise<AgentKpiTotals[]> {
+  const { starts, rest } = coverWithPeriods("WEEK", [from, toExclusive]);
+
+  const weekly = starts.length
+    ? Prisma.sql`
+        SELECT w."campaignId", w."agentId", w."agentName", w."days", w."calls",
+               w."talkTimeMin", w."demosBooked", w."salesClosed"
+        FROM "BpoAgentMetricWeekly" w
+        WHERE w."weekStart" = ANY(${toTimestamps(starts)}::timestamp[])
+        UNION ALL`
+    : Prisma.empty;
+
+  const rows = await prisma.$queryRaw<AgentKpiTotals[]>`
+    WITH s AS (
+      ${weekly}
+      SELECT m."campaignId", COALESCE(m."userId", 0) AS "agentId", MAX(m."agentName") AS "agentName",
+             COUNT(DISTINCT date_trunc('day', m."date"))::int AS "days",
+             SUM(COALESCE(m."handledCalls", 0) + COALESCE(m."outboundCalls", 0))::int AS "calls",
+             SUM(COALESCE(m."talkTimeMin", 0))::int AS "talkTimeMin",
+             SUM(COALESCE(m."demosBooked", 0))::int AS "demosBooked",
+             SUM(COALESCE(m."salesClosed", 0))::int AS "salesClosed"
+      FROM "BpoAgentMetric" m
+      WHERE ${rest.length ? spanFilter(Prisma.sql`m."date"`, rest) : Prisma.sql`FALSE`}
+      GROUP BY 1, 2
+    )
+    SELECT s."campaignId", s."agentId",
+           COALESCE(u."name", MAX(s."agentName"), 'Agent ' || s."agentId") AS "agentName",
+           c."name" AS "campaignName",
+           SUM(s."calls")::int AS "totalCalls",
+           (SUM(s."talkTimeMin") * 60)::int AS "totalTalkTimeSec",
+           SUM(s."demosBooked")::int AS "totalAppointments",
+           SUM(s."salesClosed")::int AS "totalSales",
+           SUM(s."days")::int AS "days"
+    FROM s
+    LEFT JOIN "User" u ON u."id" = s."agentId"
+    LEFT JOIN "BpoCampaign" c ON c."id" = s."campaignId"
+    GROUP BY s."campaignId", s."agentId", u."name", c."name"
+    ORDER BY "totalCalls" DESC, s."agentId", s."campaignId"
+  `;
+
+  return rows.map((r) => ({
+    ...r,
+    totalCalls: Number(r.totalCalls),
+    totalTalkTimeSec: Number(r.totalTalkTimeSec),
+    totalAppointments: Number(r.totalAppointments),
+    totalSales: Number(r.totalSales),
+    days: Number(r.days),
+  }));
+}
+
+export type CampaignCardTotals = {
+  id: number;
+  name: string;
+  clientName: string | null;
+  vertical: string | null;
+  talkTimeMin: number;
+  handledCalls: number;
+  outboundCalls: number;
+  leadsCreated: number;
+  demosBooked: number;
+  salesClosed: number;
+  revenue: number;
+  cost: number;
+  qaScoreSum: number;
+  qaCount: number;
+};
+
+export type AgentLeaderboardTotals = {
+  key: string;
+  name: string;
+  outboundCalls: number;
+  leadsCreated: number;
+  demosBooked: number;
+  salesClosed: number;
+};
+
+/**
+ * Active campaigns of a venture with their BpoDailyMetric sums, and the
+ * top agents by leads across those campaigns, for [from, to] inclusive.
+ */
+export async function readBpoDashboardTotals(params: {
+  ventureId: number;
+  from: Date;
+  to: Date;
+  includeTest: boolean;
+  leaderboardSize: number;
+}): Promise<{ campaigns: CampaignCardTotals[]; leaderboard: AgentLeaderboardTotals[] }> {
+  const { ventureId, from, to, includeTest, leaderboardSize } = params;
+  const testFilter = (alias: string) =>
+    includeTest ? Prisma.empty : Prisma.sql`AND NOT ${Prisma.raw(alias)}."isTest"`;
+  const activeCampaigns = Prisma.sql`
+    SELECT "id" FROM "BpoCampaign" WHERE "ventureId" = ${ventureId} AND "isActive"`;
+
+  const [campaigns, leaderboard] = await Promise.all([
+    prisma.$queryRaw<CampaignCardTotals[]>`
+      SELECT c."id", c."name", c."clientName", c."vertical",
+             COALESCE(m."talkTimeMin", 0)::int AS "talkTimeMin",
+             COALESCE(m."handledCalls", 0)::int AS "handledCalls",
+             COALESCE(m."outboundCalls", 0)::int AS "outboundCalls",
+             COALESCE(m."leadsCreated", 0)::int AS "leadsCreated",
+             COALESCE(m."demosBooked", 0)::int AS "demosBooked",
+             COALESCE(m."salesClosed", 0)::int AS "salesClosed",
+             COALESCE(m."revenue", 0)::float8 AS "revenue",
+             COALESCE(m."cost", 0)::float8 AS "cost",
+             COALESCE(m."qaScoreSum", 0)::float8 AS "qaScoreSum",
+             COALESCE(m."qaCount", 0)::int AS "qaCount"
+      FROM "BpoCampaign" c
+      LEFT JOIN (
+        SELECT d."campaignId", SUM(d."talkTimeMin") AS "talkTimeMin", SUM(d."handledCalls") AS "handledCalls",
+               SUM(d."outboundCalls") AS "outboundCalls", SUM(d."leadsCreated") AS "leadsCreated",
+               SUM(d."demosBooked") AS "demosBooked", SUM(d."salesClosed") AS "salesClosed",
+               SUM(d."revenue") AS "revenue", SUM(d."cost") AS "cost",
+               SUM(d."avgQaScore") AS "qaScoreSum", COUNT(d."avgQaScore") AS "qaCount"
+        FROM "BpoDailyMetric" d
+        WHERE d."campaignId" IN (${activeCampaigns})
+          AND d."date" >= ${from} AND d."date" <= ${to} ${testFilter("d")}
+        GROUP BY 1
+      ) m ON m."campaignId" = c."id"
+      WHERE c."ventureId" = ${ventureId} AND c."isActive"
+      ORDER BY c."id"
+    `,
+    prisma.$queryRaw<AgentLeaderboardTotals[]>`
+      SELECT g."key",
+             COALESCE(NULLIF(u."name", ''), NULLIF(g."agentName", ''), 'Unknown agent') AS "name",
+             g."outboundCalls", g."leadsCreated", g."demosBooked", g."salesClosed"
+      FROM (
+        SELECT CASE WHEN m."userId" IS NOT NULL THEN 'user_' || m."userId"
+                    ELSE COALESCE(NULLIF(m."agentName", ''), 'UNKNOWN') END AS "key",
+               m."userId", MAX(m."agentName") AS "agentName",
+               SUM(COALESCE(m."outboundCalls", 0))::int AS "outboundCalls",
+               SUM(COALESCE(m."leadsCreated", 0))::int AS "leadsCreated",
+               SUM(COALESCE(m."demosBooked", 0))::int AS "demosBooked",
+               SUM(COALESCE(m."salesClosed", 0))::int AS "salesClosed"
+        FROM "BpoAgentMetric" m
+        WHERE m."campaignId" IN (${activeCampaigns})
+          AND m."date" >= ${from} AND m."date" <= ${to} ${testFilter("m")}
+        GROUP BY 1, 2
+      ) g
+      LEFT JOIN "User" u ON u."id" = g."userId"
+      ORDER BY g."leadsCreated" DESC, g."key"
+      LIMIT ${leaderboardSize}
+    `,
+  ]);
+
+  return { campaigns, leaderboard };
+}
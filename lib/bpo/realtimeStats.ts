@@ -0,0 +1,544 @@
+import prisma from "@/lib/prisma";
+import { logger } from "@/lib/logger";
+
+// In-process, per-venture aggregator behind the BPO floor dashboards.
+//
+// A floor is loaded once from grouped queries, then kept current by call
+// events (recordBpoCall) so a read is O(agents) instead of reloading every
+// call log for the day. Each floor is reloaded from the database every
+// BPO_REALTIME_RECONCILE_MS to pick up writes from other processes, call
+// updates and daily metric imports, and again when the local day rolls over.
+
+const RECONCILE_MS = Math.max(1000, Number(process.env.BPO_REALTIME_RECONCILE_MS ?? 60 * 1000));
+const PUSH_INTERVAL_MS = Math.max(1000, Number(process.env.BPO_REALTIME_PUSH_MS ?? 5 * 1000));
+
+export type AgentStatus = "online" | "busy" | "idle" | "offline";
+
+export type RealtimeAgentStats = {
+  id: number;
+  name: string;
+  avatarUrl: string | null;
+  campaignName: string;
+  status: AgentStatus;
+  callsToday: number;
+  connectedCalls: number;
+  talkTimeMin: number;
+  leadsToday: number;
+  demosToday: number;
+  salesToday: number;
+  lastCallAt: Date | null;
+  connectionRate: number;
+};
+
+export type RealtimeCampaignStats = {
+  id: number;
+  name: string;
+  clientName: string;
+  totalCalls: number;
+  connectedCalls: number;
+  connectionRate: number;
+  leads: number;
+  demos: number;
+  sales: number;
+  revenue: number;
+  activeAgents: number;
+};
+
+export type RealtimeStats = {
+  timestamp: string;
+  summary: {
+    totalAgents: number;
+    onlineAgents: number;
+    busyAgents: number;
+    idleAgents: number;
+    offlineAgents: number;
+    totalCallsToday: number;
+    connectedCallsToday: number;
+    leadsToday: number;
+    salesToday: number;
+    totalRevenue: number;
+  };
+  agents: RealtimeAgentStats[];
+  campaigns: RealtimeCampaignStats[];
+};
+
+/** The fields of a BpoCallLog row the aggregator needs. */
+export type BpoCallEvent = {
+  id: number;
+  agentId: number;
+  ventureId: number;
+  campaignId: number | null;
+  callStartedAt: Date;
+  callEndedAt: Date | null;
+  isConnected: boolean;
+  appointmentSet: boolean;
+  dealWon: boolean;
+};
+
+type CallTotals = {
+  calls: number;
+  connected: number;
+  leads: number;
+  sales: number;
+  talkMs: number;
+  openCalls: number;
+  lastCallAt: Date | null;
+};
+
+type FloorAgent = {
+  id: number;
+  userId: number | null;
+  name: string;
+  avatarUrl: string | null;
+  campaignId: number | null;
+  campaignName: string;
+};
+
+type FloorCampaign = {
+  id: number;
+  name: string;
+  clientName: string;
+  demos: number;
+  firstMetricRevenue: number;
+  revenue: number;
+  // demosBooked per userId from BpoAgentMetric
+  agentDemos: Map<number, number>;
+};
+
+type Floor = {
+  ventureId: number;
+  dayStart: number;
+  loadedAt: number;
+  // Calls with an id at or below this were counted by the load query
+  maxCallId: number;
+  campaigns: Map<number, FloorCampaign>;
+  agents: FloorAgent[];
+  // agentId -> campaignId -> totals
+  agentCalls: Map<number, Map<number, CallTotals>>;
+  campaignCalls: Map<number, CallTotals>;
+};
+
+const floors = new Map<number, Floor>();
+const loading = new Map<number, Promise<Floor>>();
+
+function emptyTotals(): CallTotals {
+  return { calls: 0, connected: 0, leads: 0, sales: 0, talkMs: 0, openCalls: 0, lastCallAt: null };
+}
+
+function localDayStart(now: Date): number {
+  const d = new Date(now);
+  d.setHours(0, 0, 0, 0);
+  return d.getTime();
+}
+
+function addTotals(into: CallTotals, from: CallTotals): void {
+  into.calls += from.calls;
+  into.connected += from.connected;
+  into.leads += from.leads;
+  into.sales += from.sales;
+  into.talkMs += from.talkMs;
+  into.openCalls += from.openCalls;
+  if (from.lastCallAt && (!into.lastCallAt || from.lastCallAt > into.lastCallAt)) {
+    into.lastCallAt = from.lastCallAt;
+  }
+}
+
+type CallGroupRow = {
+  agentId: number;
+  campaignId: number;
+  calls: number;
+  connected: number;
+  leads: number;
+  sales: number;
+  talkMs: number;
+  openCalls: number;
+  lastCallAt: Date | null;
+  maxId: number;
+};
+
+async function loadFloor(ventureId: number, now: Date): Promise<Floor> {
+  const dayStart = localDayStart(now);
+  const todayStart = new Date(dayStart);
+
+  const campaigns = await prisma.bpoCampaign.findMany({
+    where: { ventureId, isActive: true },
+    select: { id: true, name: true, clientName: true },
+  });
+  const campaignIds = campaigns.map((c) => c.id);
+
+  const [agents, callGroups, dailyMetrics, agentMetrics] = await Promise.all([
+    prisma.bpoAgent.findMany({
+      where: { ventureId, isActive: true, campaignId: { in: campaignIds } },
+      include: {
+        user: { select: { id: true, fullName: true, avatarUrl: true } },
+        campaign: { select: { id: true, name: true } },
+      },
+    }),
+    campaignIds.length
+      ? prisma.$queryRaw<CallGroupRow[]>`
+          SELECT "agentId", "campaignId",
+                 COUNT(*)::int AS "calls",
+                 COUNT(*) FILTER (WHERE "isConnected")::int AS "connected",
+                 COUNT(*) FILTER (WHERE "appointmentSet")::int AS "leads",
+                 COUNT(*) FILTER (WHERE "dealWon")::int AS "sales",
+                 COALESCE(SUM(EXTRACT(EPOCH FROM ("callEndedAt" - "callStartedAt")) * 1000), 0)::float8 AS "talkMs",
+                 COUNT(*) FILTER (WHERE "callEndedAt" IS NULL)::int AS "openCalls",
+                 MAX("callStartedAt") AS "lastCallAt",
+                 MAX("id") AS "maxId"
+          FROM "BpoCallLog"
+          WHERE "ventureId" = ${ventureId}
+            AND "campaignId" = ANY(${campaignIds})
+            AND "callStartedAt" >= ${todayStart}
+          GROUP BY "agentId", "campaignId"
+        `
+      : Promise.resolve([] as CallGroupRow[]),
+    prisma.bpoDailyMetric.findMany({
+      where: { campaignId: { in: campaignIds }, date: { gte: todayStart } },
+      select: { campaignId: true, demosBooked: true, revenue: true },
+    }),
+    prisma.bpoAgentMetric.findMany({
+      where: { campaignId: { in: campaignIds }, date: { gte: todayStart } },
+      select: { campaignId: true, userId: true, demosBooked: true },
+    }),
+  ]);
+
+  const floorCampaigns = new Map<number, FloorCampaign>();
+  for (const c of campaigns) {
+    floorCampaigns.set(c.id, {
+      id: c.id,
+      name: c.name,
+      clientName: c.clientName,
+      demos: 0,
+      firstMetricRevenue: 0,
+      revenue: 0,
+      agentDemos: new Map(),
+    });
+  }
+  const seenDaily = new Set<number>();
+  for (const m of dailyMetrics) {
+    const camp = floorCampaigns.get(m.campaignId);
+    if (!camp) continue;
+    if (!seenDaily.has(m.campaignId)) {
+      seenDaily.add(m.campaignId);
+      camp.demos = m.demosBooked || 0;
+      camp.firstMetricRevenue = m.revenue || 0;
+    }
+    camp.revenue += m.revenue || 0;
+  }
+  for (const m of agentMetrics) {
+    const camp = floorCampaigns.get(m.campaignId);
+    if (!camp || !m.userId) continue;
+    camp.agentDemos.set(m.userId, (camp.agentDemos.get(m.userId) ?? 0) + (m.demosBooked || 0));
+  }
+
+  const floor: Floor = {
+    ventureId,
+    dayStart,
+    loadedAt: now.getTime(),
+    maxCallId: 0,
+    campaigns: floorCampaigns,
+    agents: agents.map((a) => ({
+      id: a.id,
+      userId: a.user?.id ?? null,
+      name: a.user?.fullName || `Agent #${a.id}`,
+      avatarUrl: a.user?.avatarUrl || null,
+      campaignId: a.campaignId,
+      campaignName: a.campaign?.name || "Unassigned",
+    })),
+    agentCalls: new Map(),
+    campaignCalls: new Map(),
+  };
+
+  for (const row of callGroups) {
+    const totals: CallTotals = {
+      calls: Number(row.calls),
+      connected: Number(row.connected),
+      leads: Number(row.leads),
+      sales: Number(row.sales),
+      talkMs: Number(row.talkMs),
+      openCalls: Number(row.openCalls),
+      lastCallAt: row.lastCallAt ? new Date(row.lastCallAt) : null,
+    };
+    floor.maxCallId = Math.max(floor.maxCallId, Number(row.maxId));
+    addTotals(agentTotals(floor, row.agentId, row.campaignId), totals);
+    addTotals(campaignTotals(floor, row.campaignId), totals);
+  }
+
+  return floor;
+}
+
+function agentTotals(floor: Floor, agentId: number, campaignId: number): CallTotals {
+  let byCampaign = floor.agentCalls.get(agentId);
+  if (!byCampaign) {
+    byCampaign = new Map();
+    floor.agentCalls.set(agentId, byCampaign);
+  }
+  let totals = byCampaign.get(campaignId);
+  if (!totals) {
+    totals = emptyTotals();
+    byCampaign.set(campaignId, totals);
+  }
+  return totals;
+}
+
+function campaignTotals(floor: Floor, campaignId: number): CallTotals {
+  let totals = floor.campaignCalls.get(campaignId);
+  if (!totals) {
+    totals = emptyTotals();
+    floor.campaignCalls.set(campaignId, totals);
+  }
+  return totals;
+}
+
+async function getFloor(ventureId: number, now: Date): Promise<Floor> {
+  const floor = floors.get(ventureId);
+  if (
+    floor &&
+    floor.dayStart === localDayStart(now) &&
+    now.getTime() - floor.loadedAt < RECONCILE_MS
+  ) {
+    return floor;
+  }
+
+  // Every screen on the floor shares one reload
+  let pending = loading.get(ventureId);
+  if (!pending) {
+    pending = loadFloor(ventureId, now)
+      .then((fresh) => {
+        floors.set(ventureId, fresh);
+        return fresh;
+      })
+      .finally(() => loading.delete(ventureId));
+    loading.set(ventureId, pending);
+  }
+  return pending;
+}
+
+/**
+ * Fold a newly stored call log into its venture's floor. Calls for ventures
+ * nobody is watching, for another day or for untracked campaigns are skipped;
+ * the next load or reconciliation reads them from the database.
+ */
+export function recordBpoCall(call: BpoCallEvent): void {
+  const floor = floors.get(call.ventureId);
+  if (!floor || call.campaignId == null || !floor.campaigns.has(call.campaignId)) return;
+  if (call.id <= floor.maxCallId) return;
+  if (localDayStart(call.callStartedAt) !== floor.dayStart) return;
+
+  const delta: CallTotals = {
+    calls: 1,
+    connected: call.isConnected ? 1 : 0,
+    leads: call.appointmentSet ? 1 : 0,
+    sales: call.dealWon ? 1 : 0,
+    talkMs: call.callEndedAt ? call.callEndedAt.getTime() - call.callStartedAt.getTime() : 0,
+    openCalls: call.callEndedAt ? 0 : 1,
+    lastCallAt: call.callStartedAt,
+  };
+  floor.maxCallId = call.id;
+  addTotals(agentTotals(floor, call.agentId, call.campaignId), delta);
+  addTotals(campaignTotals(floor, call.campaignId), delta);
+}
+
+const STATUS_ORDER: Record<AgentStatus, number> = { busy: 0, online: 1, idle: 2, offline: 3 };
+
+/** Build the dashboard payload from a floor. Pure; exposed for tests. */
+export function buildRealtimeStats(floor: Floor, now: Date, campaignId?: number): RealtimeStats {
+  const inView = (id: number | null) => id != null && (!campaignId || id === campaignId);
+  const campaigns = Array.from(floor.campaigns.values()).filter((c) => inView(c.id));
+  const agents = floor.agents.filter((a) => inView(a.campaignId));
+
+  const fiveMinutesAgo = now.getTime() - 5 * 60 * 1000;
+  const fifteenMinutesAgo = now.getTime() - 15 * 60 * 1000;
+
+  // Agent metrics are keyed by user; the first agent row for a user gets them
+  const demosByUser = new Map<number, number>();
+  for (const camp of campaigns) {
+    for (const [userId, demos] of camp.agentDemos) {
+      demosByUser.set(userId, (demosByUser.get(userId) ?? 0) + demos);
+    }
+  }
+
+  const agentStats: RealtimeAgentStats[] = agents.map((agent) => {
+    const totals = emptyTotals();
+    for (const [cid, t] of floor.agentCalls.get(agent.id) ?? []) {
+      if (inView(cid)) addTotals(totals, t);
+    }
+
+    let demosToday = 0;
+    if (agent.userId != null && demosByUser.has(agent.userId)) {
+      demosToday = demosByUser.get(agent.userId)!;
+      demosByUser.delete(agent.userId);
+    }
+
+    let status: AgentStatus = "offline";
+    if (totals.lastCallAt) {
+      const last = totals.lastCallAt.getTime();
+      if (totals.openCalls > 0) status = "busy";
+      else if (last > fiveMinutesAgo) status = "online";
+      else if (last > fifteenMinutesAgo) status = "idle";
+    }
+
+    return {
+      id: agent.id,
+      name: agent.name,
+      avatarUrl: agent.avatarUrl,
+      campaignName: agent.campaignName,
+      status,
+      callsToday: totals.calls,
+      connectedCalls: totals.connected,
+      talkTimeMin: totals.talkMs / 60000,
+      leadsToday: totals.leads,
+      demosToday,
+      salesToday: totals.sales,
+      lastCallAt: totals.lastCallAt,
+      connectionRate: totals.calls > 0 ? totals.connected / totals.calls : 0,
+    };
+  });
+
+  agentStats.sort((a, b) => {
+    if (STATUS_ORDER[a.status] !== STATUS_ORDER[b.status]) {
+      return STATUS_ORDER[a.status] - STATUS_ORDER[b.status];
+    }
+    return b.callsToday - a.callsToday;
+  });
+
+  const activeByCampaignName = new Map<string, number>();
+  for (const a of agentStats) {
+    if (a.status !== "offline") {
+      activeByCampaignName.set(a.campaignName, (activeByCampaignName.get(a.campaignName) ?? 0) + 1);
+    }
+  }
+
+  const floorTotals = emptyTotals();
+  let totalRevenue = 0;
+  const campaignStats: RealtimeCampaignStats[] = campaigns.map((camp) => {
+    const totals = floor.campaignCalls.get(camp.id) ?? emptyTotals();
+    addTotals(floorTotals, totals);
+    totalRevenue += camp.revenue;
+    return {
+      id: camp.id,
+      name: camp.name,
+      clientName: camp.clientName,
+      totalCalls: totals.calls,
+      connectedCalls: totals.connected,
+      connectionRate: totals.calls > 0 ? totals.connected / totals.calls : 0,
+      leads: totals.leads,
+      demos: camp.demos,
+      sales: totals.sales,
+      revenue: camp.firstMetricRevenue,
+      activeAgents: activeByCampaignName.get(camp.name) ?? 0,
+    };
+  });
+
+  const count = (status: AgentStatus) => agentStats.filter((a) => a.status === status).length;
+
+  return {
+    timestamp: now.toISOString(),
+    summary: {
+      totalAgents: agents.length,
+      onlineAgents: count("online") + count("busy"),
+      busyAgents: count("busy"),
+      idleAgents: count("idle"),
+      offlineAgents: count("offline"),
+      totalCallsToday: floorTotals.calls,
+      connectedCallsToday: floorTotals.connected,
+      leadsToday: floorTotals.leads,
+      salesToday: floorTotals.sales,
+      totalRevenue,
+    },
+    agents: agentStats,
+    campaigns: campaignStats,
+  };
+}
+
+/** Realtime floor stats for a venture, optionally narrowed to one campaign. */
+export async function getRealtimeStats(
+  ventureId: number,
+  campaignId?: number,
+  now = new Date(),
+): Promise<RealtimeStats> {
+  const floor = await getFloor(ventureId, now);
+  return buildRealtimeStats(floor, now, campaignId);
+}
+
+type Subscriber = {
+  campaignId?: number;
+  send: (stats: RealtimeStats) => void;
+};
+
+const subscribers = new Map<number, Set<Subscriber>>();
+const pushTimers = new Map<number, NodeJS.Timeout>();
+
+async function pushToVenture(ventureId: number): Promise<void> {
+  const subs = subscribers.get(ventureId);
+  if (!subs?.size) return;
+
+  const now = new Date();
+  const floor = await getFloor(ventureId, now);
+  // One snapshot per campaign filter, shared by every screen using it
+  const snapshots = new Map<number, RealtimeStats>();
+  for (const sub of subs) {
+    const key = sub.campaignId ?? 0;
+    let stats = snapshots.get(key);
+    if (!stats) {
+      stats = buildRealtimeStats(floor, now, sub.campaignId);
+      snapshots.set(key, stats);
+    }
+    sub.send(stats);
+  }
+}
+
+/**
+ * Push a fresh snapshot every BPO_REALTIME_PUSH_MS to `send` until the
+ * returned function is called. The first snapshot is sent immediately.
+ */
+export function subscribeRealtimeStats(
+  ventureId: number,
+  campaignId: number | undefined,
+  send: (stats: RealtimeStats) => void,
+): () => void {
+  const sub: Subscriber = { campaignId, send };
+  let subs = subscribers.get(ventureId);
+  if (!subs) {
+    subs = new Set();
+    subscribers.set(ventureId, subs);
+  }
+  subs.add(sub);
+
+  getRealtimeStats(ventureId, campaignId)
+    .then(send)
+    .catch((err) =>
+      logger.error("bpo_realtime_push_failed", { ventureId, error: err?.message || String(err) }),
+    );
+
+  if (!pushTimers.has(ventureId)) {
+    const timer = setInterval(() => {
+      pushToVenture(ventureId).catch((err) =>
+        logger.error("bpo_realtime_push_failed", { ventureId, error: err?.message || String(err) }),
+      );
+    }, PUSH_INTERVAL_MS);
+    timer.unref?.();
+    pushTimers.set(ventureId, timer);
+  }
+
+  return () => {
+    const current = subscribers.get(ventureId);
+    if (!current) return;
+    current.delete(sub);
+    if (current.size === 0) {
+      subscribers.delete(ventureId);
+      const timer = pushTimers.get(ventureId);
+      if (timer) clearInterval(timer);
+      pushTimers.delete(ventureId);
+    }
+  };
+}
+
+/** Drop every floor and subscription. Exposed for tests. */
+export function resetRealtimeStats(): void {
+  floors.clear();
+  loading.clear();
+  for (const timer of pushTimers.values()) clearInterval(timer);
+  pushTimers.clear();
+  subscribers.clear();
+}
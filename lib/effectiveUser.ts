@@ -4,6 +4,7 @@ import { getServerSession } from 'next-auth';
 import { authOptions } from '@/pages/api/auth/[...nextauth]';
 import prisma from '@/lib/prisma';
 import * as cookie from 'cookie';
+import { createHash } from 'crypto';
 import { IMPERSONATE_COOKIE, canImpersonateUser } from '@/lib/impersonation';
 import type { SessionUser, Role } from './scope';
 
@@ -20,10 +21,121 @@ type UserWithVenturesAndOffices = {
 type RequestLike = NextApiRequest | (IncomingMessage & { cookies: Partial<Record<string, string>> });
 type ResponseLike = NextApiResponse | ServerResponse;
 
+// ─────────────────────────────────────────────────────────────
+// RESOLUTION CACHE
+//
+// A dashboard fans out to many API calls carrying the same session cookie.
+// Resolved users are cached per (session token, impersonation target) for a
+// short TTL and dropped as soon as an admin write touches the user, so a
+// revocation is visible on the next request in this process and within the
+// TTL everywhere else.
+// ─────────────────────────────────────────────────────────────
+
+const EFFECTIVE_USER_TTL_MS = Number(process.env.EFFECTIVE_USER_CACHE_TTL_MS) || 30_000;
+const MAX_CACHE_ENTRIES = 10_000;
+
+type CacheEntry = {
+  user: SessionUser;
+  /** Real and effective user ids, for per-user invalidation */
+  userIds: number[];
+  expiresAt: number;
+};
+
+const resolved = new Map<string, CacheEntry>();
+// Keyed by invalidation generation and cache key
+const inFlight = new Map<string, Promise<CacheEntry | null>>();
+// Bumped on every invalidation; resolutions started earlier are neither
+// cached nor joined
+let generation = 0;
+let hits = 0;
+let misses = 0;
+
+const SESSION_COOKIE_NAMES = [
+  '__Secure-next-auth.session-token',
+  'next-auth.session-token',
+];
+
+function cacheKeyFor(req: RequestLike): string | null {
+  const cookies = cookie.parse(req.headers.cookie || '');
+  const token = SESSION_COOKIE_NAMES.map((name) => cookies[name]).find(Boolean);
+
+  // Without a session cookie only the development fallback user can resolve
+  if (!token && process.env.NODE_ENV !== 'development') return null;
+
+  const tokenHash = token
+    ? createHash('sha256').update(token).digest('base64url')
+    : 'dev';
+  return `${tokenHash}:${cookies[IMPERSONATE_COOKIE] ?? ''}`;
+}
+
+/**
+ * Drop cached resolutions for a user (as real or impersonated user).
+ * Call after any write to the user's role, status, ventures or offices.
+ */
+export function invalidateEffectiveUser(userId: number): void {
+  generation++;
+  for (const [key, entry] of resolved) {
+    if (entry.userIds.includes(userId)) {
+      resolved.delete(key);
+    }
+  }
+}
+
+/**
+ * Drop every cached resolution (role definition changes, tests).
+ */
+export function invalidateAllEffectiveUsers(): void {
+  generation++;
+  resolved.clear();
+}
+
+export function getEffectiveUserCacheStats() {
+  return { size: resolved.size, hits, misses, ttlMs: EFFECTIVE_USER_TTL_MS };
+}
+
 export async function getEffectiveUser(
   req: RequestLike,
   res: ResponseLike
 ): Promise<SessionUser | null> {
+  const key = cacheKeyFor(req);
+  if (!key) {
+    return (await resolveEffectiveUser(req, res))?.user ?? null;
+  }
+
+  const cached = resolved.get(key);
+  if (cached && cached.expiresAt > Date.now()) {
+    hits++;
+    return cached.user;
+  }
+  misses++;
+
+  // Concurrent requests for the same session share one resolution, unless an
+  // invalidation happened after it started
+  const startedGeneration = generation;
+  const flightKey = `${startedGeneration}:${key}`;
+  let pending = inFlight.get(flightKey);
+  if (!pending) {
+    pending = resolveEffectiveUser(req, res)
+      .then((entry) => {
+        if (entry && generation === startedGeneration) {
+          if (resolved.size >= MAX_CACHE_ENTRIES) {
+            resolved.delete(resolved.keys().next().value as string);
+          }
+          resolved.set(key, entry);
+        }
+        return entry;
+      })
+      .finally(() => inFlight.delete(flightKey));
+    inFlight.set(flightKey, pending);
+  }
+
+  return (await pending)?.user ?? null;
+}
+
+async function resolveEffectiveUser(
+  req: RequestLike,
+  res: ResponseLike
+): Promise<CacheEntry | null> {
   let realUserId: number;
 
   const session = await getServerSession(req, res, authOptions);
@@ -66,13 +178,17 @@ export async function getEffectiveUser(
   }
 
   return {
-    id: effective.id,
-    email: effective.email,
-    fullName: effective.fullName ?? null,
-    name: effective.fullName ?? null, // Legacy alias
-    role: effective.role as Role,
-    isTestUser: !!effective.isTestUser,
-    ventureIds: effective.ventures.map((v) => v.ventureId),
-    officeIds: effective.offices.map((o) => o.officeId),
+    user: {
+      id: effective.id,
+      email: effective.email,
+      fullName: effective.fullName ?? null,
+      name: effective.fullName ?? null, // Legacy alias
+      role: effective.role as Role,
+      isTestUser: !!effective.isTestUser,
+      ventureIds: effective.ventures.map((v) => v.ventureId),
+      officeIds: effective.offices.map((o) => o.officeId),
+    },
+    userIds: [realUser.id, effective.id],
+    expiresAt: Date.now() + EFFECTIVE_USER_TTL_MS,
   };
 }
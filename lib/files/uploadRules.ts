@@ -0,0 +1,157 @@
+import { prisma } from "@/lib/prisma";
+import { createStorageClient, storageClient, type StorageClient } from "@/lib/storage";
+import { v4 as uuidv4 } from "uuid";
+
+// Validation and object placement shared by the one-shot upload
+// (/api/files/upload) and resumable upload sessions (/api/files/upload-sessions).
+
+// Allowed file types for documents (policies and tasks)
+export const ALLOWED_MIME_TYPES = [
+  "application/pdf",
+  "application/msword", // .doc
+  "application/vnd.openxmlformats-officedocument.wordprocessingml.document", // .docx
+  "application/vnd.ms-excel", // .xls
+  "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", // .xlsx
+  "image/jpeg",
+  "image/jpg",
+  "image/png",
+  "image/gif",
+  "image/webp",
+];
+
+const ALLOWED_EXTENSIONS = ["pdf", "doc", "docx", "xls", "xlsx", "jpg", "jpeg", "png", "gif", "webp"];
+
+export const MAX_FILE_SIZE = 5 * 1024 * 1024; // 5MB in bytes
+const MAX_FILES_PER_POLICY = 5;
+const MAX_FILES_PER_TASK = 5;
+
+export const INVALID_FILE_TYPE_MESSAGE =
+  "Invalid file type. Allowed formats: PDF, Word (.doc, .docx), Excel (.xls, .xlsx), Images (JPG, PNG, GIF, WebP).";
+
+export class UploadRejectedError extends Error {
+  constructor(public status: number, message: string) {
+    super(message);
+    this.name = "UploadRejectedError";
+  }
+}
+
+export function isValidFileType(mimeType: string, filename: string): boolean {
+  // Check MIME type
+  if (!ALLOWED_MIME_TYPES.includes(mimeType.toLowerCase())) {
+    return false;
+  }
+
+  // Check file extension
+  const ext = filename.includes(".")
+    ? filename.split(".").pop()?.toLowerCase()
+    : "";
+  return ext ? ALLOWED_EXTENSIONS.includes(ext) : false;
+}
+
+export function fileSizeExceededMessage(size?: number): string {
+  return size === undefined
+    ? "File size exceeds 5MB limit."
+    : `File size exceeds 5MB limit. Current size: ${(size / 1024 / 1024).toFixed(2)}MB`;
+}
+
+export interface UploadTarget {
+  client: StorageClient;
+  objectKey: string;
+  ventureId?: number;
+  taskId?: number;
+  policyId?: number;
+  tag: string | null;
+}
+
+/**
+ * Check the task/policy an upload is attached to (existence and per-entity
+ * file limits) and pick its bucket and object key.
+ */
+export async function resolveUploadTarget(
+  fields: Record<string, string>,
+  filename: string
+): Promise<UploadTarget> {
+  const taskId = fields.taskId ? Number(fields.taskId) : undefined;
+  const policyId = fields.policyId ? Number(fields.policyId) : undefined;
+  let ventureId: number | undefined = fields.ventureId
+    ? Number(fields.ventureId)
+    : undefined;
+
+  if (taskId) {
+    const task = await prisma.task.findUnique({
+      where: { id: taskId },
+      select: { id: true, ventureId: true },
+    });
+    if (!task) throw new UploadRejectedError(400, "Invalid taskId");
+    ventureId = task.ventureId ?? ventureId;
+
+    // Check max files per task
+    const existingFileCount = await prisma.file.count({
+      where: {
+        taskId: taskId,
+        deletedAt: null,
+      },
+    });
+
+    if (existingFileCount >= MAX_FILES_PER_TASK) {
+      throw new UploadRejectedError(
+        400,
+        `Maximum ${MAX_FILES_PER_TASK} files allowed per task. This task already has ${existingFileCount} file(s).`
+      );
+    }
+  }
+
+  if (policyId) {
+    const policy = await prisma.policy.findUnique({
+      where: { id: policyId },
+      select: { id: true, ventureId: true },
+    });
+    if (!policy) throw new UploadRejectedError(400, "Invalid policyId");
+    ventureId = policy.ventureId ?? ventureId;
+
+    // Check max files per policy
+    const existingFileCount = await prisma.file.count({
+      where: {
+        policyId: policyId,
+        deletedAt: null,
+      },
+    });
+
+    if (existingFileCount >= MAX_FILES_PER_POLICY) {
+      throw new UploadRejectedError(
+        400,
+        `Maximum ${MAX_FILES_PER_POLICY} files allowed per policy. This policy already has ${existingFileCount} file(s).`
+      );
+    }
+  }
+
+  const ext = filename.includes(".")
+    ? filename.split(".").pop()
+    : "bin";
+
+  let entityType = "general";
+  let entityId = 0;
+  if (taskId) {
+    entityType = "task";
+    entityId = taskId;
+  } else if (policyId) {
+    entityType = "policy";
+    entityId = policyId;
+  }
+
+  const keyParts = [
+    ventureId ? `venture-${ventureId}` : "venture-global",
+    `${entityType}-${entityId}`,
+    `${uuidv4()}.${ext}`,
+  ];
+
+  return {
+    // Use taskFiles bucket for tasks, default bucket for others
+    client: taskId ? createStorageClient("taskFiles") : storageClient,
+    objectKey: keyParts.join("/"),
+    ventureId,
+    taskId,
+    policyId,
+    tag: fields.tag || null,
+  };
+}
@@ -0,0 +1,297 @@
+import { createHash } from "crypto";
+import { Prisma } from "@prisma/client";
+import prisma from "@/lib/prisma";
+
+// Available-loads feed for the carrier portal.
+//
+// Row triggers on "Load" bump the "CarrierLoadFeed_version_seq" sequence
+// whenever a load enters, leaves or changes inside the feed (open, non-test).
+// Each process caches one view per region / equipment filter, built by its
+// own indexed query (first FEED_SIZE loads) and reused until the feed version
+// moves, so polls between load changes cost a version check (itself reused
+// for VERSION_CHECK_MS) and no load query. Views carry a content-hash ETag
+// and keep a short history so a poller holding version N can be sent only
+// what changed since.
+//
+// nextval() is not transactional: a reader can see a new version before the
+// load write commits. CARRIER_FEED_MAX_AGE_MS bounds how long such a view
+// can be served.
+
+export type CarrierFeedLoad = {
+  id: number;
+  originCity: string;
+  originState: string;
+  destCity: string;
+  destState: string;
+  equipmentType: string;
+  weight: number | null;
+  pickupDate: string | null;
+  dropDate: string | null;
+};
+
+export type CarrierFeedQuery = {
+  region?: string | null;
+  equipment?: string | null;
+  since?: number | null;
+};
+
+export type CarrierFeedResult = {
+  version: number;
+  etag: string;
+  loads: CarrierFeedLoad[];
+  /** Present when `since` was answered with a delta instead of the full list */
+  changes?: { since: number; upserted: CarrierFeedLoad[]; removed: number[] };
+};
+
+const FEED_SIZE = 50;
+const HISTORY_PER_VIEW = 8;
+const MAX_VIEWS = 500;
+const MAX_AGE_MS = Math.max(1000, Number(process.env.CARRIER_FEED_MAX_AGE_MS ?? 60 * 1000));
+const VERSION_CHECK_MS = Math.max(0, Number(process.env.CARRIER_FEED_VERSION_CHECK_MS ?? 1000));
+
+/** Census regions as used by the freight team, keyed by pickup state. */
+export const FEED_REGIONS: Record<string, string[]> = {
+  NORTHEAST: ["CT", "DC", "DE", "MA", "MD", "ME", "NH", "NJ", "NY", "PA", "RI", "VT"],
+  SOUTHEAST: ["AL", "FL", "GA", "KY", "MS", "NC", "SC", "TN", "VA", "WV"],
+  MIDWEST: ["IA", "IL", "IN", "KS", "MI", "MN", "MO", "ND", "NE", "OH", "SD", "WI"],
+  SOUTHWEST: ["AR", "LA", "NM", "OK", "TX"],
+  MOUNTAIN: ["CO", "ID", "MT", "NV", "UT", "WY"],
+  WEST: ["AZ", "CA", "HI"],
+  NORTHWEST: ["AK", "OR", "WA"],
+};
+
+// Loads without an equipment type are shown (and filtered) as this one
+const DEFAULT_EQUIPMENT = "Van";
+
+type ViewState = {
+  fromVersion: number;
+  toVersion: number;
+  hash: string;
+  byId: Map<number, CarrierFeedLoad>;
+};
+
+type View = {
+  version: number;
+  builtAt: number;
+  etag: string;
+  loads: CarrierFeedLoad[];
+  history: ViewState[];
+};
+
+const stats = {
+  requests: 0,
+  hits: 0,
+  builds: 0,
+  totalBuildMs: 0,
+  lastBuildMs: 0,
+  maxBuildMs: 0,
+  notModified: 0,
+  deltas: 0,
+};
+
+let versionCache: { version: number; checkedAt: number } | null = null;
+let versionInFlight: Promise<number> | null = null;
+const views = new Map<string, View>();
+const building = new Map<string, Promise<View>>();
+
+/** Normalise a region filter: a region name or a two-letter pickup state. */
+export function parseRegion(region: string | null | undefined): string | null | undefined {
+  if (!region) return undefined;
+  const key = region.trim().toUpperCase();
+  if (FEED_REGIONS[key]) return key;
+  if (/^[A-Z]{2}$/.test(key)) return key;
+  return null;
+}
+
+function regionStates(region: string): string[] {
+  return FEED_REGIONS[region] ?? [region];
+}
+
+async function currentVersion(now: number): Promise<number> {
+  if (versionCache && now - versionCache.checkedAt < VERSION_CHECK_MS) {
+    return versionCache.version;
+  }
+  if (!versionInFlight) {
+    versionInFlight = prisma
+      .$queryRaw<{ version: bigint | number }[]>`SELECT last_value AS "version" FROM "CarrierLoadFeed_version_seq"`
+      .then((rows) => {
+        const version = Number(rows[0]?.version ?? 0);
+        versionCache = { version, checkedAt: now };
+        return version;
+      })
+      .finally(() => {
+        versionInFlight = null;
+      });
+  }
+  return versionInFlight;
+}
+
+function feedWhere(region: string | null, equipment: string | null): Prisma.LoadWhereInput {
+  const and: Prisma.LoadWhereInput[] = [];
+  if (region) {
+    and.push({ pickupState: { in: regionStates(region), mode: "insensitive" } });
+  }
+  if (equipment) {
+    const matches: Prisma.LoadWhereInput[] = [{ equipmentType: { equals: equipment, mode: "insensitive" } }];
+    if (equipment === DEFAULT_EQUIPMENT.toUpperCase()) {
+      matches.push({ equipmentType: null }, { equipmentType: "" });
+    }
+    and.push({ OR: matches });
+  }
+  return { loadStatus: "OPEN", isTest: false, ...(and.length ? { AND: and } : {}) };
+}
+
+async function queryView(region: string | null, equipment: string | null): Promise<CarrierFeedLoad[]> {
+  const started = Date.now();
+  const rows = await prisma.load.findMany({
+    where: feedWhere(region, equipment),
+    orderBy: [
+      { pickupDate: "asc" },
+      { createdAt: "desc" },
+    ],
+    take: FEED_SIZE,
+    select: {
+      id: true,
+      pickupCity: true,
+      pickupState: true,
+      dropCity: true,
+      dropState: true,
+      equipmentType: true,
+      weightLbs: true,
+      pickupDate: true,
+      dropDate: true,
+    },
+  });
+
+  const loads = rows.map((load) => ({
+    id: load.id,
+    originCity: load.pickupCity || "TBD",
+    originState: load.pickupState || "",
+    destCity: load.dropCity || "TBD",
+    destState: load.dropState || "",
+    equipmentType: load.equipmentType || DEFAULT_EQUIPMENT,
+    weight: load.weightLbs ? Number(load.weightLbs) : null,
+    pickupDate: load.pickupDate?.toISOString() || null,
+    dropDate: load.dropDate?.toISOString() || null,
+  }));
+
+  const buildMs = Date.now() - started;
+  stats.builds++;
+  stats.totalBuildMs += buildMs;
+  stats.lastBuildMs = buildMs;
+  stats.maxBuildMs = Math.max(stats.maxBuildMs, buildMs);
+  return loads;
+}
+
+function viewKey(region: string | null, equipment: string | null): string {
+  return `${region ?? "*"}|${equipment ?? "*"}`;
+}
+
+async function buildView(
+  key: string,
+  version: number,
+  now: number,
+  region: string | null,
+  equipment: string | null,
+): Promise<View> {
+  // The version was read before the rows: a view is never older than its label
+  const loads = await queryView(region, equipment);
+  const hash = createHash("sha1").update(JSON.stringify(loads)).digest("hex").slice(0, 20);
+
+  const existing = views.get(key);
+  if (existing && existing.version > version) return existing;
+
+  const history = existing?.history ?? [];
+  const last = history[history.length - 1];
+  if (last && last.hash === hash) {
+    last.toVersion = Math.max(last.toVersion, version);
+  } else {
+    history.push({
+      fromVersion: version,
+      toVersion: version,
+      hash,
+      byId: new Map(loads.map((l) => [l.id, l])),
+    });
+    if (history.length > HISTORY_PER_VIEW) history.shift();
+  }
+
+  const view: View = { version, builtAt: now, etag: `"${hash}"`, loads, history };
+  if (!existing && views.size >= MAX_VIEWS) {
+    views.delete(views.keys().next().value as string);
+  }
+  views.set(key, view);
+  return view;
+}
+
+async function getView(region: string | null, equipment: string | null, version: number, now: number): Promise<View> {
+  const key = viewKey(region, equipment);
+  const cached = views.get(key);
+  if (cached && cached.version >= version && now - cached.builtAt < MAX_AGE_MS) {
+    stats.hits++;
+    return cached;
+  }
+  let pending = building.get(key);
+  if (!pending) {
+    pending = buildView(key, version, now, region, equipment).finally(() => building.delete(key));
+    building.set(key, pending);
+  }
+  return pending;
+}
+
+function diff(from: Map<number, CarrierFeedLoad>, to: CarrierFeedLoad[]) {
+  const toIds = new Set(to.map((l) => l.id));
+  const upserted = to.filter((l) => {
+    const prev = from.get(l.id);
+    return !prev || JSON.stringify(prev) !== JSON.stringify(l);
+  });
+  const removed = Array.from(from.keys()).filter((id) => !toIds.has(id));
+  return { upserted, removed };
+}
+
+/**
+ * Open loads for a region / equipment type. With `since`, answers with the
+ * changes relative to that version when this process still holds it, and
+ * with the full list otherwise.
+ */
+export async function getCarrierFeed(query: CarrierFeedQuery, now: number = Date.now()): Promise<CarrierFeedResult> {
+  stats.requests++;
+  const region = parseRegion(query.region) ?? null;
+  const equipment = query.equipment ? query.equipment.trim().toUpperCase() : null;
+
+  const version = await currentVersion(now);
+  const view = await getView(region, equipment, version, now);
+  const result: CarrierFeedResult = { version: view.version, etag: view.etag, loads: view.loads };
+
+  if (query.since != null) {
+    const since = query.since;
+    const held = view.history.find((h) => h.fromVersion <= since && since <= h.toVersion);
+    if (held) {
+      stats.deltas++;
+      result.changes = { since, ...diff(held.byId, view.loads) };
+    }
+  }
+  return result;
+}
+
+/** Count a poll answered with 304 Not Modified. */
+export function recordCarrierFeedNotModified(): void {
+  stats.notModified++;
+}
+
+/** Counters for this process since start. */
+export function getCarrierFeedStats() {
+  return {
+    ...stats,
+    hitRatio: stats.requests > 0 ? Math.round((stats.hits / stats.requests) * 1000) / 1000 : 0,
+    avgBuildMs: stats.builds > 0 ? Math.round(stats.totalBuildMs / stats.builds) : 0,
+    version: versionCache?.version ?? null,
+    views: views.size,
+  };
+}
+
+/** Drop views and counters (tests). */
+export function clearCarrierFeed(): void {
+  versionCache = null;
+  views.clear();
+  for (const key of Object.keys(stats) as (keyof typeof stats)[]) stats[key] = 0;
+}
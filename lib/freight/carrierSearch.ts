@@ -72,93 +72,119 @@ function zip3(zip?: string | null): string | null {
   return zip && zip.length >= 3 ? zip.slice(0, 3) : null;
 }
 
-async function getCarrierLaneHistory(
-  carrierId: number,
+// Carriers scored per search: the first active carriers, plus the carriers
+// with the most history on or around the lane from the lane profile index.
+const BASE_CARRIER_LIMIT = 100;
+const PROFILED_CARRIER_LIMIT = 100;
+
+type LaneProfileStats = {
+  laneRunCount: number;
+  laneOnTimeCount: number;
+  laneLastLoadAt: Date | null;
+  regionCount: number;
+  originPickupCount: number;
+};
+
+/**
+ * Delivered-load history per carrier around the searched lane, read from
+ * CarrierLaneProfile (kept current by a trigger on Load) instead of counting
+ * loads per carrier. Counts match the load queries they replace:
+ * - lane: pickup ZIP-3 and drop ZIP-3 both match
+ * - region: pickup ZIP-3 or drop ZIP-3 matches
+ * - origin pickups: pickup ZIP-3 or pickup state matches
+ */
+async function getLaneProfileStats(
   originZip3: string | null,
-  destZip3: string | null
-): Promise<{ runCount: number; onTimeRate: number | null; lastLoadDate: Date | null }> {
-  if (!originZip3 || !destZip3) {
-    return { runCount: 0, onTimeRate: null, lastLoadDate: null };
-  }
+  destZip3: string | null,
+  originState: string | null
+): Promise<Map<number, LaneProfileStats>> {
+  const stats = new Map<number, LaneProfileStats>();
 
-  const loads = await prisma.load.findMany({
-    where: {
-      carrierId,
-      pickupZip: { startsWith: originZip3 },
-      dropZip: { startsWith: destZip3 },
-      loadStatus: "DELIVERED",
-    },
+  const conditions: any[] = [];
+  if (originZip3) conditions.push({ originZip3 });
+  if (destZip3) conditions.push({ destZip3 });
+  if (originState) conditions.push({ originState });
+  if (conditions.length === 0) return stats;
+
+  const profiles = await prisma.carrierLaneProfile.findMany({
+    where: { OR: conditions, deliveredCount: { gt: 0 } },
     select: {
-      id: true,
-      dropDate: true,
-      actualDeliveryAt: true,
-      createdAt: true,
+      carrierId: true,
+      originZip3: true,
+      destZip3: true,
+      originState: true,
+      deliveredCount: true,
+      onTimeCount: true,
+      lastLoadAt: true,
     },
-    orderBy: { createdAt: "desc" },
   });
 
-  if (loads.length === 0) {
-    return { runCount: 0, onTimeRate: null, lastLoadDate: null };
-  }
+  for (const profile of profiles) {
+    let entry = stats.get(profile.carrierId);
+    if (!entry) {
+      entry = { laneRunCount: 0, laneOnTimeCount: 0, laneLastLoadAt: null, regionCount: 0, originPickupCount: 0 };
+      stats.set(profile.carrierId, entry);
+    }
+
+    const originMatch = !!originZip3 && profile.originZip3 === originZip3;
+    const destMatch = !!destZip3 && profile.destZip3 === destZip3;
 
-  let onTimeCount = 0;
-  for (const load of loads) {
-    if (load.dropDate && load.actualDeliveryAt) {
-      if (load.actualDeliveryAt <= load.dropDate) {
-        onTimeCount++;
+    if (originMatch && destMatch) {
+      entry.laneRunCount += profile.deliveredCount;
+      entry.laneOnTimeCount += profile.onTimeCount;
+      if (profile.lastLoadAt && (!entry.laneLastLoadAt || profile.lastLoadAt > entry.laneLastLoadAt)) {
+        entry.laneLastLoadAt = profile.lastLoadAt;
       }
-    } else {
-      onTimeCount++;
+    }
+    if (originMatch || destMatch) {
+      entry.regionCount += profile.deliveredCount;
+    }
+    if (originMatch || (!!originState && profile.originState === originState)) {
+      entry.originPickupCount += profile.deliveredCount;
     }
   }
 
-  return {
-    runCount: loads.length,
-    onTimeRate: Math.round((onTimeCount / loads.length) * 100),
-    lastLoadDate: loads[0]?.createdAt || null,
-  };
+  return stats;
 }
 
-async function getCarrierRegionHistory(
-  carrierId: number,
-  originZip3: string | null,
-  destZip3: string | null
-): Promise<number> {
-  if (!originZip3 && !destZip3) return 0;
-
-  const conditions: any[] = [];
-  if (originZip3) conditions.push({ pickupZip: { startsWith: originZip3 } });
-  if (destZip3) conditions.push({ dropZip: { startsWith: destZip3 } });
-  
-  if (conditions.length === 0) return 0;
-
-  const count = await prisma.load.count({
-    where: {
-      carrierId,
-      loadStatus: "DELIVERED",
-      OR: conditions,
-    },
-  });
+/** Latest load created in the last 30 days per carrier, in one grouped query */
+async function getRecentActivity(carrierIds: number[]): Promise<Map<number, Date>> {
+  const latest = new Map<number, Date>();
+  if (carrierIds.length === 0) return latest;
 
-  return count;
-}
-
-async function getCarrierRecentActivity(carrierId: number): Promise<{ isActive: boolean; lastLoadDate: Date | null }> {
   const thirtyDaysAgo = new Date();
   thirtyDaysAgo.setDate(thirtyDaysAgo.getDate() - 30);
 
-  const recentLoad = await prisma.load.findFirst({
+  const groups = await prisma.load.groupBy({
+    by: ["carrierId"],
     where: {
-      carrierId,
+      carrierId: { in: carrierIds },
       createdAt: { gte: thirtyDaysAgo },
     },
-    select: { createdAt: true },
-    orderBy: { createdAt: "desc" },
+    _max: { createdAt: true },
   });
 
+  for (const group of groups) {
+    if (group.carrierId != null && group._max.createdAt) {
+      latest.set(group.carrierId, group._max.createdAt);
+    }
+  }
+
+  return latest;
+}
+
+function laneHistoryFrom(stats: LaneProfileStats | undefined): {
+  runCount: number;
+  onTimeRate: number | null;
+  lastLoadDate: Date | null;
+} {
+  if (!stats || stats.laneRunCount === 0) {
+    return { runCount: 0, onTimeRate: null, lastLoadDate: null };
+  }
   return {
-    isActive: !!recentLoad,
-    lastLoadDate: recentLoad?.createdAt || null,
+    runCount: stats.laneRunCount,
+    onTimeRate: Math.round((stats.laneOnTimeCount / stats.laneRunCount) * 100),
+    lastLoadDate: stats.laneLastLoadAt,
   };
 }
 
@@ -249,30 +275,6 @@ function calculateOriginProximityScore(
   return score;
 }
 
-async function getCarrierOriginPickupHistory(
-  carrierId: number,
-  originZip3: string | null,
-  originState: string | null
-): Promise<number> {
-  if (!originZip3 && !originState) return 0;
-
-  const conditions: any[] = [];
-  if (originZip3) conditions.push({ pickupZip: { startsWith: originZip3 } });
-  if (originState) conditions.push({ pickupState: originState });
-  
-  if (conditions.length === 0) return 0;
-
-  const count = await prisma.load.count({
-    where: {
-      carrierId,
-      loadStatus: "DELIVERED",
-      OR: conditions,
-    },
-  });
-
-  return count;
-}
-
 export async function searchCarriersForLoad(input: CarrierSearchInput): Promise<CarrierSearchResult> {
   const {
     originCity,
@@ -287,22 +289,47 @@ export async function searchCarriersForLoad(input: CarrierSearchInput): Promise<
   const originZip3 = zip3(originZip);
   const destZip3 = zip3(destinationZip);
 
-  const carriers = await prisma.carrier.findMany({
-    where: {
-      active: true,
-    },
-    take: 100,
-  });
+  const [baseCarriers, profileStats] = await Promise.all([
+    prisma.carrier.findMany({
+      where: {
+        active: true,
+      },
+      take: BASE_CARRIER_LIMIT,
+    }),
+    getLaneProfileStats(originZip3, destZip3, originState ?? null),
+  ]);
+
+  // Carriers with history here are candidates even outside the base page
+  const baseIds = new Set(baseCarriers.map((c) => c.id));
+  const profiledIds = Array.from(profileStats.entries())
+    .filter(([id]) => !baseIds.has(id))
+    .sort(
+      ([, a], [, b]) =>
+        b.laneRunCount - a.laneRunCount ||
+        b.originPickupCount - a.originPickupCount ||
+        b.regionCount - a.regionCount
+    )
+    .slice(0, PROFILED_CARRIER_LIMIT)
+    .map(([id]) => id);
+
+  const profiledCarriers = profiledIds.length
+    ? await prisma.carrier.findMany({
+        where: { active: true, id: { in: profiledIds } },
+      })
+    : [];
+
+  const carriers = [...baseCarriers, ...profiledCarriers];
+  const recentActivityByCarrier = await getRecentActivity(carriers.map((c) => c.id));
 
   const scoredCarriers: CarrierCandidate[] = [];
 
   for (const carrier of carriers) {
-    const [laneHistory, regionCount, recentActivity, originPickupCount] = await Promise.all([
-      getCarrierLaneHistory(carrier.id, originZip3, destZip3),
-      getCarrierRegionHistory(carrier.id, originZip3, destZip3),
-      getCarrierRecentActivity(carrier.id),
-      getCarrierOriginPickupHistory(carrier.id, originZip3, originState),
-    ]);
+    const stats = profileStats.get(carrier.id);
+    const laneHistory = laneHistoryFrom(stats);
+    const regionCount = stats?.regionCount ?? 0;
+    const originPickupCount = stats?.originPickupCount ?? 0;
+    const recentLoadDate = recentActivityByCarrier.get(carrier.id) ?? null;
+    const recentActivity = { isActive: !!recentLoadDate, lastLoadDate: recentLoadDate };
 
     const hasLaneHistory = laneHistory.runCount > 0;
     
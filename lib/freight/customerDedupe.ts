@@ -20,6 +20,23 @@ interface DedupeParams {
   ventureId?: number;
 }
 
+export interface BatchDedupeResult {
+  candidates: DedupeCandidate[];
+  /** Index of an earlier input in the same batch that this one duplicates */
+  duplicateOfIndex: number | null;
+}
+
+const FREE_EMAIL_DOMAINS = ['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'aol.com'];
+
+// Upper bound on rows pulled per fuzzy (domain / name) lookup for a single
+// input; batches scale it. Exact-key matches are never capped.
+const MAX_BLOCK_ROWS = 200;
+const MAX_CANDIDATES = 10;
+
+// The normalizers below must stay in sync with the "Customer_dedupe_keys"
+// trigger (migration 20260305000000_customer_dedupe_keys), which stores the
+// same normalized values in the dedupe* columns on every customer write.
+
 function normalizePhone(phone: string | null | undefined): string | null {
   if (!phone) return null;
   return phone.replace(/\D/g, '').slice(-10);
@@ -32,169 +49,236 @@ function normalizeEmail(email: string | null | undefined): string | null {
 
 function getEmailDomain(email: string | null | undefined): string | null {
   if (!email) return null;
-  const parts = email.split('@');
-  return parts.length > 1 ? parts[1].toLowerCase() : null;
+  const parts = email.trim().split('@');
+  return parts.length > 1 && parts[1] ? parts[1].toLowerCase() : null;
 }
 
 function normalizeName(name: string): string {
   return name.toLowerCase().replace(/[^a-z0-9]/g, '').trim();
 }
 
-export async function findDuplicateCustomers(params: DedupeParams): Promise<DedupeCandidate[]> {
-  const { name, email, phone, tmsCustomerCode, state, ventureId } = params;
+type BlockingKeys = {
+  tmsCustomerCode: string | null;
+  phone: string | null;
+  email: string | null;
+  /** Only set for non-free domains */
+  domain: string | null;
+  name: string;
+  state: string | null;
+  ventureId: number | undefined;
+};
+
+function blockingKeysFor(params: DedupeParams): BlockingKeys {
+  const phone = normalizePhone(params.phone);
+  const domain = getEmailDomain(params.email);
+  return {
+    tmsCustomerCode: params.tmsCustomerCode || null,
+    phone: phone && phone.length >= 10 ? phone : null,
+    email: normalizeEmail(params.email),
+    domain: domain && !FREE_EMAIL_DOMAINS.includes(domain) ? domain : null,
+    name: normalizeName(params.name),
+    state: params.state || null,
+    ventureId: params.ventureId,
+  };
+}
+
+type BlockRow = {
+  id: number;
+  name: string;
+  email: string | null;
+  phone: string | null;
+  tmsCustomerCode: string | null;
+  address: string | null;
+  ventureId: number | null;
+  dedupePhone: string | null;
+  dedupeEmail: string | null;
+  dedupeEmailDomain: string | null;
+  dedupeName: string | null;
+};
+
+const BLOCK_SELECT = {
+  id: true,
+  name: true,
+  email: true,
+  phone: true,
+  tmsCustomerCode: true,
+  address: true,
+  ventureId: true,
+  dedupePhone: true,
+  dedupeEmail: true,
+  dedupeEmailDomain: true,
+  dedupeName: true,
+} as const;
+
+/**
+ * Fetch every customer sharing at least one blocking key with any of the
+ * inputs, over the indexed dedupe* columns. Exact keys (TMS code, phone,
+ * email) are fetched in full; the fuzzy keys (email domain, name), where a
+ * common value can match thousands of rows, are capped separately so they
+ * never crowd out an exact match.
+ */
+async function fetchBlock(inputs: BlockingKeys[]): Promise<BlockRow[]> {
+  const codes = new Set<string>();
+  const phones = new Set<string>();
+  const emails = new Set<string>();
+  const domains = new Set<string>();
+  const names = new Set<string>();
+
+  for (const k of inputs) {
+    if (k.tmsCustomerCode) codes.add(k.tmsCustomerCode);
+    if (k.phone) phones.add(k.phone);
+    if (k.email) emails.add(k.email);
+    if (k.domain) domains.add(k.domain);
+    if (k.state && k.name) names.add(k.name);
+  }
+
+  const exactOr: Record<string, unknown>[] = [];
+  if (codes.size) exactOr.push({ tmsCustomerCode: { in: Array.from(codes) } });
+  if (phones.size) exactOr.push({ dedupePhone: { in: Array.from(phones) } });
+  if (emails.size) exactOr.push({ dedupeEmail: { in: Array.from(emails) } });
+
+  const fuzzyOr: Record<string, unknown>[] = [];
+  if (domains.size) fuzzyOr.push({ dedupeEmailDomain: { in: Array.from(domains) } });
+  if (names.size) fuzzyOr.push({ dedupeName: { in: Array.from(names) } });
+
+  // A shared venture filter can go to the database; mixed batches filter per input
+  const ventureIds = new Set(inputs.map((k) => k.ventureId));
+  const [onlyVenture] = Array.from(ventureIds);
+  const ventureFilter = ventureIds.size === 1 && onlyVenture ? { ventureId: onlyVenture } : {};
+
+  const [exact, fuzzy] = await Promise.all([
+    exactOr.length
+      ? prisma.customer.findMany({
+          where: { ...ventureFilter, OR: exactOr },
+          select: BLOCK_SELECT,
+          orderBy: { id: 'asc' },
+        })
+      : [],
+    fuzzyOr.length
+      ? prisma.customer.findMany({
+          where: { ...ventureFilter, OR: fuzzyOr },
+          select: BLOCK_SELECT,
+          orderBy: { id: 'asc' },
+          take: MAX_BLOCK_ROWS * inputs.length,
+        })
+      : [],
+  ]);
+
+  const byId = new Map<number, BlockRow>();
+  for (const row of [...exact, ...fuzzy]) byId.set(row.id, row);
+  return Array.from(byId.values()).sort((a, b) => a.id - b.id);
+}
+
+/**
+ * Score block rows against one input. Strategies, scores and bonuses are
+ * applied in the same order as the original per-strategy queries.
+ */
+function scoreCandidates(keys: BlockingKeys, block: BlockRow[]): DedupeCandidate[] {
+  const rows = keys.ventureId ? block.filter((r) => r.ventureId === keys.ventureId) : block;
   const candidates: Map<number, DedupeCandidate> = new Map();
 
-  if (tmsCustomerCode) {
-    const exactTmsMatch = await prisma.customer.findFirst({
-      where: {
-        tmsCustomerCode,
-        ...(ventureId && { ventureId }),
-      },
-    });
-
-    if (exactTmsMatch) {
-      candidates.set(exactTmsMatch.id, {
-        id: exactTmsMatch.id,
-        name: exactTmsMatch.name,
-        email: exactTmsMatch.email,
-        phone: exactTmsMatch.phone,
-        tmsCustomerCode: exactTmsMatch.tmsCustomerCode,
-        address: exactTmsMatch.address,
-        score: 100,
-        matchReasons: ['Exact TMS customer code match'],
+  const add = (match: BlockRow, score: number, bonus: number, reason: string) => {
+    const existing = candidates.get(match.id);
+    if (existing) {
+      existing.score = Math.min(100, existing.score + bonus);
+      existing.matchReasons.push(reason);
+    } else {
+      candidates.set(match.id, {
+        id: match.id,
+        name: match.name,
+        email: match.email,
+        phone: match.phone,
+        tmsCustomerCode: match.tmsCustomerCode,
+        address: match.address,
+        score,
+        matchReasons: [reason],
       });
     }
+  };
+
+  if (keys.tmsCustomerCode) {
+    const exactTmsMatch = rows.find((r) => r.tmsCustomerCode === keys.tmsCustomerCode);
+    if (exactTmsMatch) add(exactTmsMatch, 100, 0, 'Exact TMS customer code match');
   }
 
-  const normalizedPhone = normalizePhone(phone);
-  if (normalizedPhone && normalizedPhone.length >= 10) {
-    const phoneMatches = await prisma.customer.findMany({
-      where: {
-        phone: { contains: normalizedPhone.slice(-10) },
-        ...(ventureId && { ventureId }),
-      },
-      take: 10,
-    });
-
-    for (const match of phoneMatches) {
-      const existing = candidates.get(match.id);
-      if (existing) {
-        existing.score = Math.min(100, existing.score + 30);
-        existing.matchReasons.push('Phone match');
-      } else {
-        candidates.set(match.id, {
-          id: match.id,
-          name: match.name,
-          email: match.email,
-          phone: match.phone,
-          tmsCustomerCode: match.tmsCustomerCode,
-          address: match.address,
-          score: 80,
-          matchReasons: ['Phone match'],
-        });
-      }
+  if (keys.phone) {
+    for (const match of rows.filter((r) => r.dedupePhone === keys.phone)) {
+      add(match, 80, 30, 'Phone match');
     }
   }
 
-  const normalizedEmail = normalizeEmail(email);
-  if (normalizedEmail) {
-    const emailMatches = await prisma.customer.findMany({
-      where: {
-        email: { equals: normalizedEmail, mode: 'insensitive' },
-        ...(ventureId && { ventureId }),
-      },
-      take: 10,
-    });
-
-    for (const match of emailMatches) {
-      const existing = candidates.get(match.id);
-      if (existing) {
-        existing.score = Math.min(100, existing.score + 30);
-        existing.matchReasons.push('Exact email match');
-      } else {
-        candidates.set(match.id, {
-          id: match.id,
-          name: match.name,
-          email: match.email,
-          phone: match.phone,
-          tmsCustomerCode: match.tmsCustomerCode,
-          address: match.address,
-          score: 85,
-          matchReasons: ['Exact email match'],
-        });
-      }
+  if (keys.email) {
+    for (const match of rows.filter((r) => r.dedupeEmail === keys.email)) {
+      add(match, 85, 30, 'Exact email match');
     }
   }
 
-  const emailDomain = getEmailDomain(email);
-  const normalizedInputName = normalizeName(name);
-  if (emailDomain && !['gmail.com', 'yahoo.com', 'hotmail.com', 'outlook.com', 'aol.com'].includes(emailDomain)) {
-    const domainMatches = await prisma.customer.findMany({
-      where: {
-        email: { endsWith: `@${emailDomain}`, mode: 'insensitive' },
-        ...(ventureId && { ventureId }),
-      },
-      take: 20,
-    });
-
-    for (const match of domainMatches) {
-      const matchedNormalizedName = normalizeName(match.name);
-      if (normalizedInputName.includes(matchedNormalizedName) || matchedNormalizedName.includes(normalizedInputName)) {
-        const existing = candidates.get(match.id);
-        if (existing) {
-          existing.score = Math.min(100, existing.score + 20);
-          existing.matchReasons.push('Email domain + similar name');
-        } else {
-          candidates.set(match.id, {
-            id: match.id,
-            name: match.name,
-            email: match.email,
-            phone: match.phone,
-            tmsCustomerCode: match.tmsCustomerCode,
-            address: match.address,
-            score: 70,
-            matchReasons: ['Email domain + similar name'],
-          });
-        }
+  if (keys.domain) {
+    for (const match of rows.filter((r) => r.dedupeEmailDomain === keys.domain)) {
+      const matchedNormalizedName = match.dedupeName ?? normalizeName(match.name);
+      if (keys.name.includes(matchedNormalizedName) || matchedNormalizedName.includes(keys.name)) {
+        add(match, 70, 20, 'Email domain + similar name');
       }
     }
   }
 
-  if (state) {
-    const nameStateMatches = await prisma.customer.findMany({
-      where: {
-        address: { contains: state, mode: 'insensitive' },
-        ...(ventureId && { ventureId }),
-      },
-      take: 50,
-    });
-
-    for (const match of nameStateMatches) {
-      const matchedNormalizedName = normalizeName(match.name);
-      if (normalizedInputName === matchedNormalizedName) {
-        const existing = candidates.get(match.id);
-        if (existing) {
-          existing.score = Math.min(100, existing.score + 15);
-          existing.matchReasons.push('Exact name + state match');
-        } else {
-          candidates.set(match.id, {
-            id: match.id,
-            name: match.name,
-            email: match.email,
-            phone: match.phone,
-            tmsCustomerCode: match.tmsCustomerCode,
-            address: match.address,
-            score: 60,
-            matchReasons: ['Exact name + state match'],
-          });
-        }
+  if (keys.state) {
+    const state = keys.state.toLowerCase();
+    for (const match of rows.filter((r) => r.dedupeName === keys.name)) {
+      if (match.address && match.address.toLowerCase().includes(state)) {
+        add(match, 60, 15, 'Exact name + state match');
       }
     }
   }
 
   return Array.from(candidates.values())
     .sort((a, b) => b.score - a.score)
-    .slice(0, 10);
+    .slice(0, MAX_CANDIDATES);
+}
+
+export async function findDuplicateCustomers(params: DedupeParams): Promise<DedupeCandidate[]> {
+  const keys = blockingKeysFor(params);
+  const block = await fetchBlock([keys]);
+  return scoreCandidates(keys, block);
+}
+
+/**
+ * Dedupe a batch of incoming customers with one blocking lookup (one exact
+ * and one fuzzy query).
+ *
+ * Each result holds the existing-customer candidates for that input, plus
+ * the index of an earlier input in the batch sharing its TMS code, phone,
+ * email or normalized name (same venture), so bulk onboarding can collapse
+ * duplicates within the file itself.
+ */
+export async function findDuplicateCustomersBatch(
+  inputs: DedupeParams[]
+): Promise<BatchDedupeResult[]> {
+  if (inputs.length === 0) return [];
+
+  const keys = inputs.map(blockingKeysFor);
+  const block = await fetchBlock(keys);
+
+  const seen = new Map<string, number>();
+  return keys.map((k, index) => {
+    const batchKeys = [
+      k.tmsCustomerCode && `tms:${k.tmsCustomerCode}`,
+      k.phone && `phone:${k.phone}`,
+      k.email && `email:${k.email}`,
+      k.name && `name:${k.name}`,
+    ]
+      .filter(Boolean)
+      .map((key) => `${k.ventureId ?? ''}|${key}`);
+
+    let duplicateOfIndex: number | null = null;
+    for (const key of batchKeys) {
+      const earlier = seen.get(key);
+      if (earlier !== undefined && duplicateOfIndex === null) duplicateOfIndex = earlier;
+      if (earlier === undefined) seen.set(key, index);
+    }
+
+    return { candidates: scoreCandidates(k, block), duplicateOfIndex };
+  });
 }
 
 export function isStrongMatch(candidates: DedupeCandidate[]): boolean {
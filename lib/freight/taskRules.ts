@@ -211,6 +211,24 @@ export async function runQuoteExpiringRule(
   return result;
 }
 
+/** Follow-up task for a quote that timed out without a customer response. */
+export function buildQuoteFollowupTask(
+  quote: { id: number; ventureId: number; salespersonUserId: number; customerName?: string | null },
+  dueAt: Date
+) {
+  return {
+    ventureId: quote.ventureId,
+    type: TaskType.QUOTE_FOLLOWUP,
+    status: TaskStatus.OPEN,
+    assignedTo: quote.salespersonUserId,
+    quoteId: quote.id,
+    title: `Follow up on Quote #${quote.id} - ${quote.customerName || "Unknown"} (no response)`,
+    description: `Quote received no response. Consider reaching out to customer.`,
+    priority: "MEDIUM" as const,
+    dueDate: dueAt,
+  };
+}
+
 export async function runQuoteNoResponseRule(
   options: QuoteNoResponseRuleOptions
 ): Promise<TaskRuleResult> {
@@ -265,17 +283,12 @@ export async function runQuoteNoResponseRule(
       continue;
     }
 
-    tasksToCreate.push({
-      ventureId,
-      type: TaskType.QUOTE_FOLLOWUP,
-      status: TaskStatus.OPEN,
-      assignedTo: quote.salespersonUserId,
-      quoteId: quote.id,
-      title: `Follow up on Quote #${quote.id} - ${quote.customer?.name || "Unknown"} (no response)`,
-      description: `Quote received no response. Consider reaching out to customer.`,
-      priority: "MEDIUM",
-      dueDate: dueAt,
-    });
+    tasksToCreate.push(
+      buildQuoteFollowupTask(
+        { id: quote.id, ventureId, salespersonUserId: quote.salespersonUserId, customerName: quote.customer?.name },
+        dueAt
+      )
+    );
   }
 
   if (!dryRun && tasksToCreate.length > 0) {
@@ -1,4 +1,6 @@
 import { prisma } from '@/lib/prisma';
+import { getCached, invalidateCache } from '@/lib/cache/simple';
+import { leaderboardScoreUpsert, noteLeaderboardAward } from './leaderboard';
 
 export interface AwardPointsInput {
   userId: number;
@@ -31,14 +33,28 @@ const DEFAULT_POINTS: Record<string, number> = {
   FIRST_DAILY_LOGIN: 1,
 };
 
+const CONFIG_CACHE_TTL_SECONDS = 60;
+
+function configCacheKey(ventureId: number): string {
+  return `gamification:config:${ventureId}`;
+}
+
+/** Call after changing a venture's GamificationConfig. */
+export function invalidateGamificationConfig(ventureId: number): void {
+  invalidateCache(configCacheKey(ventureId));
+}
+
 export async function getPointsForEvent(
   ventureId: number,
   eventType: string
 ): Promise<number> {
   try {
-    const config = await prisma.gamificationConfig.findUnique({
-      where: { ventureId },
-    });
+    // Wrapped so that "no config" is cached too
+    const { config } = await getCached(configCacheKey(ventureId), CONFIG_CACHE_TTL_SECONDS, async () => ({
+      config: await prisma.gamificationConfig.findUnique({
+        where: { ventureId },
+      }),
+    }));
 
     if (config?.config && typeof config.config === 'object') {
       const configObj = config.config as Record<string, any>;
@@ -53,59 +69,69 @@ export async function getPointsForEvent(
   return DEFAULT_POINTS[eventType] ?? 10;
 }
 
+function isUniqueViolation(err: unknown): boolean {
+  return String((err as any)?.code) === 'P2002';
+}
+
+/**
+ * Record an award: the event, the all-time balance and the period
+ * leaderboards are written in one transaction. Idempotency is enforced by a
+ * unique index on (userId, ventureId, type, idempotencyKey), so a repeat is
+ * detected by the insert itself rather than a lookup beforehand.
+ */
 export async function awardPoints(
   input: AwardPointsInput
 ): Promise<AwardPointsResult> {
   const { userId, ventureId, officeId, eventType, points, metadata, idempotencyKey } = input;
 
   try {
-    if (idempotencyKey) {
-      const existing = await prisma.gamificationEvent.findFirst({
-        where: {
+    const baseMetadata = metadata ?? {};
+    const eventMetadata = idempotencyKey
+      ? { ...baseMetadata, idempotencyKey }
+      : (metadata || null);
+
+    const award = { userId, ventureId, officeId: officeId ?? null, points, at: new Date() };
+
+    const [event] = await prisma.$transaction([
+      prisma.gamificationEvent.create({
+        data: {
           userId,
           ventureId,
+          officeId: officeId ?? null,
           type: eventType,
-          metadata: {
-            path: ['idempotencyKey'],
-            equals: idempotencyKey,
-          },
+          points,
+          metadata: eventMetadata ?? null,
+          idempotencyKey: idempotencyKey ?? null,
+          createdAt: award.at,
         },
-      });
+      }),
+      prisma.gamificationPointsBalance.upsert({
+        where: { userId },
+        update: {
+          points: { increment: points },
+        },
+        create: {
+          userId,
+          points,
+        },
+      }),
+      leaderboardScoreUpsert(award),
+    ]);
+
+    noteLeaderboardAward(award);
 
+    return { success: true, eventId: event.id };
+  } catch (err) {
+    if (idempotencyKey && isUniqueViolation(err)) {
+      const existing = await prisma.gamificationEvent.findFirst({
+        where: { userId, ventureId, type: eventType, idempotencyKey },
+        select: { id: true },
+      });
       if (existing) {
         return { success: true, eventId: existing.id, skipped: true };
       }
     }
 
-    const baseMetadata = metadata ?? {};
-    const eventMetadata = idempotencyKey
-      ? { ...baseMetadata, idempotencyKey }
-      : (metadata || null);
-
-    const event = await prisma.gamificationEvent.create({
-      data: {
-        userId,
-        ventureId,
-        officeId: officeId ?? null,
-        type: eventType,
-        points,
-        metadata: eventMetadata ?? null,
-      },
-    });
-
-    await prisma.gamificationPointsBalance.upsert({
-      where: { userId },
-      update: {
-        points: { increment: points },
-      },
-      create: {
-        userId,
-        points,
-      },
-    });
-
-    return { success: true, eventId: event.id };
-  } catch (err) {
     const errorMessage = err instanceof Error ? err.message : String(err);
     console.error('[awardPoints] Error awarding points:', {
       userId,
@@ -0,0 +1,260 @@
+import { Prisma } from '@prisma/client';
+import { prisma } from '@/lib/prisma';
+
+// Per-period gamification leaderboards.
+//
+// GamificationLeaderboardScore holds one row per (venture, office, period,
+// period start, user), incremented in the same transaction as each award.
+// officeId 0 is the venture-wide board. Reads go through an in-process
+// ranked set per board, loaded from that table on first use and updated in
+// place by awards made in this process; other processes' awards show up when
+// the cached board expires.
+
+export type LeaderboardPeriod = 'DAY' | 'WEEK' | 'MONTH' | 'ALL';
+
+export const LEADERBOARD_PERIODS: LeaderboardPeriod[] = ['DAY', 'WEEK', 'MONTH', 'ALL'];
+
+export interface LeaderboardAward {
+  userId: number;
+  ventureId: number;
+  officeId?: number | null;
+  points: number;
+  at: Date;
+}
+
+export interface LeaderboardEntry {
+  userId: number;
+  points: number;
+  rank: number;
+}
+
+export interface LeaderboardQuery {
+  ventureId: number;
+  officeId?: number | null;
+  period: LeaderboardPeriod;
+  limit: number;
+  /** Also return this user's rank and points */
+  userId?: number;
+  at?: Date;
+}
+
+export interface LeaderboardResult {
+  period: LeaderboardPeriod;
+  periodStart: Date;
+  totalRanked: number;
+  top: LeaderboardEntry[];
+  me: LeaderboardEntry | null;
+}
+
+const ALL_TIME_START = new Date(0);
+const BOARD_TTL_MS = parseInt(process.env.LEADERBOARD_CACHE_TTL_MS || '30000', 10);
+const MAX_CACHED_BOARDS = 2000;
+
+/** UTC start of the period containing `at`; weeks start on Monday. */
+export function periodStart(period: LeaderboardPeriod, at: Date): Date {
+  const y = at.getUTCFullYear();
+  const m = at.getUTCMonth();
+  const d = at.getUTCDate();
+  switch (period) {
+    case 'DAY':
+      return new Date(Date.UTC(y, m, d));
+    case 'WEEK':
+      return new Date(Date.UTC(y, m, d - ((at.getUTCDay() + 6) % 7)));
+    case 'MONTH':
+      return new Date(Date.UTC(y, m, 1));
+    case 'ALL':
+      return ALL_TIME_START;
+  }
+}
+
+type RankedItem = { userId: number; points: number };
+
+function compare(a: RankedItem, b: RankedItem): number {
+  return b.points - a.points || a.userId - b.userId;
+}
+
+/**
+ * Users ordered by points (desc, ties by userId). Rank is a binary search
+ * and top-N a slice. An update finds its old and new positions by binary
+ * search, but moving the entry shifts the array between them, so it is
+ * O(n); at board sizes (one venture's users) that is a short memmove.
+ */
+export class RankedSet {
+  private items: RankedItem[];
+  private points = new Map<number, number>();
+
+  constructor(rows: RankedItem[] = []) {
+    this.items = rows.map((r) => ({ userId: r.userId, points: r.points })).sort(compare);
+    for (const item of this.items) this.points.set(item.userId, item.points);
+  }
+
+  get size(): number {
+    return this.items.length;
+  }
+
+  private indexOf(item: RankedItem): number {
+    let lo = 0;
+    let hi = this.items.length;
+    while (lo < hi) {
+      const mid = (lo + hi) >>> 1;
+      if (compare(this.items[mid], item) < 0) lo = mid + 1;
+      else hi = mid;
+    }
+    return lo;
+  }
+
+  add(userId: number, delta: number): void {
+    const current = this.points.get(userId);
+    if (current !== undefined) {
+      this.items.splice(this.indexOf({ userId, points: current }), 1);
+    }
+    const next = { userId, points: (current ?? 0) + delta };
+    this.items.splice(this.indexOf(next), 0, next);
+    this.points.set(userId, next.points);
+  }
+
+  /** 1-based position, or null if the user has no points on this board */
+  rank(userId: number): number | null {
+    const points = this.points.get(userId);
+    if (points === undefined) return null;
+    return this.indexOf({ userId, points }) + 1;
+  }
+
+  entry(userId: number): LeaderboardEntry | null {
+    const rank = this.rank(userId);
+    return rank === null ? null : { userId, points: this.points.get(userId)!, rank };
+  }
+
+  top(n: number): LeaderboardEntry[] {
+    return this.items.slice(0, n).map((item, idx) => ({ ...item, rank: idx + 1 }));
+  }
+}
+
+type Board = { set: RankedSet; expiresAt: number };
+
+const boards = new Map<string, Board>();
+const loading = new Map<string, Promise<RankedSet>>();
+
+function boardKey(ventureId: number, officeId: number, period: LeaderboardPeriod, start: Date): string {
+  return `${ventureId}:${officeId}:${period}:${start.getTime()}`;
+}
+
+function boardTargets(award: LeaderboardAward) {
+  const officeIds = award.officeId ? [0, award.officeId] : [0];
+  return officeIds.flatMap((officeId) =>
+    LEADERBOARD_PERIODS.map((period) => ({
+      officeId,
+      period,
+      periodStart: periodStart(period, award.at),
+    }))
+  );
+}
+
+/**
+ * Increment every board the award counts towards. Returned unexecuted so
+ * callers can put it in the same $transaction as the event insert.
+ */
+export function leaderboardScoreUpsert(award: LeaderboardAward) {
+  const rows = boardTargets(award).map(
+    (t) =>
+      Prisma.sql`(${award.ventureId}, ${t.officeId}, ${t.period}, ${t.periodStart}, ${award.userId}, ${award.points}, now())`
+  );
+
+  return prisma.$executeRaw`
+    INSERT INTO "GamificationLeaderboardScore"
+      ("ventureId", "officeId", "period", "periodStart", "userId", "points", "updatedAt")
+    VALUES ${Prisma.join(rows)}
+    ON CONFLICT ("ventureId", "officeId", "period", "periodStart", "userId")
+    DO UPDATE SET "points" = "GamificationLeaderboardScore"."points" + EXCLUDED."points",
+                  "updatedAt" = now()
+  `;
+}
+
+/** Apply a committed award to any boards cached in this process. */
+export function noteLeaderboardAward(award: LeaderboardAward): void {
+  for (const t of boardTargets(award)) {
+    const board = boards.get(boardKey(award.ventureId, t.officeId, t.period, t.periodStart));
+    if (board) board.set.add(award.userId, award.points);
+  }
+}
+
+async function loadBoard(
+  ventureId: number,
+  officeId: number,
+  period: LeaderboardPeriod,
+  start: Date
+): Promise<RankedSet> {
+  const key = boardKey(ventureId, officeId, period, start);
+  const cached = boards.get(key);
+  if (cached && cached.expiresAt > Date.now()) return cached.set;
+
+  const pending = loading.get(key);
+  if (pending) return pending;
+
+  const promise = prisma.gamificationLeaderboardScore
+    .findMany({
+      where: { ventureId, officeId, period, periodStart: start },
+      select: { userId: true, points: true },
+    })
+    .then((rows) => {
+      const set = new RankedSet(rows);
+      if (boards.size >= MAX_CACHED_BOARDS) {
+        const oldest = boards.keys().next().value;
+        if (oldest !== undefined) boards.delete(oldest);
+      }
+      boards.set(key, { set, expiresAt: Date.now() + BOARD_TTL_MS });
+      return set;
+    })
+    .finally(() => loading.delete(key));
+
+  loading.set(key, promise);
+  return promise;
+}
+
+export async function getLeaderboard(query: LeaderboardQuery): Promise<LeaderboardResult> {
+  const start = periodStart(query.period, query.at ?? new Date());
+  const set = await loadBoard(query.ventureId, query.officeId ?? 0, query.period, start);
+
+  return {
+    period: query.period,
+    periodStart: start,
+    totalRanked: set.size,
+    top: set.top(query.limit),
+    me: query.userId !== undefined ? set.entry(query.userId) : null,
+  };
+}
+
+/**
+ * Rebuild every board from GamificationEvent, e.g. after events were
+ * written without awardPoints (seeding). Returns the number of score rows.
+ */
+export async function rebuildLeaderboardScores(): Promise<number> {
+  const [, inserted] = await prisma.$transaction([
+    prisma.$executeRaw`DELETE FROM "GamificationLeaderboardScore"`,
+    prisma.$executeRaw`
+      INSERT INTO "GamificationLeaderboardScore"
+        ("ventureId", "officeId", "period", "periodStart", "userId", "points", "updatedAt")
+      SELECT e."ventureId", o."officeId", p."period",
+             CASE p."period"
+               WHEN 'ALL' THEN TIMESTAMP '1970-01-01'
+               ELSE DATE_TRUNC(LOWER(p."period"), e."createdAt")
+             END,
+             e."userId", SUM(e."points")::int, now()
+      FROM "GamificationEvent" e
+      CROSS JOIN (VALUES ('DAY'), ('WEEK'), ('MONTH'), ('ALL')) AS p("period")
+      CROSS JOIN LATERAL (
+        SELECT 0 AS "officeId"
+        UNION ALL
+        SELECT e."officeId" WHERE e."officeId" IS NOT NULL
+      ) o
+      GROUP BY 1, 2, 3, 4, 5
+    `,
+  ]);
+  boards.clear();
+  return inserted;
+}
+
+/** Drop cached boards (tests, bulk cleanup). */
+export function clearLeaderboardCache(): void {
+  boards.clear();
+}
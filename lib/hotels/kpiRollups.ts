@@ -0,0 +1,412 @@
+import { Prisma } from "@prisma/client";
+import prisma from "../prisma";
+import {
+  DAY_MS,
+  coverWithPeriods,
+  periodsTouching,
+  planSummaryRead,
+  spanFilter,
+  utcDay,
+} from "../utils/rollupPeriods";
+
+/**
+ * Property-level hospitality rollups.
+ *
+ * HotelKpiRollup holds weekly and monthly HotelKpiDaily totals (plus high-loss
+ * nights from HotelDailyReport) per property; HotelReviewRollup holds monthly
+ * review counts per property and source. Portfolio and venture figures are
+ * sums over the property rows, and edge days come straight from the daily
+ * tables, so any [from, to) window is answered by one grouped query.
+ */
+
+export type HotelScope = { hotelIds?: number[]; ventureId?: number };
+
+export type HotelKpiTotals = {
+  days: number;
+  roomsSold: number;
+  roomsAvailable: number;
+  roomRevenue: number;
+  totalRevenue: number;
+  occSum: number;
+  adrSum: number;
+  revparSum: number;
+  occPositiveSum: number;
+  occPositiveDays: number;
+  adrPositiveSum: number;
+  adrPositiveDays: number;
+  revparPositiveSum: number;
+  revparPositiveDays: number;
+  lossNights: number;
+};
+
+export type HotelKpiWindow = { key: string; from: Date; toExclusive: Date };
+
+export type HotelReviewSummary = {
+  totalReviews: number;
+  ratedReviews: number;
+  ratingSum: number;
+  positive: number;
+  negative: number;
+  unresponded: number;
+  recent: number;
+  sourceCounts: Record<string, number>;
+};
+
+const TOTAL_FIELDS: (keyof HotelKpiTotals)[] = [
+  "days",
+  "roomsSold",
+  "roomsAvailable",
+  "roomRevenue",
+  "totalRevenue",
+  "occSum",
+  "adrSum",
+  "revparSum",
+  "occPositiveSum",
+  "occPositiveDays",
+  "adrPositiveSum",
+  "adrPositiveDays",
+  "revparPositiveSum",
+  "revparPositiveDays",
+  "lossNights",
+];
+
+export function emptyKpiTotals(): HotelKpiTotals {
+  return Object.fromEntries(TOTAL_FIELDS.map((f) => [f, 0])) as HotelKpiTotals;
+}
+
+/** Inclusive local calendar days [from, to] as a UTC-midnight half-open window. */
+export function dayWindow(key: string, from: Date, to: Date): HotelKpiWindow {
+  return {
+    key,
+    from: new Date(Date.UTC(from.getFullYear(), from.getMonth(), from.getDate())),
+    toExclusive: new Date(Date.UTC(to.getFullYear(), to.getMonth(), to.getDate() + 1)),
+  };
+}
+
+/** The trailing `days` days ending today, in stored (UTC-midnight) dates. */
+export function trailingWindow(key: string, days: number, now: Date = new Date()): HotelKpiWindow {
+  const today = utcDay(now);
+  return {
+    key,
+    from: new Date(today.getTime() - (days - 1) * DAY_MS),
+    toExclusive: new Date(today.getTime() + DAY_MS),
+  };
+}
+
+function scopeFilters(scope: HotelScope) {
+  if (scope.hotelIds) {
+    const ids = scope.hotelIds;
+    return {
+      rollup: Prisma.sql`r."hotelId" = ANY(${ids})`,
+      kpi: Prisma.sql`k."hotelId" = ANY(${ids})`,
+      report: Prisma.sql`d."hotelId" = ANY(${ids})`,
+    };
+  }
+  if (scope.ventureId) {
+    const ventureId = scope.ventureId;
+    return {
+      rollup: Prisma.sql`r."ventureId" = ${ventureId}`,
+      kpi: Prisma.sql`k."ventureId" = ${ventureId}`,
+      report: Prisma.sql`d."hotelId" IN (SELECT "id" FROM "HotelProperty" WHERE "ventureId" = ${ventureId})`,
+    };
+  }
+  return { rollup: Prisma.sql`TRUE`, kpi: Prisma.sql`TRUE`, report: Prisma.sql`TRUE` };
+}
+
+/** KPI days and high-loss nights as one row shape, ready to be summed. */
+function dailySource(kpiFilter: Prisma.Sql, reportFilter: Prisma.Sql): Prisma.Sql {
+  return Prisma.sql`
+    SELECT k."hotelId", k."date", 1 AS "kpiDay", k."roomsSold", k."roomsAvailable",
+           k."roomRevenue", k."totalRevenue", k."occupancyPct" AS "occ", k."adr", k."revpar",
+           0 AS "loss"
+    FROM "HotelKpiDaily" k
+    WHERE ${kpiFilter}
+    UNION ALL
+    SELECT d."hotelId", d."date", 0, 0, 0, 0, 0, 0, 0, 0, 1
+    FROM "HotelDailyReport" d
+    WHERE d."highLossFlag" AND ${reportFilter}`;
+}
+
+const DAILY_TOTALS = Prisma.sql`
+  SUM(s."kpiDay") AS "days", SUM(s."roomsSold") AS "roomsSold",
+  SUM(s."roomsAvailable") AS "roomsAvailable", SUM(s."roomRevenue") AS "roomRevenue",
+  SUM(s."totalRevenue") AS "totalRevenue", SUM(s."occ") AS "occSum",
+  SUM(s."adr") AS "adrSum", SUM(s."revpar") AS "revparSum",
+  COALESCE(SUM(s."occ") FILTER (WHERE s."occ" > 0), 0) AS "occPositiveSum",
+  COUNT(*) FILTER (WHERE s."occ" > 0) AS "occPositiveDays",
+  COALESCE(SUM(s."adr") FILTER (WHERE s."adr" > 0), 0) AS "adrPositiveSum",
+  COUNT(*) FILTER (WHERE s."adr" > 0) AS "adrPositiveDays",
+  COALESCE(SUM(s."revpar") FILTER (WHERE s."revpar" > 0), 0) AS "revparPositiveSum",
+  COUNT(*) FILTER (WHERE s."revpar" > 0) AS "revparPositiveDays",
+  SUM(s."loss") AS "lossNights"`;
+
+type KpiReadRow = { key: string; hotelId: number | null } & Record<keyof HotelKpiTotals, number | null>;
+
+/**
+ * KPI totals for each window, optionally split per property. Each window is
+ * covered by month and week rollups plus daily rows at the edges.
+ */
+export async function readHotelKpiTotals(
+  scope: HotelScope,
+  windows: HotelKpiWindow[],
+  opts: { byHotel?: boolean } = {},
+): Promise<Map<string, HotelKpiTotals>> {
+  const filters = scopeFilters(scope);
+  const sources: Prisma.Sql[] = [];
+
+  for (const w of windows) {
+    const plan = planSummaryRead(w.from, w.toExclusive);
+    if (plan.periods.length) {
+      sources.push(Prisma.sql`
+        SELECT ${w.key}::text AS "key", r."hotelId", r."days", r."roomsSold", r."roomsAvailable",
+               r."roomRevenue", r."totalRevenue", r."occSum", r."adrSum", r."revparSum",
+               r."occPositiveSum", r."occPositiveDays", r."adrPositiveSum", r."adrPositiveDays",
+               r."revparPositiveSum", r."revparPositiveDays", r."lossNights"
+        FROM "HotelKpiRollup" r
+        WHERE ${filters.rollup}
+          AND (r."period", r."periodStart") IN (${Prisma.join(
+            plan.periods.map((p) => Prisma.sql`(${p.period}, ${p.start})`),
+          )})`);
+    }
+    if (plan.days.length) {
+      sources.push(Prisma.sql`
+        SELECT ${w.key}::text AS "key", s."hotelId", ${DAILY_TOTALS}
+        FROM (${dailySource(filters.kpi, filters.report)}) s
+        WHERE ${spanFilter(Prisma.sql`s."date"`, plan.days)}
+        GROUP BY s."hotelId"`);
+    }
+  }
+
+  const totals = new Map<string, HotelKpiTotals>();
+  if (!sources.length) return totals;
+
+  const hotelColumn = opts.byHotel ? Prisma.sql`t."hotelId"` : Prisma.sql`NULL::int`;
+  const rows = await prisma.$queryRaw<KpiReadRow[]>`
+    SELECT t."key", ${hotelColumn} AS "hotelId",
+           SUM(t."days")::int AS "days", SUM(t."roomsSold")::int AS "roomsSold",
+           SUM(t."roomsAvailable")::int AS "roomsAvailable",
+           SUM(t."roomRevenue")::float8 AS "roomRevenue", SUM(t."totalRevenue")::float8 AS "totalRevenue",
+           SUM(t."occSum")::float8 AS "occSum", SUM(t."adrSum")::float8 AS "adrSum",
+           SUM(t."revparSum")::float8 AS "revparSum",
+           SUM(t."occPositiveSum")::float8 AS "occPositiveSum", SUM(t."occPositiveDays")::int AS "occPositiveDays",
+           SUM(t."adrPositiveSum")::float8 AS "adrPositiveSum", SUM(t."adrPositiveDays")::int AS "adrPositiveDays",
+           SUM(t."revparPositiveSum")::float8 AS "revparPositiveSum",
+           SUM(t."revparPositiveDays")::int AS "revparPositiveDays",
+           SUM(t."lossNights")::int AS "lossNights"
+    FROM (${Prisma.join(sources, " UNION ALL ")}) t
+    GROUP BY 1, 2
+  `;
+
+  for (const row of rows) {
+    const t = emptyKpiTotals();
+    for (const f of TOTAL_FIELDS) t[f] = Number(row[f] ?? 0);
+    totals.set(opts.byHotel ? `${row.key}:${row.hotelId}` : row.key, t);
+  }
+  return totals;
+}
+
+type ReviewReadRow = {
+  source: string;
+  reviews: number | null;
+  ratedReviews: number | null;
+  ratingSum: number | null;
+  positive: number | null;
+  negative: number | null;
+  unresponded: number | null;
+  recent: number | null;
+};
+
+/**
+ * All-time review totals for a set of properties, with the number of reviews
+ * dated inside the recent window. Whole months inside the window come from
+ * the rollup; the partial months at the edges are counted from HotelReview.
+ */
+export async function readHotelReviewSummary(
+  hotelIds: number[],
+  includeTest: boolean,
+  recent: HotelKpiWindow,
+): Promise<HotelReviewSummary> {
+  const summary: HotelReviewSummary = {
+    totalReviews: 0,
+    ratedReviews: 0,
+    ratingSum: 0,
+    positive: 0,
+    negative: 0,
+    unresponded: 0,
+    recent: 0,
+    sourceCounts: {},
+  };
+  if (!hotelIds.length) return summary;
+
+  const { starts, rest } = coverWithPeriods("MONTH", [recent.from, recent.toExclusive]);
+  const recentMonths = starts.length
+    ? Prisma.sql`r."period" = 'MONTH' AND r."periodStart" = ANY(${starts.map((s) => s.toISOString())}::timestamp[])`
+    : Prisma.sql`FALSE`;
+  const rollupTest = includeTest ? Prisma.empty : Prisma.sql`AND NOT r."isTest"`;
+  const reviewTest = includeTest ? Prisma.empty : Prisma.sql`AND NOT v."isTest"`;
+
+  const rows = await prisma.$queryRaw<ReviewReadRow[]>`
+    SELECT t."source", SUM(t."reviews")::int AS "reviews", SUM(t."ratedReviews")::int AS "ratedReviews",
+           SUM(t."ratingSum")::float8 AS "ratingSum", SUM(t."positive")::int AS "positive",
+           SUM(t."negative")::int AS "negative", SUM(t."unresponded")::int AS "unresponded",
+           SUM(t."recent")::int AS "recent"
+    FROM (
+      SELECT r."source", r."reviews", r."ratedReviews", r."ratingSum", r."positive", r."negative",
+             r."unresponded", CASE WHEN ${recentMonths} THEN r."reviews" ELSE 0 END AS "recent"
+      FROM "HotelReviewRollup" r
+      WHERE r."hotelId" = ANY(${hotelIds}) ${rollupTest}
+      UNION ALL
+      SELECT v."source"::text, 0, 0, 0, 0, 0, 0, 1
+      FROM "HotelReview" v
+      WHERE v."hotelId" = ANY(${hotelIds}) ${reviewTest}
+        AND (${rest.length ? spanFilter(Prisma.sql`v."reviewDate"`, rest) : Prisma.sql`FALSE`})
+    ) t
+    GROUP BY t."source"
+  `;
+
+  for (const row of rows) {
+    const reviews = Number(row.reviews ?? 0);
+    summary.totalReviews += reviews;
+    summary.ratedReviews += Number(row.ratedReviews ?? 0);
+    summary.ratingSum += Number(row.ratingSum ?? 0);
+    summary.positive += Number(row.positive ?? 0);
+    summary.negative += Number(row.negative ?? 0);
+    summary.unresponded += Number(row.unresponded ?? 0);
+    summary.recent += Number(row.recent ?? 0);
+    if (reviews > 0) summary.sourceCounts[row.source] = reviews;
+  }
+  return summary;
+}
+
+/**
+ * Recompute the week and month rollups touching [from, to] for one property.
+ * Upsert-then-prune keeps concurrent uploads for the same hotel from tripping
+ * over the unique key.
+ */
+export async function refreshHotelKpiRollups(hotelId: number, from: Date, to: Date): Promise<void> {
+  const periods = periodsTouching(from, to);
+  const values = Prisma.join(
+    periods.map((p) => Prisma.sql`(${p.period}, ${p.start}::timestamp, ${p.end}::timestamp)`),
+  );
+
+  await prisma.$transaction([
+    prisma.$executeRaw`
+      INSERT INTO "HotelKpiRollup" ("hotelId", "ventureId", "period", "periodStart", "days", "roomsSold",
+        "roomsAvailable", "roomRevenue", "totalRevenue", "occSum", "adrSum", "revparSum",
+        "occPositiveSum", "occPositiveDays", "adrPositiveSum", "adrPositiveDays",
+        "revparPositiveSum", "revparPositiveDays", "lossNights", "updatedAt")
+      SELECT h."id", h."ventureId", p."period", p."start", ${DAILY_TOTALS}, NOW()
+      FROM (VALUES ${values}) AS p("period", "start", "end")
+      JOIN (${dailySource(Prisma.sql`k."hotelId" = ${hotelId}`, Prisma.sql`d."hotelId" = ${hotelId}`)}) s
+        ON s."date" >= p."start" AND s."date" < p."end"
+      JOIN "HotelProperty" h ON h."id" = s."hotelId"
+      GROUP BY h."id", h."ventureId", p."period", p."start"
+      ON CONFLICT ("hotelId", "period", "periodStart") DO UPDATE
+      SET "ventureId" = EXCLUDED."ventureId",
+          "days" = EXCLUDED."days",
+          "roomsSold" = EXCLUDED."roomsSold",
+          "roomsAvailable" = EXCLUDED."roomsAvailable",
+          "roomRevenue" = EXCLUDED."roomRevenue",
+          "totalRevenue" = EXCLUDED."totalRevenue",
+          "occSum" = EXCLUDED."occSum",
+          "adrSum" = EXCLUDED."adrSum",
+          "revparSum" = EXCLUDED."revparSum",
+          "occPositiveSum" = EXCLUDED."occPositiveSum",
+          "occPositiveDays" = EXCLUDED."occPositiveDays",
+          "adrPositiveSum" = EXCLUDED."adrPositiveSum",
+          "adrPositiveDays" = EXCLUDED."adrPositiveDays",
+          "revparPositiveSum" = EXCLUDED."revparPositiveSum",
+          "revparPositiveDays" = EXCLUDED."revparPositiveDays",
+          "lossNights" = EXCLUDED."lossNights",
+          "updatedAt" = EXCLUDED."updatedAt"
+    `,
+    prisma.$executeRaw`
+      DELETE FROM "HotelKpiRollup" r
+      USING (VALUES ${values}) AS p("period", "start", "end")
+      WHERE r."hotelId" = ${hotelId}
+        AND r."period" = p."period" AND r."periodStart" = p."start"
+        AND NOT EXISTS (
+          SELECT 1 FROM "HotelKpiDaily" k
+          WHERE k."hotelId" = r."hotelId" AND k."date" >= p."start" AND k."date" < p."end"
+        )
+        AND NOT EXISTS (
+          SELECT 1 FROM "HotelDailyReport" d
+          WHERE d."hotelId" = r."hotelId" AND d."highLossFlag"
+            AND d."date" >= p."start" AND d."date" < p."end"
+        )
+    `,
+  ]);
+}
+
+/**
+ * Collect the dates a batch writes per property, then refresh each property's
+ * touched periods once at the end instead of once per row.
+ */
+export function trackHotelKpiWrites() {
+  const ranges = new Map<number, { from: Date; to: Date }>();
+  return {
+    touch(hotelId: number, date: Date) {
+      const range = ranges.get(hotelId);
+      if (!range) ranges.set(hotelId, { from: date, to: date });
+      else if (date < range.from) range.from = date;
+      else if (date > range.to) range.to = date;
+    },
+    async flush() {
+      for (const [hotelId, { from, to }] of ranges) {
+        await refreshHotelKpiRollups(hotelId, from, to);
+      }
+      ranges.clear();
+    },
+  };
+}
+
+const REVIEW_TOTALS = Prisma.sql`
+  COUNT(*), COUNT(v."rating"), COALESCE(SUM(v."rating"), 0),
+  COUNT(*) FILTER (WHERE v."rating" >= 4), COUNT(*) FILTER (WHERE v."rating" <= 2),
+  COUNT(*) FILTER (WHERE v."responseText" IS NULL OR v."responseText" = '')`;
+
+const REVIEW_PERIOD = Prisma.sql`
+  CASE WHEN v."reviewDate" IS NULL THEN 'UNDATED' ELSE 'MONTH' END,
+  COALESCE(DATE_TRUNC('month', v."reviewDate"), TIMESTAMP '1970-01-01')`;
+
+/** Rewrite a property's review rollups; reviews per hotel are few enough to redo wholesale. */
+export async function refreshHotelReviewRollups(hotelId: number): Promise<void> {
+  await prisma.$transaction([
+    prisma.$executeRaw`DELETE FROM "HotelReviewRollup" WHERE "hotelId" = ${hotelId}`,
+    prisma.$executeRaw`
+      INSERT INTO "HotelReviewRollup" ("hotelId", "source", "isTest", "period", "periodStart", "reviews",
+        "ratedReviews", "ratingSum", "positive", "negative", "unresponded", "updatedAt")
+      SELECT v."hotelId", v."source"::text, v."isTest", ${REVIEW_PERIOD}, ${REVIEW_TOTALS}, NOW()
+      FROM "HotelReview" v
+      WHERE v."hotelId" = ${hotelId}
+      GROUP BY 1, 2, 3, 4, 5
+    `,
+  ]);
+}
+
+/** Rebuild every hospitality rollup from the daily tables, e.g. after bulk deletes or seeding. */
+export async function rebuildHotelRollups(): Promise<number> {
+  const [, kpiRows, , reviewRows] = await prisma.$transaction([
+    prisma.$executeRaw`DELETE FROM "HotelKpiRollup"`,
+    prisma.$executeRaw`
+      INSERT INTO "HotelKpiRollup" ("hotelId", "ventureId", "period", "periodStart", "days", "roomsSold",
+        "roomsAvailable", "roomRevenue", "totalRevenue", "occSum", "adrSum", "revparSum",
+        "occPositiveSum", "occPositiveDays", "adrPositiveSum", "adrPositiveDays",
+        "revparPositiveSum", "revparPositiveDays", "lossNights", "updatedAt")
+      SELECT h."id", h."ventureId", p."period", DATE_TRUNC(LOWER(p."period"), s."date"), ${DAILY_TOTALS}, NOW()
+      FROM (${dailySource(Prisma.sql`TRUE`, Prisma.sql`TRUE`)}) s
+      JOIN "HotelProperty" h ON h."id" = s."hotelId"
+      CROSS JOIN (VALUES ('WEEK'), ('MONTH')) AS p("period")
+      GROUP BY h."id", h."ventureId", p."period", DATE_TRUNC(LOWER(p."period"), s."date")
+    `,
+    prisma.$executeRaw`DELETE FROM "HotelReviewRollup"`,
+    prisma.$executeRaw`
+      INSERT INTO "HotelReviewRollup" ("hotelId", "source", "isTest", "period", "periodStart", "reviews",
+        "ratedReviews", "ratingSum", "positive", "negative", "unresponded", "updatedAt")
+      SELECT v."hotelId", v."source"::text, v."isTest", ${REVIEW_PERIOD}, ${REVIEW_TOTALS}, NOW()
+      FROM "HotelReview" v
+      GROUP BY 1, 2, 3, 4, 5
+    `,
+  ]);
+  return kpiRows + reviewRows;
+}
@@ -0,0 +1,117 @@
+import { Prisma, type HotelLossSeverity } from "@prisma/client";
+import prisma from "../prisma";
+
+/**
+ * High-loss night classification for HotelDailyReport.
+ *
+ * A night is high-loss when lost dues pass an absolute or a share-of-total
+ * threshold; severity grades flagged nights by how far past the thresholds
+ * they are. Writers classify on ingest with `classifyLoss`, and the nightly
+ * scan reclassifies a day set-wise with the same thresholds in SQL.
+ */
+
+export const LOSS_THRESHOLDS = {
+  LOW: { lostDues: 100, ratio: 0.05 },
+  MEDIUM: { lostDues: 500, ratio: 0.1 },
+  HIGH: { lostDues: 1000, ratio: 0.2 },
+} as const;
+
+export const LOSS_SEVERITY_ORDER: HotelLossSeverity[] = ["NONE", "LOW", "MEDIUM", "HIGH"];
+
+export type LossClassification = {
+  highLossFlag: boolean;
+  lossSeverity: HotelLossSeverity;
+};
+
+export function classifyLoss(total: number | null, lostDues: number | null): LossClassification {
+  const t = total ?? 0;
+  const lost = lostDues ?? 0;
+  if (lost <= 0 || t <= 0) return { highLossFlag: false, lossSeverity: "NONE" };
+
+  const ratio = lost / t;
+  const passes = (tier: keyof typeof LOSS_THRESHOLDS) =>
+    lost >= LOSS_THRESHOLDS[tier].lostDues || ratio >= LOSS_THRESHOLDS[tier].ratio;
+
+  if (passes("HIGH")) return { highLossFlag: true, lossSeverity: "HIGH" };
+  if (passes("MEDIUM")) return { highLossFlag: true, lossSeverity: "MEDIUM" };
+  if (passes("LOW")) return { highLossFlag: true, lossSeverity: "LOW" };
+  return { highLossFlag: false, lossSeverity: "NONE" };
+}
+
+/** Severities at or above `min`, for `lossSeverity: { in: ... }` filters. */
+export function severitiesAtLeast(min: HotelLossSeverity): HotelLossSeverity[] {
+  return LOSS_SEVERITY_ORDER.slice(LOSS_SEVERITY_ORDER.indexOf(min));
+}
+
+export function parseSeverityParam(
+  value: string | string[] | undefined,
+): HotelLossSeverity | null | undefined {
+  if (value === undefined || value === "") return undefined;
+  const upper = String(value).toUpperCase() as HotelLossSeverity;
+  return LOSS_SEVERITY_ORDER.includes(upper) && upper !== "NONE" ? upper : null;
+}
+
+function passesSql(tier: keyof typeof LOSS_THRESHOLDS): Prisma.Sql {
+  const { lostDues, ratio } = LOSS_THRESHOLDS[tier];
+  return Prisma.sql`(c."lost" >= ${lostDues} OR c."lost" / c."total" >= ${ratio})`;
+}
+
+export type LossScanResult = {
+  scanned: number;
+  updated: number;
+  highLossDays: number;
+  flagChangedHotelIds: number[];
+};
+
+/**
+ * Reclassify every report dated in [from, to) in one UPDATE ... FROM pass:
+ * recompute net ADR, flag and severity, and only touch rows that changed.
+ */
+export async function reclassifyLossNights(from: Date, to: Date): Promise<LossScanResult> {
+  const [row] = await prisma.$queryRaw<
+    { scanned: number; updated: number; highLossDays: number; flagChangedHotelIds: number[] | null }[]
+  >`
+    WITH c AS (
+      SELECT r."id", r."hotelId", r."highLossFlag" AS "wasHighLoss",
+             COALESCE(r."total", 0)::float8 AS "total", COALESCE(r."lostDues", 0)::float8 AS "lost",
+             CASE WHEN COALESCE(r."roomSold", 0) > 0
+                  THEN (COALESCE(r."total", 0) - COALESCE(r."lostDues", 0)) / r."roomSold"
+                  ELSE 0 END AS "adr"
+      FROM "HotelDailyReport" r
+      WHERE r."date" >= ${from} AND r."date" < ${to}
+    ),
+    graded AS (
+      SELECT c."id", c."hotelId", c."wasHighLoss", c."adr",
+             CASE WHEN c."lost" <= 0 OR c."total" <= 0 THEN 'NONE'
+                  WHEN ${passesSql("HIGH")} THEN 'HIGH'
+                  WHEN ${passesSql("MEDIUM")} THEN 'MEDIUM'
+                  WHEN ${passesSql("LOW")} THEN 'LOW'
+                  ELSE 'NONE' END::"HotelLossSeverity" AS "severity"
+      FROM c
+    ),
+    u AS (
+      UPDATE "HotelDailyReport" r
+      SET "adr" = g."adr",
+          "highLossFlag" = g."severity" <> 'NONE',
+          "lossSeverity" = g."severity",
+          "updatedAt" = NOW()
+      FROM graded g
+      WHERE r."id" = g."id"
+        AND (r."adr" IS DISTINCT FROM g."adr" OR r."lossSeverity" <> g."severity"
+             OR r."highLossFlag" <> (g."severity" <> 'NONE'))
+      RETURNING r."hotelId", r."highLossFlag", g."wasHighLoss"
+    )
+    SELECT (SELECT COUNT(*) FROM c)::int AS "scanned",
+           COUNT(*)::int AS "updated",
+           COUNT(*) FILTER (WHERE u."highLossFlag")::int AS "highLossDays",
+           ARRAY_AGG(DISTINCT u."hotelId") FILTER (WHERE u."highLossFlag" <> u."wasHighLoss") AS "flagChangedHotelIds"
+    FROM u
+  `;
+
+  return {
+    scanned: Number(row?.scanned ?? 0),
+    updated: Number(row?.updated ?? 0),
+    highLossDays: Number(row?.highLossDays ?? 0),
+    flagChangedHotelIds: row?.flagChangedHotelIds ?? [],
+  };
+}
@@ -1,4 +1,5 @@
 import prisma from "../prisma";
+import { refreshIncentiveRollups } from "./rollups";
 
 export type EngineIncentiveDaily = {
   userId: number;
@@ -8,21 +9,21 @@ export type EngineIncentiveDaily = {
   planId: number;
 };
 
-const LOAD_METRICS = new Set([
+export const LOAD_METRICS = new Set([
   "loads_completed",
   "loads_revenue",
   "loads_miles",
   "loads_margin",
 ]);
 
-const BPO_METRICS = new Set([
+export const BPO_METRICS = new Set([
   "bpo_dials",
   "bpo_connects",
   "bpo_talk_seconds",
   "bpo_deals",
 ]);
 
-const HOTEL_METRICS = new Set([
+export const HOTEL_METRICS = new Set([
   "hotel_reviews_responded",
   "hotel_adr",
   "hotel_revpar",
@@ -173,7 +174,7 @@ async function loadHotelMetrics(
   return metricsByUser;
 }
 
-function computeAmountForRule(
+export function computeAmountForRule(
   rule: IncentiveRuleLike,
   metricValue: number,
   allMetrics: Record<string, number>,
@@ -437,6 +438,8 @@ export async function saveIncentivesForDay(
     }
   }
 
+  await refreshIncentiveRollups(ventureId, dayDate);
+
   return { items, inserted, updated };
 }
 
@@ -481,6 +484,7 @@ export async function saveIncentivesForDayIdempotent(
   // Calculate fresh incentives
   const items = await calculateIncentivesForDay(planId, date);
   if (!items.length) {
+    await refreshIncentiveRollups(ventureId, dayDate);
     return { items: [], deleted, inserted: 0 };
   }
 
@@ -518,5 +522,8 @@ export async function saveIncentivesForDayIdempotent(
     inserted += 1;
   }
 
+  // Keep the week/month rollups read by the summary endpoints in step
+  await refreshIncentiveRollups(ventureId, dayDate);
+
   return { items, deleted, inserted };
 }
@@ -0,0 +1,235 @@
+import { Prisma } from "@prisma/client";
+import prisma from "../prisma";
+import {
+  coverWithPeriods,
+  periodEnd,
+  periodStartOf,
+  planSummaryRead,
+  spanFilter,
+  type RollupPeriod,
+  type RollupPlan,
+  type Span,
+} from "../utils/rollupPeriods";
+
+/**
+ * Weekly and monthly IncentiveDaily rollups.
+ *
+ * Rollups are rewritten from IncentiveDaily whenever a day is (re)computed, so
+ * they are always a pure function of the daily rows. Readers cover a range with
+ * whole periods from the rollup table and fall back to daily rows only for the
+ * partial periods at the edges.
+ */
+
+export type IncentiveGranularity = "day" | "week" | "month";
+export type IncentiveInclude = { summary: boolean; series: boolean };
+
+export type IncentiveUserSummary = {
+  userId: number;
+  userName: string;
+  email: string | null;
+  role: string | null;
+  totalAmount: number;
+  daysWithIncentives: number;
+};
+
+export type IncentiveSeriesPoint = { date: string; amount: number };
+
+export { periodStartOf };
+
+/**
+ * Split [from, toExclusive) into rollup periods and daily spans. Series at a
+ * given granularity only use rollups of that granularity so no period straddles
+ * two buckets; summary-only reads take months, then weeks, then days.
+ */
+export function planRollupRead(
+  from: Date,
+  toExclusive: Date,
+  granularity: IncentiveGranularity | null,
+): RollupPlan {
+  const whole: Span = [from, toExclusive];
+  if (granularity === "day") return { periods: [], days: [whole] };
+
+  if (granularity === "week" || granularity === "month") {
+    const period: RollupPeriod = granularity === "week" ? "WEEK" : "MONTH";
+    const { starts, rest } = coverWithPeriods(period, whole);
+    return { periods: starts.map((start) => ({ period, start })), days: rest };
+  }
+
+  return planSummaryRead(from, toExclusive);
+}
+
+export function parseIncludeParam(
+  value: string | string[] | undefined,
+  fallback: IncentiveInclude,
+): IncentiveInclude {
+  if (!value || Array.isArray(value)) return fallback;
+  const parts = value.split(",").map((p) => p.trim().toLowerCase());
+  const include = { summary: parts.includes("summary"), series: parts.includes("series") };
+  return include.summary || include.series ? include : fallback;
+}
+
+export function parseGranularityParam(
+  value: string | string[] | undefined,
+): IncentiveGranularity | null {
+  if (value === undefined) return "day";
+  if (value === "day" || value === "week" || value === "month") return value;
+  return null;
+}
+
+function dailyBucket(granularity: IncentiveGranularity | null): Prisma.Sql {
+  if (granularity === "week") return Prisma.sql`DATE_TRUNC('week', d."date")`;
+  if (granularity === "month") return Prisma.sql`DATE_TRUNC('month', d."date")`;
+  if (granularity === "day") return Prisma.sql`d."date"`;
+  return Prisma.sql`NULL::timestamp`;
+}
+
+type RollupReadRow = {
+  userId: number | null;
+  userName: string | null;
+  email: string | null;
+  role: string | null;
+  bucket: Date | null;
+  amount: number | null;
+  days: number | null;
+  byBucket: number;
+};
+
+/**
+ * Per-user totals and/or a bucketed series for a venture (optionally a single
+ * user) over [from, toExclusive), answered by one grouped query.
+ */
+export async function readIncentiveRollups(params: {
+  ventureId: number;
+  userId?: number;
+  from: Date;
+  toExclusive: Date;
+  granularity: IncentiveGranularity;
+  include: IncentiveInclude;
+}): Promise<{
+  items: IncentiveUserSummary[];
+  totalAmount: number;
+  points: IncentiveSeriesPoint[];
+}> {
+  const { ventureId, userId, from, toExclusive, include } = params;
+  const granularity = include.series ? params.granularity : null;
+  const plan = planRollupRead(from, toExclusive, granularity);
+
+  const rollupUser = userId ? Prisma.sql`AND r."userId" = ${userId}` : Prisma.empty;
+  const dailyUser = userId ? Prisma.sql`AND d."userId" = ${userId}` : Prisma.empty;
+
+  const sources: Prisma.Sql[] = [];
+  if (plan.periods.length) {
+    sources.push(Prisma.sql`
+      SELECT r."userId", ${granularity ? Prisma.sql`r."periodStart"` : Prisma.sql`NULL::timestamp`} AS "bucket",
+             r."amount", r."daysWithIncentives" AS "days"
+      FROM "IncentiveRollup" r
+      WHERE r."ventureId" = ${ventureId} ${rollupUser}
+        AND (r."period", r."periodStart") IN (${Prisma.join(
+          plan.periods.map((p) => Prisma.sql`(${p.period}, ${p.start})`),
+        )})`);
+  }
+  if (plan.days.length) {
+    sources.push(Prisma.sql`
+      SELECT d."userId", ${dailyBucket(granularity)} AS "bucket",
+             d."amount", CASE WHEN d."amount" > 0 THEN 1 ELSE 0 END AS "days"
+      FROM "IncentiveDaily" d
+      WHERE d."ventureId" = ${ventureId} ${dailyUser}
+        AND (${spanFilter(Prisma.sql`d."date"`, plan.days)})`);
+  }
+
+  const groupingSets: Prisma.Sql[] = [];
+  if (include.summary) groupingSets.push(Prisma.sql`(s."userId", u."name", u."email", u."role")`);
+  if (include.series) groupingSets.push(Prisma.sql`(s."bucket")`);
+
+  const rows = await prisma.$queryRaw<RollupReadRow[]>`
+    SELECT s."userId", u."name" AS "userName", u."email", u."role"::text AS "role", s."bucket",
+           SUM(s."amount")::float8 AS "amount", SUM(s."days")::int AS "days",
+           GROUPING(s."userId") AS "byBucket"
+    FROM (${Prisma.join(sources, " UNION ALL ")}) s
+    JOIN "User" u ON u."id" = s."userId"
+    GROUP BY GROUPING SETS (${Prisma.join(groupingSets)})
+  `;
+
+  const items: IncentiveUserSummary[] = [];
+  const points: IncentiveSeriesPoint[] = [];
+  for (const row of rows) {
+    const amount = Number(row.amount ?? 0);
+    if (Number(row.byBucket) === 1) {
+      if (!row.bucket) continue;
+      points.push({ date: new Date(row.bucket).toISOString().slice(0, 10), amount });
+    } else if (row.userId != null) {
+      items.push({
+        userId: row.userId,
+        userName: row.userName || `User #${row.userId}`,
+        email: row.email ?? null,
+        role: row.role ?? null,
+        totalAmount: amount,
+        daysWithIncentives: Number(row.days ?? 0),
+      });
+    }
+  }
+
+  items.sort((a, b) => b.totalAmount - a.totalAmount);
+  points.sort((a, b) => a.date.localeCompare(b.date));
+  const totalAmount = items.reduce((sum, i) => sum + i.totalAmount, 0);
+
+  return { items, totalAmount, points };
+}
+
+/**
+ * Recompute the week and month rollups containing `day` for a venture from
+ * IncentiveDaily. Upsert-then-prune keeps concurrent refreshes of the same
+ * period from tripping over the unique key.
+ */
+export async function refreshIncentiveRollups(ventureId: number, day: Date): Promise<void> {
+  const periods = (["WEEK", "MONTH"] as const).map((period) => {
+    const start = periodStartOf(period, day);
+    return { period, start, end: periodEnd(period, start) };
+  });
+  const values = Prisma.join(
+    periods.map((p) => Prisma.sql`(${p.period}, ${p.start}::timestamp, ${p.end}::timestamp)`),
+  );
+
+  await prisma.$transaction([
+    prisma.$executeRaw`
+      INSERT INTO "IncentiveRollup" ("ventureId", "userId", "period", "periodStart", "amount", "daysWithIncentives", "updatedAt")
+      SELECT d."ventureId", d."userId", p."period", p."start",
+             SUM(d."amount"), COUNT(*) FILTER (WHERE d."amount" > 0), NOW()
+      FROM (VALUES ${values}) AS p("period", "start", "end")
+      JOIN "IncentiveDaily" d
+        ON d."ventureId" = ${ventureId} AND d."date" >= p."start" AND d."date" < p."end"
+      GROUP BY d."ventureId", d."userId", p."period", p."start"
+      ON CONFLICT ("ventureId", "userId", "period", "periodStart") DO UPDATE
+      SET "amount" = EXCLUDED."amount",
+          "daysWithIncentives" = EXCLUDED."daysWithIncentives",
+          "updatedAt" = EXCLUDED."updatedAt"
+    `,
+    prisma.$executeRaw`
+      DELETE FROM "IncentiveRollup" r
+      USING (VALUES ${values}) AS p("period", "start", "end")
+      WHERE r."ventureId" = ${ventureId}
+        AND r."period" = p."period" AND r."periodStart" = p."start"
+        AND NOT EXISTS (
+          SELECT 1 FROM "IncentiveDaily" d
+          WHERE d."ventureId" = r."ventureId" AND d."userId" = r."userId"
+            AND d."date" >= p."start" AND d."date" < p."end"
+        )
+    `,
+  ]);
+}
+
+/** Rebuild every rollup from IncentiveDaily, e.g. after bulk deletes. */
+export async function rebuildIncentiveRollups(): Promise<number> {
+  const [, inserted] = await prisma.$transaction([
+    prisma.$executeRaw`DELETE FROM "IncentiveRollup"`,
+    prisma.$executeRaw`
+      INSERT INTO "IncentiveRollup" ("ventureId", "userId", "period", "periodStart", "amount", "daysWithIncentives", "updatedAt")
+      SELECT d."ventureId", d."userId", p."period", DATE_TRUNC(LOWER(p."period"), d."date"),
+             SUM(d."amount"), COUNT(*) FILTER (WHERE d."amount" > 0), NOW()
+      FROM "IncentiveDaily" d
+      CROSS JOIN (VALUES ('WEEK'), ('MONTH')) AS p("period")
+      GROUP BY d."ventureId", d."userId", p."period", DATE_TRUNC(LOWER(p."period"), d."date")
+    `,
+  ]);
+  return inserted;
+}
@@ -0,0 +1,333 @@
+import prisma from "../prisma";
+import { getCached } from "@/lib/cache/simple";
+import {
+  BPO_METRICS,
+  HOTEL_METRICS,
+  LOAD_METRICS,
+  computeAmountForRule,
+  getDayBounds,
+  type EngineIncentiveDaily,
+  type EngineRule,
+  type IncentiveRuleLike,
+} from "./engine";
+
+// What-if simulation over a venture's per-user, per-day metric cube.
+//
+// computeIncentivesForDayWithRules reloads every metric for every day and
+// every rule set. For simulations the metrics do not change between rule
+// sets, so they are loaded once per (venture, range) with one grouped query
+// per source, kept in flat typed arrays, and any number of rule sets are
+// evaluated against them in memory. Results match the per-day engine.
+
+export type MetricFamily = "freight" | "bpo" | "hotel";
+
+export type CubeMetricRow = {
+  family: MetricFamily;
+  userId: number;
+  day: string; // YYYY-MM-DD
+  metrics: Record<string, number>;
+};
+
+export type CubeHotelDay = { day: string; adr: number; revpar: number };
+
+export type MetricCube = {
+  ventureId: number;
+  days: string[];
+  /** Venture members first, then users who only appear in metrics */
+  userIds: number[];
+  isVentureUser: Uint8Array;
+  /** One column per metric key, indexed [day * userIds.length + user]; NaN = no value */
+  columns: Map<string, Float64Array>;
+  /** Whether the user had any row from the family that day (same indexing) */
+  presence: Record<MetricFamily, Uint8Array>;
+  /** Venture-level hotel averages per day, 0 when there is no KPI row */
+  hotelAdr: Float64Array;
+  hotelRevpar: Float64Array;
+};
+
+const FAMILY_KEYS: Record<MetricFamily, Set<string>> = {
+  freight: LOAD_METRICS,
+  bpo: BPO_METRICS,
+  hotel: HOTEL_METRICS,
+};
+
+const CUBE_TTL_SECONDS = Math.max(
+  1,
+  Math.ceil(Number(process.env.INCENTIVE_CUBE_TTL_MS ?? 60 * 1000) / 1000)
+);
+
+function familyOf(metricKey: string): MetricFamily | null {
+  if (LOAD_METRICS.has(metricKey)) return "freight";
+  if (BPO_METRICS.has(metricKey)) return "bpo";
+  if (HOTEL_METRICS.has(metricKey)) return "hotel";
+  return null;
+}
+
+/** Inclusive list of UTC days between two YYYY-MM-DD dates. */
+export function dayRange(from: string, to: string): string[] {
+  const start = getDayBounds(from).start.getTime();
+  const end = getDayBounds(to).start.getTime();
+  const days: string[] = [];
+  for (let t = start; t <= end; t += 24 * 60 * 60 * 1000) {
+    days.push(new Date(t).toISOString().slice(0, 10));
+  }
+  return days;
+}
+
+/** Lay grouped metric rows out as a cube. Exposed for tests and benchmarks. */
+export function buildMetricCube(params: {
+  ventureId: number;
+  days: string[];
+  ventureUserIds: number[];
+  rows: CubeMetricRow[];
+  hotelDays?: CubeHotelDay[];
+}): MetricCube {
+  const { ventureId, days, ventureUserIds, rows, hotelDays = [] } = params;
+
+  const userIndex = new Map<number, number>();
+  for (const id of ventureUserIds) {
+    if (!userIndex.has(id)) userIndex.set(id, userIndex.size);
+  }
+  const ventureCount = userIndex.size;
+  for (const row of rows) {
+    if (!userIndex.has(row.userId)) userIndex.set(row.userId, userIndex.size);
+  }
+
+  const dayIndex = new Map(days.map((d, i) => [d, i]));
+  const userCount = userIndex.size;
+  const cells = days.length * userCount;
+
+  const isVentureUser = new Uint8Array(userCount);
+  isVentureUser.fill(1, 0, ventureCount);
+
+  const columns = new Map<string, Float64Array>();
+  const presence: Record<MetricFamily, Uint8Array> = {
+    freight: new Uint8Array(cells),
+    bpo: new Uint8Array(cells),
+    hotel: new Uint8Array(cells),
+  };
+
+  for (const row of rows) {
+    const d = dayIndex.get(row.day);
+    if (d === undefined) continue;
+    const cell = d * userCount + userIndex.get(row.userId)!;
+    presence[row.family][cell] = 1;
+
+    for (const [key, value] of Object.entries(row.metrics)) {
+      let column = columns.get(key);
+      if (!column) {
+        column = new Float64Array(cells).fill(NaN);
+        columns.set(key, column);
+      }
+      column[cell] = value;
+    }
+  }
+
+  const hotelAdr = new Float64Array(days.length);
+  const hotelRevpar = new Float64Array(days.length);
+  for (const h of hotelDays) {
+    const d = dayIndex.get(h.day);
+    if (d === undefined) continue;
+    hotelAdr[d] = h.adr;
+    hotelRevpar[d] = h.revpar;
+  }
+
+  return {
+    ventureId,
+    days,
+    userIds: Array.from(userIndex.keys()),
+    isVentureUser,
+    columns,
+    presence,
+    hotelAdr,
+    hotelRevpar,
+  };
+}
+
+async function queryMetricCube(ventureId: number, days: string[]): Promise<MetricCube> {
+  const start = getDayBounds(days[0]).start;
+  const end = getDayBounds(days[days.length - 1]).end;
+
+  const [users, freight, bpo, reviews, hotelDays] = await Promise.all([
+    prisma.user.findMany({
+      where: { ventures: { some: { ventureId } } },
+      select: { id: true },
+    }),
+    prisma.$queryRaw<
+      { userId: number; day: string; loads: number; revenue: number; miles: number; margin: number }[]
+    >`
+      SELECT l."createdById" AS "userId",
+             to_char(l."billingDate", 'YYYY-MM-DD') AS "day",
+             COUNT(*)::float8 AS "loads",
+             COALESCE(SUM(l."billAmount"), 0)::float8 AS "revenue",
+             COALESCE(SUM(l."miles"), 0)::float8 AS "miles",
+             COALESCE(SUM(l."marginAmount"), 0)::float8 AS "margin"
+      FROM "Load" l
+      WHERE l."ventureId" = ${ventureId}
+        AND l."loadStatus" = 'DELIVERED'
+        AND l."billingDate" >= ${start}
+        AND l."billingDate" <= ${end}
+        AND l."createdById" IS NOT NULL
+      GROUP BY 1, 2
+    `,
+    prisma.$queryRaw<
+      { userId: number; day: string; dials: number; connects: number; deals: number; talkSeconds: number }[]
+    >`
+      SELECT a."userId",
+             to_char(c."callStartedAt", 'YYYY-MM-DD') AS "day",
+             SUM(COALESCE(c."dialCount", 1))::float8 AS "dials",
+             (COUNT(*) FILTER (WHERE c."isConnected"))::float8 AS "connects",
+             (COUNT(*) FILTER (WHERE c."dealWon"))::float8 AS "deals",
+             SUM(GREATEST(0, ROUND(EXTRACT(EPOCH FROM (COALESCE(c."callEndedAt", c."callStartedAt") - c."callStartedAt")))))::float8 AS "talkSeconds"
+      FROM "BpoCallLog" c
+      JOIN "BpoAgent" a ON a."id" = c."agentId"
+      WHERE c."ventureId" = ${ventureId}
+        AND c."callStartedAt" >= ${start}
+        AND c."callStartedAt" <= ${end}
+      GROUP BY 1, 2
+    `,
+    prisma.$queryRaw<{ userId: number; day: string; responded: number }[]>`
+      SELECT r."respondedById" AS "userId",
+             to_char(r."reviewDate", 'YYYY-MM-DD') AS "day",
+             COUNT(*)::float8 AS "responded"
+      FROM "HotelReview" r
+      JOIN "HotelProperty" h ON h."id" = r."hotelId"
+      WHERE h."ventureId" = ${ventureId}
+        AND r."respondedById" IS NOT NULL
+        AND r."reviewDate" >= ${start}
+        AND r."reviewDate" <= ${end}
+      GROUP BY 1, 2
+    `,
+    prisma.$queryRaw<CubeHotelDay[]>`
+      SELECT to_char(k."date", 'YYYY-MM-DD') AS "day",
+             AVG(k."adr")::float8 AS "adr",
+             AVG(k."revpar")::float8 AS "revpar"
+      FROM "HotelKpiDaily" k
+      WHERE k."ventureId" = ${ventureId}
+        AND k."date" >= ${start}
+        AND k."date" <= ${end}
+      GROUP BY 1
+    `,
+  ]);
+
+  const rows: CubeMetricRow[] = [];
+  for (const r of freight) {
+    rows.push({
+      family: "freight",
+      userId: r.userId,
+      day: r.day,
+      metrics: {
+        loads_completed: r.loads,
+        loads_revenue: r.revenue,
+        loads_miles: r.miles,
+        loads_margin: r.margin,
+      },
+    });
+  }
+  for (const r of bpo) {
+    // Like the engine, connects and deals only exist once there is one
+    const metrics: Record<string, number> = { bpo_dials: r.dials, bpo_talk_seconds: r.talkSeconds };
+    if (r.connects > 0) metrics.bpo_connects = r.connects;
+    if (r.deals > 0) metrics.bpo_deals = r.deals;
+    rows.push({ family: "bpo", userId: r.userId, day: r.day, metrics });
+  }
+  for (const r of reviews) {
+    rows.push({
+      family: "hotel",
+      userId: r.userId,
+      day: r.day,
+      metrics: { hotel_reviews_responded: r.responded },
+    });
+  }
+
+  return buildMetricCube({
+    ventureId,
+    days,
+    ventureUserIds: users.map((u) => u.id),
+    rows,
+    hotelDays,
+  });
+}
+
+/**
+ * The metric cube for a venture and inclusive day range, shared by every
+ * simulation of that range for INCENTIVE_CUBE_TTL_MS.
+ */
+export async function loadMetricCube(ventureId: number, from: string, to: string): Promise<MetricCube> {
+  const days = dayRange(from, to);
+  if (!days.length) {
+    return buildMetricCube({ ventureId, days, ventureUserIds: [], rows: [] });
+  }
+  return getCached(`incentive-cube:${ventureId}:${days[0]}:${days[days.length - 1]}`, CUBE_TTL_SECONDS, () =>
+    queryMetricCube(ventureId, days)
+  );
+}
+
+/**
+ * Evaluate one rule set against a cube. Produces the same items as calling
+ * computeIncentivesForDayWithRules for each day of the cube.
+ */
+export function simulateRules(
+  cube: MetricCube,
+  rules: EngineRule[],
+  opts: { planId?: number; restrictToUserIds?: number[] } = {}
+): EngineIncentiveDaily[] {
+  const { planId = cube.ventureId, restrictToUserIds } = opts;
+  if (!rules.length) return [];
+
+  // The engine only loads families that a rule's own metricKey needs; values
+  // from other families are invisible even to bonus thresholds.
+  const ruleKeys = new Set(rules.map((r) => r.metricKey));
+  const families = (Object.keys(FAMILY_KEYS) as MetricFamily[]).filter((f) =>
+    [...ruleKeys].some((k) => FAMILY_KEYS[f].has(k))
+  );
+
+  const readKeys = new Set(ruleKeys);
+  for (const rule of rules) {
+    const thresholdKey = (rule.config as any)?.metricKey;
+    if (typeof thresholdKey === "string") readKeys.add(thresholdKey);
+  }
+  const columns: [string, Float64Array][] = [];
+  for (const key of readKeys) {
+    const family = familyOf(key);
+    const column = cube.columns.get(key);
+    if (family && families.includes(family) && column) columns.push([key, column]);
+  }
+
+  const wantsAdr = ruleKeys.has("hotel_adr");
+  const wantsRevpar = ruleKeys.has("hotel_revpar");
+  const restrict = restrictToUserIds ? new Set(restrictToUserIds) : null;
+  const presence = families.map((f) => cube.presence[f]);
+  const userCount = cube.userIds.length;
+  const results: EngineIncentiveDaily[] = [];
+
+  for (let d = 0; d < cube.days.length; d++) {
+    const day = cube.days[d];
+    const adr = cube.hotelAdr[d];
+    const revpar = cube.hotelRevpar[d];
+
+    for (let u = 0; u < userCount; u++) {
+      const cell = d * userCount + u;
+      if (!cube.isVentureUser[u] && !presence.some((p) => p[cell])) continue;
+      const userId = cube.userIds[u];
+      if (restrict && !restrict.has(userId)) continue;
+
+      const bucket: Record<string, number> = {};
+      for (const [key, column] of columns) {
+        const value = column[cell];
+        if (!Number.isNaN(value)) bucket[key] = value;
+      }
+      if (wantsAdr && adr) bucket.hotel_adr = adr;
+      if (wantsRevpar && revpar) bucket.hotel_revpar = revpar;
+
+      for (const rule of rules) {
+        const metricValue = bucket[rule.metricKey] ?? 0;
+        const amount = computeAmountForRule(rule as IncentiveRuleLike, metricValue, bucket);
+        if (!amount) continue;
+        results.push({ userId, ruleId: rule.id, amount, date: day, planId });
+      }
+    }
+  }
+
+  return results;
+}
@@ -1,6 +1,8 @@
 import { logger } from '@/lib/logger';
 import { withRetry } from '@/lib/resilience/withRetry';
 import { getCircuitBreaker } from '@/lib/resilience/circuitBreaker';
+import { getTokenBucket } from '@/lib/resilience/tokenBucket';
+import { runWithConcurrency } from '@/lib/utils/workerPool';
 
 /**
  * Mock FMCSA client for fetching carrier status.
@@ -16,6 +18,53 @@ export type FMCSACarrierData = {
   lastUpdated: Date;
 };
 
+export type FetchCarrierOptions = {
+  bypassCache?: boolean; // Skip the TTL cache (explicit user refresh)
+};
+
+export type FetchCarriersBulkOptions = FetchCarrierOptions & {
+  concurrency?: number; // Max requests in flight (default: FMCSA_SYNC_CONCURRENCY or 8)
+};
+
+// Upstream base URL; point at a local stand-in for benchmarks (see perf/fmcsa-standin.js)
+const FMCSA_API_BASE_URL = process.env.FMCSA_API_BASE_URL || 'https://mobile.fmcsa.dot.gov/qc/services';
+
+// Quota shared by every caller in this process
+const FMCSA_RATE_LIMIT_PER_SEC = Number(process.env.FMCSA_RATE_LIMIT_PER_SEC) || 10;
+const FMCSA_RATE_BURST = Number(process.env.FMCSA_RATE_BURST) || 1; // Evenly spaced by default
+const FMCSA_SYNC_CONCURRENCY = Number(process.env.FMCSA_SYNC_CONCURRENCY) || 8;
+const FMCSA_CACHE_TTL_MS = (Number(process.env.FMCSA_CACHE_TTL_SECONDS) || 6 * 3600) * 1000;
+const FMCSA_CACHE_MAX_ENTRIES = 50000;
+
+// Upstream answers only (never mock fallbacks), keyed by carrier number
+const responseCache = new Map<string, { data: FMCSACarrierData; expiresAt: number }>();
+
+function getCachedCarrier(key: string): FMCSACarrierData | null {
+  const entry = responseCache.get(key);
+  if (!entry) return null;
+  if (Date.now() > entry.expiresAt) {
+    responseCache.delete(key);
+    return null;
+  }
+  return entry.data;
+}
+
+function setCachedCarrier(key: string, data: FMCSACarrierData): void {
+  if (responseCache.size >= FMCSA_CACHE_MAX_ENTRIES) {
+    // Map iterates in insertion order - evict the oldest entry
+    const oldest = responseCache.keys().next().value;
+    if (oldest !== undefined) responseCache.delete(oldest);
+  }
+  responseCache.set(key, { data, expiresAt: Date.now() + FMCSA_CACHE_TTL_MS });
+}
+
+/**
+ * Clear the FMCSA response cache (tests / admin)
+ */
+export function clearFmcsaCache(): void {
+  responseCache.clear();
+}
+
 /**
  * Fetch carrier data from FMCSA.
  * In production, make HTTP request to FMCSA API.
@@ -23,11 +72,23 @@ export type FMCSACarrierData = {
  * 
  * Includes retry logic and circuit breaker protection.
  */
-export async function fetchCarrierFromFMCSA(mcNumber: string): Promise<FMCSACarrierData | null> {
+export async function fetchCarrierFromFMCSA(
+  mcNumber: string,
+  options: FetchCarrierOptions = {}
+): Promise<FMCSACarrierData | null> {
   const circuitBreaker = getCircuitBreaker('fmcsa', {
     failureThreshold: 5,
     resetTimeout: 60000, // 1 minute
   });
+  const rateLimiter = getTokenBucket('fmcsa', {
+    ratePerSecond: FMCSA_RATE_LIMIT_PER_SEC,
+    capacity: FMCSA_RATE_BURST,
+  });
+
+  if (!options.bypassCache) {
+    const cached = getCachedCarrier(mcNumber);
+    if (cached) return cached;
+  }
 
   try {
     return await circuitBreaker.execute(async () => {
@@ -52,8 +113,11 @@ export async function fetchCarrierFromFMCSA(mcNumber: string): Promise<FMCSACarr
           }
 
           try {
+            // Stay under the upstream quota (retries also consume tokens)
+            await rateLimiter.take();
+
             // Call real FMCSA API
-            const apiUrl = `https://mobile.fmcsa.dot.gov/qc/services/carriers/${mcNumber}?webKey=${fmcsaApiKey}`;
+            const apiUrl = `${FMCSA_API_BASE_URL}/carriers/${encodeURIComponent(mcNumber)}?webKey=${fmcsaApiKey}`;
             const response = await fetch(apiUrl, {
               method: 'GET',
               headers: {
@@ -64,15 +128,20 @@ export async function fetchCarrierFromFMCSA(mcNumber: string): Promise<FMCSACarr
             if (!response.ok) {
               if (response.status === 404) {
                 // Carrier not found in FMCSA database
-                return {
+                const notFound: FMCSACarrierData = {
                   mcNumber,
                   status: 'NOT_FOUND',
                   authorized: false,
                   safetyRating: undefined,
                   lastUpdated: new Date(),
                 };
+                setCachedCarrier(mcNumber, notFound);
+                return notFound;
               }
-              throw new Error(`FMCSA API error: ${response.status} ${response.statusText}`);
+              throw Object.assign(
+                new Error(`FMCSA API error: ${response.status} ${response.statusText}`),
+                { status: response.status }
+              );
             }
 
             const data = await response.json();
@@ -85,6 +154,7 @@ export async function fetchCarrierFromFMCSA(mcNumber: string): Promise<FMCSACarr
               safetyRating: data.carrier?.safety?.safetyRating?.safetyRatingDesc || undefined,
               lastUpdated: new Date(),
             };
+            setCachedCarrier(mcNumber, carrierData);
 
             logger.info('fmcsa_fetch', {
               meta: {
@@ -97,6 +167,12 @@ export async function fetchCarrierFromFMCSA(mcNumber: string): Promise<FMCSACarr
 
             return carrierData;
           } catch (fetchErr: any) {
+            // Throttling and upstream 5xx go to withRetry/circuit breaker instead of
+            // being masked by mock data
+            if (fetchErr.status === 429 || fetchErr.status >= 500) {
+              throw fetchErr;
+            }
+
             // If API call fails, log and fall back to mock
             logger.warn('fmcsa_fetch_api_error', {
               meta: {
@@ -145,3 +221,30 @@ export async function fetchCarrierFromFMCSA(mcNumber: string): Promise<FMCSACarr
     return null;
   }
 }
+
+/**
+ * Fetch many carriers concurrently.
+ *
+ * Requests go through the same circuit breaker, retry policy, rate limiter and
+ * cache as fetchCarrierFromFMCSA; the worker pool only keeps enough requests in
+ * flight to use the quota instead of waiting on one round trip at a time.
+ *
+ * @returns Map of carrier number to data (null when the fetch failed)
+ */
+export async function fetchCarriersFromFMCSA(
+  mcNumbers: string[],
+  options: FetchCarriersBulkOptions = {}
+): Promise<Map<string, FMCSACarrierData | null>> {
+  const { concurrency = FMCSA_SYNC_CONCURRENCY, ...fetchOptions } = options;
+  const unique = Array.from(new Set(mcNumbers.filter(Boolean)));
+
+  const results = await runWithConcurrency(unique, concurrency, mc =>
+    fetchCarrierFromFMCSA(mc, fetchOptions)
+  );
+
+  const byNumber = new Map<string, FMCSACarrierData | null>();
+  results.forEach((res, i) => {
+    byNumber.set(unique[i], res.ok ? res.value : null);
+  });
+  return byNumber;
+}
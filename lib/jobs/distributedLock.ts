@@ -1,14 +1,28 @@
 /**
  * Distributed Lock Utility
- * 
- * Uses database-level locking to prevent concurrent job execution.
- * Uses PostgreSQL advisory locks (or table-based locks for other DBs).
+ *
+ * Lease-based locks stored in the "JobLock" table.
+ *
+ * Each acquisition is a single INSERT ... ON CONFLICT statement, so a lock never
+ * pins a pooled connection for the length of the job (session-level advisory locks
+ * did, and with a 5-connection pool that starved request handlers during long jobs).
+ * Holders keep the lease alive with heartbeats; a crashed holder's lease simply
+ * expires. Every acquisition is stamped with a monotonically increasing fencing
+ * token so writers can reject work from a holder whose lease has been taken over.
  */
 
 import { prisma } from '@/lib/prisma';
+import crypto from 'crypto';
+
+const DEFAULT_LEASE_MS = 60000; // 1 minute
+const MIN_LEASE_MS = 5000;
+
+// Identifies this process as lock owner across renewals/release
+const PROCESS_OWNER_ID = `${process.pid}:${crypto.randomUUID()}`;
 
 export interface LockOptions {
-  timeout?: number; // Lock timeout in milliseconds (default: 1 hour)
+  timeout?: number; // Upper bound for the lease in milliseconds (default: 1 hour)
+  leaseMs?: number; // Lease duration renewed by heartbeats (default: 60000)
   retryInterval?: number; // Retry interval in milliseconds (default: 1000)
   maxRetries?: number; // Maximum retry attempts (default: 0, no retry)
 }
@@ -16,15 +30,80 @@ export interface LockOptions {
 export interface LockResult {
   acquired: boolean;
   lockId?: string;
+  fencingToken?: number;
+  leaseMs?: number;
+  waitMs?: number; // Time spent acquiring (including retries)
   error?: string;
 }
 
+export interface LeaseRenewalHandle {
+  /** Number of successful lease renewals so far */
+  readonly renewals: number;
+  /** True once a renewal found the lease taken over or deleted */
+  readonly lost: boolean;
+  /** Stop heartbeating (does not release the lock) */
+  stop(): void;
+}
+
+/**
+ * Try to acquire a lease exactly once, without waiting.
+ *
+ * Succeeds when the key is free or the previous lease has expired.
+ *
+ * @param lockKey - Unique identifier for the lock (e.g., "job:CHURN_RECALC:2025-12-15")
+ * @param leaseMs - Lease duration in milliseconds
+ */
+export async function tryAcquireLock(
+  lockKey: string,
+  leaseMs: number = DEFAULT_LEASE_MS
+): Promise<LockResult> {
+  const lease = Math.max(MIN_LEASE_MS, Math.floor(leaseMs));
+
+  try {
+    const rows = await prisma.$queryRaw<Array<{ fencing_token: bigint | number }>>`
+      INSERT INTO "JobLock" (lock_key, owner_id, fencing_token, acquired_at, renewed_at, expires_at)
+      VALUES (
+        ${lockKey},
+        ${PROCESS_OWNER_ID},
+        nextval('"JobLock_fencing_token_seq"'),
+        NOW(),
+        NOW(),
+        NOW() + (${lease}::int * INTERVAL '1 millisecond')
+      )
+      ON CONFLICT (lock_key) DO UPDATE SET
+        owner_id = EXCLUDED.owner_id,
+        fencing_token = EXCLUDED.fencing_token,
+        acquired_at = EXCLUDED.acquired_at,
+        renewed_at = EXCLUDED.renewed_at,
+        expires_at = EXCLUDED.expires_at
+      WHERE "JobLock".expires_at < NOW()
+      RETURNING fencing_token
+    `;
+
+    if (rows && rows.length > 0) {
+      const fencingToken = Number(rows[0].fencing_token);
+      return {
+        acquired: true,
+        lockId: `lease_${fencingToken}`,
+        fencingToken,
+        leaseMs: lease,
+      };
+    }
+
+    return { acquired: false, error: 'Lock already held by another process' };
+  } catch (err: any) {
+    return { acquired: false, error: err.message || 'Failed to acquire lock' };
+  }
+}
+
 /**
- * Acquire a distributed lock using database advisory locks
- * 
+ * Acquire a distributed lock
+ *
+ * With the default maxRetries of 0 this is wait-free: one statement, then return.
+ *
  * @param lockKey - Unique identifier for the lock (e.g., "job:CHURN_RECALC:2025-12-15")
- * @param options - Lock options (timeout, retry, etc.)
- * @returns Lock result with acquired status and lockId
+ * @param options - Lock options (lease, retry, etc.)
+ * @returns Lock result with acquired status, lockId and fencing token
  */
 export async function acquireLock(
   lockKey: string,
@@ -32,165 +111,168 @@ export async function acquireLock(
 ): Promise<LockResult> {
   const {
     timeout = 3600000, // 1 hour default
+    leaseMs = DEFAULT_LEASE_MS,
     retryInterval = 1000,
     maxRetries = 0,
   } = options;
 
-  // Generate lock ID from key (hash for consistency)
-  const lockId = `lock_${hashString(lockKey)}`;
+  const startedAt = Date.now();
+  const lease = Math.min(leaseMs, timeout);
 
   let attempts = 0;
-  while (attempts <= maxRetries) {
-    try {
-      // Use PostgreSQL advisory lock (pg_advisory_lock)
-      // For other databases, we'd use a table-based lock
-      const result = await prisma.$queryRaw<Array<{ lock_acquired: boolean }>>`
-        SELECT pg_try_advisory_lock(hashtext(${lockId})) as lock_acquired
-      `;
-
-      if (result && result[0]?.lock_acquired) {
-        // Lock acquired successfully
-        // PostgreSQL advisory locks are sufficient - no need for tracking table
-
-        return { acquired: true, lockId };
-      }
+  let lastResult: LockResult = { acquired: false, error: 'Max retries exceeded' };
 
-      // Lock not acquired, check if we should retry
-      if (attempts < maxRetries) {
-        await new Promise(resolve => setTimeout(resolve, retryInterval));
-        attempts++;
-        continue;
-      }
+  while (attempts <= maxRetries) {
+    lastResult = await tryAcquireLock(lockKey, lease);
 
-      return { acquired: false, error: 'Lock already held by another process' };
-    } catch (err: any) {
-      // If advisory locks not available (non-PostgreSQL), fall back to table-based lock
-      if (err.message?.includes('pg_try_advisory_lock') || err.message?.includes('advisory')) {
-        return await acquireTableBasedLock(lockKey, timeout);
-      }
+    if (lastResult.acquired) {
+      return { ...lastResult, waitMs: Date.now() - startedAt };
+    }
 
-      return { acquired: false, error: err.message || 'Failed to acquire lock' };
+    if (attempts < maxRetries) {
+      await new Promise(resolve => setTimeout(resolve, retryInterval));
     }
+    attempts++;
   }
 
-  return { acquired: false, error: 'Max retries exceeded' };
+  return { ...lastResult, waitMs: Date.now() - startedAt };
 }
 
 /**
- * Release a distributed lock
- * 
- * @param lockKey - Unique identifier for the lock
- * @param lockId - Lock ID returned from acquireLock
+ * Extend a held lease.
+ *
+ * @returns true if the lease is still ours and was extended
  */
-export async function releaseLock(lockKey: string, lockId?: string): Promise<void> {
-  try {
-    if (lockId) {
-      // Release PostgreSQL advisory lock
-      await prisma.$executeRaw`
-        SELECT pg_advisory_unlock(hashtext(${lockId}))
-      `.catch(() => {
-        // Ignore if advisory locks not available
-      });
-    }
+export async function renewLock(
+  lockKey: string,
+  fencingToken: number,
+  leaseMs: number = DEFAULT_LEASE_MS
+): Promise<boolean> {
+  const lease = Math.max(MIN_LEASE_MS, Math.floor(leaseMs));
 
-    // Note: JobLock table doesn't exist yet - advisory locks are sufficient
-  } catch (err) {
-    console.error('[distributedLock] Error releasing lock:', err);
-    // Don't throw - lock release is best effort
-  }
+  const updated = await prisma.$executeRaw`
+    UPDATE "JobLock"
+    SET renewed_at = NOW(),
+        expires_at = NOW() + (${lease}::int * INTERVAL '1 millisecond')
+    WHERE lock_key = ${lockKey}
+      AND owner_id = ${PROCESS_OWNER_ID}
+      AND fencing_token = ${fencingToken}
+  `;
+
+  return updated > 0;
 }
 
 /**
- * Fallback: Table-based lock using SELECT FOR UPDATE
- * Works on any database but requires a JobLock table
+ * Start heartbeating a held lease (renews every leaseMs / 3).
+ *
+ * Renewal failures are logged and retried on the next tick; a renewal that
+ * finds the lease gone marks the handle as lost and stops.
  */
-async function acquireTableBasedLock(
+export function startLeaseRenewal(
   lockKey: string,
-  timeout: number
-): Promise<LockResult> {
-  try {
-    // Try to acquire lock using transaction with SELECT FOR UPDATE
-    const result = await prisma.$transaction(async (tx) => {
-      // Check if lock exists and is expired
-      const existing = await tx.$queryRaw<Array<{ lock_key: string; expires_at: Date }>>`
-        SELECT lock_key, expires_at
-        FROM "JobLock"
-        WHERE lock_key = ${lockKey}
-        FOR UPDATE NOWAIT
-      `.catch((): Array<{ lock_key: string; expires_at: Date }> => []);
-
-      if (existing && existing.length > 0) {
-        const lock = existing[0];
-        const now = new Date();
-        if (lock.expires_at > now) {
-          // Lock still valid
-          return false;
-        }
-        // Lock expired, delete it
-        await tx.$executeRaw`DELETE FROM "JobLock" WHERE lock_key = ${lockKey}`;
-      }
-
-      // Acquire new lock
-      const expiresAt = new Date(Date.now() + timeout);
-      await tx.$executeRaw`
-        INSERT INTO "JobLock" (lock_key, acquired_at, expires_at)
-        VALUES (${lockKey}, NOW(), ${expiresAt})
-      `;
+  lock: LockResult
+): LeaseRenewalHandle {
+  const leaseMs = lock.leaseMs ?? DEFAULT_LEASE_MS;
+  const fencingToken = lock.fencingToken;
 
-      return true;
-    }, {
-      timeout: 5000, // 5 second timeout for transaction
-    });
+  let renewals = 0;
+  let lost = false;
+  let inFlight = false;
+  let timer: NodeJS.Timeout | null = null;
 
-    if (result) {
-      return { acquired: true, lockId: `table_${hashString(lockKey)}` };
+  const stop = () => {
+    if (timer) {
+      clearInterval(timer);
+      timer = null;
     }
+  };
 
-    return { acquired: false, error: 'Lock already held' };
-  } catch (err: any) {
-    // If table doesn't exist, create a simple in-memory lock (not distributed)
-    console.warn('[distributedLock] JobLock table not found, using in-memory lock (not distributed)');
-    return { acquired: true, lockId: `memory_${hashString(lockKey)}` };
+  if (fencingToken !== undefined) {
+    timer = setInterval(async () => {
+      if (inFlight) return;
+      inFlight = true;
+      try {
+        const ok = await renewLock(lockKey, fencingToken, leaseMs);
+        if (ok) {
+          renewals++;
+        } else {
+          lost = true;
+          stop();
+          console.error(`[distributedLock] Lease lost for ${lockKey} (token ${fencingToken})`);
+        }
+      } catch (err) {
+        console.warn('[distributedLock] Lease renewal failed, will retry:', err);
+      } finally {
+        inFlight = false;
+      }
+    }, Math.max(1000, Math.floor(leaseMs / 3)));
+
+    // Heartbeats alone should never keep the process alive
+    timer.unref?.();
   }
+
+  return {
+    get renewals() {
+      return renewals;
+    },
+    get lost() {
+      return lost;
+    },
+    stop,
+  };
 }
 
 /**
- * Hash a string to a consistent numeric value
+ * Release a distributed lock
+ *
+ * Only deletes the row if it still carries our fencing token, so a holder whose
+ * lease expired cannot release a lock that has since been re-acquired.
+ *
+ * @param lockKey - Unique identifier for the lock
+ * @param lockId - Lock ID returned from acquireLock
+ * @param fencingToken - Fencing token returned from acquireLock
  */
-function hashString(str: string): string {
-  let hash = 0;
-  for (let i = 0; i < str.length; i++) {
-    const char = str.charCodeAt(i);
-    hash = ((hash << 5) - hash) + char;
-    hash = hash & hash; // Convert to 32-bit integer
+export async function releaseLock(
+  lockKey: string,
+  lockId?: string,
+  fencingToken?: number
+): Promise<void> {
+  try {
+    const token = fencingToken ?? parseFencingToken(lockId);
+    if (token === undefined) return;
+
+    await prisma.$executeRaw`
+      DELETE FROM "JobLock"
+      WHERE lock_key = ${lockKey}
+        AND owner_id = ${PROCESS_OWNER_ID}
+        AND fencing_token = ${token}
+    `;
+  } catch (err) {
+    console.error('[distributedLock] Error releasing lock:', err);
+    // Don't throw - lock release is best effort (the lease will expire)
   }
-  return Math.abs(hash).toString();
+}
+
+function parseFencingToken(lockId?: string): number | undefined {
+  if (!lockId?.startsWith('lease_')) return undefined;
+  const token = Number(lockId.slice('lease_'.length));
+  return Number.isFinite(token) ? token : undefined;
 }
 
 /**
- * Check if a lock is currently held
- * 
- * Note: This is a best-effort check using JobRunLog.
- * For accurate lock status, use PostgreSQL advisory lock functions directly.
+ * Check if a lock is currently held (an unexpired lease exists)
  */
 export async function isLockHeld(lockKey: string): Promise<boolean> {
   try {
-    // Check for active job run log (RUNNING status within last hour)
-    const activeRun = await prisma.jobRunLog.findFirst({
-      where: {
-        status: 'RUNNING',
-        startedAt: {
-          gte: new Date(Date.now() - 3600000), // Within last hour
-        },
-        statsJson: {
-          contains: lockKey,
-        },
-      },
-    });
-
-    return !!activeRun;
+    const rows = await prisma.$queryRaw<Array<{ held: boolean }>>`
+      SELECT EXISTS (
+        SELECT 1 FROM "JobLock"
+        WHERE lock_key = ${lockKey} AND expires_at > NOW()
+      ) AS held
+    `;
+
+    return !!rows?.[0]?.held;
   } catch {
     return false;
   }
 }
-
@@ -1,15 +1,66 @@
 import prisma from '@/lib/prisma';
 import { logger } from '@/lib/logger';
 import { fetchCarrierFromFMCSA } from '@/lib/integrations/fmcsaClient';
+import { chunk, runWithConcurrency } from '@/lib/utils/workerPool';
+import { Prisma } from '@prisma/client';
 import crypto from 'crypto';
 
+const FETCH_CONCURRENCY = Number(process.env.FMCSA_SYNC_CONCURRENCY) || 8;
+const WRITE_BATCH_SIZE = 100;
+
+type CarrierWrite = {
+  carrierId: number;
+  /** True when the write stores fresh FMCSA data rather than a sync error */
+  synced: boolean;
+  data: Prisma.CarrierUpdateInput;
+};
+
+function updateCarrier(write: CarrierWrite) {
+  return prisma.carrier.update({ where: { id: write.carrierId }, data: write.data });
+}
+
+/**
+ * Write a chunk in one transaction. If it fails, retry the rows one at a time
+ * so a bad row only loses its own write.
+ *
+ * @returns the writes that committed
+ */
+async function writeBatch(batch: CarrierWrite[], requestId: string): Promise<CarrierWrite[]> {
+  try {
+    await prisma.$transaction(batch.map(updateCarrier));
+    return batch;
+  } catch (err: any) {
+    logger.error('fmcsa_autosync_write_error', {
+      meta: { requestId, batchSize: batch.length, error: err.message },
+    });
+    if (batch.length === 1) return [];
+  }
+
+  const committed: CarrierWrite[] = [];
+  for (const write of batch) {
+    try {
+      await updateCarrier(write);
+      committed.push(write);
+    } catch (err: any) {
+      logger.error('fmcsa_autosync_write_error', {
+        meta: { requestId, carrierId: write.carrierId, error: err.message },
+      });
+    }
+  }
+  return committed;
+}
+
 /**
  * Autosync job for FMCSA carrier data.
  * Fetches updates for all carriers in the DB and updates their FMCSA status fields.
  * Can be triggered periodically (e.g., daily cron) or on-demand.
+ *
+ * Fetches run through a bounded worker pool (the client enforces the upstream
+ * rate limit), and carrier updates are written back in batched transactions.
  */
 export async function runFMCSAAutosyncJob() {
   const requestId = crypto.randomUUID();
+  const startedAt = Date.now();
   logger.info('fmcsa_autosync_start', { meta: { requestId, timestamp: new Date().toISOString() } });
 
   try {
@@ -19,53 +70,70 @@ export async function runFMCSAAutosyncJob() {
       select: { id: true, mcNumber: true, name: true },
     });
 
-    let successCount = 0;
-    let failureCount = 0;
-
-    for (const carrier of carriers) {
-      if (!carrier.mcNumber) continue;
+    const syncable = carriers.filter(c => c.mcNumber);
+    const results = await runWithConcurrency(syncable, FETCH_CONCURRENCY, carrier =>
+      fetchCarrierFromFMCSA(carrier.mcNumber!)
+    );
 
-      try {
-        const fmcsaData = await fetchCarrierFromFMCSA(carrier.mcNumber);
+    const writes: CarrierWrite[] = results.map((res, i) => {
+      const carrier = syncable[i];
 
-        if (fmcsaData) {
-          await prisma.carrier.update({
-            where: { id: carrier.id },
-            data: {
-              fmcsaStatus: fmcsaData.status,
-              fmcsaAuthorized: fmcsaData.authorized,
-              fmcsaLastSyncAt: new Date(),
-              fmcsaSyncError: null, // Clear previous errors
-              safetyRating: fmcsaData.safetyRating || undefined,
-            },
-          });
-          successCount++;
-        } else {
-          // If fetch failed, mark it and set error
-          await prisma.carrier.update({
-            where: { id: carrier.id },
-            data: {
-              fmcsaSyncError: 'Failed to fetch from FMCSA API',
-            },
-          });
-          failureCount++;
-        }
-      } catch (err: any) {
+      if (!res.ok) {
         logger.error('fmcsa_autosync_carrier_error', {
-          meta: { requestId, carrierId: carrier.id, mcNumber: carrier.mcNumber, error: err.message },
+          meta: { requestId, carrierId: carrier.id, mcNumber: carrier.mcNumber, error: res.error?.message },
         });
-        failureCount++;
-
         // Update carrier with error message
-        await prisma.carrier.update({
-          where: { id: carrier.id },
-          data: { fmcsaSyncError: err.message || 'Unknown error' },
-        });
+        return {
+          carrierId: carrier.id,
+          synced: false,
+          data: { fmcsaSyncError: res.error?.message || 'Unknown error' },
+        };
       }
+
+      const fmcsaData = res.value;
+      if (fmcsaData) {
+        return {
+          carrierId: carrier.id,
+          synced: true,
+          data: {
+            fmcsaStatus: fmcsaData.status,
+            fmcsaAuthorized: fmcsaData.authorized,
+            fmcsaLastSyncAt: new Date(),
+            fmcsaSyncError: null, // Clear previous errors
+            safetyRating: fmcsaData.safetyRating || undefined,
+          },
+        };
+      }
+
+      // If fetch failed, mark it and set error
+      return {
+        carrierId: carrier.id,
+        synced: false,
+        data: {
+          fmcsaSyncError: 'Failed to fetch from FMCSA API',
+        },
+      };
+    });
+
+    // Write back in batches: one transaction per chunk instead of one round trip per carrier
+    let successCount = 0;
+    for (const batch of chunk(writes, WRITE_BATCH_SIZE)) {
+      const committed = await writeBatch(batch, requestId);
+      successCount += committed.filter(w => w.synced).length;
     }
+    // Fetch failures and carriers whose write did not commit
+    const failureCount = syncable.length - successCount;
 
+    const durationMs = Date.now() - startedAt;
     logger.info('fmcsa_autosync_complete', {
-      meta: { requestId, successCount, failureCount, totalProcessed: carriers.length },
+      meta: {
+        requestId,
+        successCount,
+        failureCount,
+        totalProcessed: carriers.length,
+        durationMs,
+        carriersPerSecond: Math.round((carriers.length / Math.max(1, durationMs)) * 1000),
+      },
     });
   } catch (err: any) {
     logger.error('fmcsa_autosync_job_error', { meta: { requestId, error: err.message } });
@@ -5,6 +5,7 @@ import {
   getDayBounds,
   type EngineIncentiveDaily 
 } from "@/lib/incentives/engine";
+import { refreshIncentiveRollups } from "@/lib/incentives/rollups";
 
 export interface IncentiveDailyJobOptions {
   ventureId?: number;
@@ -57,6 +58,7 @@ async function commitVentureIncentivesIdempotent(
   const deleted = deleteResult.count;
 
   if (allItems.length === 0) {
+    await refreshIncentiveRollups(ventureId, dayDate);
     return { deleted, inserted: 0, items: [] };
   }
 
@@ -101,6 +103,8 @@ async function commitVentureIncentivesIdempotent(
     inserted += 1;
   }
 
+  await refreshIncentiveRollups(ventureId, dayDate);
+
   return { deleted, inserted, items: allItems };
 }
 
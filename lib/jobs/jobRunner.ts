@@ -6,7 +6,13 @@
 
 import { prisma } from '@/lib/prisma';
 import { JobName } from '@prisma/client';
-import { acquireLock, releaseLock, type LockResult } from './distributedLock';
+import {
+  acquireLock,
+  releaseLock,
+  startLeaseRenewal,
+  type LeaseRenewalHandle,
+  type LockResult,
+} from './distributedLock';
 import { alertJobFailure } from './jobAlerts';
 
 export interface JobRunOptions {
@@ -14,6 +20,15 @@ export interface JobRunOptions {
   jobKey: string; // Unique key for this job run (e.g., "CHURN_RECALC:2025-12-15")
   timeout?: number; // Job timeout in milliseconds (default: 1 hour)
   skipLock?: boolean; // Skip lock acquisition (for testing)
+  leaseMs?: number; // Lock lease duration, renewed by heartbeat (default: 60000)
+  onStart?: (jobRunLogId: number) => void; // Called once the lock is held and the RUNNING log exists
+}
+
+export interface JobRunMetrics {
+  lockWaitMs: number; // Time spent acquiring the lock
+  leaseRenewals: number; // Heartbeat renewals while the job ran
+  leaseLost: boolean; // Lease was taken over mid-run
+  fencingToken?: number;
 }
 
 export interface JobRunResult<T = any> {
@@ -22,6 +37,7 @@ export interface JobRunResult<T = any> {
   error?: string;
   jobRunLogId?: number;
   duration?: number;
+  metrics?: JobRunMetrics;
 }
 
 /**
@@ -40,17 +56,28 @@ export async function runJobWithControl<T = any>(
     jobKey,
     timeout = 3600000, // 1 hour default
     skipLock = false,
+    leaseMs,
+    onStart,
   } = options;
 
   const startedAt = new Date();
   let lockResult: LockResult | null = null;
+  let lease: LeaseRenewalHandle | null = null;
   let jobRunLogId: number | undefined;
 
+  const collectMetrics = (): JobRunMetrics => ({
+    lockWaitMs: lockResult?.waitMs ?? 0,
+    leaseRenewals: lease?.renewals ?? 0,
+    leaseLost: lease?.lost ?? false,
+    fencingToken: lockResult?.fencingToken,
+  });
+
   try {
     // Acquire distributed lock
     if (!skipLock) {
       lockResult = await acquireLock(`job:${jobKey}`, {
         timeout,
+        leaseMs,
         maxRetries: 0, // Don't retry - if lock held, skip this run
       });
 
@@ -59,8 +86,11 @@ export async function runJobWithControl<T = any>(
         return {
           success: false,
           error: 'Job already running (lock held)',
+          metrics: collectMetrics(),
         };
       }
+
+      lease = startLeaseRenewal(`job:${jobKey}`, lockResult);
     }
 
     // Create job run log entry (RUNNING status)
@@ -75,6 +105,7 @@ export async function runJobWithControl<T = any>(
     jobRunLogId = jobRunLog.id;
 
     console.log(`[jobRunner] Job ${jobName} (${jobKey}) started, logId: ${jobRunLogId}`);
+    onStart?.(jobRunLogId);
 
     // Run job with timeout
     const jobPromise = jobFn();
@@ -87,6 +118,7 @@ export async function runJobWithControl<T = any>(
     const result = await Promise.race([jobPromise, timeoutPromise]);
     const endedAt = new Date();
     const duration = endedAt.getTime() - startedAt.getTime();
+    const metrics = collectMetrics();
 
     // Update job run log (SUCCESS)
     await prisma.jobRunLog.update({
@@ -97,6 +129,7 @@ export async function runJobWithControl<T = any>(
         statsJson: JSON.stringify({
           jobKey,
           duration,
+          ...metrics,
           result: typeof result === 'object' ? JSON.stringify(result) : String(result),
         }),
       },
@@ -109,11 +142,13 @@ export async function runJobWithControl<T = any>(
       result,
       jobRunLogId,
       duration,
+      metrics,
     };
   } catch (err: any) {
     const endedAt = new Date();
     const duration = endedAt.getTime() - startedAt.getTime();
     const errorMessage = err.message || 'Unknown error';
+    const metrics = collectMetrics();
 
     console.error(`[jobRunner] Job ${jobName} (${jobKey}) failed:`, errorMessage);
 
@@ -128,6 +163,7 @@ export async function runJobWithControl<T = any>(
           statsJson: JSON.stringify({
             jobKey,
             duration,
+            ...metrics,
             error: errorMessage,
           }),
         },
@@ -144,6 +180,7 @@ export async function runJobWithControl<T = any>(
           statsJson: JSON.stringify({
             jobKey,
             duration,
+            ...metrics,
             error: errorMessage,
           }),
         },
@@ -165,11 +202,13 @@ export async function runJobWithControl<T = any>(
       error: errorMessage,
       jobRunLogId,
       duration,
+      metrics,
     };
   } finally {
-    // Release lock
+    // Stop heartbeat and release lock
+    lease?.stop();
     if (lockResult?.acquired && lockResult.lockId) {
-      await releaseLock(`job:${jobKey}`, lockResult.lockId);
+      await releaseLock(`job:${jobKey}`, lockResult.lockId, lockResult.fencingToken);
     }
   }
 }
@@ -3,34 +3,156 @@
  * 
  * Aggregates KPIs from source data (Loads, HotelReviews, BpoCallLogs, etc.)
  * and updates daily KPI records.
+ *
+ * Each venture keeps a watermark (KpiAggregationWatermark) of the newest load
+ * write already folded into its KPIs, so scheduled runs only recompute days
+ * that actually changed. Days that lost loads (deleted, or moved to another
+ * day or venture) leave no newer write behind; a trigger records them in
+ * KpiAggregationDirtyDay and incremental runs pick them up from there.
  */
 
 import { prisma } from '@/lib/prisma';
 import { upsertFreightKpiDaily } from '@/lib/kpiFreight';
 import { logger } from '@/lib/logger';
+import { runWithConcurrency } from '@/lib/utils/workerPool';
 import { JobName } from '@prisma/client';
 
+const DEFAULT_CONCURRENCY = 3; // Leave headroom in the 5-connection pool
+const DEFAULT_INITIAL_LOOKBACK_DAYS = 7;
+const DAY_MS = 24 * 60 * 60 * 1000;
+const BACKFILL_CHUNK_DAYS = 31;
+
+/** Lock key shared by scheduled runs and admin-triggered runs (see runJobWithControl) */
+export const KPI_AGGREGATION_JOB_KEY = 'KPI_AGGREGATION';
+
 export interface KpiAggregationJobOptions {
   ventureId?: number;
-  date?: Date;
+  date?: Date; // Recompute exactly this day
+  from?: Date; // Backfill: recompute every day from..to (inclusive)
+  to?: Date;
+  incremental?: boolean; // Recompute only days with load writes after the venture watermark
+  concurrency?: number; // Max venture-days aggregated in parallel (default: 3)
+  initialLookbackDays?: number; // Incremental window for ventures without a watermark (default: 7)
   dryRun?: boolean;
 }
 
 export interface KpiAggregationJobResult {
   venturesProcessed: number;
   freightKpisUpdated: number;
+  venturesUnchanged: number;
   errors: string[];
 }
 
+type VenturePlan = {
+  days: Date[];
+  latestChangeAt: Date | null;
+  dirtyDays: Array<{ day: Date; markedAt: Date }>;
+};
+
+type VentureCounts = {
+  activeShippers: number;
+  activeCarriers: number;
+};
+
+function startOfUtcDay(date: Date): Date {
+  const d = new Date(date);
+  d.setUTCHours(0, 0, 0, 0);
+  return d;
+}
+
+function daysInRange(from: Date, to: Date): Date[] {
+  const days: Date[] = [];
+  for (let t = startOfUtcDay(from).getTime(); t <= startOfUtcDay(to).getTime(); t += DAY_MS) {
+    days.push(new Date(t));
+  }
+  return days;
+}
+
+/**
+ * Venture-level counts (current, not per day) shared by every day aggregated for the venture
+ */
+async function loadVentureCounts(ventureId: number): Promise<VentureCounts> {
+  const [activeShippers, activeCarriers] = await Promise.all([
+    prisma.logisticsShipper.count({
+      where: {
+        ventureId,
+        isActive: true,
+        isTest: false,
+      },
+    }),
+    prisma.carrierVentureStats.count({
+      where: {
+        ventureId,
+        recentLoadsDelivered: { gt: 0 },
+      },
+    }),
+  ]);
+
+  return { activeShippers, activeCarriers };
+}
+
+/**
+ * Find the days (by load createdAt) that received load writes after `since`,
+ * together with the newest write seen - the venture's next watermark - plus
+ * the days marked dirty by load deletes and moves.
+ */
+async function findChangedDays(ventureId: number, since: Date): Promise<VenturePlan> {
+  const rows = await prisma.$queryRaw<
+    Array<{ day: Date; latest_change_at: Date | null; dirty_marked_at?: Date | null }>
+  >`
+    SELECT day, MAX(latest_change_at) AS latest_change_at, MAX(dirty_marked_at) AS dirty_marked_at
+    FROM (
+      SELECT date_trunc('day', "createdAt") AS day, MAX("updatedAt") AS latest_change_at,
+             NULL::timestamp AS dirty_marked_at
+      FROM "Load"
+      WHERE "ventureId" = ${ventureId} AND "updatedAt" > ${since}
+      GROUP BY 1
+      UNION ALL
+      SELECT "day", NULL, "markedAt"
+      FROM "KpiAggregationDirtyDay"
+      WHERE "ventureId" = ${ventureId}
+    ) changes
+    GROUP BY 1
+    ORDER BY 1
+  `;
+
+  let latestChangeAt: Date | null = null;
+  const dirtyDays: VenturePlan['dirtyDays'] = [];
+  for (const row of rows) {
+    if (row.latest_change_at && (!latestChangeAt || row.latest_change_at > latestChangeAt)) {
+      latestChangeAt = row.latest_change_at;
+    }
+    if (row.dirty_marked_at) {
+      dirtyDays.push({ day: new Date(row.day), markedAt: row.dirty_marked_at });
+    }
+  }
+
+  return { days: rows.map(r => new Date(r.day)), latestChangeAt, dirtyDays };
+}
+
+/**
+ * Clear the dirty days a run recomputed. A day marked again since it was read
+ * has a newer markedAt and stays for the next run.
+ */
+async function clearDirtyDays(ventureId: number, dirtyDays: VenturePlan['dirtyDays']): Promise<void> {
+  if (dirtyDays.length === 0) return;
+  await prisma.$executeRaw`
+    DELETE FROM "KpiAggregationDirtyDay" d
+    USING unnest(${dirtyDays.map(d => d.day)}::timestamp[], ${dirtyDays.map(d => d.markedAt)}::timestamp[])
+      AS r("day", "markedAt")
+    WHERE d."ventureId" = ${ventureId} AND d."day" = r."day" AND d."markedAt" = r."markedAt"
+  `;
+}
+
 /**
  * Aggregate freight KPIs for a given venture and date
  */
 async function aggregateFreightKpisForDate(
   ventureId: number,
-  date: Date
+  date: Date,
+  counts: VentureCounts
 ): Promise<void> {
-  const startOfDay = new Date(date);
-  startOfDay.setUTCHours(0, 0, 0, 0);
+  const startOfDay = startOfUtcDay(date);
   const endOfDay = new Date(startOfDay);
   endOfDay.setUTCHours(23, 59, 59, 999);
 
@@ -48,73 +170,76 @@ async function aggregateFreightKpisForDate(
     },
   });
 
-  const loadsInbound = loads.length;
-  const loadsQuoted = loads.filter(l => l.status === 'QUOTED' || l.status === 'COVERED' || l.status === 'DELIVERED').length;
-  const loadsCovered = loads.filter(l => l.status === 'COVERED' || l.status === 'DELIVERED').length;
-  const loadsLost = loads.filter(l => l.status === 'LOST').length;
+  let loadsQuoted = 0;
+  let loadsCovered = 0;
+  let loadsLost = 0;
+  let totalRevenue = 0;
+  let totalCost = 0;
 
-  // Aggregate revenue and cost from delivered loads
-  const deliveredLoads = loads.filter(l => l.status === 'DELIVERED' && l.billingDate);
-  const totalRevenue = deliveredLoads.reduce((sum, l) => sum + (l.billAmount || 0), 0);
-  const totalCost = deliveredLoads.reduce((sum, l) => sum + (l.costAmount || 0), 0);
+  for (const l of loads) {
+    if (l.status === 'QUOTED' || l.status === 'COVERED' || l.status === 'DELIVERED') loadsQuoted++;
+    if (l.status === 'COVERED' || l.status === 'DELIVERED') loadsCovered++;
+    if (l.status === 'LOST') loadsLost++;
 
-  // Get shipper/carrier counts (from churn job if available, otherwise count active)
-  const activeShippers = await prisma.logisticsShipper.count({
-    where: {
-      ventureId,
-      isActive: true,
-      isTest: false,
-    },
-  });
-
-  const activeCarriers = await prisma.carrierVentureStats.count({
-    where: {
-      ventureId,
-      recentLoadsDelivered: { gt: 0 },
-    },
-  });
+    // Revenue and cost from delivered loads
+    if (l.status === 'DELIVERED' && l.billingDate) {
+      totalRevenue += l.billAmount || 0;
+      totalCost += l.costAmount || 0;
+    }
+  }
 
   // Upsert KPI record
   await upsertFreightKpiDaily({
     ventureId,
     date: startOfDay,
-    loadsInbound,
+    loadsInbound: loads.length,
     loadsQuoted,
     loadsCovered,
     loadsLost,
     totalRevenue,
     totalCost,
-    activeShippers,
-    activeCarriers,
+    activeShippers: counts.activeShippers,
+    activeCarriers: counts.activeCarriers,
   });
 }
 
 /**
  * Run KPI aggregation job
+ *
+ * Modes:
+ * - `date`: recompute that single day for every venture
+ * - `from`/`to`: backfill every day in the range, BACKFILL_CHUNK_DAYS at a time
+ * - `incremental` (default when no date/range is given): recompute only days that
+ *   received load writes after each venture's watermark, then advance the watermark
+ *
+ * Venture-days are fanned out over a bounded worker pool.
  */
 export async function runKpiAggregationJob(
   options: KpiAggregationJobOptions = {}
 ): Promise<{ stats: KpiAggregationJobResult; jobRunLogId: number }> {
-  const { ventureId, date, dryRun = false } = options;
+  const {
+    ventureId,
+    date,
+    from,
+    to,
+    concurrency = DEFAULT_CONCURRENCY,
+    initialLookbackDays = DEFAULT_INITIAL_LOOKBACK_DAYS,
+    dryRun = false,
+  } = options;
+  const incremental = options.incremental ?? (!date && !from);
   const startedAt = new Date();
   const errors: string[] = [];
 
   const stats: KpiAggregationJobResult = {
     venturesProcessed: 0,
     freightKpisUpdated: 0,
+    venturesUnchanged: 0,
     errors: [],
   };
 
   let status = 'SUCCESS';
 
   try {
-    const targetDate = date || (() => {
-      const yesterday = new Date();
-      yesterday.setDate(yesterday.getDate() - 1);
-      yesterday.setUTCHours(0, 0, 0, 0);
-      return yesterday;
-    })();
-
     if (dryRun) {
       const ventureCount = await prisma.venture.count({
         where: {
@@ -141,22 +266,109 @@ export async function runKpiAggregationJob(
       select: { id: true, name: true },
     });
 
+    // Decide which days each venture needs
+    const plans = new Map<number, VenturePlan>();
+
+    if (incremental) {
+      const watermarks = await prisma.kpiAggregationWatermark.findMany({
+        where: { ventureId: { in: ventures.map(v => v.id) } },
+      });
+      const watermarkByVenture = new Map(watermarks.map(w => [w.ventureId, w.lastChangeAt]));
+      const defaultSince = new Date(startOfUtcDay(startedAt).getTime() - initialLookbackDays * DAY_MS);
+
+      const changed = await runWithConcurrency(ventures, concurrency, venture =>
+        findChangedDays(venture.id, watermarkByVenture.get(venture.id) ?? defaultSince)
+      );
+      changed.forEach((res, i) => {
+        const venture = ventures[i];
+        if (res.ok) {
+          plans.set(venture.id, res.value);
+        } else {
+          const errorMsg = `Venture ${venture.name} (${venture.id}): ${res.error?.message || 'Unknown error'}`;
+          errors.push(errorMsg);
+          stats.errors.push(errorMsg);
+        }
+      });
+    } else {
+      const targetDays = from
+        ? daysInRange(from, to || startedAt)
+        : [startOfUtcDay(date || new Date(startedAt.getTime() - DAY_MS))];
+      for (const venture of ventures) {
+        plans.set(venture.id, { days: targetDays, latestChangeAt: null, dirtyDays: [] });
+      }
+    }
+
+    // Fan out venture-days over the pool; venture-level counts are loaded once per venture
+    const countsByVenture = new Map<number, Promise<VentureCounts>>();
+    const tasks: Array<{ venture: { id: number; name: string }; day: Date }> = [];
     for (const venture of ventures) {
-      try {
-        await aggregateFreightKpisForDate(venture.id, targetDate);
-        stats.freightKpisUpdated++;
-        stats.venturesProcessed++;
-      } catch (err: any) {
-        const errorMsg = `Venture ${venture.name} (${venture.id}): ${err.message || 'Unknown error'}`;
+      const plan = plans.get(venture.id);
+      if (!plan) continue;
+      if (plan.days.length === 0) {
+        stats.venturesUnchanged++;
+        continue;
+      }
+      for (const day of plan.days) {
+        tasks.push({ venture, day });
+      }
+    }
+    // Day-major order so each chunk covers a contiguous range of days
+    tasks.sort((a, b) => a.day.getTime() - b.day.getTime());
+
+    const failedVentures = new Set<number>();
+    const chunkSize = BACKFILL_CHUNK_DAYS * Math.max(1, ventures.length);
+    for (let offset = 0; offset < tasks.length; offset += chunkSize) {
+      const chunkTasks = tasks.slice(offset, offset + chunkSize);
+      const results = await runWithConcurrency(chunkTasks, concurrency, async ({ venture, day }) => {
+        let counts = countsByVenture.get(venture.id);
+        if (!counts) {
+          counts = loadVentureCounts(venture.id);
+          countsByVenture.set(venture.id, counts);
+        }
+        await aggregateFreightKpisForDate(venture.id, day, await counts);
+      });
+
+      results.forEach((res, i) => {
+        const { venture, day } = chunkTasks[i];
+        if (res.ok) {
+          stats.freightKpisUpdated++;
+          return;
+        }
+        failedVentures.add(venture.id);
+        const errorMsg = `Venture ${venture.name} (${venture.id}) ${day.toISOString().split('T')[0]}: ${res.error?.message || 'Unknown error'}`;
         errors.push(errorMsg);
         stats.errors.push(errorMsg);
         logger.error('kpi_aggregation_venture_failed', {
           ventureId: venture.id,
           ventureName: venture.name,
-          date: targetDate.toISOString(),
-          error: err.message || String(err),
+          date: day.toISOString(),
+          error: res.error?.message || String(res.error),
+        });
+      });
+
+      if (tasks.length > chunkSize) {
+        logger.info('kpi_aggregation_chunk_done', {
+          through: chunkTasks[chunkTasks.length - 1].day.toISOString(),
+          done: Math.min(offset + chunkSize, tasks.length),
+          total: tasks.length,
+        });
+      }
+    }
+
+    for (const venture of ventures) {
+      const plan = plans.get(venture.id);
+      if (!plan || plan.days.length === 0 || failedVentures.has(venture.id)) continue;
+      stats.venturesProcessed++;
+
+      // Only advance the watermark once every changed day was recomputed
+      if (incremental && plan.latestChangeAt) {
+        await prisma.kpiAggregationWatermark.upsert({
+          where: { ventureId: venture.id },
+          create: { ventureId: venture.id, lastChangeAt: plan.latestChangeAt },
+          update: { lastChangeAt: plan.latestChangeAt },
         });
       }
+      await clearDirtyDays(venture.id, plan.dirtyDays);
     }
 
     if (errors.length > 0) {
@@ -182,7 +394,7 @@ export async function runKpiAggregationJob(
       status,
       startedAt,
       endedAt: new Date(),
-      statsJson: JSON.stringify({ ...stats, jobType: 'KPI_AGGREGATION' }),
+      statsJson: JSON.stringify({ ...stats, jobType: 'KPI_AGGREGATION', incremental }),
       error: errors.length > 0 ? errors.join('; ') : null,
     },
   });
@@ -192,4 +404,3 @@ export async function runKpiAggregationJob(
     jobRunLogId: jobRunLog.id,
   };
 }
-
@@ -1,5 +1,6 @@
 import { prisma } from "@/lib/prisma";
-import { JobName } from "@prisma/client";
+import { JobName, Prisma, TaskStatus, TaskType } from "@prisma/client";
+import { buildQuoteFollowupTask } from "@/lib/freight/taskRules";
 
 export interface QuoteTimeoutJobOptions {
   ventureId?: number;
@@ -12,6 +13,89 @@ export interface QuoteTimeoutJobResult {
   updated: number;
   skippedNoExpiresAt: number;
   skippedAlreadyResolved: number;
+  followupTasksCreated: number;
+  notificationsCreated: number;
+}
+
+type TimedOutQuote = {
+  id: number;
+  ventureId: number;
+  salespersonUserId: number;
+  customerName: string | null;
+};
+
+type Tx = Prisma.TransactionClient;
+
+// Quotes flipped per statement. Each chunk is one transaction: an
+// UPDATE ... RETURNING plus one batched insert each for follow-up tasks and
+// notifications, so a quote never times out without its side effects.
+const CHUNK_SIZE = 500;
+
+/**
+ * Move up to `take` expired SENT quotes to NO_RESPONSE in one statement,
+ * oldest deadline first. Uses the (status, expiresAt) index, so only quotes
+ * past their deadline are read; SKIP LOCKED lets overlapping runs split the
+ * work instead of waiting on each other.
+ */
+async function expireChunk(tx: Tx, now: Date, take: number, ventureId?: number): Promise<TimedOutQuote[]> {
+  const ventureFilter = ventureId ? Prisma.sql`AND q."ventureId" = ${ventureId}` : Prisma.empty;
+
+  return tx.$queryRaw<TimedOutQuote[]>`
+    WITH expired AS (
+      UPDATE "FreightQuote" AS fq
+      SET "status" = 'NO_RESPONSE', "respondedAt" = ${now}, "updatedAt" = ${now}
+      WHERE fq."id" IN (
+        SELECT q."id" FROM "FreightQuote" q
+        WHERE q."status" = 'SENT'
+          AND q."expiresAt" IS NOT NULL
+          AND q."expiresAt" <= ${now}
+          ${ventureFilter}
+        ORDER BY q."expiresAt"
+        LIMIT ${take}
+        FOR UPDATE SKIP LOCKED
+      )
+      RETURNING fq."id", fq."ventureId", fq."salespersonUserId", fq."customerId"
+    )
+    SELECT e."id", e."ventureId", e."salespersonUserId", c."name" AS "customerName"
+    FROM expired e
+    LEFT JOIN "Customer" c ON c."id" = e."customerId"
+  `;
+}
+
+/** Follow-up tasks and salesperson notifications for one chunk, batched. */
+async function applySideEffects(
+  tx: Tx,
+  quotes: TimedOutQuote[],
+  now: Date
+): Promise<{ tasks: number; notifications: number }> {
+  const existing = await tx.task.findMany({
+    where: {
+      quoteId: { in: quotes.map((q) => q.id) },
+      type: TaskType.QUOTE_FOLLOWUP,
+      status: { in: [TaskStatus.OPEN, TaskStatus.IN_PROGRESS] },
+    },
+    select: { quoteId: true },
+  });
+  const hasFollowup = new Set(existing.map((t) => t.quoteId));
+
+  const dueAt = new Date(now.getTime() + 24 * 60 * 60 * 1000);
+  const tasks = quotes
+    .filter((q) => !hasFollowup.has(q.id))
+    .map((q) => buildQuoteFollowupTask(q, dueAt));
+
+  const notifications = quotes.map((q) => ({
+    userId: q.salespersonUserId,
+    title: `Quote #${q.id} expired without a response`,
+    body: `${q.customerName || "The customer"} did not respond before the quote deadline.`,
+    type: "QUOTE_NO_RESPONSE",
+    entityType: "FreightQuote",
+    entityId: q.id,
+  }));
+
+  const createdTasks = tasks.length ? await tx.task.createMany({ data: tasks }) : { count: 0 };
+  const createdNotifications = await tx.notification.createMany({ data: notifications });
+
+  return { tasks: createdTasks.count, notifications: createdNotifications.count };
 }
 
 export async function runQuoteTimeoutJob(
@@ -37,6 +121,8 @@ export async function runQuoteTimeoutJob(
     updated: 0,
     skippedNoExpiresAt: 0,
     skippedAlreadyResolved: 0,
+    followupTasksCreated: 0,
+    notificationsCreated: 0,
   };
 
   if (dryRun) {
@@ -44,34 +130,24 @@ export async function runQuoteTimeoutJob(
     stats.scanned = count;
     stats.updated = count;
   } else {
-    let processed = 0;
-    const batchSize = 100;
-
-    while (processed < limit) {
-      const quotes = await prisma.freightQuote.findMany({
-        where,
-        take: Math.min(batchSize, limit - processed),
-        select: { id: true },
+    const now = new Date();
+
+    while (stats.updated < limit) {
+      const take = Math.min(CHUNK_SIZE, limit - stats.updated);
+      const { quotes, created } = await prisma.$transaction(async (tx) => {
+        const expired = await expireChunk(tx, now, take, ventureId);
+        if (expired.length === 0) return { quotes: expired, created: { tasks: 0, notifications: 0 } };
+        return { quotes: expired, created: await applySideEffects(tx, expired, now) };
       });
 
       if (quotes.length === 0) break;
 
       stats.scanned += quotes.length;
+      stats.updated += quotes.length;
+      stats.followupTasksCreated += created.tasks;
+      stats.notificationsCreated += created.notifications;
 
-      for (const quote of quotes) {
-        await prisma.freightQuote.update({
-          where: { id: quote.id },
-          data: {
-            status: "NO_RESPONSE",
-            respondedAt: new Date(),
-          },
-        });
-        stats.updated++;
-      }
-
-      processed += quotes.length;
-
-      if (quotes.length < batchSize) break;
+      if (quotes.length < take) break;
     }
   }
 
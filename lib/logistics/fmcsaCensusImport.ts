@@ -0,0 +1,588 @@
+/**
+ * FMCSA Census Importer
+ *
+ * Streams the FMCSA company census CSV (~2M rows nationally) into Carrier:
+ *
+ * 1. Lines are read straight from a byte stream so every row has an exact end
+ *    offset; a checkpoint file records the offset after each committed batch and
+ *    `resumeFromOffset` / `--resume` picks up from there.
+ * 2. Each eligible row is normalized and hashed. The hash is stored on the
+ *    carrier (Carrier.fmcsaCensusHash), so rows whose content has not changed
+ *    since the last import are dropped before touching the database.
+ * 3. Changed rows of a batch are bulk-loaded into a transaction-scoped staging
+ *    table (one INSERT ... SELECT FROM unnest(...) statement) and merged into
+ *    Carrier with one set-based upsert per conflict key.
+ */
+
+import prisma from '@/lib/prisma';
+import { Prisma } from '@prisma/client';
+import crypto from 'crypto';
+import * as fs from 'fs';
+
+const DEFAULT_BATCH_SIZE = 5000;
+
+export interface FmcsaCensusRow {
+  DOT_NUMBER?: string;
+  LEGAL_NAME?: string;
+  DBA_NAME?: string;
+  CARRIER_OPERATION?: string;
+  PHY_STREET?: string;
+  PHY_CITY?: string;
+  PHY_STATE?: string;
+  PHY_ZIP?: string;
+  PHY_COUNTRY?: string;
+  TELEPHONE?: string;
+  EMAIL_ADDRESS?: string;
+  NBR_POWER_UNIT?: string;
+  DRIVER_TOTAL?: string;
+  OP_STATUS?: string;
+  OP_STATUS_DESC?: string;
+  MC_MX_FF_NUMBER?: string;
+  [key: string]: string | undefined;
+}
+
+/** Carrier fields sourced from the census (the hashed content) */
+export interface CensusCarrier {
+  dotNumber: string | null;
+  mcNumber: string | null;
+  name: string;
+  legalName: string | null;
+  dbaName: string | null;
+  phone: string | null;
+  email: string | null;
+  city: string | null;
+  state: string | null;
+  postalCode: string | null;
+  country: string;
+  addressLine1: string | null;
+  powerUnits: number | null;
+  drivers: number | null;
+  fmcsaStatus: string | null;
+  fmcsaStatusRaw: string | null;
+  fmcsaCargoTypesRaw: string | null;
+  contentHash: string;
+}
+
+export interface CensusImportOptions {
+  batchSize?: number;
+  resumeFromOffset?: number; // Byte offset of the first data line to read
+  checkpointPath?: string | null; // Defaults to `<csv>.checkpoint.json`; null disables
+  dryRun?: boolean; // Parse and diff, but do not write
+  onProgress?: (stats: CensusImportStats) => void;
+}
+
+export interface CensusImportStats {
+  rowsRead: number;
+  rowsSkipped: number; // Inactive, non-property, or missing DOT/MC
+  rowsUnchanged: number; // Content hash matched the stored one
+  rowsWritten: number; // Inserted or updated in Carrier
+  errors: number;
+  batches: number;
+  startOffset: number;
+  offset: number; // Byte offset after the last committed batch
+  durationMs: number;
+}
+
+export interface CensusCheckpoint {
+  csvPath: string;
+  fileSize: number;
+  offset: number;
+  stats: CensusImportStats;
+  updatedAt: string;
+}
+
+// ---------------------------------------------------------------------------
+// Parsing
+// ---------------------------------------------------------------------------
+
+/**
+ * Split one CSV line into fields (RFC 4180 quoting, "" escapes a quote)
+ */
+export function parseCsvLine(line: string): string[] {
+  const values: string[] = [];
+  let current = '';
+  let inQuotes = false;
+
+  for (let i = 0; i < line.length; i++) {
+    const char = line[i];
+    if (inQuotes) {
+      if (char === '"') {
+        if (line[i + 1] === '"') {
+          current += '"';
+          i++;
+        } else {
+          inQuotes = false;
+        }
+      } else {
+        current += char;
+      }
+    } else if (char === '"') {
+      inQuotes = true;
+    } else if (char === ',') {
+      values.push(current.trim());
+      current = '';
+    } else {
+      current += char;
+    }
+  }
+  values.push(current.trim());
+
+  return values;
+}
+
+function toRow(values: string[], headers: string[]): FmcsaCensusRow {
+  const row: FmcsaCensusRow = {};
+  headers.forEach((header, index) => {
+    row[header] = values[index] || '';
+  });
+  return row;
+}
+
+function formatMCNumber(mcMxFfNumber: string | undefined): string | null {
+  if (!mcMxFfNumber) return null;
+  const cleaned = mcMxFfNumber.replace(/\D/g, '');
+  return cleaned ? `MC${cleaned}` : null;
+}
+
+function formatDOTNumber(dotNumber: string | undefined): string | null {
+  if (!dotNumber) return null;
+  const cleaned = dotNumber.replace(/\D/g, '');
+  return cleaned || null;
+}
+
+function formatPhone(phone: string | undefined): string | null {
+  if (!phone) return null;
+  const cleaned = phone.replace(/\D/g, '');
+  if (cleaned.length === 10) {
+    return `(${cleaned.slice(0, 3)}) ${cleaned.slice(3, 6)}-${cleaned.slice(6)}`;
+  }
+  return phone.trim() || null;
+}
+
+function toInt(value: string | undefined): number | null {
+  if (!value) return null;
+  return parseInt(value, 10) || null;
+}
+
+/**
+ * Stable hash of the census-sourced carrier fields
+ */
+export function censusContentHash(carrier: Omit<CensusCarrier, 'contentHash'>): string {
+  const fields = [
+    carrier.dotNumber,
+    carrier.mcNumber,
+    carrier.name,
+    carrier.legalName,
+    carrier.dbaName,
+    carrier.phone,
+    carrier.email,
+    carrier.city,
+    carrier.state,
+    carrier.postalCode,
+    carrier.country,
+    carrier.addressLine1,
+    carrier.powerUnits,
+    carrier.drivers,
+    carrier.fmcsaStatus,
+    carrier.fmcsaStatusRaw,
+    carrier.fmcsaCargoTypesRaw,
+  ];
+  return crypto.createHash('sha1').update(JSON.stringify(fields)).digest('hex');
+}
+
+/**
+ * Normalize a census row into carrier fields.
+ *
+ * @returns null for rows we do not import (inactive, non-property, no DOT/MC)
+ */
+export function normalizeCensusRow(row: FmcsaCensusRow): CensusCarrier | null {
+  const opStatus = (row.OP_STATUS || '').toUpperCase();
+  const opStatusDesc = (row.OP_STATUS_DESC || '').toUpperCase();
+  const carrierOp = row.CARRIER_OPERATION || '';
+
+  const isActive = opStatus === 'A' || opStatus === 'ACTIVE' || opStatusDesc === 'ACTIVE';
+  if (!isActive) return null;
+
+  if (!carrierOp.toUpperCase().includes('PROPERTY') && carrierOp !== '') return null;
+
+  const dotNumber = formatDOTNumber(row.DOT_NUMBER);
+  const mcNumber = formatMCNumber(row.MC_MX_FF_NUMBER);
+  if (!dotNumber && !mcNumber) return null;
+
+  const carrier = {
+    dotNumber,
+    mcNumber,
+    name: row.LEGAL_NAME || row.DBA_NAME || 'Unknown',
+    legalName: row.LEGAL_NAME || null,
+    dbaName: row.DBA_NAME || null,
+    phone: formatPhone(row.TELEPHONE),
+    email: row.EMAIL_ADDRESS || null,
+    city: row.PHY_CITY || null,
+    state: row.PHY_STATE || null,
+    postalCode: row.PHY_ZIP || null,
+    country: row.PHY_COUNTRY || 'US',
+    addressLine1: row.PHY_STREET || null,
+    powerUnits: toInt(row.NBR_POWER_UNIT),
+    drivers: toInt(row.DRIVER_TOTAL),
+    fmcsaStatus: row.OP_STATUS || null,
+    fmcsaStatusRaw: row.OP_STATUS_DESC || null,
+    fmcsaCargoTypesRaw: row.CARRIER_OPERATION || null,
+  };
+
+  return { ...carrier, contentHash: censusContentHash(carrier) };
+}
+
+/**
+ * Read the header line (always from the start of the file)
+ */
+export async function readCensusHeaders(csvPath: string): Promise<{ headers: string[]; dataOffset: number }> {
+  for await (const { line, endOffset } of readLinesWithOffsets(csvPath, 0)) {
+    return {
+      headers: parseCsvLine(line).map(h => h.replace(/"/g, '')),
+      dataOffset: endOffset,
+    };
+  }
+  return { headers: [], dataOffset: 0 };
+}
+
+/**
+ * Stream lines from `start`, yielding each line with the byte offset just past it
+ */
+export async function* readLinesWithOffsets(
+  csvPath: string,
+  start: number
+): AsyncGenerator<{ line: string; endOffset: number }> {
+  const stream = fs.createReadStream(csvPath, { start });
+  let pending: Buffer = Buffer.alloc(0);
+  let offset = start;
+
+  for await (const chunk of stream as AsyncIterable<Buffer>) {
+    let buf = pending.length > 0 ? Buffer.concat([pending, chunk]) : chunk;
+    let newline = buf.indexOf(0x0a);
+    while (newline !== -1) {
+      const lineBytes = buf.subarray(0, newline);
+      offset += newline + 1;
+      yield { line: stripCr(lineBytes.toString('utf8')), endOffset: offset };
+      buf = buf.subarray(newline + 1);
+      newline = buf.indexOf(0x0a);
+    }
+    pending = Buffer.from(buf);
+  }
+
+  if (pending.length > 0) {
+    offset += pending.length;
+    yield { line: stripCr(pending.toString('utf8')), endOffset: offset };
+  }
+}
+
+function stripCr(line: string): string {
+  return line.endsWith('\r') ? line.slice(0, -1) : line;
+}
+
+// ---------------------------------------------------------------------------
+// Diff + merge
+// ---------------------------------------------------------------------------
+
+function rowKey(c: CensusCarrier): string {
+  return c.dotNumber ? `DOT:${c.dotNumber}` : `MC:${c.mcNumber}`;
+}
+
+/**
+ * Collapse duplicates within a batch: last row per DOT/MC wins, and an MC number
+ * is kept only on the first carrier that claims it (Carrier.mcNumber is unique).
+ */
+function dedupeBatch(batch: CensusCarrier[]): CensusCarrier[] {
+  const byKey = new Map<string, CensusCarrier>();
+  for (const c of batch) {
+    byKey.set(rowKey(c), c);
+  }
+
+  const seenMc = new Set<string>();
+  const result: CensusCarrier[] = [];
+  for (const c of byKey.values()) {
+    if (c.mcNumber && seenMc.has(c.mcNumber)) {
+      if (!c.dotNumber) continue; // MC-only duplicate, nothing left to key on
+      result.push({ ...c, mcNumber: null });
+      continue;
+    }
+    if (c.mcNumber) seenMc.add(c.mcNumber);
+    result.push(c);
+  }
+  return result;
+}
+
+/**
+ * Drop rows whose content hash matches what is already stored
+ */
+async function filterChanged(batch: CensusCarrier[]): Promise<CensusCarrier[]> {
+  const dotNumbers = batch.filter(c => c.dotNumber).map(c => c.dotNumber!);
+  const mcOnly = batch.filter(c => !c.dotNumber).map(c => c.mcNumber!);
+
+  const or: Prisma.CarrierWhereInput[] = [];
+  if (dotNumbers.length > 0) or.push({ dotNumber: { in: dotNumbers } });
+  if (mcOnly.length > 0) or.push({ mcNumber: { in: mcOnly } });
+  if (or.length === 0) return [];
+
+  const existing = await prisma.carrier.findMany({
+    where: { OR: or },
+    select: { dotNumber: true, mcNumber: true, fmcsaCensusHash: true },
+  });
+
+  const hashByDot = new Map<string, string | null>();
+  const hashByMc = new Map<string, string | null>();
+  for (const e of existing) {
+    if (e.dotNumber) hashByDot.set(e.dotNumber, e.fmcsaCensusHash);
+    if (e.mcNumber) hashByMc.set(e.mcNumber, e.fmcsaCensusHash);
+  }
+
+  return batch.filter(c => {
+    const stored = c.dotNumber ? hashByDot.get(c.dotNumber) : hashByMc.get(c.mcNumber!);
+    return stored !== c.contentHash;
+  });
+}
+
+const CARRIER_MERGE_COLUMNS = `
+  "name", "legalName", "dbaName", "dotNumber", "mcNumber", "phone", "email",
+  "city", "state", "postalCode", "country", "addressLine1", "powerUnits", "drivers",
+  "fmcsaStatus", "fmcsaStatusRaw", "fmcsaCargoTypesRaw", "fmcsaCensusHash",
+  "fmcsaLastSyncAt", "fmcsaAuthorized", "active", "updatedAt"
+`;
+
+const STAGING_SELECT = `
+  name, legal_name, dba_name, dot_number, mc_number, phone, email,
+  city, state, postal_code, country, address_line1, power_units, drivers,
+  fmcsa_status, fmcsa_status_raw, fmcsa_cargo_types_raw, content_hash,
+  NOW(), true, true, NOW()
+`;
+
+const MERGE_UPDATE_SET = `
+  "name" = EXCLUDED."name",
+  "legalName" = EXCLUDED."legalName",
+  "dbaName" = EXCLUDED."dbaName",
+  "phone" = EXCLUDED."phone",
+  "email" = EXCLUDED."email",
+  "city" = EXCLUDED."city",
+  "state" = EXCLUDED."state",
+  "postalCode" = EXCLUDED."postalCode",
+  "country" = EXCLUDED."country",
+  "addressLine1" = EXCLUDED."addressLine1",
+  "powerUnits" = EXCLUDED."powerUnits",
+  "drivers" = EXCLUDED."drivers",
+  "fmcsaStatus" = EXCLUDED."fmcsaStatus",
+  "fmcsaStatusRaw" = EXCLUDED."fmcsaStatusRaw",
+  "fmcsaCargoTypesRaw" = EXCLUDED."fmcsaCargoTypesRaw",
+  "fmcsaCensusHash" = EXCLUDED."fmcsaCensusHash",
+  "fmcsaLastSyncAt" = EXCLUDED."fmcsaLastSyncAt",
+  "fmcsaAuthorized" = true,
+  "active" = true,
+  "updatedAt" = NOW()
+`;
+
+/**
+ * Bulk-load changed rows into a staging table and merge them into Carrier
+ *
+ * @returns number of carriers inserted or updated
+ */
+async function mergeBatch(rows: CensusCarrier[]): Promise<number> {
+  if (rows.length === 0) return 0;
+
+  const col = <K extends keyof CensusCarrier>(key: K) => rows.map(r => r[key]);
+
+  return prisma.$transaction(
+    async tx => {
+      await tx.$executeRawUnsafe(`
+        CREATE TEMP TABLE fmcsa_census_staging (
+          dot_number TEXT, mc_number TEXT, name TEXT, legal_name TEXT, dba_name TEXT,
+          phone TEXT, email TEXT, city TEXT, state TEXT, postal_code TEXT, country TEXT,
+          address_line1 TEXT, power_units INTEGER, drivers INTEGER, fmcsa_status TEXT,
+          fmcsa_status_raw TEXT, fmcsa_cargo_types_raw TEXT, content_hash TEXT
+        ) ON COMMIT DROP
+      `);
+
+      await tx.$executeRawUnsafe(
+        `INSERT INTO fmcsa_census_staging
+         SELECT * FROM unnest(
+           $1::text[], $2::text[], $3::text[], $4::text[], $5::text[], $6::text[],
+           $7::text[], $8::text[], $9::text[], $10::text[], $11::text[], $12::text[],
+           $13::int[], $14::int[], $15::text[], $16::text[], $17::text[], $18::text[]
+         )`,
+        col('dotNumber'),
+        col('mcNumber'),
+        col('name'),
+        col('legalName'),
+        col('dbaName'),
+        col('phone'),
+        col('email'),
+        col('city'),
+        col('state'),
+        col('postalCode'),
+        col('country'),
+        col('addressLine1'),
+        col('powerUnits'),
+        col('drivers'),
+        col('fmcsaStatus'),
+        col('fmcsaStatusRaw'),
+        col('fmcsaCargoTypesRaw'),
+        col('contentHash')
+      );
+
+      // An MC number already owned by a different DOT would violate Carrier.mcNumber
+      await tx.$executeRawUnsafe(`
+        UPDATE fmcsa_census_staging s
+        SET mc_number = NULL
+        FROM "Carrier" c
+        WHERE s.dot_number IS NOT NULL
+          AND s.mc_number IS NOT NULL
+          AND c."mcNumber" = s.mc_number
+          AND c."dotNumber" IS DISTINCT FROM s.dot_number
+      `);
+
+      const byDot = await tx.$executeRawUnsafe(`
+        INSERT INTO "Carrier" (${CARRIER_MERGE_COLUMNS})
+        SELECT ${STAGING_SELECT}
+        FROM fmcsa_census_staging
+        WHERE dot_number IS NOT NULL
+        ON CONFLICT ("dotNumber") DO UPDATE SET
+          ${MERGE_UPDATE_SET},
+          "mcNumber" = COALESCE(EXCLUDED."mcNumber", "Carrier"."mcNumber")
+      `);
+
+      const byMc = await tx.$executeRawUnsafe(`
+        INSERT INTO "Carrier" (${CARRIER_MERGE_COLUMNS})
+        SELECT ${STAGING_SELECT}
+        FROM fmcsa_census_staging
+        WHERE dot_number IS NULL
+        ON CONFLICT ("mcNumber") DO UPDATE SET
+          ${MERGE_UPDATE_SET}
+      `);
+
+      return byDot + byMc;
+    },
+    { timeout: 60000 }
+  );
+}
+
+// ---------------------------------------------------------------------------
+// Checkpoints
+// ---------------------------------------------------------------------------
+
+export function defaultCheckpointPath(csvPath: string): string {
+  return `${csvPath}.checkpoint.json`;
+}
+
+/**
+ * Read a checkpoint, ignoring it if the CSV has changed size since it was written
+ */
+export function readCensusCheckpoint(csvPath: string, checkpointPath = defaultCheckpointPath(csvPath)): CensusCheckpoint | null {
+  try {
+    const checkpoint = JSON.parse(fs.readFileSync(checkpointPath, 'utf8')) as CensusCheckpoint;
+    const { size } = fs.statSync(csvPath);
+    return checkpoint.fileSize === size ? checkpoint : null;
+  } catch {
+    return null;
+  }
+}
+
+function writeCheckpoint(checkpointPath: string, checkpoint: CensusCheckpoint): void {
+  const tmpPath = `${checkpointPath}.tmp`;
+  fs.writeFileSync(tmpPath, JSON.stringify(checkpoint, null, 2));
+  fs.renameSync(tmpPath, checkpointPath);
+}
+
+// ---------------------------------------------------------------------------
+// Import
+// ---------------------------------------------------------------------------
+
+/**
+ * Stream an FMCSA census CSV into Carrier
+ */
+export async function importFmcsaCensus(
+  csvPath: string,
+  options: CensusImportOptions = {}
+): Promise<CensusImportStats> {
+  const {
+    batchSize = DEFAULT_BATCH_SIZE,
+    dryRun = false,
+    onProgress,
+  } = options;
+  const checkpointPath = options.checkpointPath === undefined
+    ? defaultCheckpointPath(csvPath)
+    : options.checkpointPath;
+
+  const startedAt = Date.now();
+  const { size: fileSize } = fs.statSync(csvPath);
+  const { headers, dataOffset } = await readCensusHeaders(csvPath);
+  const startOffset = Math.max(dataOffset, options.resumeFromOffset ?? dataOffset);
+
+  const stats: CensusImportStats = {
+    rowsRead: 0,
+    rowsSkipped: 0,
+    rowsUnchanged: 0,
+    rowsWritten: 0,
+    errors: 0,
+    batches: 0,
+    startOffset,
+    offset: startOffset,
+    durationMs: 0,
+  };
+
+  let batch: CensusCarrier[] = [];
+  let batchEndOffset = startOffset;
+
+  const flush = async () => {
+    const deduped = dedupeBatch(batch);
+    stats.rowsSkipped += batch.length - deduped.length;
+    batch = [];
+
+    try {
+      const changed = await filterChanged(deduped);
+      stats.rowsUnchanged += deduped.length - changed.length;
+      if (!dryRun) {
+        stats.rowsWritten += await mergeBatch(changed);
+      }
+    } catch (err: any) {
+      // Failed rows keep their old hash, so the next import retries them
+      console.error(`[fmcsaCensusImport] Batch ending at byte ${batchEndOffset} failed: ${err.message}`);
+      stats.errors += deduped.length;
+    }
+
+    stats.batches++;
+    stats.offset = batchEndOffset;
+    stats.durationMs = Date.now() - startedAt;
+
+    if (checkpointPath && !dryRun) {
+      writeCheckpoint(checkpointPath, {
+        csvPath,
+        fileSize,
+        offset: stats.offset,
+        stats,
+        updatedAt: new Date().toISOString(),
+      });
+    }
+    onProgress?.(stats);
+  };
+
+  for await (const { line, endOffset } of readLinesWithOffsets(csvPath, startOffset)) {
+    batchEndOffset = endOffset;
+    if (!line.trim()) continue;
+
+    stats.rowsRead++;
+    const carrier = normalizeCensusRow(toRow(parseCsvLine(line), headers));
+    if (!carrier) {
+      stats.rowsSkipped++;
+      continue;
+    }
+
+    batch.push(carrier);
+    if (batch.length >= batchSize) {
+      await flush();
+    }
+  }
+
+  if (batch.length > 0 || stats.offset !== batchEndOffset) {
+    await flush();
+  }
+
+  stats.durationMs = Date.now() - startedAt;
+  return stats;
+}
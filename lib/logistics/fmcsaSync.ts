@@ -1,6 +1,14 @@
 import prisma from "@/lib/prisma";
+import { Prisma } from "@prisma/client";
 import { logger } from "@/lib/logger";
-import { fetchCarrierFromFMCSA } from "@/lib/integrations/fmcsaClient";
+import {
+  fetchCarrierFromFMCSA,
+  fetchCarriersFromFMCSA,
+  type FMCSACarrierData,
+} from "@/lib/integrations/fmcsaClient";
+import { chunk } from "@/lib/utils/workerPool";
+
+const WRITE_BATCH_SIZE = 100;
 
 export type FmcsaBulkSyncOptions = {
   limit?: number;
@@ -65,6 +73,131 @@ function isActivePropertyCarrier(row: FmcsaCensusRow): boolean {
   return status.includes("authorized");
 }
 
+type NormalizedRecord = {
+  dotNumber: string | null;
+  mcNumber: string | null;
+  name: string;
+  legalName: string | null;
+  dbaName: string | null;
+  phone: string | null;
+  email: string | null;
+  city: string | null;
+  state: string | null;
+  postalCode: string | null;
+  country: string | null;
+  fmcsaStatus: string | null;
+  fmcsaStatusRaw: string | null;
+  fmcsaCargoTypesRaw: string | null;
+  powerUnits: number | null;
+  drivers: number | null;
+};
+
+function carrierData(record: NormalizedRecord, syncedAt: Date) {
+  return {
+    name: record.name,
+    legalName: record.legalName,
+    dbaName: record.dbaName,
+    dotNumber: record.dotNumber,
+    mcNumber: record.mcNumber,
+    phone: record.phone,
+    email: record.email,
+    city: record.city,
+    state: record.state,
+    postalCode: record.postalCode,
+    country: record.country,
+    fmcsaStatus: record.fmcsaStatus,
+    fmcsaStatusRaw: record.fmcsaStatusRaw,
+    fmcsaCargoTypesRaw: record.fmcsaCargoTypesRaw,
+    powerUnits: record.powerUnits,
+    drivers: record.drivers,
+    fmcsaLastSyncAt: syncedAt,
+    fmcsaAuthorized: true,
+    active: true,
+  };
+}
+
+/**
+ * Write one batch of records: a single lookup, then the creates and updates
+ * in one transaction, so the batch commits or fails as a whole.
+ */
+async function writeRecordBatch(
+  batch: NormalizedRecord[]
+): Promise<{ imported: number; updated: number; skipped: number }> {
+  const dotNumbers = batch.filter((r) => r.dotNumber).map((r) => r.dotNumber!);
+  const mcOnly = batch.filter((r) => !r.dotNumber && r.mcNumber).map((r) => r.mcNumber!);
+
+  const existing = await prisma.carrier.findMany({
+    where: {
+      OR: [
+        ...(dotNumbers.length > 0 ? [{ dotNumber: { in: dotNumbers } }] : []),
+        ...(mcOnly.length > 0 ? [{ mcNumber: { in: mcOnly } }] : []),
+      ],
+    },
+    select: { id: true, dotNumber: true, mcNumber: true },
+  });
+  const idByDot = new Map(existing.filter((c) => c.dotNumber).map((c) => [c.dotNumber!, c.id]));
+  const idByMc = new Map(existing.filter((c) => c.mcNumber).map((c) => [c.mcNumber!, c.id]));
+
+  const creates: Prisma.CarrierCreateManyInput[] = [];
+  const updates: Prisma.PrismaPromise<unknown>[] = [];
+  const syncedAt = new Date();
+
+  for (const record of batch) {
+    const data = carrierData(record, syncedAt);
+    const existingId = record.dotNumber
+      ? idByDot.get(record.dotNumber)
+      : idByMc.get(record.mcNumber!);
+
+    if (existingId) {
+      updates.push(prisma.carrier.update({ where: { id: existingId }, data }));
+    } else {
+      creates.push(data);
+    }
+  }
+
+  const operations = [...updates];
+  if (creates.length > 0) {
+    operations.push(prisma.carrier.createMany({ data: creates, skipDuplicates: true }));
+  }
+  const results = await prisma.$transaction(operations);
+  const created = creates.length > 0 ? (results[results.length - 1] as Prisma.BatchPayload).count : 0;
+
+  return {
+    imported: created,
+    updated: updates.length,
+    // Creates that collided with another carrier's unique DOT/MC were not written
+    skipped: creates.length - created,
+  };
+}
+
+/**
+ * Write a single record (fallback when its batch fails).
+ */
+async function writeRecord(record: NormalizedRecord): Promise<"imported" | "updated" | "skipped"> {
+  try {
+    const data = carrierData(record, new Date());
+    const existing = await prisma.carrier.findFirst({
+      where: record.dotNumber ? { dotNumber: record.dotNumber } : { mcNumber: record.mcNumber! },
+      select: { id: true },
+    });
+
+    if (existing) {
+      await prisma.carrier.update({ where: { id: existing.id }, data });
+      return "updated";
+    }
+    await prisma.carrier.create({ data });
+    return "imported";
+  } catch (err: any) {
+    // P2002: the DOT/MC belongs to another carrier; nothing was written
+    if (err.code !== "P2002") {
+      logger.error("fmcsa_bulk_sync_record_error", {
+        meta: { dotNumber: record.dotNumber, mcNumber: record.mcNumber, error: err.message },
+      });
+    }
+    return "skipped";
+  }
+}
+
 export async function syncFmcsaCarriersBulk(
   options: FmcsaBulkSyncOptions = {}
 ): Promise<FmcsaBulkSyncResult> {
@@ -99,24 +232,7 @@ export async function syncFmcsaCarriersBulk(
   let updated = 0;
   let skipped = 0;
   
-  const normalizedRecords: Array<{
-    dotNumber: string | null;
-    mcNumber: string | null;
-    name: string;
-    legalName: string | null;
-    dbaName: string | null;
-    phone: string | null;
-    email: string | null;
-    city: string | null;
-    state: string | null;
-    postalCode: string | null;
-    country: string | null;
-    fmcsaStatus: string | null;
-    fmcsaStatusRaw: string | null;
-    fmcsaCargoTypesRaw: string | null;
-    powerUnits: number | null;
-    drivers: number | null;
-  }> = [];
+  const normalizedRecords: NormalizedRecord[] = [];
   
   for (const row of rows) {
     const dotNumber = row.dot_number?.trim() || null;
@@ -156,73 +272,28 @@ export async function syncFmcsaCarriersBulk(
     });
   }
   
-  const BATCH_SIZE = 100;
-  for (let i = 0; i < normalizedRecords.length; i += BATCH_SIZE) {
-    const batch = normalizedRecords.slice(i, i + BATCH_SIZE);
-    
-    for (const record of batch) {
-      try {
-        let whereClause: { dotNumber: string } | { mcNumber: string };
-        
-        if (record.dotNumber) {
-          whereClause = { dotNumber: record.dotNumber };
-        } else if (record.mcNumber) {
-          whereClause = { mcNumber: record.mcNumber };
-        } else {
-          skipped++;
-          continue;
-        }
-        
-        const data = {
-          name: record.name,
-          legalName: record.legalName,
-          dbaName: record.dbaName,
-          dotNumber: record.dotNumber,
-          mcNumber: record.mcNumber,
-          phone: record.phone,
-          email: record.email,
-          city: record.city,
-          state: record.state,
-          postalCode: record.postalCode,
-          country: record.country,
-          fmcsaStatus: record.fmcsaStatus,
-          fmcsaStatusRaw: record.fmcsaStatusRaw,
-          fmcsaCargoTypesRaw: record.fmcsaCargoTypesRaw,
-          powerUnits: record.powerUnits,
-          drivers: record.drivers,
-          fmcsaLastSyncAt: new Date(),
-          fmcsaAuthorized: true,
-          active: true,
-        };
-        
-        const existing = await prisma.carrier.findFirst({
-          where: whereClause,
-          select: { id: true },
-        });
-        
-        if (existing) {
-          await prisma.carrier.update({
-            where: { id: existing.id },
-            data,
-          });
-          updated++;
-        } else {
-          await prisma.carrier.create({ data });
-          imported++;
-        }
-      } catch (err: any) {
-        if (err.code === "P2002") {
-          updated++;
-        } else {
-          logger.error("fmcsa_bulk_sync_record_error", {
-            meta: { dotNumber: record.dotNumber, mcNumber: record.mcNumber, error: err.message },
-          });
-          skipped++;
-        }
+  // Write back in batches: one lookup per batch, then one transaction for the
+  // creates and updates, instead of a findFirst + write per record
+  for (const batch of chunk(normalizedRecords, WRITE_BATCH_SIZE)) {
+    try {
+      const counts = await writeRecordBatch(batch);
+      imported += counts.imported;
+      updated += counts.updated;
+      skipped += counts.skipped;
+    } catch (err: any) {
+      logger.error("fmcsa_bulk_sync_batch_error", {
+        meta: { batchSize: batch.length, error: err.message },
+      });
+      // Nothing in the batch committed; retry per record so an error only skips its own record
+      for (const record of batch) {
+        const outcome = await writeRecord(record);
+        if (outcome === "imported") imported++;
+        else if (outcome === "updated") updated++;
+        else skipped++;
       }
     }
   }
-  
+
   const nextOffset = fetched < limit ? null : offset + fetched;
   
   logger.info("fmcsa_bulk_sync_complete", {
@@ -262,7 +333,8 @@ export async function syncCarrierFromFMCSAById(carrierId: number): Promise<Fmcsa
     return null;
   }
 
-  const fmcsaData = await fetchCarrierFromFMCSA(carrier.mcNumber);
+  // Explicit refresh: always go to FMCSA
+  const fmcsaData = await fetchCarrierFromFMCSA(carrier.mcNumber, { bypassCache: true });
 
   if (!fmcsaData) {
     await prisma.carrier.update({
@@ -279,14 +351,7 @@ export async function syncCarrierFromFMCSAById(carrierId: number): Promise<Fmcsa
 
   const updated = await prisma.carrier.update({
     where: { id: carrier.id },
-    data: {
-      fmcsaStatus: fmcsaData.status,
-      fmcsaAuthorized: fmcsaData.authorized,
-      fmcsaLastSyncAt: new Date(),
-      fmcsaLastUpdated: fmcsaData.lastUpdated,
-      fmcsaSyncError: null,
-      safetyRating: fmcsaData.safetyRating || undefined,
-    },
+    data: snapshotUpdateData(fmcsaData, new Date()),
   });
 
   logger.info("fmcsa_single_sync_success", {
@@ -303,3 +368,81 @@ export async function syncCarrierFromFMCSAById(carrierId: number): Promise<Fmcsa
     lastSyncedAt: updated.fmcsaLastSyncAt ?? null,
   };
 }
+
+function snapshotUpdateData(fmcsaData: FMCSACarrierData, syncedAt: Date) {
+  return {
+    fmcsaStatus: fmcsaData.status,
+    fmcsaAuthorized: fmcsaData.authorized,
+    fmcsaLastSyncAt: syncedAt,
+    fmcsaLastUpdated: fmcsaData.lastUpdated,
+    fmcsaSyncError: null,
+    safetyRating: fmcsaData.safetyRating || undefined,
+  };
+}
+
+/**
+ * Sync many carriers at once.
+ *
+ * Loads the carriers in one query, fetches FMCSA data concurrently (rate limited
+ * and cached by the client), and writes the snapshots back in batched transactions.
+ *
+ * @returns snapshots in the order of `carrierIds` (null for missing/failed carriers)
+ */
+export async function syncCarriersFromFMCSAByIds(
+  carrierIds: number[],
+  options: { concurrency?: number } = {}
+): Promise<Array<FmcsaSnapshot | null>> {
+  const carriers = await prisma.carrier.findMany({
+    where: { id: { in: carrierIds }, mcNumber: { not: null } },
+    select: { id: true, mcNumber: true, dotNumber: true, safetyRating: true },
+  });
+
+  const fmcsaByMc = await fetchCarriersFromFMCSA(
+    carriers.map((c) => c.mcNumber!),
+    { concurrency: options.concurrency }
+  );
+
+  const syncedAt = new Date();
+  const snapshots = new Map<number, FmcsaSnapshot>();
+  const updates: Prisma.PrismaPromise<unknown>[] = [];
+
+  for (const carrier of carriers) {
+    const fmcsaData = fmcsaByMc.get(carrier.mcNumber!);
+
+    if (!fmcsaData) {
+      updates.push(
+        prisma.carrier.update({
+          where: { id: carrier.id },
+          data: { fmcsaSyncError: "Failed to fetch from FMCSA API" },
+        })
+      );
+      continue;
+    }
+
+    updates.push(
+      prisma.carrier.update({
+        where: { id: carrier.id },
+        data: snapshotUpdateData(fmcsaData, syncedAt),
+      })
+    );
+    snapshots.set(carrier.id, {
+      carrierId: carrier.id,
+      mcNumber: carrier.mcNumber,
+      dotNumber: carrier.dotNumber,
+      status: fmcsaData.status,
+      authorized: fmcsaData.authorized,
+      safetyRating: fmcsaData.safetyRating || carrier.safetyRating || null,
+      lastSyncedAt: syncedAt,
+    });
+  }
+
+  for (const batch of chunk(updates, WRITE_BATCH_SIZE)) {
+    await prisma.$transaction(batch);
+  }
+
+  logger.info("fmcsa_multi_sync_complete", {
+    meta: { requested: carrierIds.length, synced: snapshots.size },
+  });
+
+  return carrierIds.map((id) => snapshots.get(id) ?? null);
+}
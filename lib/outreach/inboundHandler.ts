@@ -18,7 +18,7 @@ function logInboundEvent(event: {
   });
 }
 
-function normalizePhone(phone: string): string {
+export function normalizePhone(phone: string): string {
   const digits = phone.replace(/\D/g, "");
   if (digits.length === 11 && digits.startsWith("1")) {
     return digits.slice(1);
@@ -422,7 +422,7 @@ async function storeUnmatchedEmail(payload: InboundEmailPayload, reason: string)
   }
 }
 
-function extractEmail(emailString: string): string {
+export function extractEmail(emailString: string): string {
   const match = emailString.match(/<([^>]+)>/);
   if (match) return match[1].toLowerCase();
   return emailString.trim().toLowerCase();
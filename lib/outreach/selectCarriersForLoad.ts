@@ -1,4 +1,6 @@
+import { Prisma } from "@prisma/client";
 import prisma from "@/lib/prisma";
+import { getCached, invalidateCachePattern } from "@/lib/cache/simple";
 
 export interface CarrierForOutreach {
   id: number;
@@ -19,27 +21,72 @@ export interface SelectCarriersParams {
   specificCarrierIds?: number[];
 }
 
-export async function selectCarriersForLoad(
-  params: SelectCarriersParams
-): Promise<CarrierForOutreach[]> {
-  const { loadId, channel, limit, specificCarrierIds } = params;
+export interface SelectCarriersForLoadsParams {
+  loadIds: number[];
+  channel: "sms" | "email";
+  limit: number;
+}
 
-  const load = await prisma.load.findUnique({
-    where: { id: loadId },
-    select: {
-      id: true,
-      equipmentType: true,
-      pickupCity: true,
-      pickupState: true,
-      dropCity: true,
-      dropState: true,
-    },
-  });
+type OutreachLoad = {
+  id: number;
+  equipmentType: string | null;
+  pickupState: string | null;
+  dropState: string | null;
+};
 
-  if (!load) {
-    return [];
-  }
+type EligibleCarrier = {
+  id: number;
+  name: string;
+  email: string | null;
+  phone: string | null;
+  equipmentTypes: string | null;
+  operatingStatus: string | null;
+  fmcsaAuthorized: boolean | null;
+  lanesJson: string | null;
+};
 
+type PreparedCarrier = EligibleCarrier & {
+  equipmentLower: string | null;
+  lanes: any[] | null;
+};
+
+const LOAD_SELECT = {
+  id: true,
+  equipmentType: true,
+  pickupState: true,
+  dropState: true,
+} as const;
+
+const CARRIER_SELECT = {
+  id: true,
+  name: true,
+  email: true,
+  phone: true,
+  equipmentTypes: true,
+  operatingStatus: true,
+  fmcsaAuthorized: true,
+  lanesJson: true,
+} as const;
+
+// Candidates are cached per channel and lane: the eligible carriers whose
+// equipment or lanes match, ranked in SQL by the same equipment and lane
+// score as scoreCarrier (the substring prefilter uses the trigram indexes of
+// 20260318000000_carrier_outreach_candidates, the exact lane test is
+// "carrier_lane_match" from 20260320000000_carrier_lane_match), plus the
+// lowest-id eligible carriers that fill a list with "Available" entries.
+// Both are capped at CANDIDATE_CAP, above every outreach limit; because the
+// SQL order is the exact score (ties by id), the top `limit` of the capped
+// set is the top `limit` overall.
+// Carrier edits made through the carrier API drop the cache immediately;
+// imports and FMCSA syncs are picked up on the next refresh.
+const ELIGIBILITY_TTL_SECONDS = Math.max(
+  1,
+  Math.ceil(Number(process.env.OUTREACH_ELIGIBILITY_TTL_MS ?? 5 * 60 * 1000) / 1000)
+);
+const ELIGIBILITY_CACHE_PREFIX = "outreach:eligible:";
+const CANDIDATE_CAP = 250;
+
+function eligibilityWhere(channel: "sms" | "email"): any {
   const whereClause: any = {
     active: true,
     blocked: false,
@@ -52,79 +99,202 @@ export async function selectCarriersForLoad(
     whereClause.email = { not: null };
   }
 
-  if (specificCarrierIds && specificCarrierIds.length > 0) {
-    whereClause.id = { in: specificCarrierIds };
+  return whereClause;
+}
+
+function prepareCarrier(carrier: EligibleCarrier): PreparedCarrier {
+  let lanes: any[] | null = null;
+  if (carrier.lanesJson) {
+    try {
+      const parsed = JSON.parse(carrier.lanesJson);
+      if (Array.isArray(parsed)) lanes = parsed;
+    } catch {
+    }
   }
+  return {
+    ...carrier,
+    equipmentLower: carrier.equipmentTypes?.toLowerCase() ?? null,
+    lanes,
+  };
+}
 
-  const carriers = await prisma.carrier.findMany({
-    where: whereClause,
-    select: {
-      id: true,
-      name: true,
-      email: true,
-      phone: true,
-      equipmentTypes: true,
-      operatingStatus: true,
-      fmcsaAuthorized: true,
-      lanesJson: true,
-    },
-    take: limit,
-    orderBy: { id: "asc" },
-  });
+function likeContains(value: string): string {
+  return `%${value.replace(/[\\%_]/g, (c) => `\\${c}`)}%`;
+}
 
-  const results: CarrierForOutreach[] = carriers.map((carrier) => {
-    const matchReasons: string[] = [];
-    let matchScore = 0;
+/**
+ * Eligible carriers whose equipment or lanes match the load, ranked by the
+ * equipment and lane points of scoreCarrier, then id.
+ */
+async function findLaneMatches(channel: "sms" | "email", load: OutreachLoad): Promise<EligibleCarrier[]> {
+  const equipment = load.equipmentType;
+  const hasLane = !!(load.pickupState && load.dropState);
+  if (!equipment && !hasLane) return [];
 
-    if (carrier.fmcsaAuthorized) {
-      matchReasons.push("Active Authority");
-      matchScore += 10;
-    }
+  const equipmentMatch = equipment
+    ? Prisma.sql`coalesce("equipmentTypes" ILIKE ${likeContains(equipment)}, false)`
+    : Prisma.sql`false`;
+  // The substring test is a superset of the exact one and can use the index
+  const lanePrefilter = hasLane
+    ? Prisma.sql`("lanesJson" LIKE ${likeContains(load.pickupState!)} OR "lanesJson" LIKE ${likeContains(load.dropState!)})`
+    : Prisma.sql`false`;
+  const laneMatch = hasLane
+    ? Prisma.sql`(${lanePrefilter} AND "carrier_lane_match"("lanesJson", ${load.pickupState}::text, ${load.dropState}::text))`
+    : Prisma.sql`false`;
 
-    if (
-      load.equipmentType &&
-      carrier.equipmentTypes?.toLowerCase().includes(load.equipmentType.toLowerCase())
-    ) {
-      matchReasons.push("Equipment Match");
-      matchScore += 20;
-    }
+  const contact = channel === "sms" ? Prisma.sql`"phone"` : Prisma.sql`"email"`;
+  return prisma.$queryRaw<EligibleCarrier[]>`
+    SELECT "id", "name", "email", "phone", "equipmentTypes", "operatingStatus", "fmcsaAuthorized", "lanesJson"
+    FROM "Carrier"
+    WHERE "active" = true AND "blocked" = false AND "fmcsaAuthorized" = true AND ${contact} IS NOT NULL
+      AND (${equipmentMatch} OR ${lanePrefilter})
+    ORDER BY (CASE WHEN ${equipmentMatch} THEN 20 ELSE 0 END) + (CASE WHEN ${laneMatch} THEN 30 ELSE 0 END) DESC, "id"
+    LIMIT ${CANDIDATE_CAP}::int
+  `;
+}
 
-    if (carrier.lanesJson && load.pickupState && load.dropState) {
-      try {
-        const lanes = JSON.parse(carrier.lanesJson);
-        if (Array.isArray(lanes)) {
-          const hasLaneMatch = lanes.some(
-            (lane: any) =>
-              lane.origin?.includes(load.pickupState) ||
-              lane.destination?.includes(load.dropState)
-          );
-          if (hasLaneMatch) {
-            matchReasons.push("Lane Match");
-            matchScore += 30;
-          }
-        }
-      } catch {
-      }
-    }
+/** The bounded candidate set for one channel and lane, lanes pre-parsed. */
+async function getLaneCandidates(channel: "sms" | "email", load: OutreachLoad): Promise<PreparedCarrier[]> {
+  const [matches, fillers] = await Promise.all([
+    getCached(`${ELIGIBILITY_CACHE_PREFIX}${channel}:lane:${laneKey(load)}`, ELIGIBILITY_TTL_SECONDS, () =>
+      findLaneMatches(channel, load)
+    ),
+    getCached(`${ELIGIBILITY_CACHE_PREFIX}${channel}:fill`, ELIGIBILITY_TTL_SECONDS, () =>
+      prisma.carrier.findMany({
+        where: eligibilityWhere(channel),
+        select: CARRIER_SELECT,
+        orderBy: { id: "asc" },
+        take: CANDIDATE_CAP,
+      })
+    ),
+  ]);
+
+  const byId = new Map<number, EligibleCarrier>();
+  for (const carrier of [...matches, ...fillers]) byId.set(carrier.id, carrier);
+  return Array.from(byId.values(), prepareCarrier);
+}
+
+/** Drop the cached candidate sets so the next outreach run reloads them. */
+export function invalidateOutreachEligibility(): void {
+  invalidateCachePattern(ELIGIBILITY_CACHE_PREFIX);
+}
+
+// Scoring only looks at equipment and the pickup/drop states, so loads that
+// share them share a ranking.
+function laneKey(load: OutreachLoad): string {
+  return [load.equipmentType?.toLowerCase() ?? "", load.pickupState ?? "", load.dropState ?? ""].join("|");
+}
+
+function scoreCarrier(carrier: PreparedCarrier, load: OutreachLoad): CarrierForOutreach {
+  const matchReasons: string[] = [];
+  let matchScore = 0;
+
+  if (carrier.fmcsaAuthorized) {
+    matchReasons.push("Active Authority");
+    matchScore += 10;
+  }
 
-    if (matchReasons.length === 0) {
-      matchReasons.push("Available");
+  if (load.equipmentType && carrier.equipmentLower?.includes(load.equipmentType.toLowerCase())) {
+    matchReasons.push("Equipment Match");
+    matchScore += 20;
+  }
+
+  if (carrier.lanes && load.pickupState && load.dropState) {
+    const hasLaneMatch = carrier.lanes.some(
+      (lane: any) =>
+        lane?.origin?.includes(load.pickupState) ||
+        lane?.destination?.includes(load.dropState)
+    );
+    if (hasLaneMatch) {
+      matchReasons.push("Lane Match");
+      matchScore += 30;
     }
+  }
+
+  if (matchReasons.length === 0) {
+    matchReasons.push("Available");
+  }
 
-    return {
-      id: carrier.id,
-      name: carrier.name,
-      email: carrier.email,
-      phone: carrier.phone,
-      equipmentTypes: carrier.equipmentTypes,
-      operatingStatus: carrier.operatingStatus,
-      fmcsaAuthorized: carrier.fmcsaAuthorized,
-      matchScore,
-      matchReasons,
-    };
+  return {
+    id: carrier.id,
+    name: carrier.name,
+    email: carrier.email,
+    phone: carrier.phone,
+    equipmentTypes: carrier.equipmentTypes,
+    operatingStatus: carrier.operatingStatus,
+    fmcsaAuthorized: carrier.fmcsaAuthorized,
+    matchScore,
+    matchReasons,
+  };
+}
+
+/** Score every candidate against one load and keep the best `limit` (ties by id). */
+function rankCarriers(candidates: PreparedCarrier[], load: OutreachLoad, limit: number): CarrierForOutreach[] {
+  const scored = candidates.map((carrier) => scoreCarrier(carrier, load));
+  scored.sort((a, b) => b.matchScore - a.matchScore || a.id - b.id);
+  return scored.slice(0, limit);
+}
+
+/**
+ * Pick outreach candidates for many loads with one load query and one
+ * bounded candidate set per distinct lane and equipment.
+ */
+export async function selectCarriersForLoads(
+  params: SelectCarriersForLoadsParams
+): Promise<Map<number, CarrierForOutreach[]>> {
+  const { loadIds, channel, limit } = params;
+  const results = new Map<number, CarrierForOutreach[]>();
+  if (loadIds.length === 0) return results;
+
+  const loads = await prisma.load.findMany({
+    where: { id: { in: Array.from(new Set(loadIds)) } },
+    select: LOAD_SELECT,
   });
 
-  results.sort((a, b) => b.matchScore - a.matchScore);
+  const rankingsByLane = new Map<string, Promise<CarrierForOutreach[]>>();
+  for (const load of loads) {
+    const key = laneKey(load);
+    if (!rankingsByLane.has(key)) {
+      rankingsByLane.set(
+        key,
+        getLaneCandidates(channel, load).then((candidates) => rankCarriers(candidates, load, limit))
+      );
+    }
+  }
+  for (const load of loads) {
+    results.set(load.id, await rankingsByLane.get(laneKey(load))!);
+  }
 
   return results;
 }
+
+export async function selectCarriersForLoad(
+  params: SelectCarriersParams
+): Promise<CarrierForOutreach[]> {
+  const { loadId, channel, limit, specificCarrierIds } = params;
+
+  if (!specificCarrierIds || specificCarrierIds.length === 0) {
+    const byLoad = await selectCarriersForLoads({ loadIds: [loadId], channel, limit });
+    return byLoad.get(loadId) ?? [];
+  }
+
+  // Explicit recipient lists are validated against the database, not the
+  // cached set, so a carrier blocked a moment ago is never messaged.
+  const load = await prisma.load.findUnique({
+    where: { id: loadId },
+    select: LOAD_SELECT,
+  });
+
+  if (!load) {
+    return [];
+  }
+
+  const carriers = await prisma.carrier.findMany({
+    where: { ...eligibilityWhere(channel), id: { in: specificCarrierIds } },
+    select: CARRIER_SELECT,
+    take: limit,
+    orderBy: { id: "asc" },
+  });
+
+  return rankCarriers(carriers.map(prepareCarrier), load, limit);
+}
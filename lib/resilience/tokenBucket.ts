@@ -0,0 +1,117 @@
+/**
+ * Token Bucket Rate Limiter
+ *
+ * Client-side throttle for outbound calls to rate-limited upstream APIs.
+ * Lightweight in-memory implementation (per process, like the circuit breaker).
+ */
+
+export interface TokenBucketOptions {
+  ratePerSecond?: number; // Tokens added per second (default: 10)
+  capacity?: number; // Maximum burst size (default: ratePerSecond)
+}
+
+export class TokenBucket {
+  private tokens: number;
+  private lastRefill: number;
+  private readonly ratePerSecond: number;
+  private readonly capacity: number;
+  private waiters: Array<() => void> = [];
+  private timer: NodeJS.Timeout | null = null;
+
+  constructor(
+    private name: string,
+    options: TokenBucketOptions = {}
+  ) {
+    this.ratePerSecond = Math.max(0.001, options.ratePerSecond ?? 10);
+    this.capacity = Math.max(1, options.capacity ?? Math.ceil(this.ratePerSecond));
+    this.tokens = this.capacity;
+    this.lastRefill = Date.now();
+  }
+
+  /**
+   * Take a token if one is available right now
+   */
+  tryTake(): boolean {
+    this.refill();
+    if (this.waiters.length === 0 && this.tokens >= 1) {
+      this.tokens -= 1;
+      return true;
+    }
+    return false;
+  }
+
+  /**
+   * Wait until a token is available, then take it (FIFO)
+   */
+  take(): Promise<void> {
+    if (this.tryTake()) {
+      return Promise.resolve();
+    }
+    return new Promise(resolve => {
+      this.waiters.push(resolve);
+      this.schedule();
+    });
+  }
+
+  /**
+   * Tokens currently available (fractional)
+   */
+  available(): number {
+    this.refill();
+    return this.tokens;
+  }
+
+  /**
+   * Number of callers waiting for a token
+   */
+  pending(): number {
+    return this.waiters.length;
+  }
+
+  private refill(): void {
+    const now = Date.now();
+    const elapsed = (now - this.lastRefill) / 1000;
+    if (elapsed > 0) {
+      this.tokens = Math.min(this.capacity, this.tokens + elapsed * this.ratePerSecond);
+      this.lastRefill = now;
+    }
+  }
+
+  private schedule(): void {
+    if (this.timer) return;
+
+    this.refill();
+    const deficit = Math.max(0, 1 - this.tokens);
+    const waitMs = Math.ceil((deficit / this.ratePerSecond) * 1000);
+
+    this.timer = setTimeout(() => {
+      this.timer = null;
+      this.refill();
+      while (this.waiters.length > 0 && this.tokens >= 1) {
+        this.tokens -= 1;
+        this.waiters.shift()!();
+      }
+      if (this.waiters.length > 0) {
+        this.schedule();
+      }
+    }, waitMs);
+  }
+}
+
+/**
+ * Token bucket instances (singleton per upstream)
+ */
+const tokenBuckets = new Map<string, TokenBucket>();
+
+/**
+ * Get or create a token bucket instance
+ */
+export function getTokenBucket(
+  name: string,
+  options?: TokenBucketOptions
+): TokenBucket {
+  if (!tokenBuckets.has(name)) {
+    tokenBuckets.set(name, new TokenBucket(name, options));
+  }
+  return tokenBuckets.get(name)!;
+}
@@ -0,0 +1,375 @@
+import { Prisma } from "@prisma/client";
+import prisma from "@/lib/prisma";
+import { getCached, invalidateCachePattern } from "@/lib/cache/simple";
+
+// SaaS MRR trend and cohort retention computed from a subscription-event
+// ledger. Each subscription is a +mrr event in the month it starts and a -mrr
+// event in the month it is cancelled; a running window sum over the month
+// index then gives MRR and live customers at every month end in one pass,
+// instead of re-scanning customers x subscriptions for every month.
+
+const SAAS_METRICS_TTL_SECONDS = Math.max(
+  1,
+  Math.ceil(Number(process.env.SAAS_METRICS_CACHE_TTL_MS ?? 5 * 60 * 1000) / 1000)
+);
+
+const CACHE_PREFIX = "saas:";
+
+/** `null` means every venture. */
+export type SaasVentureFilter = number[] | null;
+
+/** Drop cached metrics and cohorts; call after any subscription or customer write. */
+export function invalidateSaasMetrics(): void {
+  invalidateCachePattern(CACHE_PREFIX);
+}
+
+function ventureKey(ventureIds: SaasVentureFilter): string {
+  return ventureIds ? [...ventureIds].sort((a, b) => a - b).join(",") : "all";
+}
+
+function monthKey(now: Date): string {
+  return `${now.getFullYear()}-${now.getMonth() + 1}`;
+}
+
+function ventureWhere(ventureIds: SaasVentureFilter): Prisma.Sql {
+  return ventureIds ? Prisma.sql`WHERE c."ventureId" = ANY(${ventureIds})` : Prisma.empty;
+}
+
+function subsCte(ventureIds: SaasVentureFilter): Prisma.Sql {
+  return Prisma.sql`subs AS (
+    SELECT s."id", s."customerId", s."planName", s."mrr", s."startedAt", s."cancelledAt",
+           s."cancelReason", s."isActive"
+    FROM "SaasSubscription" s
+    JOIN "SaasCustomer" c ON c."id" = s."customerId"
+    ${ventureWhere(ventureIds)}
+  )`;
+}
+
+/**
+ * Month `k` of the window ends at `ends[k]` (23:59:59, local time, matching the
+ * dashboards). `bounds[k]` is the first instant after it, so `width_bucket(ts,
+ * bounds)` is the first month whose end is at or after `ts`.
+ */
+export function monthWindow(now: Date, months: number) {
+  const starts: Date[] = [];
+  const ends: Date[] = [];
+  for (let k = 0; k < months; k++) {
+    const offset = k - (months - 1);
+    starts.push(new Date(now.getFullYear(), now.getMonth() + offset, 1));
+    ends.push(new Date(now.getFullYear(), now.getMonth() + offset + 1, 0, 23, 59, 59));
+  }
+  const bounds = ends.map((e) => new Date(e.getTime() + 1));
+  return { starts, ends, bounds };
+}
+
+const toTimestamps = (dates: Date[]) => dates.map((d) => d.toISOString());
+
+/**
+ * Ledger events bucketed by month, folded per customer into MRR and
+ * live-customer deltas. `groupCol` partitions the running totals (cohort).
+ */
+function ledgerDeltasCte(bounds: Date[], join: Prisma.Sql, groupCol: Prisma.Sql): Prisma.Sql {
+  const b = Prisma.sql`${toTimestamps(bounds)}::timestamp[]`;
+  return Prisma.sql`events AS (
+    SELECT ${groupCol} AS "grp", s."customerId", width_bucket(s."startedAt", ${b}) AS "idx",
+           s."mrr" AS "mrrDelta", 1 AS "subDelta"
+    FROM subs s ${join}
+    UNION ALL
+    SELECT ${groupCol}, s."customerId",
+           GREATEST(width_bucket(s."cancelledAt", ${b}), width_bucket(s."startedAt", ${b})),
+           -s."mrr", -1
+    FROM subs s ${join}
+    WHERE s."cancelledAt" IS NOT NULL
+  ),
+  per_customer AS (
+    SELECT "grp", "customerId", "idx", SUM("mrrDelta") AS "mrrDelta",
+           (SUM(SUM("subDelta")) OVER (PARTITION BY "customerId" ORDER BY "idx") > 0)::int AS "live"
+    FROM events
+    GROUP BY "grp", "customerId", "idx"
+  ),
+  deltas AS (
+    SELECT "grp", "idx", "mrrDelta",
+           "live" - COALESCE(LAG("live") OVER (PARTITION BY "customerId" ORDER BY "idx"), 0) AS "customerDelta"
+    FROM per_customer
+  )`;
+}
+
+type LedgerRow = { idx: number; mrr: number; customers: number };
+
+/** Carry sparse running totals forward onto every month of the window. */
+export function denseSeries<T extends LedgerRow>(rows: T[], months: number): LedgerRow[] {
+  const out: LedgerRow[] = [];
+  let r = 0;
+  let current: LedgerRow = { idx: 0, mrr: 0, customers: 0 };
+  for (let k = 0; k < months; k++) {
+    while (r < rows.length && Number(rows[r].idx) <= k) {
+      current = rows[r];
+      r += 1;
+    }
+    out.push({
+      idx: k,
+      // running float sums can leave residue where +mrr and -mrr cancel out
+      mrr: Math.round(Number(current.mrr) * 100) / 100,
+      customers: Number(current.customers),
+    });
+  }
+  return out;
+}
+
+export type SaasMetrics = {
+  summary: {
+    currentMrr: number;
+    currentArr: number;
+    lastMonthMrr: number;
+    mrrGrowth: number;
+    netNewMrr: number;
+    newMrrThisMonth: number;
+    churnedMrrThisMonth: number;
+    revenueChurnRate: number;
+    activeSubscriptions: number;
+    activeCustomers: number;
+    churnedThisMonth: number;
+    arpu: number;
+    totalCustomers: number;
+  };
+  monthlyTrend: { month: string; mrr: number; arr: number; customers: number }[];
+  planBreakdown: { plan: string; count: number; mrr: number }[];
+  cancelReasons: { reason: string; count: number; mrr: number }[];
+};
+
+type SummaryRow = {
+  currentMrr: number;
+  activeSubscriptions: number;
+  activeCustomers: number;
+  newMrrThisMonth: number;
+  churnedThisMonth: number;
+  churnedMrrThisMonth: number;
+  totalCustomers: number;
+};
+
+type BreakdownRow = { kind: "plan" | "reason"; key: string; count: number; mrr: number };
+
+async function computeSaasMetrics(ventureIds: SaasVentureFilter, now: Date): Promise<SaasMetrics> {
+  const TREND_MONTHS = 12;
+  const { starts, bounds } = monthWindow(now, TREND_MONTHS);
+  const thisMonthStart = new Date(now.getFullYear(), now.getMonth(), 1);
+  const subs = subsCte(ventureIds);
+
+  const [[totals], breakdown, trendRows] = await Promise.all([
+    prisma.$queryRaw<SummaryRow[]>`
+      WITH ${subs}
+      SELECT COALESCE(SUM(s."mrr") FILTER (WHERE s."isActive"), 0)::float8 AS "currentMrr",
+             COUNT(*) FILTER (WHERE s."isActive")::int AS "activeSubscriptions",
+             COUNT(DISTINCT s."customerId") FILTER (WHERE s."isActive")::int AS "activeCustomers",
+             COALESCE(SUM(s."mrr") FILTER (WHERE s."isActive" AND s."startedAt" >= ${thisMonthStart}), 0)::float8 AS "newMrrThisMonth",
+             COUNT(*) FILTER (WHERE s."cancelledAt" >= ${thisMonthStart})::int AS "churnedThisMonth",
+             COALESCE(SUM(s."mrr") FILTER (WHERE s."cancelledAt" >= ${thisMonthStart}), 0)::float8 AS "churnedMrrThisMonth",
+             (SELECT COUNT(*)::int FROM "SaasCustomer" c ${ventureWhere(ventureIds)}) AS "totalCustomers"
+      FROM subs s
+    `,
+    prisma.$queryRaw<BreakdownRow[]>`
+      WITH ${subs}
+      SELECT 'plan' AS "kind", s."planName" AS "key", COUNT(*)::int AS "count", SUM(s."mrr")::float8 AS "mrr"
+      FROM subs s WHERE s."isActive"
+      GROUP BY s."planName"
+      UNION ALL
+      SELECT 'reason', COALESCE(NULLIF(s."cancelReason", ''), 'Not specified'), COUNT(*)::int, SUM(s."mrr")::float8
+      FROM subs s WHERE s."cancelledAt" >= ${thisMonthStart}
+      GROUP BY 2
+      ORDER BY 1, 2
+    `,
+    prisma.$queryRaw<LedgerRow[]>`
+      WITH ${subs}, ${ledgerDeltasCte(bounds, Prisma.empty, Prisma.sql`0`)}
+      SELECT "idx",
+             CAST(SUM(SUM("mrrDelta")) OVER (ORDER BY "idx") AS float8) AS "mrr",
+             CAST(SUM(SUM("customerDelta")) OVER (ORDER BY "idx") AS int) AS "customers"
+      FROM deltas
+      GROUP BY "idx"
+      ORDER BY "idx"
+    `,
+  ]);
+
+  const trend = denseSeries(trendRows, TREND_MONTHS);
+  const currentMrr = Number(totals?.currentMrr ?? 0);
+  const newMrrThisMonth = Number(totals?.newMrrThisMonth ?? 0);
+  const churnedMrrThisMonth = Number(totals?.churnedMrrThisMonth ?? 0);
+  const activeCustomers = Number(totals?.activeCustomers ?? 0);
+  const lastMonthMrr = trend[TREND_MONTHS - 2].mrr;
+
+  const mrrGrowth = lastMonthMrr > 0 ? ((currentMrr - lastMonthMrr) / lastMonthMrr) * 100 : 0;
+  const revenueChurnRate = lastMonthMrr > 0 ? (churnedMrrThisMonth / lastMonthMrr) * 100 : 0;
+  const arpu = activeCustomers > 0 ? currentMrr / activeCustomers : 0;
+
+  return {
+    summary: {
+      currentMrr: Math.round(currentMrr),
+      currentArr: Math.round(currentMrr * 12),
+      lastMonthMrr: Math.round(lastMonthMrr),
+      mrrGrowth: Math.round(mrrGrowth * 10) / 10,
+      netNewMrr: Math.round(newMrrThisMonth - churnedMrrThisMonth),
+      newMrrThisMonth: Math.round(newMrrThisMonth),
+      churnedMrrThisMonth: Math.round(churnedMrrThisMonth),
+      revenueChurnRate: Math.round(revenueChurnRate * 10) / 10,
+      activeSubscriptions: Number(totals?.activeSubscriptions ?? 0),
+      activeCustomers,
+      churnedThisMonth: Number(totals?.churnedThisMonth ?? 0),
+      arpu: Math.round(arpu),
+      totalCustomers: Number(totals?.totalCustomers ?? 0),
+    },
+    monthlyTrend: trend.map((point, k) => ({
+      month: starts[k].toLocaleDateString("en-US", { month: "short", year: "2-digit" }),
+      mrr: Math.round(point.mrr),
+      arr: Math.round(point.mrr * 12),
+      customers: point.customers,
+    })),
+    planBreakdown: breakdown
+      .filter((row) => row.kind === "plan")
+      .map((row) => ({ plan: row.key, count: Number(row.count), mrr: Math.round(Number(row.mrr)) })),
+    cancelReasons: breakdown
+      .filter((row) => row.kind === "reason")
+      .map((row) => ({ reason: row.key, count: Number(row.count), mrr: Math.round(Number(row.mrr)) }))
+      .sort((a, b) => b.count - a.count),
+  };
+}
+
+/** MRR summary, 12-month trend and plan/churn breakdowns, cached per venture scope. */
+export function getSaasMetrics(ventureIds: SaasVentureFilter, now = new Date()): Promise<SaasMetrics> {
+  return getCached(
+    `${CACHE_PREFIX}metrics:${ventureKey(ventureIds)}:${monthKey(now)}`,
+    SAAS_METRICS_TTL_SECONDS,
+    () => computeSaasMetrics(ventureIds, now)
+  );
+}
+
+export type SaasCohortRow = {
+  cohort: string;
+  cohortDate: Date;
+  initialCustomers: number;
+  initialMrr: number;
+  retention: number[];
+  mrrRetention: number[];
+};
+
+export type SaasCohorts = {
+  cohorts: SaasCohortRow[];
+  summary: {
+    totalCohorts: number;
+    avgRetentionByMonth: number[];
+    estimatedLtvMonths: number;
+  };
+};
+
+type CohortLedgerRow = LedgerRow & {
+  cohort: number;
+  initialCustomers: number;
+  initialMrr: number;
+};
+
+async function computeSaasCohorts(
+  ventureIds: SaasVentureFilter,
+  monthsBack: number,
+  now: Date
+): Promise<SaasCohorts> {
+  const MAX_RETENTION_MONTHS = 12;
+  const { starts, bounds } = monthWindow(now, monthsBack);
+  const b = Prisma.sql`${toTimestamps(bounds)}::timestamp[]`;
+  const s0 = Prisma.sql`${toTimestamps(starts)}::timestamp[]`;
+
+  // A customer's cohort is the month of their first subscription; the start
+  // check drops the sub-second gap between one month end and the next start.
+  const rows = await prisma.$queryRaw<CohortLedgerRow[]>`
+    WITH ${subsCte(ventureIds)},
+    firsts AS (
+      SELECT DISTINCT ON (s."customerId") s."customerId", s."startedAt", s."mrr",
+             width_bucket(s."startedAt", ${b}) AS "cohort"
+      FROM subs s
+      ORDER BY s."customerId", s."startedAt", s."id"
+    ),
+    members AS (
+      SELECT f."customerId", f."cohort", f."mrr" AS "initialMrr"
+      FROM firsts f
+      WHERE f."cohort" < ${monthsBack} AND f."startedAt" >= (${s0})[f."cohort" + 1]
+    ),
+    sizes AS (
+      SELECT "cohort", COUNT(*)::int AS "initialCustomers", SUM("initialMrr")::float8 AS "initialMrr"
+      FROM members
+      GROUP BY "cohort"
+    ),
+    ${ledgerDeltasCte(bounds, Prisma.sql`JOIN members m ON m."customerId" = s."customerId"`, Prisma.sql`m."cohort"`)}
+    SELECT d."grp" AS "cohort", d."idx", z."initialCustomers", z."initialMrr",
+           CAST(SUM(SUM(d."mrrDelta")) OVER (PARTITION BY d."grp" ORDER BY d."idx") AS float8) AS "mrr",
+           CAST(SUM(SUM(d."customerDelta")) OVER (PARTITION BY d."grp" ORDER BY d."idx") AS int) AS "customers"
+    FROM deltas d
+    JOIN sizes z ON z."cohort" = d."grp"
+    GROUP BY d."grp", d."idx", z."initialCustomers", z."initialMrr"
+    ORDER BY d."grp", d."idx"
+  `;
+
+  const byCohort = new Map<number, CohortLedgerRow[]>();
+  for (const row of rows) {
+    const k = Number(row.cohort);
+    const list = byCohort.get(k) ?? [];
+    list.push(row);
+    byCohort.set(k, list);
+  }
+
+  const cohorts: SaasCohortRow[] = [];
+  for (let k = 0; k < monthsBack; k++) {
+    const cohortRows = byCohort.get(k);
+    if (!cohortRows?.length) continue;
+
+    const initialCustomers = Number(cohortRows[0].initialCustomers);
+    const initialMrr = Number(cohortRows[0].initialMrr);
+    const series = denseSeries(cohortRows, monthsBack);
+    const retention: number[] = [];
+    const mrrRetention: number[] = [];
+
+    for (let m = 0; m < monthsBack - k && m < MAX_RETENTION_MONTHS; m++) {
+      const point = series[k + m];
+      retention.push(Math.round((point.customers / initialCustomers) * 100));
+      mrrRetention.push(initialMrr > 0 ? Math.round((point.mrr / initialMrr) * 100) : 0);
+    }
+
+    cohorts.push({
+      cohort: starts[k].toLocaleDateString("en-US", { month: "short", year: "2-digit" }),
+      cohortDate: starts[k],
+      initialCustomers,
+      initialMrr: Math.round(initialMrr),
+      retention,
+      mrrRetention,
+    });
+  }
+
+  const avgRetentionByMonth: number[] = [];
+  for (let m = 0; m < MAX_RETENTION_MONTHS; m++) {
+    const values = cohorts.filter((c) => c.retention[m] !== undefined).map((c) => c.retention[m]);
+    if (values.length > 0) {
+      avgRetentionByMonth.push(Math.round(values.reduce((a, v) => a + v, 0) / values.length));
+    }
+  }
+
+  const ltv =
+    avgRetentionByMonth.length > 0 ? avgRetentionByMonth.reduce((a, v) => a + v, 0) / 100 : 0;
+
+  return {
+    cohorts,
+    summary: {
+      totalCohorts: cohorts.length,
+      avgRetentionByMonth,
+      estimatedLtvMonths: Math.round(ltv * 10) / 10,
+    },
+  };
+}
+
+/** Monthly signup cohorts with customer and MRR retention, cached per venture scope. */
+export function getSaasCohorts(
+  ventureIds: SaasVentureFilter,
+  monthsBack: number,
+  now = new Date()
+): Promise<SaasCohorts> {
+  return getCached(
+    `${CACHE_PREFIX}cohorts:${ventureKey(ventureIds)}:${monthsBack}:${monthKey(now)}`,
+    SAAS_METRICS_TTL_SECONDS,
+    () => computeSaasCohorts(ventureIds, monthsBack, now)
+  );
+}
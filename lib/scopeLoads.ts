@@ -1,3 +1,4 @@
+import { Prisma } from "@prisma/client";
 import type { SessionUser } from "./scope";
 import { isGlobalAdmin, isManagerLike } from "./scope";
 
@@ -87,3 +88,35 @@ function buildScopeCondition(user: SessionUser): LoadWhereInput | null {
     },
   };
 }
+
+/**
+ * SQL form of applyLoadScope's scope condition, for raw aggregation queries.
+ * Expects the "Load" table aliased as `l` and must stay in sync with
+ * buildScopeCondition above.
+ */
+export function loadScopeSql(user: SessionUser): Prisma.Sql {
+  if (isGlobalAdmin(user)) {
+    return Prisma.sql`TRUE`;
+  }
+
+  const assignedToUser = Prisma.sql`EXISTS (
+    SELECT 1 FROM "Customer" scope_c
+    WHERE scope_c."id" = l."customerId"
+      AND (scope_c."assignedSalesId" = ${user.id}
+        OR scope_c."assignedCsrId" = ${user.id}
+        OR scope_c."assignedDispatcherId" = ${user.id})
+  )`;
+
+  if (isManagerLike(user)) {
+    if (user.ventureIds.length > 0) {
+      return Prisma.sql`(l."ventureId" IN (${Prisma.join(user.ventureIds)}) OR l."ventureId" IS NULL OR ${assignedToUser})`;
+    }
+    return Prisma.sql`TRUE`;
+  }
+
+  if (user.ventureIds.length > 0) {
+    return Prisma.sql`(l."ventureId" IN (${Prisma.join(user.ventureIds)}) AND ${assignedToUser})`;
+  }
+
+  return assignedToUser;
+}
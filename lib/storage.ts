@@ -1,6 +1,12 @@
-import { supabaseService, BUCKET_NAME } from "./supabase";
+import { createHmac, randomUUID, timingSafeEqual } from "crypto";
+import { createReadStream, createWriteStream, promises as fs } from "fs";
+import path from "path";
+import { Readable } from "stream";
+import { pipeline } from "stream/promises";
 
-export type StorageProviderName = "supabase";
+export type StorageProviderName = "supabase" | "local";
+
+export type UploadBody = Buffer | Readable;
 
 export interface UploadResult {
   provider: StorageProviderName;
@@ -8,17 +14,172 @@ export interface UploadResult {
   path: string;
 }
 
+export interface UploadSession {
+  /** Opaque, signed token; hand it back to resume the upload */
+  sessionId: string;
+  provider: StorageProviderName;
+  bucket: string;
+  path: string;
+  mimeType: string;
+  totalBytes: number;
+  uploadedBytes: number;
+  /** Every chunk except the last must be exactly this many bytes */
+  chunkSize: number;
+  expiresAt: string;
+  metadata: Record<string, unknown>;
+}
+
+export interface UploadChunkResult {
+  session: UploadSession;
+  /** Set once the last byte has been stored */
+  completed: UploadResult | null;
+}
+
 export interface StorageClient {
+  /**
+   * Store an object. Streams are piped straight through to the backend, so
+   * the file is never held in memory as a whole.
+   */
   upload(
     key: string,
-    data: Buffer,
+    data: UploadBody,
     mimeType: string
   ): Promise<UploadResult>;
+  remove(bucket: string, path: string): Promise<void>;
   signedUrl(
     bucket: string,
     path: string,
     expiresInSeconds: number
   ): Promise<string>;
+  /** Start a resumable upload of `totalBytes` bytes to `key`. */
+  createUploadSession(
+    key: string,
+    mimeType: string,
+    totalBytes: number,
+    metadata?: Record<string, unknown>
+  ): Promise<UploadSession>;
+  /** Current progress of a session, or null if the token is invalid or expired. */
+  getUploadSession(sessionId: string): Promise<UploadSession | null>;
+  /** Append `data` at `offset`, which must equal the session's uploadedBytes. */
+  uploadChunk(
+    sessionId: string,
+    offset: number,
+    data: Buffer
+  ): Promise<UploadChunkResult>;
+}
+
+/** The chunk offset does not match what the backend has stored. */
+export class UploadOffsetError extends Error {
+  constructor(public expectedOffset: number) {
+    super(`Upload offset mismatch; resume from byte ${expectedOffset}`);
+    this.name = "UploadOffsetError";
+  }
+}
+
+export class UploadSessionError extends Error {
+  constructor(message = "Upload session is invalid or has expired") {
+    super(message);
+    this.name = "UploadSessionError";
+  }
+}
+
+const SESSION_TTL_MS = 24 * 60 * 60 * 1000;
+// Supabase's resumable endpoint only accepts 6MB chunks
+const SUPABASE_CHUNK_SIZE = 6 * 1024 * 1024;
+const LOCAL_CHUNK_SIZE = Number(process.env.LOCAL_STORAGE_CHUNK_BYTES || 1024 * 1024);
+
+// ---------------------------------------------------------------------------
+// Signed tokens (upload sessions and local signed URLs)
+// ---------------------------------------------------------------------------
+
+type SessionToken = {
+  p: StorageProviderName;
+  b: string;
+  k: string;
+  m: string;
+  t: number;
+  x: number;
+  /** Supabase resumable upload URL */
+  u?: string;
+  /** Local staging file id */
+  i?: string;
+  meta?: Record<string, unknown>;
+};
+
+function signingSecret(): string {
+  const secret = process.env.STORAGE_SIGNING_SECRET || process.env.NEXTAUTH_SECRET;
+  if (!secret) {
+    throw new Error("Missing STORAGE_SIGNING_SECRET or NEXTAUTH_SECRET for storage tokens");
+  }
+  return secret;
+}
+
+function sign(payload: string): string {
+  return createHmac("sha256", signingSecret()).update(payload).digest("base64url");
+}
+
+function verifySignature(payload: string, signature: string): boolean {
+  const expected = Buffer.from(sign(payload));
+  const actual = Buffer.from(signature);
+  return expected.length === actual.length && timingSafeEqual(expected, actual);
+}
+
+function encodeSessionToken(token: SessionToken): string {
+  const payload = Buffer.from(JSON.stringify(token)).toString("base64url");
+  return `${payload}.${sign(payload)}`;
+}
+
+function decodeSessionToken(sessionId: string, provider: StorageProviderName): SessionToken | null {
+  const [payload, signature] = sessionId.split(".");
+  if (!payload || !signature || !verifySignature(payload, signature)) return null;
+  try {
+    const token = JSON.parse(Buffer.from(payload, "base64url").toString()) as SessionToken;
+    if (token.p !== provider || token.x < Date.now()) return null;
+    return token;
+  } catch {
+    return null;
+  }
+}
+
+function toSession(sessionId: string, token: SessionToken, uploadedBytes: number, chunkSize: number): UploadSession {
+  return {
+    sessionId,
+    provider: token.p,
+    bucket: token.b,
+    path: token.k,
+    mimeType: token.m,
+    totalBytes: token.t,
+    uploadedBytes,
+    chunkSize,
+    expiresAt: new Date(token.x).toISOString(),
+    metadata: token.meta ?? {},
+  };
+}
+
+function checkChunk(token: SessionToken, offset: number, data: Buffer, uploadedBytes: number, chunkSize: number) {
+  if (offset !== uploadedBytes) {
+    throw new UploadOffsetError(uploadedBytes);
+  }
+  const remaining = token.t - offset;
+  if (data.length > remaining || (data.length !== chunkSize && data.length !== remaining)) {
+    throw new UploadSessionError(`Chunk must be ${Math.min(chunkSize, remaining)} bytes`);
+  }
+}
+
+// ---------------------------------------------------------------------------
+// Supabase
+// ---------------------------------------------------------------------------
+
+// Buckets confirmed (or created) by this process. Checked once per bucket
+// instead of listing every bucket before each upload; a failed check is
+// forgotten so the next upload retries it.
+const ensuredBuckets = new Map<string, Promise<void>>();
+
+async function supabase() {
+  // Imported lazily: lib/supabase throws at import time without a URL, and
+  // the local adapter must work without Supabase configured.
+  const { supabaseService } = await import("./supabase");
+  return supabaseService();
 }
 
 class SupabaseStorageClient implements StorageClient {
@@ -28,34 +189,46 @@ class SupabaseStorageClient implements StorageClient {
     this.bucket = bucket;
   }
 
+  private async ensureBucket(): Promise<void> {
+    let pending = ensuredBuckets.get(this.bucket);
+    if (!pending) {
+      pending = (async () => {
+        const client = await supabase();
+        const { data: buckets, error: listError } = await client.storage.listBuckets();
+        if (listError) throw listError;
+        const bucketExists = buckets?.some(b => b.id === this.bucket || b.name === this.bucket);
+        if (!bucketExists) {
+          // Try to create the bucket (this might fail if user doesn't have permission, but that's okay)
+          await client.storage.createBucket(this.bucket, {
+            public: false,
+            fileSizeLimit: 5242880, // 5MB
+            allowedMimeTypes: ['application/pdf', 'image/jpeg', 'image/jpg', 'image/png'],
+          });
+        }
+      })();
+      ensuredBuckets.set(this.bucket, pending);
+      pending.catch(() => ensuredBuckets.delete(this.bucket));
+    }
+    // Upload anyway if the check fails; the upload reports the real error
+    await pending.catch(() => undefined);
+  }
+
   async upload(
     key: string,
-    data: Buffer,
+    data: UploadBody,
     mimeType: string
   ): Promise<UploadResult> {
-    const client = supabaseService();
-    
-    // Ensure the bucket exists, create if it doesn't
-    const { data: buckets, error: listError } = await client.storage.listBuckets();
-    if (!listError) {
-      const bucketExists = buckets?.some(b => b.id === this.bucket || b.name === this.bucket);
-      if (!bucketExists) {
-        // Try to create the bucket (this might fail if user doesn't have permission, but that's okay)
-        await client.storage.createBucket(this.bucket, {
-          public: false,
-          fileSizeLimit: 5242880, // 5MB
-          allowedMimeTypes: ['application/pdf', 'image/jpeg', 'image/jpg', 'image/png'],
-        });
-      }
-    }
+    await this.ensureBucket();
+    const client = await supabase();
 
-    // Upload the file
+    // Upload the file; streams go out as a chunked request body
     const { data: uploadData, error } = await client.storage
       .from(this.bucket)
       .upload(key, data, {
         contentType: mimeType,
         upsert: false,
         cacheControl: '3600',
+        ...(Buffer.isBuffer(data) ? {} : { duplex: 'half' }),
       });
 
     if (error) {
@@ -74,12 +247,20 @@ class SupabaseStorageClient implements StorageClient {
     };
   }
 
+  async remove(bucket: string, path: string): Promise<void> {
+    const client = await supabase();
+    const { error } = await client.storage.from(bucket).remove([path]);
+    if (error) {
+      throw new Error(`Supabase remove failed: ${error.message}`);
+    }
+  }
+
   async signedUrl(
     bucket: string,
     path: string,
     expiresInSeconds: number
   ): Promise<string> {
-    const client = supabaseService();
+    const client = await supabase();
     const { data, error } = await client.storage
       .from(bucket)
       .createSignedUrl(path, expiresInSeconds);
@@ -90,14 +271,257 @@ class SupabaseStorageClient implements StorageClient {
 
     return data.signedUrl;
   }
+
+  // Resumable uploads use Supabase's TUS endpoint; the upload URL lives in
+  // the signed session token, and the stored offset is read back with HEAD.
+
+  private tusHeaders(extra: Record<string, string> = {}): Record<string, string> {
+    const serviceKey = process.env.SUPABASE_SERVICE_ROLE_KEY;
+    if (!serviceKey) {
+      throw new Error("Missing Supabase Service Role Key. Please set SUPABASE_SERVICE_ROLE_KEY environment variable.");
+    }
+    return { Authorization: `Bearer ${serviceKey}`, "Tus-Resumable": "1.0.0", ...extra };
+  }
+
+  async createUploadSession(
+    key: string,
+    mimeType: string,
+    totalBytes: number,
+    metadata: Record<string, unknown> = {}
+  ): Promise<UploadSession> {
+    await this.ensureBucket();
+    const baseUrl = process.env.NEXT_PUBLIC_SUPABASE_URL || process.env.SUPABASE_URL;
+    const b64 = (value: string) => Buffer.from(value).toString("base64");
+
+    const res = await fetch(`${baseUrl}/storage/v1/upload/resumable`, {
+      method: "POST",
+      headers: this.tusHeaders({
+        "Upload-Length": String(totalBytes),
+        "Upload-Metadata": [
+          `bucketName ${b64(this.bucket)}`,
+          `objectName ${b64(key)}`,
+          `contentType ${b64(mimeType)}`,
+          `cacheControl ${b64("3600")}`,
+        ].join(","),
+      }),
+    });
+    const location = res.headers.get("location");
+    if (res.status !== 201 || !location) {
+      throw new Error(`Supabase resumable upload failed: ${res.status} ${await res.text()}`);
+    }
+
+    const token: SessionToken = {
+      p: "supabase",
+      b: this.bucket,
+      k: key,
+      m: mimeType,
+      t: totalBytes,
+      x: Date.now() + SESSION_TTL_MS,
+      u: new URL(location, baseUrl).toString(),
+      meta: metadata,
+    };
+    return toSession(encodeSessionToken(token), token, 0, SUPABASE_CHUNK_SIZE);
+  }
+
+  private async storedOffset(token: SessionToken): Promise<number | null> {
+    const res = await fetch(token.u!, { method: "HEAD", headers: this.tusHeaders() });
+    if (!res.ok) return null;
+    return Number(res.headers.get("upload-offset") ?? 0);
+  }
+
+  async getUploadSession(sessionId: string): Promise<UploadSession | null> {
+    const token = decodeSessionToken(sessionId, "supabase");
+    if (!token) return null;
+    const offset = await this.storedOffset(token);
+    if (offset === null) return null;
+    return toSession(sessionId, token, offset, SUPABASE_CHUNK_SIZE);
+  }
+
+  async uploadChunk(sessionId: string, offset: number, data: Buffer): Promise<UploadChunkResult> {
+    const token = decodeSessionToken(sessionId, "supabase");
+    if (!token) throw new UploadSessionError();
+    const stored = await this.storedOffset(token);
+    if (stored === null) throw new UploadSessionError();
+    checkChunk(token, offset, data, stored, SUPABASE_CHUNK_SIZE);
+
+    const res = await fetch(token.u!, {
+      method: "PATCH",
+      headers: this.tusHeaders({
+        "Upload-Offset": String(offset),
+        "Content-Type": "application/offset+octet-stream",
+      }),
+      body: data,
+    });
+    if (res.status === 409) {
+      throw new UploadOffsetError(Number(res.headers.get("upload-offset") ?? stored));
+    }
+    if (!res.ok) {
+      throw new Error(`Supabase chunk upload failed: ${res.status} ${await res.text()}`);
+    }
+
+    const uploadedBytes = Number(res.headers.get("upload-offset") ?? offset + data.length);
+    return {
+      session: toSession(sessionId, token, uploadedBytes, SUPABASE_CHUNK_SIZE),
+      completed:
+        uploadedBytes >= token.t ? { provider: "supabase", bucket: token.b, path: token.k } : null,
+    };
+  }
 }
 
-const defaultBucket = process.env.SUPABASE_BUCKET_NAME || BUCKET_NAME;
-export const storageClient: StorageClient = new SupabaseStorageClient(
-  defaultBucket
-);
+// ---------------------------------------------------------------------------
+// Local filesystem (development, tests and throughput benchmarks)
+// ---------------------------------------------------------------------------
+
+class LocalStorageClient implements StorageClient {
+  constructor(private bucket: string, private root: string) {}
+
+  /** Absolute path for an object, refusing keys that escape the bucket. */
+  objectPath(bucket: string, key: string): string {
+    const bucketDir = path.resolve(this.root, bucket);
+    const target = path.resolve(bucketDir, key);
+    if (!target.startsWith(bucketDir + path.sep)) {
+      throw new Error(`Invalid storage key: ${key}`);
+    }
+    return target;
+  }
+
+  private stagingPath(id: string): string {
+    return path.join(this.root, ".sessions", `${id}.part`);
+  }
+
+  private async place(source: string, target: string): Promise<void> {
+    await fs.mkdir(path.dirname(target), { recursive: true });
+    // Refuse to overwrite, like the Supabase adapter (upsert: false)
+    await fs.link(source, target).catch((err) => {
+      throw err.code === "EEXIST" ? new Error(`Local upload failed: ${path.basename(target)} already exists`) : err;
+    });
+    await fs.unlink(source);
+  }
+
+  async upload(key: string, data: UploadBody, _mimeType: string): Promise<UploadResult> {
+    const target = this.objectPath(this.bucket, key);
+    const temp = this.stagingPath(randomUUID());
+    await fs.mkdir(path.dirname(temp), { recursive: true });
+
+    try {
+      await pipeline(Buffer.isBuffer(data) ? Readable.from([data]) : data, createWriteStream(temp));
+      await this.place(temp, target);
+    } catch (err) {
+      await fs.rm(temp, { force: true });
+      throw err;
+    }
+
+    return { provider: "local", bucket: this.bucket, path: key };
+  }
+
+  async remove(bucket: string, key: string): Promise<void> {
+    await fs.rm(this.objectPath(bucket, key), { force: true });
+  }
+
+  async signedUrl(bucket: string, key: string, expiresInSeconds: number): Promise<string> {
+    const expires = Date.now() + expiresInSeconds * 1000;
+    const signature = sign(`${bucket}/${key}:${expires}`);
+    const base = process.env.LOCAL_STORAGE_PUBLIC_URL || "/api/files/local";
+    const encodedKey = key.split("/").map(encodeURIComponent).join("/");
+    return `${base}/${encodeURIComponent(bucket)}/${encodedKey}?expires=${expires}&signature=${signature}`;
+  }
+
+  async createUploadSession(
+    key: string,
+    mimeType: string,
+    totalBytes: number,
+    metadata: Record<string, unknown> = {}
+  ): Promise<UploadSession> {
+    this.objectPath(this.bucket, key);
+    const id = randomUUID();
+    const staging = this.stagingPath(id);
+    await fs.mkdir(path.dirname(staging), { recursive: true });
+    await fs.writeFile(staging, Buffer.alloc(0));
+
+    const token: SessionToken = {
+      p: "local",
+      b: this.bucket,
+      k: key,
+      m: mimeType,
+      t: totalBytes,
+      x: Date.now() + SESSION_TTL_MS,
+      i: id,
+      meta: metadata,
+    };
+    return toSession(encodeSessionToken(token), token, 0, LOCAL_CHUNK_SIZE);
+  }
+
+  private async stagedBytes(token: SessionToken): Promise<number | null> {
+    const stat = await fs.stat(this.stagingPath(token.i!)).catch(() => null);
+    return stat ? stat.size : null;
+  }
+
+  async getUploadSession(sessionId: string): Promise<UploadSession | null> {
+    const token = decodeSessionToken(sessionId, "local");
+    if (!token) return null;
+    const staged = await this.stagedBytes(token);
+    if (staged === null) return null;
+    return toSession(sessionId, token, staged, LOCAL_CHUNK_SIZE);
+  }
+
+  async uploadChunk(sessionId: string, offset: number, data: Buffer): Promise<UploadChunkResult> {
+    const token = decodeSessionToken(sessionId, "local");
+    if (!token) throw new UploadSessionError();
+    const staged = await this.stagedBytes(token);
+    if (staged === null) throw new UploadSessionError();
+    checkChunk(token, offset, data, staged, LOCAL_CHUNK_SIZE);
+
+    const staging = this.stagingPath(token.i!);
+    await fs.appendFile(staging, data);
+    const uploadedBytes = offset + data.length;
+
+    if (uploadedBytes < token.t) {
+      return { session: toSession(sessionId, token, uploadedBytes, LOCAL_CHUNK_SIZE), completed: null };
+    }
+
+    await this.place(staging, this.objectPath(token.b, token.k));
+    return {
+      session: toSession(sessionId, token, uploadedBytes, LOCAL_CHUNK_SIZE),
+      completed: { provider: "local", bucket: token.b, path: token.k },
+    };
+  }
+}
+
+const localRoot = path.resolve(process.env.LOCAL_STORAGE_DIR || ".storage");
+
+/**
+ * Open a stored local object if `signature` matches a URL issued by
+ * LocalStorageClient.signedUrl and has not expired.
+ */
+export async function openLocalObject(
+  bucket: string,
+  key: string,
+  expires: number,
+  signature: string
+): Promise<Readable | null> {
+  if (!Number.isFinite(expires) || expires < Date.now()) return null;
+  if (!verifySignature(`${bucket}/${key}:${expires}`, signature)) return null;
+
+  const file = new LocalStorageClient(bucket, localRoot).objectPath(bucket, key);
+  const exists = await fs.stat(file).then((s) => s.isFile(), () => false);
+  return exists ? createReadStream(file) : null;
+}
+
+// Default mirrors BUCKET_NAME in lib/supabase (not imported here, see supabase())
+const defaultBucket = process.env.SUPABASE_BUCKET_NAME || "insurancePolicies";
+const provider: StorageProviderName = process.env.STORAGE_PROVIDER === "local" ? "local" : "supabase";
 
 // Helper function to create a storage client with a custom bucket
 export function createStorageClient(bucket: string): StorageClient {
-  return new SupabaseStorageClient(bucket);
-}
\ No newline at end of file
+  return provider === "local"
+    ? new LocalStorageClient(bucket, localRoot)
+    : new SupabaseStorageClient(bucket);
+}
+
+export const storageClient: StorageClient = createStorageClient(defaultBucket);
+
+/** Client for the bucket an upload session was started in, or null for an invalid token. */
+export function storageClientForSession(sessionId: string): StorageClient | null {
+  const token = decodeSessionToken(sessionId, provider);
+  return token ? createStorageClient(token.b) : null;
+}
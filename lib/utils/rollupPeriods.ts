@@ -0,0 +1,97 @@
+/**
+ * Rollup Period Utilities
+ *
+ * UTC week (ISO, Monday-start) and month arithmetic shared by the rollup
+ * tables. Readers cover a range with whole periods and read the partial
+ * periods at the edges from the underlying daily rows.
+ */
+
+import { Prisma } from "@prisma/client";
+
+export type RollupPeriod = "WEEK" | "MONTH";
+
+export type Span = [Date, Date];
+
+export const DAY_MS = 24 * 60 * 60 * 1000;
+
+export function utcDay(d: Date): Date {
+  return new Date(Date.UTC(d.getUTCFullYear(), d.getUTCMonth(), d.getUTCDate()));
+}
+
+/** Start of the UTC ISO week (Monday) or month containing `d`. */
+export function periodStartOf(period: RollupPeriod, d: Date): Date {
+  const day = utcDay(d);
+  if (period === "MONTH") {
+    return new Date(Date.UTC(day.getUTCFullYear(), day.getUTCMonth(), 1));
+  }
+  const offset = (day.getUTCDay() + 6) % 7;
+  return new Date(day.getTime() - offset * DAY_MS);
+}
+
+export function periodEnd(period: RollupPeriod, start: Date): Date {
+  if (period === "MONTH") {
+    return new Date(Date.UTC(start.getUTCFullYear(), start.getUTCMonth() + 1, 1));
+  }
+  return new Date(start.getTime() + 7 * DAY_MS);
+}
+
+/** Whole periods inside [start, end) plus the uncovered leftovers. */
+export function coverWithPeriods(
+  period: RollupPeriod,
+  [start, end]: Span,
+): { starts: Date[]; rest: Span[] } {
+  let p = periodStartOf(period, start);
+  if (p < start) p = periodEnd(period, p);
+
+  const starts: Date[] = [];
+  while (periodEnd(period, p) <= end) {
+    starts.push(p);
+    p = periodEnd(period, p);
+  }
+  if (!starts.length) return { starts, rest: [[start, end]] };
+
+  const rest: Span[] = [];
+  if (start < starts[0]) rest.push([start, starts[0]]);
+  if (p < end) rest.push([p, end]);
+  return { starts, rest };
+}
+
+export type RollupPlan = {
+  periods: { period: RollupPeriod; start: Date }[];
+  days: Span[];
+};
+
+/** Cover [from, toExclusive) with months, then weeks, then daily spans. */
+export function planSummaryRead(from: Date, toExclusive: Date): RollupPlan {
+  const months = coverWithPeriods("MONTH", [from, toExclusive]);
+  const periods = months.starts.map((start) => ({ period: "MONTH" as const, start }));
+  const days: Span[] = [];
+  for (const span of months.rest) {
+    const weeks = coverWithPeriods("WEEK", span);
+    periods.push(...weeks.starts.map((start) => ({ period: "WEEK" as const, start })));
+    days.push(...weeks.rest);
+  }
+  return { periods, days };
+}
+
+/** Every week and month touching the inclusive day range [from, to]. */
+export function periodsTouching(
+  from: Date,
+  to: Date,
+): { period: RollupPeriod; start: Date; end: Date }[] {
+  const out: { period: RollupPeriod; start: Date; end: Date }[] = [];
+  for (const period of ["WEEK", "MONTH"] as const) {
+    for (let p = periodStartOf(period, from); p <= to; p = periodEnd(period, p)) {
+      out.push({ period, start: p, end: periodEnd(period, p) });
+    }
+  }
+  return out;
+}
+
+/** `column` falls inside any of the half-open spans. */
+export function spanFilter(column: Prisma.Sql, spans: Span[]): Prisma.Sql {
+  return Prisma.join(
+    spans.map(([start, end]) => Prisma.sql`(${column} >= ${start} AND ${column} < ${end})`),
+    " OR ",
+  );
+}
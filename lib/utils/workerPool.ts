@@ -0,0 +1,56 @@
+/**
+ * Worker Pool Utilities
+ *
+ * Bounded-concurrency helpers for fanning work out without exhausting the
+ * Prisma connection pool (5 connections) or an upstream API quota.
+ */
+
+export type PoolResult<R> =
+  | { ok: true; value: R }
+  | { ok: false; error: any };
+
+/**
+ * Run `fn` over `items` with at most `concurrency` calls in flight.
+ *
+ * Never rejects: each item settles to `{ ok, value }` or `{ ok: false, error }`,
+ * in the same order as `items`.
+ *
+ * @param items - Work items
+ * @param concurrency - Maximum number of concurrent calls (min 1)
+ * @param fn - Worker function
+ */
+export async function runWithConcurrency<T, R>(
+  items: readonly T[],
+  concurrency: number,
+  fn: (item: T, index: number) => Promise<R>
+): Promise<PoolResult<R>[]> {
+  const results: PoolResult<R>[] = new Array(items.length);
+  const workerCount = Math.max(1, Math.min(Math.floor(concurrency) || 1, items.length));
+  let next = 0;
+
+  async function worker() {
+    while (next < items.length) {
+      const index = next++;
+      try {
+        results[index] = { ok: true, value: await fn(items[index], index) };
+      } catch (error) {
+        results[index] = { ok: false, error };
+      }
+    }
+  }
+
+  await Promise.all(Array.from({ length: workerCount }, () => worker()));
+  return results;
+}
+
+/**
+ * Split an array into chunks of at most `size` elements
+ */
+export function chunk<T>(items: readonly T[], size: number): T[][] {
+  const chunks: T[][] = [];
+  const step = Math.max(1, Math.floor(size));
+  for (let i = 0; i < items.length; i += step) {
+    chunks.push(items.slice(i, i + step));
+  }
+  return chunks;
+}
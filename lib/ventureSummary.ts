@@ -0,0 +1,454 @@
+import { Prisma } from "@prisma/client";
+import prisma from "./prisma";
+import { DAY_MS, utcDay } from "./utils/rollupPeriods";
+
+/**
+ * Per-venture summary snapshots for the landing pages.
+ *
+ * VentureSummarySnapshot keeps one compact JSON row per venture: current
+ * counts (offices, properties, agents, MRR, latest bank balance), additive
+ * totals for the trailing landing windows, and task/policy counts by test
+ * flag and office. Triggers on the source tables mark a venture's row stale
+ * on write; readers load every row in scope with one query, refresh only the
+ * stale ones (set-wise, across ventures), and merge by the viewer's scope.
+ */
+
+const MAX_AGE_MS = Number(process.env.VENTURE_SUMMARY_MAX_AGE_MS ?? 60 * 60 * 1000);
+
+export const LANDING_WINDOW_DAYS = 30;
+
+export type SummaryWindow = { key: string; from: Date; toExclusive: Date };
+
+export type VentureWindowTotals = {
+  loads: number;
+  deliveredLoads: number;
+  atRiskLoads: number;
+  loadRevenue: number;
+  loadMargin: number;
+  kpiDays: number;
+  roomsAvailable: number;
+  roomsSold: number;
+  roomRevenue: number;
+  adrSum: number;
+  revparSum: number;
+  lossNights: number;
+  calls: number;
+  talkSeconds: number;
+  churnedSubscriptions: number;
+  endMrr: number;
+  incentives: number;
+  incentiveUserIds: number[];
+};
+
+/** [openTasks, overdueTasks, activePolicies, expiringPolicies] */
+export type OpsCounts = [number, number, number, number];
+
+export type VentureSummary = {
+  ventureId: number;
+  offices: number;
+  properties: number;
+  agents: number;
+  mrr: number;
+  activeCustomers: number;
+  bank: { balance: number; date: string } | null;
+  windows: Record<string, VentureWindowTotals>;
+  /** Keyed `${isTest ? 1 : 0}:${officeId ?? ""}`. */
+  ops: Record<string, OpsCounts>;
+};
+
+export function emptyWindowTotals(): VentureWindowTotals {
+  return {
+    loads: 0,
+    deliveredLoads: 0,
+    atRiskLoads: 0,
+    loadRevenue: 0,
+    loadMargin: 0,
+    kpiDays: 0,
+    roomsAvailable: 0,
+    roomsSold: 0,
+    roomRevenue: 0,
+    adrSum: 0,
+    revparSum: 0,
+    lossNights: 0,
+    calls: 0,
+    talkSeconds: 0,
+    churnedSubscriptions: 0,
+    endMrr: 0,
+    incentives: 0,
+    incentiveUserIds: [],
+  };
+}
+
+/** `[from, toExclusive)` as "current" and the same-length window before it as "previous". */
+export function comparisonWindows(from: Date, toExclusive: Date): SummaryWindow[] {
+  const span = toExclusive.getTime() - from.getTime();
+  return [
+    { key: "current", from, toExclusive },
+    { key: "previous", from: new Date(from.getTime() - span), toExclusive: from },
+  ];
+}
+
+/** The default landing range: the trailing 30 UTC days including today. */
+export function landingWindows(now: Date = new Date()): SummaryWindow[] {
+  const end = new Date(utcDay(now).getTime() + DAY_MS);
+  return comparisonWindows(new Date(end.getTime() - LANDING_WINDOW_DAYS * DAY_MS), end);
+}
+
+function windowsSql(windows: SummaryWindow[]): Prisma.Sql {
+  return Prisma.sql`unnest(
+    ${windows.map((w) => w.key)}::text[],
+    ${windows.map((w) => w.from.toISOString())}::timestamp[],
+    ${windows.map((w) => w.toExclusive.toISOString())}::timestamp[]
+  ) AS w("key", "from", "to")`;
+}
+
+const num = (v: unknown) => Number(v ?? 0);
+
+type WindowRow = { ventureId: number; key: string } & Record<string, unknown>;
+
+/**
+ * Compute summaries for `ventureIds` straight from the source tables, with
+ * one grouped query per source covering every venture and window.
+ * `asOf` bounds the bank balance (exclusive; defaults to the first window's end).
+ */
+export async function computeVentureSummaries(
+  ventureIds: number[],
+  windows: SummaryWindow[],
+  opts: { includeTest?: boolean; asOf?: Date; ops?: boolean; now?: Date } = {},
+): Promise<Map<number, VentureSummary>> {
+  const out = new Map<number, VentureSummary>();
+  if (!ventureIds.length) return out;
+
+  const { includeTest = false, asOf = windows[0].toExclusive, now = new Date() } = opts;
+  const live = (alias: string) =>
+    includeTest ? Prisma.empty : Prisma.sql`AND NOT ${Prisma.raw(alias)}."isTest"`;
+  const w = windowsSql(windows);
+
+  const [ventures, loads, rooms, calls, subs, incentives, ops] = await Promise.all([
+    prisma.$queryRaw<Record<string, any>[]>`
+      SELECT v."id" AS "ventureId",
+             (SELECT COUNT(*) FROM "Office" o WHERE o."ventureId" = v."id" ${live("o")})::int AS "offices",
+             (SELECT COUNT(*) FROM "HotelProperty" h
+              WHERE h."ventureId" = v."id" AND h."status" = 'ACTIVE' ${live("h")})::int AS "properties",
+             (SELECT COUNT(*) FROM "BpoAgent" a WHERE a."ventureId" = v."id" AND a."isActive")::int AS "agents",
+             (SELECT COALESCE(SUM(s."mrr"), 0) FROM "SaasSubscription" s
+              JOIN "SaasCustomer" c ON c."id" = s."customerId"
+              WHERE c."ventureId" = v."id" AND s."isActive")::float8 AS "mrr",
+             (SELECT COUNT(DISTINCT s."customerId") FROM "SaasSubscription" s
+              JOIN "SaasCustomer" c ON c."id" = s."customerId"
+              WHERE c."ventureId" = v."id" AND s."isActive")::int AS "activeCustomers",
+             b."balance", b."date" AS "bankDate"
+      FROM "Venture" v
+      LEFT JOIN LATERAL (
+        SELECT COALESCE(bs."balance", 0)::float8 AS "balance", bs."date"
+        FROM "BankAccountSnapshot" bs
+        WHERE bs."ventureId" = v."id" AND bs."date" < ${asOf}
+        ORDER BY bs."date" DESC
+        LIMIT 1
+      ) b ON TRUE
+      WHERE v."id" = ANY(${ventureIds})
+    `,
+    prisma.$queryRaw<WindowRow[]>`
+      SELECT l."ventureId", w."key", COUNT(*)::int AS "loads",
+             COUNT(*) FILTER (WHERE l."status" = 'DELIVERED')::int AS "deliveredLoads",
+             COUNT(*) FILTER (WHERE l."atRiskFlag")::int AS "atRiskLoads",
+             SUM(COALESCE(l."billAmount", l."sellRate", 0))::float8 AS "loadRevenue",
+             SUM(COALESCE(l."marginAmount", COALESCE(l."billAmount", l."sellRate", 0) - COALESCE(l."buyRate", 0)))::float8 AS "loadMargin"
+      FROM ${w}
+      JOIN "Load" l ON l."createdAt" >= w."from" AND l."createdAt" < w."to"
+      WHERE l."ventureId" = ANY(${ventureIds}) ${live("l")}
+      GROUP BY 1, 2
+    `,
+    prisma.$queryRaw<WindowRow[]>`
+      SELECT h."ventureId", w."key", SUM(s."kpiDay")::int AS "kpiDays",
+             SUM(s."roomsAvailable")::float8 AS "roomsAvailable", SUM(s."roomsSold")::float8 AS "roomsSold",
+             SUM(s."roomRevenue")::float8 AS "roomRevenue", SUM(s."adr")::float8 AS "adrSum",
+             SUM(s."revpar")::float8 AS "revparSum", SUM(s."loss")::int AS "lossNights"
+      FROM (
+        SELECT k."hotelId", k."date", 1 AS "kpiDay", k."roomsAvailable", k."roomsSold",
+               k."roomRevenue", k."adr", k."revpar", 0 AS "loss"
+        FROM "HotelKpiDaily" k
+        UNION ALL
+        SELECT d."hotelId", d."date", 0, 0, 0, 0, 0, 0, 1
+        FROM "HotelDailyReport" d
+        WHERE d."highLossFlag"
+      ) s
+      JOIN "HotelProperty" h ON h."id" = s."hotelId"
+      JOIN ${w} ON s."date" >= w."from" AND s."date" < w."to"
+      WHERE h."ventureId" = ANY(${ventureIds}) AND h."status" = 'ACTIVE' ${live("h")}
+      GROUP BY 1, 2
+    `,
+    prisma.$queryRaw<WindowRow[]>`
+      SELECT c."ventureId", w."key", COUNT(*)::int AS "calls",
+             SUM(GREATEST(0, ROUND(EXTRACT(EPOCH FROM COALESCE(c."callEndedAt", c."callStartedAt") - c."callStartedAt"))))::float8 AS "talkSeconds"
+      FROM ${w}
+      JOIN "BpoCallLog" c ON c."callStartedAt" >= w."from" AND c."callStartedAt" < w."to"
+      WHERE c."ventureId" = ANY(${ventureIds}) ${live("c")}
+      GROUP BY 1, 2
+    `,
+    prisma.$queryRaw<WindowRow[]>`
+      SELECT c."ventureId", w."key",
+             COUNT(*) FILTER (WHERE s."cancelledAt" >= w."from" AND s."cancelledAt" < w."to")::int AS "churnedSubscriptions",
+             COALESCE(SUM(s."mrr") FILTER (
+               WHERE s."startedAt" < w."to" AND (s."cancelledAt" IS NULL OR s."cancelledAt" >= w."to")
+             ), 0)::float8 AS "endMrr"
+      FROM ${w}
+      CROSS JOIN "SaasSubscription" s
+      JOIN "SaasCustomer" c ON c."id" = s."customerId"
+      WHERE c."ventureId" = ANY(${ventureIds})
+      GROUP BY 1, 2
+    `,
+    prisma.$queryRaw<WindowRow[]>`
+      SELECT i."ventureId", w."key", SUM(i."amount")::float8 AS "incentives",
+             ARRAY_AGG(DISTINCT i."userId") AS "incentiveUserIds"
+      FROM ${w}
+      JOIN "IncentiveDaily" i ON i."date" >= w."from" AND i."date" < w."to"
+      WHERE i."ventureId" = ANY(${ventureIds}) ${live("i")}
+      GROUP BY 1, 2
+    `,
+    opts.ops
+      ? prisma.$queryRaw<{ ventureId: number; isTest: boolean; officeId: number | null; counts: number[] }[]>`
+          SELECT t."ventureId", t."isTest", t."officeId",
+                 ARRAY[COUNT(*) FILTER (WHERE t."status" IN ('OPEN', 'IN_PROGRESS', 'BLOCKED')),
+                       COUNT(*) FILTER (WHERE t."status" = 'OVERDUE'), 0, 0]::int[] AS "counts"
+          FROM "Task" t
+          WHERE t."ventureId" = ANY(${ventureIds})
+          GROUP BY 1, 2, 3
+          UNION ALL
+          SELECT p."ventureId", p."isTest", p."officeId",
+                 ARRAY[0, 0, COUNT(*),
+                       COUNT(*) FILTER (WHERE p."endDate" > ${now} AND p."endDate" <= ${new Date(now.getTime() + 30 * DAY_MS)})]::int[]
+          FROM "Policy" p
+          WHERE p."ventureId" = ANY(${ventureIds}) AND p."status" = 'ACTIVE'
+          GROUP BY 1, 2, 3
+        `
+      : Promise.resolve([]),
+  ]);
+
+  for (const v of ventures) {
+    const windowTotals: Record<string, VentureWindowTotals> = {};
+    for (const { key } of windows) windowTotals[key] = emptyWindowTotals();
+    out.set(v.ventureId, {
+      ventureId: v.ventureId,
+      offices: num(v.offices),
+      properties: num(v.properties),
+      agents: num(v.agents),
+      mrr: num(v.mrr),
+      activeCustomers: num(v.activeCustomers),
+      bank: v.bankDate
+        ? { balance: num(v.balance), date: new Date(v.bankDate).toISOString().slice(0, 10) }
+        : null,
+      windows: windowTotals,
+      ops: {},
+    });
+  }
+
+  for (const row of [...loads, ...rooms, ...calls, ...subs, ...incentives]) {
+    const totals = out.get(row.ventureId)?.windows[row.key];
+    if (!totals) continue;
+    for (const [field, value] of Object.entries(row)) {
+      if (field === "ventureId" || field === "key") continue;
+      if (field === "incentiveUserIds") totals.incentiveUserIds = (value as number[]) ?? [];
+      else (totals as Record<string, unknown>)[field] = num(value);
+    }
+  }
+
+  for (const row of ops) {
+    const summary = out.get(row.ventureId);
+    if (!summary) continue;
+    const key = `${row.isTest ? 1 : 0}:${row.officeId ?? ""}`;
+    const counts = summary.ops[key] ?? [0, 0, 0, 0];
+    summary.ops[key] = counts.map((c, i) => c + num(row.counts[i])) as OpsCounts;
+  }
+
+  return out;
+}
+
+/**
+ * Recompute and store snapshots for `ventureIds` (default: every venture).
+ *
+ * Claiming the rows first moves `computedAt` to the start of the run, so a
+ * write that lands while we compute re-marks the row stale and the upsert
+ * keeps that mark instead of clearing it.
+ */
+export async function refreshVentureSummaries(
+  ventureIds?: number[],
+  now: Date = new Date(),
+): Promise<Map<number, VentureSummary>> {
+  const ids = ventureIds ?? (await prisma.venture.findMany({ select: { id: true } })).map((v) => v.id);
+  if (!ids.length) return new Map();
+
+  const [{ startedAt }] = await prisma.$queryRaw<{ startedAt: Date }[]>`
+    WITH t AS (SELECT date_trunc('milliseconds', now())::timestamp(3) AS "startedAt"),
+    claimed AS (
+      UPDATE "VentureSummarySnapshot"
+      SET "computedAt" = (SELECT "startedAt" FROM t),
+          "staleAt" = COALESCE("staleAt", (SELECT "startedAt" FROM t))
+      WHERE "ventureId" = ANY(${ids})
+    )
+    SELECT "startedAt" FROM t
+  `;
+
+  const windows = landingWindows(now);
+  const summaries = await computeVentureSummaries(ids, windows, { ops: true, now });
+  if (!summaries.size) return summaries;
+
+  await prisma.$executeRaw`
+    INSERT INTO "VentureSummarySnapshot" ("ventureId", "windowEnd", "summary", "computedAt")
+    SELECT (e->>'ventureId')::int, ${windows[0].toExclusive}, e, ${startedAt}
+    FROM jsonb_array_elements(${JSON.stringify([...summaries.values()])}::jsonb) e
+    ON CONFLICT ("ventureId") DO UPDATE SET
+      "windowEnd" = EXCLUDED."windowEnd",
+      "summary" = EXCLUDED."summary",
+      "computedAt" = EXCLUDED."computedAt",
+      "staleAt" = CASE WHEN "VentureSummarySnapshot"."staleAt" > EXCLUDED."computedAt"
+                       THEN "VentureSummarySnapshot"."staleAt" END
+    WHERE "VentureSummarySnapshot"."computedAt" <= EXCLUDED."computedAt"
+  `;
+
+  return summaries;
+}
+
+type SnapshotRow = {
+  id: number;
+  type: string;
+  summary: VentureSummary | null;
+  windowEnd: Date | null;
+  computedAt: Date | null;
+  staleAt: Date | null;
+};
+
+/**
+ * Every venture in scope with its landing snapshot, in one query; missing,
+ * stale, rolled-over or expired snapshots are refreshed together first.
+ * `ventureIds: null` means every venture.
+ */
+export async function readVentureSummaries(
+  filter: { ventureIds: number[] | null; activeOnly?: boolean },
+  now: Date = new Date(),
+): Promise<{ ventures: { id: number; type: string }[]; summaries: VentureSummary[] }> {
+  const rows = await prisma.$queryRaw<SnapshotRow[]>`
+    SELECT v."id", v."type"::text AS "type", s."summary", s."windowEnd", s."computedAt", s."staleAt"
+    FROM "Venture" v
+    LEFT JOIN "VentureSummarySnapshot" s ON s."ventureId" = v."id"
+    WHERE ${filter.ventureIds ? Prisma.sql`v."id" = ANY(${filter.ventureIds})` : Prisma.sql`TRUE`}
+      ${filter.activeOnly ? Prisma.sql`AND v."isActive" AND NOT v."isTest"` : Prisma.empty}
+    ORDER BY v."id"
+  `;
+
+  const windowEnd = landingWindows(now)[0].toExclusive.getTime();
+  const stale = rows.filter(
+    (r) =>
+      !r.summary ||
+      r.staleAt ||
+      r.windowEnd?.getTime() !== windowEnd ||
+      now.getTime() - (r.computedAt?.getTime() ?? 0) > MAX_AGE_MS,
+  );
+  const refreshed = stale.length
+    ? await refreshVentureSummaries(stale.map((r) => r.id), now)
+    : new Map<number, VentureSummary>();
+
+  const summaries: VentureSummary[] = [];
+  for (const r of rows) {
+    const summary = refreshed.get(r.id) ?? r.summary;
+    if (summary) summaries.push(summary);
+  }
+  return { ventures: rows.map((r) => ({ id: r.id, type: r.type })), summaries };
+}
+
+const round1 = (n: number) => Number(n.toFixed(1));
+
+/**
+ * Parent dashboard sections for one window, summed over `summaries`.
+ * `days` is the window length used by the BPO utilization heuristic.
+ */
+export function mergeVentureSummaries(summaries: VentureSummary[], windowKey: string, days: number) {
+  const t = emptyWindowTotals();
+  const employees = new Set<number>();
+  let venturesWithIncentives = 0;
+  let offices = 0;
+  let properties = 0;
+  let agents = 0;
+  let mrr = 0;
+  let activeCustomers = 0;
+  let bankTotal = 0;
+  let bankAsOf: string | null = null;
+
+  for (const s of summaries) {
+    offices += s.offices;
+    properties += s.properties;
+    agents += s.agents;
+    mrr += s.mrr;
+    activeCustomers += s.activeCustomers;
+    if (s.bank) {
+      bankTotal += s.bank.balance;
+      if (!bankAsOf || s.bank.date > bankAsOf) bankAsOf = s.bank.date;
+    }
+
+    const w = s.windows[windowKey];
+    if (!w) continue;
+    for (const field of Object.keys(t) as (keyof VentureWindowTotals)[]) {
+      if (field !== "incentiveUserIds") t[field] += w[field];
+    }
+    if (w.incentiveUserIds.length) venturesWithIncentives += 1;
+    for (const id of w.incentiveUserIds) employees.add(id);
+  }
+
+  const theoreticalMinutes = agents * days * 6 * 60;
+
+  return {
+    offices,
+    bank: { total: bankTotal, asOf: bankAsOf },
+    logistics: {
+      totalLoads: t.loads,
+      deliveredLoads: t.deliveredLoads,
+      marginPct: t.loadRevenue > 0 ? round1((t.loadMargin / t.loadRevenue) * 100) : 0,
+      atRiskLoads: t.atRiskLoads,
+    },
+    hospitality: {
+      properties,
+      occupancyPct: t.roomsAvailable > 0 ? round1((t.roomsSold / t.roomsAvailable) * 100) : 0,
+      adr: t.kpiDays ? round1(t.adrSum / t.kpiDays) : 0,
+      revpar: t.kpiDays ? round1(t.revparSum / t.kpiDays) : 0,
+      highLossNights: t.lossNights,
+    },
+    bpo: {
+      agents,
+      totalCalls: t.calls,
+      avgTalkMinutes: t.calls ? round1(t.talkSeconds / t.calls / 60) : 0,
+      // Very rough utilization heuristic: talk time vs 6 hours/day per agent in window
+      utilizationPct: theoreticalMinutes ? round1((t.talkSeconds / 60 / theoreticalMinutes) * 100) : 0,
+    },
+    saas: {
+      mrr: Math.round(mrr),
+      arr: Math.round(mrr * 12),
+      netGrowthPct: t.endMrr ? round1(((mrr - t.endMrr) / t.endMrr) * 100) : 0,
+      activeCustomers,
+      churnedCustomers: t.churnedSubscriptions,
+    },
+    incentives: {
+      totalIncentives: t.incentives,
+      venturesWithIncentives,
+      employeesWithIncentives: employees.size,
+    },
+  };
+}
+
+/** Task and policy counts visible to a viewer; `officeIds: null` means every office. */
+export function mergeOpsCounts(
+  summaries: VentureSummary[],
+  viewer: { isTest: boolean; officeIds: number[] | null },
+) {
+  const prefix = `${viewer.isTest ? 1 : 0}:`;
+  const totals: OpsCounts = [0, 0, 0, 0];
+  for (const s of summaries) {
+    for (const [key, counts] of Object.entries(s.ops)) {
+      if (!key.startsWith(prefix)) continue;
+      const office = key.slice(prefix.length);
+      if (viewer.officeIds && office !== "" && !viewer.officeIds.includes(Number(office))) continue;
+      counts.forEach((c, i) => (totals[i] += c));
+    }
+  }
+  const [openTasks, overdueTasks, activePolicies, expiringPolicies] = totals;
+  return { openTasks, overdueTasks, activePolicies, expiringPolicies };
+}
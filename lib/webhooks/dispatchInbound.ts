@@ -0,0 +1,277 @@
+import { prisma } from "@/lib/prisma";
+import { sendNewMessageNotification } from "@/lib/dispatch-notifications";
+import { extractEmail, normalizePhone } from "@/lib/outreach/inboundHandler";
+
+// Queue processors for the dispatch inbox callbacks
+// (/api/webhooks/dispatch/twilio-sms and /api/webhooks/dispatch/sendgrid-email).
+// Timestamps are the time the callback was received, not the time it was processed.
+
+export type DispatchSmsPayload = Record<string, any> & {
+  From: string;
+  To?: string;
+  Body: string;
+  MessageSid?: string;
+  AccountSid?: string;
+};
+
+export type DispatchEmailFields = Record<string, string>;
+
+export function dispatchSmsOrderingKey(from: string): string {
+  return `dispatch-sms:${normalizePhone(from)}`;
+}
+
+export function dispatchEmailOrderingKey(from: string): string {
+  return `dispatch-email:${extractEmail(from)}`;
+}
+
+async function defaultLogisticsVenture() {
+  return prisma.venture.findFirst({
+    where: { type: "LOGISTICS", isActive: true, isTest: false },
+  });
+}
+
+export async function processDispatchSms(payload: DispatchSmsPayload, receivedAt: Date) {
+  const { From, To, Body, MessageSid, AccountSid } = payload;
+  const normalizedFrom = normalizePhone(From);
+
+  if (MessageSid) {
+    const existingMessage = await prisma.dispatchMessage.findFirst({
+      where: { externalId: MessageSid },
+    });
+
+    if (existingMessage) {
+      console.log(`[DISPATCH SMS] Duplicate message ${MessageSid}`);
+      return { success: true, duplicate: true };
+    }
+  }
+
+  const driver = await prisma.dispatchDriver.findFirst({
+    where: {
+      OR: [
+        { phone: { contains: normalizedFrom } },
+        { phone: From },
+      ],
+    },
+  });
+
+  let conversation = await prisma.dispatchConversation.findFirst({
+    where: {
+      channel: "SMS",
+      externalAddress: { contains: normalizedFrom },
+      status: { not: "ARCHIVED" },
+    },
+    orderBy: { lastMessageAt: "desc" },
+  });
+
+  if (!conversation && driver) {
+    conversation = await prisma.dispatchConversation.create({
+      data: {
+        ventureId: driver.ventureId,
+        channel: "SMS",
+        status: "OPEN",
+        participantType: "DRIVER",
+        participantId: driver.id,
+        driverId: driver.id,
+        externalAddress: From,
+        lastMessageAt: receivedAt,
+        unreadCount: 1,
+      },
+    });
+    console.log(`[DISPATCH SMS] Created new conversation ${conversation.id} for driver ${driver.id}`);
+  } else if (!conversation) {
+    const defaultVenture = await defaultLogisticsVenture();
+
+    if (!defaultVenture) {
+      throw new Error("No default venture configured");
+    }
+
+    conversation = await prisma.dispatchConversation.create({
+      data: {
+        ventureId: defaultVenture.id,
+        channel: "SMS",
+        status: "OPEN",
+        participantType: "DRIVER",
+        externalAddress: From,
+        lastMessageAt: receivedAt,
+        unreadCount: 1,
+      },
+    });
+    console.log(`[DISPATCH SMS] Created new conversation ${conversation.id} for unknown sender`);
+  }
+
+  const message = await prisma.dispatchMessage.create({
+    data: {
+      conversationId: conversation.id,
+      direction: "INBOUND",
+      channel: "SMS",
+      fromAddress: From,
+      toAddress: To,
+      body: Body,
+      status: "DELIVERED",
+      externalId: MessageSid,
+      sentAt: receivedAt,
+      deliveredAt: receivedAt,
+      metadata: {
+        AccountSid,
+        ...payload,
+      },
+    },
+  });
+
+  await prisma.dispatchConversation.update({
+    where: { id: conversation.id },
+    data: {
+      lastMessageAt: receivedAt,
+      unreadCount: { increment: 1 },
+    },
+  });
+
+  console.log(`[DISPATCH SMS] Stored message ${message.id} in conversation ${conversation.id}`);
+
+  sendNewMessageNotification(conversation.ventureId, {
+    type: "NEW_MESSAGE",
+    conversationId: conversation.id,
+    message: Body.substring(0, 100),
+    fromAddress: From,
+    channel: "SMS",
+  });
+
+  return { success: true, messageId: message.id, conversationId: conversation.id };
+}
+
+export async function processDispatchEmail(fields: DispatchEmailFields, receivedAt: Date) {
+  const from = fields.from || fields.From || "";
+  const to = fields.to || fields.To || "";
+  const subject = fields.subject || fields.Subject || "";
+  const text = fields.text || fields.Text || "";
+  const html = fields.html || fields.Html || "";
+  const envelope = fields.envelope ? JSON.parse(fields.envelope) : {};
+
+  const fromEmail = extractEmail(from);
+  const toEmail = extractEmail(to);
+
+  const body = text || html?.replace(/<[^>]+>/g, "") || "";
+
+  const messageId = fields["message-id"] || fields.messageId;
+
+  if (messageId) {
+    const existingMessage = await prisma.dispatchMessage.findFirst({
+      where: { externalId: messageId },
+    });
+
+    if (existingMessage) {
+      console.log(`[DISPATCH EMAIL] Duplicate message ${messageId}`);
+      return { success: true, duplicate: true };
+    }
+  }
+
+  const driver = await prisma.dispatchDriver.findFirst({
+    where: {
+      email: { equals: fromEmail, mode: "insensitive" },
+    },
+  });
+
+  const carrier = !driver
+    ? await prisma.carrier.findFirst({
+        where: {
+          email: { equals: fromEmail, mode: "insensitive" },
+        },
+      })
+    : null;
+
+  let conversation = await prisma.dispatchConversation.findFirst({
+    where: {
+      channel: "EMAIL",
+      externalAddress: { equals: fromEmail, mode: "insensitive" },
+      status: { not: "ARCHIVED" },
+    },
+    orderBy: { lastMessageAt: "desc" },
+  });
+
+  if (!conversation) {
+    let ventureId: number;
+    let participantType: string;
+    let participantId: number | undefined;
+    let driverId: number | undefined;
+    let carrierId: number | undefined;
+
+    if (driver) {
+      ventureId = driver.ventureId;
+      participantType = "DRIVER";
+      participantId = driver.id;
+      driverId = driver.id;
+    } else if (carrier) {
+      const defaultVenture = await defaultLogisticsVenture();
+      ventureId = defaultVenture?.id || 1;
+      participantType = "CARRIER";
+      participantId = carrier.id;
+      carrierId = carrier.id;
+    } else {
+      const defaultVenture = await defaultLogisticsVenture();
+      if (!defaultVenture) {
+        throw new Error("No default venture configured");
+      }
+      ventureId = defaultVenture.id;
+      participantType = "DRIVER";
+    }
+
+    conversation = await prisma.dispatchConversation.create({
+      data: {
+        ventureId,
+        channel: "EMAIL",
+        subject,
+        status: "OPEN",
+        participantType,
+        participantId,
+        driverId,
+        carrierId,
+        externalAddress: fromEmail,
+        lastMessageAt: receivedAt,
+        unreadCount: 1,
+      },
+    });
+    console.log(`[DISPATCH EMAIL] Created new conversation ${conversation.id}`);
+  }
+
+  const message = await prisma.dispatchMessage.create({
+    data: {
+      conversationId: conversation.id,
+      direction: "INBOUND",
+      channel: "EMAIL",
+      fromAddress: fromEmail,
+      toAddress: toEmail,
+      subject,
+      body: body.substring(0, 65000),
+      status: "DELIVERED",
+      externalId: messageId,
+      sentAt: receivedAt,
+      deliveredAt: receivedAt,
+      metadata: {
+        envelope,
+        headers: fields.headers ? JSON.parse(fields.headers) : null,
+        attachmentCount: fields.attachments ? parseInt(fields.attachments) : 0,
+      },
+    },
+  });
+
+  await prisma.dispatchConversation.update({
+    where: { id: conversation.id },
+    data: {
+      lastMessageAt: receivedAt,
+      unreadCount: { increment: 1 },
+      subject: subject || conversation.subject,
+    },
+  });
+
+  console.log(`[DISPATCH EMAIL] Stored message ${message.id} in conversation ${conversation.id}`);
+
+  sendNewMessageNotification(conversation.ventureId, {
+    type: "NEW_MESSAGE",
+    conversationId: conversation.id,
+    message: body.substring(0, 100),
+    fromAddress: fromEmail,
+    channel: "EMAIL",
+  });
+
+  return { success: true, messageId: message.id, conversationId: conversation.id };
+}
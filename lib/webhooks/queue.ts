@@ -0,0 +1,181 @@
+import { createHash } from "crypto";
+import { Prisma } from "@prisma/client";
+import prisma from "@/lib/prisma";
+
+// Durable queue for provider callbacks ("WebhookEvent").
+//
+// Webhook routes verify the signature, enqueue and acknowledge; workers in
+// lib/webhooks/worker.ts drain the queue. (source, idempotencyKey) is unique,
+// so provider retries of an already-queued callback are dropped at enqueue.
+// Events sharing an orderingKey (one conversation) are claimed strictly in
+// arrival order: only the oldest unfinished event of a key is claimable, so a
+// batch holds at most one event per conversation and batches can run their
+// events concurrently.
+
+export type WebhookSource = "TWILIO_INBOUND" | "SENDGRID_INBOUND" | "DISPATCH_SMS" | "DISPATCH_EMAIL";
+
+export type WebhookEventStatus = "PENDING" | "PROCESSING" | "DONE" | "FAILED";
+
+export type ClaimedWebhookEvent = {
+  id: number;
+  source: WebhookSource;
+  orderingKey: string;
+  payload: Prisma.JsonValue;
+  attempts: number;
+  receivedAt: Date;
+};
+
+export const MAX_ATTEMPTS = Math.max(1, Number(process.env.WEBHOOK_MAX_ATTEMPTS ?? 8));
+const RETRY_BASE_MS = 5 * 1000;
+const RETRY_MAX_MS = 15 * 60 * 1000;
+// A PROCESSING event whose worker has not settled it by then is claimable again
+const VISIBILITY_TIMEOUT_MS = 5 * 60 * 1000;
+const RETENTION_DAYS = Math.max(1, Number(process.env.WEBHOOK_EVENT_RETENTION_DAYS ?? 7));
+
+/** Stable key for callbacks that carry no provider message id. */
+export function payloadDigest(payload: unknown): string {
+  return createHash("sha256").update(JSON.stringify(payload)).digest("hex");
+}
+
+/**
+ * Store a callback for the workers. Returns `duplicate: true` when the same
+ * (source, idempotencyKey) was already queued within the retention window.
+ */
+export async function enqueueWebhook(event: {
+  source: WebhookSource;
+  idempotencyKey: string;
+  orderingKey: string;
+  payload: Prisma.InputJsonValue;
+}): Promise<{ id: number | null; duplicate: boolean }> {
+  const rows = await prisma.$queryRaw<{ id: number }[]>`
+    INSERT INTO "WebhookEvent" ("source", "idempotencyKey", "orderingKey", "payload")
+    VALUES (${event.source}, ${event.idempotencyKey}, ${event.orderingKey}, ${JSON.stringify(event.payload)}::jsonb)
+    ON CONFLICT ("source", "idempotencyKey") DO NOTHING
+    RETURNING "id"
+  `;
+  return rows.length ? { id: rows[0].id, duplicate: false } : { id: null, duplicate: true };
+}
+
+/** Enqueue several callbacks from one request in a single statement. */
+export async function enqueueWebhooks(
+  events: { source: WebhookSource; idempotencyKey: string; orderingKey: string; payload: Prisma.InputJsonValue }[],
+): Promise<{ queued: number; duplicates: number }> {
+  if (!events.length) return { queued: 0, duplicates: 0 };
+  const rows = await prisma.$queryRaw<{ id: number }[]>`
+    INSERT INTO "WebhookEvent" ("source", "idempotencyKey", "orderingKey", "payload")
+    SELECT e."source", e."idempotencyKey", e."orderingKey", e."payload"
+    FROM jsonb_to_recordset(${JSON.stringify(events)}::jsonb)
+      AS e("source" TEXT, "idempotencyKey" TEXT, "orderingKey" TEXT, "payload" JSONB)
+    ON CONFLICT ("source", "idempotencyKey") DO NOTHING
+    RETURNING "id"
+  `;
+  return { queued: rows.length, duplicates: events.length - rows.length };
+}
+
+/**
+ * Lease up to `limit` claimable events to `workerId`: the oldest unfinished
+ * event of each orderingKey, once its retry delay has passed, or one whose
+ * previous lease timed out.
+ */
+export async function claimWebhookBatch(workerId: string, limit: number): Promise<ClaimedWebhookEvent[]> {
+  return prisma.$queryRaw<ClaimedWebhookEvent[]>`
+    UPDATE "WebhookEvent" e
+    SET "status" = 'PROCESSING', "lockedAt" = now(), "lockedBy" = ${workerId}, "attempts" = e."attempts" + 1
+    WHERE e."id" IN (
+      SELECT p."id" FROM "WebhookEvent" p
+      WHERE ((p."status" = 'PENDING' AND p."availableAt" <= now())
+          OR (p."status" = 'PROCESSING' AND p."lockedAt" < now() - (${VISIBILITY_TIMEOUT_MS}::int * INTERVAL '1 millisecond')))
+        AND NOT EXISTS (
+          SELECT 1 FROM "WebhookEvent" q
+          WHERE q."orderingKey" = p."orderingKey" AND q."id" < p."id"
+            AND q."status" IN ('PENDING', 'PROCESSING')
+        )
+      ORDER BY p."id"
+      LIMIT ${limit}::int
+      FOR UPDATE SKIP LOCKED
+    )
+    RETURNING e."id", e."source", e."orderingKey", e."payload", e."attempts", e."receivedAt"
+  `;
+}
+
+/** Mark events processed. Events whose lease was taken over are left alone. */
+export async function completeWebhookEvents(workerId: string, ids: number[]): Promise<void> {
+  if (!ids.length) return;
+  await prisma.$executeRaw`
+    UPDATE "WebhookEvent"
+    SET "status" = 'DONE', "processedAt" = now(), "lockedAt" = NULL, "lockedBy" = NULL, "lastError" = NULL
+    WHERE "id" = ANY(${ids}) AND "lockedBy" = ${workerId}
+  `;
+}
+
+/**
+ * Release failed events for a retry with exponential backoff, or park them as
+ * FAILED after MAX_ATTEMPTS. Returns the earliest retry time, if any.
+ */
+export async function failWebhookEvents(
+  workerId: string,
+  failures: { id: number; error: string }[],
+): Promise<Date | null> {
+  if (!failures.length) return null;
+  const rows = await prisma.$queryRaw<{ availableAt: Date | null }[]>`
+    UPDATE "WebhookEvent" e
+    SET "status" = CASE WHEN e."attempts" >= ${MAX_ATTEMPTS}::int THEN 'FAILED' ELSE 'PENDING' END,
+        "availableAt" = now() + (LEAST(${RETRY_BASE_MS}::int * power(2, e."attempts" - 1), ${RETRY_MAX_MS}::int)
+                                 * INTERVAL '1 millisecond'),
+        "lastError" = f."error", "lockedAt" = NULL, "lockedBy" = NULL
+    FROM unnest(${failures.map((f) => f.id)}::int[], ${failures.map((f) => f.error.slice(0, 2000))}::text[])
+      AS f("id", "error")
+    WHERE e."id" = f."id" AND e."lockedBy" = ${workerId}
+    RETURNING CASE WHEN e."status" = 'PENDING' THEN e."availableAt" END AS "availableAt"
+  `;
+  const retries = rows.map((r) => r.availableAt).filter((d): d is Date => d != null);
+  return retries.length ? new Date(Math.min(...retries.map((d) => d.getTime()))) : null;
+}
+
+export type WebhookQueueStats = {
+  source: WebhookSource;
+  pending: number;
+  processing: number;
+  failed: number;
+  oldestPendingAt: Date | null;
+  lagMs: number;
+  processedLastHour: number;
+  avgProcessLagMs: number | null;
+  p95ProcessLagMs: number | null;
+};
+
+/**
+ * Depth and lag per source: unfinished events, age of the oldest one, and
+ * receive-to-processed latency over the last hour.
+ */
+export async function getWebhookQueueStats(now: Date = new Date()): Promise<WebhookQueueStats[]> {
+  const hourAgo = new Date(now.getTime() - 60 * 60 * 1000);
+  const rows = await prisma.$queryRaw<Omit<WebhookQueueStats, "lagMs">[]>`
+    SELECT "source",
+           COUNT(*) FILTER (WHERE "status" = 'PENDING')::int AS "pending",
+           COUNT(*) FILTER (WHERE "status" = 'PROCESSING')::int AS "processing",
+           COUNT(*) FILTER (WHERE "status" = 'FAILED')::int AS "failed",
+           MIN("receivedAt") FILTER (WHERE "status" IN ('PENDING', 'PROCESSING')) AS "oldestPendingAt",
+           COUNT(*) FILTER (WHERE "status" = 'DONE')::int AS "processedLastHour",
+           (AVG(EXTRACT(EPOCH FROM ("processedAt" - "receivedAt")) * 1000)
+             FILTER (WHERE "status" = 'DONE'))::float8 AS "avgProcessLagMs",
+           (percentile_cont(0.95) WITHIN GROUP (ORDER BY EXTRACT(EPOCH FROM ("processedAt" - "receivedAt")) * 1000)
+             FILTER (WHERE "status" = 'DONE'))::float8 AS "p95ProcessLagMs"
+    FROM "WebhookEvent"
+    WHERE "status" IN ('PENDING', 'PROCESSING', 'FAILED') OR "processedAt" >= ${hourAgo}
+    GROUP BY "source"
+    ORDER BY "source"
+  `;
+  return rows.map((r) => ({
+    ...r,
+    lagMs: r.oldestPendingAt ? Math.max(0, now.getTime() - new Date(r.oldestPendingAt).getTime()) : 0,
+  }));
+}
+
+/** Drop processed events past the retention window (which is also the idempotency window). */
+export async function pruneWebhookEvents(now: Date = new Date()): Promise<number> {
+  const cutoff = new Date(now.getTime() - RETENTION_DAYS * 24 * 60 * 60 * 1000);
+  return prisma.$executeRaw`
+    DELETE FROM "WebhookEvent" WHERE "status" = 'DONE' AND "processedAt" < ${cutoff}
+  `;
+}
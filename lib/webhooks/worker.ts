@@ -0,0 +1,190 @@
+import crypto from "crypto";
+import { handleInboundEmail, handleInboundSms } from "@/lib/outreach/inboundHandler";
+import type { InboundEmailPayload, InboundSmsPayload } from "@/lib/outreach/inboundHandler";
+import { processDispatchEmail, processDispatchSms } from "@/lib/webhooks/dispatchInbound";
+import type { DispatchEmailFields, DispatchSmsPayload } from "@/lib/webhooks/dispatchInbound";
+import {
+  claimWebhookBatch,
+  completeWebhookEvents,
+  failWebhookEvents,
+  pruneWebhookEvents,
+  type ClaimedWebhookEvent,
+  type WebhookSource,
+} from "@/lib/webhooks/queue";
+import { logger } from "@/lib/logger";
+import { runWithConcurrency } from "@/lib/utils/workerPool";
+
+// Worker pool draining the webhook queue (lib/webhooks/queue.ts).
+//
+// Webhook routes call kickWebhookWorkers() after enqueueing, which drains the
+// queue in the web process with at most WEBHOOK_INLINE_CONCURRENCY events in
+// flight, so a burst cannot take the Prisma connections (5 per process) the
+// routes need to enqueue and acknowledge; 0 leaves all draining to the
+// dedicated worker. A kick while a drain is running makes it go around once
+// more instead of starting a second one. `npm run webhooks:worker` runs the
+// full pool (WEBHOOK_WORKER_CONCURRENCY workers) as a dedicated process that
+// also polls, which picks up events left behind by a process that exited
+// mid-drain.
+
+const BATCH_SIZE = Math.max(1, Number(process.env.WEBHOOK_WORKER_BATCH_SIZE ?? 25));
+const CONCURRENCY = Math.max(1, Number(process.env.WEBHOOK_WORKER_CONCURRENCY ?? 4));
+const INLINE_CONCURRENCY = Math.max(0, Number(process.env.WEBHOOK_INLINE_CONCURRENCY ?? 2));
+const INLINE_BATCH_SIZE = 10;
+
+const PRUNE_EVERY_MS = 60 * 60 * 1000;
+
+const PROCESS_ID = `${process.pid}:${crypto.randomUUID()}`;
+
+const processors: Record<WebhookSource, (payload: any, receivedAt: Date) => Promise<unknown>> = {
+  TWILIO_INBOUND: (payload: InboundSmsPayload) => handleInboundSms(payload),
+  SENDGRID_INBOUND: (payload: InboundEmailPayload) => handleInboundEmail(payload),
+  DISPATCH_SMS: (payload: DispatchSmsPayload, receivedAt) => processDispatchSms(payload, receivedAt),
+  DISPATCH_EMAIL: (payload: DispatchEmailFields, receivedAt) => processDispatchEmail(payload, receivedAt),
+};
+
+export type DrainStats = {
+  batches: number;
+  processed: number;
+  failed: number;
+  nextRetryAt: Date | null;
+};
+
+const totals = { batches: 0, processed: 0, failed: 0, drains: 0 };
+let lastPruneAt = 0;
+
+async function runEvent(event: ClaimedWebhookEvent): Promise<void> {
+  const processor = processors[event.source];
+  if (!processor) {
+    throw new Error(`No processor for webhook source ${event.source}`);
+  }
+  await processor(event.payload, new Date(event.receivedAt));
+}
+
+/**
+ * Claim and process batches until the queue has nothing claimable. Each batch
+ * holds at most one event per conversation, so its events run concurrently.
+ */
+export async function drainWebhookQueue(
+  workerId: string,
+  options: { batchSize?: number; maxBatches?: number; concurrency?: number } = {},
+): Promise<DrainStats> {
+  const batchSize = options.batchSize ?? BATCH_SIZE;
+  const concurrency = options.concurrency ?? batchSize;
+  const stats: DrainStats = { batches: 0, processed: 0, failed: 0, nextRetryAt: null };
+
+  while (options.maxBatches == null || stats.batches < options.maxBatches) {
+    const batch = await claimWebhookBatch(workerId, batchSize);
+    if (!batch.length) break;
+    stats.batches++;
+
+    const results = await runWithConcurrency(batch, concurrency, runEvent);
+
+    const done: number[] = [];
+    const failures: { id: number; error: string }[] = [];
+    results.forEach((result, i) => {
+      if (result.ok) {
+        done.push(batch[i].id);
+      } else {
+        const error = result.error instanceof Error ? result.error.message : String(result.error);
+        failures.push({ id: batch[i].id, error });
+        logger.warn("webhook_event_failed", {
+          domain: "webhooks",
+          eventId: batch[i].id,
+          source: batch[i].source,
+          attempts: batch[i].attempts,
+          error,
+        });
+      }
+    });
+
+    await completeWebhookEvents(workerId, done);
+    const retryAt = await failWebhookEvents(workerId, failures);
+    if (retryAt && (!stats.nextRetryAt || retryAt < stats.nextRetryAt)) {
+      stats.nextRetryAt = retryAt;
+    }
+    stats.processed += done.length;
+    stats.failed += failures.length;
+  }
+
+  totals.batches += stats.batches;
+  totals.processed += stats.processed;
+  totals.failed += stats.failed;
+  return stats;
+}
+
+/**
+ * Run `concurrency` workers until none of them finds claimable work. Also
+ * prunes processed events past retention, at most once an hour per process.
+ */
+export async function runWebhookWorkerPool(
+  concurrency: number = CONCURRENCY,
+  drainOptions: { batchSize?: number; concurrency?: number } = {},
+): Promise<DrainStats> {
+  totals.drains++;
+  if (Date.now() - lastPruneAt >= PRUNE_EVERY_MS) {
+    lastPruneAt = Date.now();
+    await pruneWebhookEvents();
+  }
+  const results = await Promise.all(
+    Array.from({ length: concurrency }, (_, n) => drainWebhookQueue(`${PROCESS_ID}:${n}`, drainOptions)),
+  );
+  const retries = results.map((r) => r.nextRetryAt).filter((d): d is Date => d != null);
+  return {
+    batches: results.reduce((s, r) => s + r.batches, 0),
+    processed: results.reduce((s, r) => s + r.processed, 0),
+    failed: results.reduce((s, r) => s + r.failed, 0),
+    nextRetryAt: retries.length ? new Date(Math.min(...retries.map((d) => d.getTime()))) : null,
+  };
+}
+
+let running: Promise<void> | null = null;
+let kickedWhileRunning = false;
+let retryTimer: ReturnType<typeof setTimeout> | null = null;
+
+function scheduleRetryKick(at: Date) {
+  if (retryTimer) clearTimeout(retryTimer);
+  retryTimer = setTimeout(() => {
+    retryTimer = null;
+    kickWebhookWorkers();
+  }, Math.max(0, at.getTime() - Date.now()));
+  retryTimer.unref?.();
+}
+
+/**
+ * Start draining in this process (one worker, at most INLINE_CONCURRENCY
+ * events in flight) unless a drain is already running; never throws.
+ */
+export function kickWebhookWorkers(): void {
+  if (INLINE_CONCURRENCY === 0) return;
+  if (running) {
+    kickedWhileRunning = true;
+    return;
+  }
+  running = (async () => {
+    do {
+      kickedWhileRunning = false;
+      const stats = await runWebhookWorkerPool(1, {
+        batchSize: Math.max(INLINE_BATCH_SIZE, INLINE_CONCURRENCY),
+        concurrency: INLINE_CONCURRENCY,
+      });
+      if (stats.nextRetryAt) scheduleRetryKick(stats.nextRetryAt);
+    } while (kickedWhileRunning);
+  })()
+    .catch((err) => {
+      logger.error("webhook_worker_error", { domain: "webhooks", error: String(err) });
+    })
+    .finally(() => {
+      running = null;
+    });
+}
+
+/** Counters for this process since start. */
+export function getWebhookWorkerStats() {
+  return {
+    ...totals,
+    running: running != null,
+    concurrency: CONCURRENCY,
+    batchSize: BATCH_SIZE,
+    inlineConcurrency: INLINE_CONCURRENCY,
+  };
+}
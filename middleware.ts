@@ -4,6 +4,7 @@ import type { NextRequest } from "next/server";
 import {
   getRouteByPath,
   getRouteByApiPath,
+  routeAllowsRole,
 } from "@/lib/access-control/routes";
 import { isModuleEnabled } from "@/lib/access-control/feature-flags";
 
@@ -31,11 +32,7 @@ function checkPageAccessSync(path: string, role?: string, isAuthenticated?: bool
     return { allowed: false, reason: "unauthenticated" };
   }
   
-  if (!route.roles || route.roles.length === 0) {
-    return { allowed: true };
-  }
-  
-  if (!role || !route.roles.includes(role as any)) {
+  if (!routeAllowsRole(route, role)) {
     return { allowed: false, reason: "role_denied" };
   }
   
@@ -65,11 +62,7 @@ function checkApiAccessSync(apiPath: string, role?: string, isAuthenticated?: bo
     return { allowed: false, reason: "unauthenticated" };
   }
   
-  if (!route.roles || route.roles.length === 0) {
-    return { allowed: true };
-  }
-  
-  if (!role || !route.roles.includes(role as any)) {
+  if (!routeAllowsRole(route, role)) {
     return { allowed: false, reason: "role_denied" };
   }
   
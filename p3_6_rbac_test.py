@@ -7,9 +7,12 @@ Testing RBAC scenarios and edge cases that might not be covered in basic tests
 import requests
 import json
 import sys
+import time
 from datetime import datetime, timedelta
 
 BASE_URL = "http://localhost:3000"
+IMPERSONATE_COOKIE = "x-impersonate-user-id"
+EFFECTIVE_USER_CACHE_TTL_SECONDS = 30  # EFFECTIVE_USER_CACHE_TTL_MS default
 
 class RBACTester:
     def __init__(self):
@@ -97,6 +100,80 @@ class RBACTester:
             test_description="CEO access to non-existent user 999 in venture 1 (should return empty data)"
         )
 
+    def get_as(self, endpoint: str, impersonate_user_id: int, test_description: str = ""):
+        """GET an endpoint while impersonating another user (dev mode: real user is the CEO)"""
+        url = f"{BASE_URL}{endpoint}"
+        try:
+            response = requests.get(url, cookies={IMPERSONATE_COOKIE: str(impersonate_user_id)})
+            try:
+                response_data = response.json()
+            except:
+                response_data = response.text
+            self.log_result(endpoint, "GET", response.status_code, response_data, test_description)
+            return response.status_code, response_data
+        except Exception as e:
+            error_msg = f"Request failed: {str(e)}"
+            self.log_result(endpoint, "GET", 0, error_msg, test_description)
+            return 0, error_msg
+
+    def test_revocation_within_cache_ttl(self):
+        """Venture access removed by an admin must be enforced before the effective-user cache TTL expires"""
+        print("\n🎯 TESTING REVOCATION WITH EFFECTIVE-USER CACHE")
+        print("=" * 60)
+
+        users_response = self.session.get(f"{BASE_URL}/api/admin/users?limit=500")
+        if users_response.status_code != 200:
+            print(f"⚠️ Could not list users ({users_response.status_code}), skipping revocation test")
+            return
+
+        candidate = next(
+            (u for u in users_response.json().get("users", [])
+             if u.get("role") == "VENTURE_HEAD" and u.get("ventureIds")),
+            None,
+        )
+        if not candidate:
+            print("⚠️ No VENTURE_HEAD with venture memberships found, skipping revocation test")
+            return
+
+        user_id = candidate["id"]
+        original_ventures = candidate["ventureIds"]
+        venture_id = original_ventures[0]
+        endpoint = f"/api/incentives/venture-timeseries?ventureId={venture_id}"
+
+        # Warm the cache: a burst like a dashboard fan-out
+        for _ in range(3):
+            self.get_as(endpoint, user_id, f"VENTURE_HEAD {user_id} in own venture {venture_id} (should work)")
+
+        started = time.time()
+        try:
+            revoke = self.session.patch(
+                f"{BASE_URL}/api/admin/users/{user_id}",
+                json={"ventureIds": [v for v in original_ventures if v != venture_id]},
+            )
+            print(f"PATCH /api/admin/users/{user_id} -> {revoke.status_code}")
+
+            status, _ = self.get_as(
+                endpoint, user_id,
+                f"Same user right after venture {venture_id} was revoked (should fail with 403)",
+            )
+            elapsed = time.time() - started
+            if status == 403 and elapsed < EFFECTIVE_USER_CACHE_TTL_SECONDS:
+                print(f"   ✅ Revocation enforced after {elapsed:.2f}s (cache TTL {EFFECTIVE_USER_CACHE_TTL_SECONDS}s)")
+            else:
+                print(f"   ❌ Revocation not enforced within TTL (status={status}, elapsed={elapsed:.2f}s)")
+                self.results.append({
+                    "endpoint": endpoint,
+                    "method": "GET",
+                    "status_code": 500,
+                    "response": {"error": "stale effective user after revocation"},
+                    "test_description": "Revocation within cache TTL",
+                })
+        finally:
+            self.session.patch(
+                f"{BASE_URL}/api/admin/users/{user_id}",
+                json={"ventureIds": original_ventures},
+            )
+
     def test_edge_cases(self):
         """Test edge cases and boundary conditions"""
         print("\n🎯 TESTING EDGE CASES")
@@ -221,6 +298,7 @@ class RBACTester:
         try:
             self.test_rbac_scenarios()
             self.test_edge_cases()
+            self.test_revocation_within_cache_ttl()
             self.test_data_consistency()
             self.test_frontend_api_integration()
             
@@ -261,6 +261,75 @@ class P3IncentiveRegressionTester:
                 else:
                     print(f"   ✅ All totals fields present: {totals_fields}")
 
+    def test_bpo_agent_kpi_regression(self):
+        """Test /api/bpo/agent-kpi - totals must not depend on how the range is split"""
+        print("\n📊 TESTING: /api/bpo/agent-kpi - Regression Tests")
+        print("=" * 80)
+        
+        # Test 1: Validation errors are unchanged
+        self.test_endpoint(
+            "/api/bpo/agent-kpi",
+            method="GET",
+            test_description="Missing dates - should return 400",
+            expected_status=400
+        )
+        
+        today = datetime.now()
+        to_date = today.strftime("%Y-%m-%d")
+        from_date_91_days = (today - timedelta(days=91)).strftime("%Y-%m-%d")
+        
+        self.test_endpoint(
+            f"/api/bpo/agent-kpi?startDate={from_date_91_days}&endDate={to_date}",
+            method="GET",
+            test_description="Range limit test - 91 days should return 400",
+            expected_status=400
+        )
+        
+        # Test 2: A long range (whole weeks plus partial edges) equals the sum of two halves
+        from_date = (today - timedelta(days=59)).strftime("%Y-%m-%d")
+        mid_end = (today - timedelta(days=30)).strftime("%Y-%m-%d")
+        mid_start = (today - timedelta(days=29)).strftime("%Y-%m-%d")
+        
+        status_full, full = self.test_endpoint(
+            f"/api/bpo/agent-kpi?startDate={from_date}&endDate={to_date}T23:59:59.999Z",
+            method="GET",
+            test_description="60-day range - should return 200"
+        )
+        status_a, first = self.test_endpoint(
+            f"/api/bpo/agent-kpi?startDate={from_date}&endDate={mid_end}T23:59:59.999Z",
+            method="GET",
+            test_description="First 30 days - should return 200"
+        )
+        status_b, second = self.test_endpoint(
+            f"/api/bpo/agent-kpi?startDate={mid_start}&endDate={to_date}T23:59:59.999Z",
+            method="GET",
+            test_description="Last 30 days - should return 200"
+        )
+        
+        if status_full == status_a == status_b == 200:
+            def totals(items):
+                out = {}
+                for item in items:
+                    key = (item["agentId"], item["campaignId"])
+                    acc = out.setdefault(key, [0, 0, 0, 0])
+                    acc[0] += item["totalCalls"]
+                    acc[1] += item["totalTalkTimeSec"]
+                    acc[2] += item["totalAppointments"]
+                    acc[3] += item["totalSales"]
+                return out
+            
+            merged = totals(first.get("items", []) + second.get("items", []))
+            if totals(full.get("items", [])) == merged:
+                print(f"   ✅ Split-range totals match the full range ({len(merged)} agent/campaign rows)")
+            else:
+                print(f"   ⚠️  Split-range totals differ from the full range")
+            
+            calls = [item["totalCalls"] for item in full.get("items", [])]
+            if calls == sorted(calls, reverse=True):
+                print(f"   ✅ Items sorted by totalCalls descending")
+            else:
+                print(f"   ⚠️  Items not sorted by totalCalls")
+
     def test_logistics_customers_pagination(self):
         """Test /api/logistics/customers - Validate normalized pagination and error contract"""
         print("\n🚚 TESTING: /api/logistics/customers - Normalized Pagination")
@@ -375,6 +444,7 @@ class P3IncentiveRegressionTester:
         # Test each endpoint group
         self.test_incentives_commit_flow()
         self.test_bpo_kpi_regression()
+        self.test_bpo_agent_kpi_regression()
         self.test_logistics_customers_pagination()
         
         # Summary
@@ -24,6 +24,7 @@ interface VentureSummaryResponse {
   to: string;
   items: VentureUserSummary[];
   totalAmount: number;
+  points: { date: string; amount: number }[];
 }
 
 interface UserDailyItem {
@@ -152,26 +153,6 @@ const AdminVentureIncentivesPage: PageWithLayout = () => {
 
   const canRun = !!selectedVentureId && !!from && !!to && !loading;
 
-  const loadVentureTimeseries = async (ventureId: number, fromDate: string, toDate: string) => {
-    setVentureSeriesLoading(true);
-    try {
-      const params = new URLSearchParams();
-      params.set("ventureId", String(ventureId));
-      params.set("from", fromDate);
-      params.set("to", toDate);
-      const res = await fetch(`/api/incentives/venture-timeseries?${params.toString()}`);
-      const json: VentureTimeseriesResponse = await res.json();
-      if (!res.ok) {
-        throw new Error((json as any).error || "Failed to load venture chart data");
-      }
-      setVentureSeries(json);
-    } catch (e) {
-      console.error("Venture timeseries load failed", e);
-    } finally {
-      setVentureSeriesLoading(false);
-    }
-  };
-
   const handleRun = async () => {
     if (!selectedVentureId || typeof selectedVentureId !== "number") return;
 
@@ -182,12 +163,15 @@ const AdminVentureIncentivesPage: PageWithLayout = () => {
     setUserDaily(null);
     setVentureSeries(null);
     setUserSeries(null);
+    setVentureSeriesLoading(true);
 
     try {
       const params = new URLSearchParams();
       params.set("ventureId", String(selectedVentureId));
       if (from) params.set("from", from);
       if (to) params.set("to", to);
+      // Summary and chart series in one round trip
+      params.set("include", "summary,series");
 
       const res = await fetch(`/api/incentives/venture-summary?${params.toString()}`);
       const json = await res.json();
@@ -198,11 +182,17 @@ const AdminVentureIncentivesPage: PageWithLayout = () => {
       const v = ventures.find((x) => x.id === json.ventureId);
       setVentureName(v?.name ?? null);
 
-      await loadVentureTimeseries(json.ventureId, json.from, json.to);
+      setVentureSeries({
+        ventureId: json.ventureId,
+        from: json.from,
+        to: json.to,
+        points: json.points ?? [],
+      });
     } catch (e: any) {
       setError(e?.message || "Failed to load venture incentives");
     } finally {
       setLoading(false);
+      setVentureSeriesLoading(false);
     }
   };
 
@@ -1,6 +1,7 @@
 import type { NextApiRequest, NextApiResponse } from "next";
 import { requireUser } from "@/lib/apiAuth";
 import prisma from "@/lib/prisma";
+import { getCompletionCacheStats } from "@/lib/ai/completionCache";
 
 const ADMIN_ROLES = ["CEO", "ADMIN", "COO"];
 
@@ -140,6 +141,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       userStats,
       dailyStats,
       errorStats,
+      // Completion cache since this process started, per assistant
+      cacheStats: getCompletionCacheStats(),
     });
   } catch (err) {
     console.error("Error fetching AI usage stats:", err);
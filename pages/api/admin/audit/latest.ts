@@ -29,19 +29,22 @@ export default async function handler(
     return res.status(401).json({ error: "Unauthorized" });
   }
 
-  const run = await prisma.auditRun.findFirst({
+  const latestRun = await prisma.auditRun.findFirst({
     orderBy: { createdAt: "desc" },
-    include: {
-      issues: {
-        orderBy: { createdAt: "desc" },
-      },
-    },
   });
 
-  if (!run) {
+  if (!latestRun) {
     return res.status(200).json({ run: null, moduleSummary: null });
   }
 
+  // Runs are incremental: a finding keeps one OPEN issue across runs until a
+  // later run resolves it, so the current state is every open issue.
+  const issues = await prisma.auditIssue.findMany({
+    where: { status: "OPEN" },
+    orderBy: { createdAt: "desc" },
+  });
+  const run = { ...latestRun, issues };
+
   const modules: AuditModule[] = [
     "FREIGHT",
     "HOTEL",
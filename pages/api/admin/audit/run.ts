@@ -15,7 +15,7 @@ export default async function handler(
     return res.status(405).json({ error: "Method not allowed" });
   }
 
-  const { ventureId, officeId, propertyId } = req.body || {};
+  const { ventureId, officeId, propertyId, full } = req.body || {};
 
   try {
     const run = await runAudit({
@@ -23,6 +23,7 @@ export default async function handler(
       scopeVentureId: ventureId || undefined,
       scopeOfficeId: officeId || undefined,
       scopePropertyId: propertyId || undefined,
+      full: full === true,
     });
 
     return res.status(200).json({
@@ -30,7 +31,8 @@ export default async function handler(
       startedAt: run.createdAt,
       finishedAt: run.finishedAt,
       overallScore: run.overallScore,
-      issuesCount: run.issues.length,
+      issuesCount: run.stats.issuesFound,
+      stats: run.stats,
     });
   } catch (e: unknown) {
     console.error("Audit run error", e);
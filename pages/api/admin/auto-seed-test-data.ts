@@ -397,6 +397,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       const batch = hotelKpiData.slice(i, i + CONFIG.BATCH_SIZE);
       await prisma.hotelKpiDaily.createMany({ data: batch, skipDuplicates: true });
     }
+    const { rebuildHotelRollups } = await import('@/lib/hotels/kpiRollups');
+    await rebuildHotelRollups();
 
     console.log('Creating BPO campaigns with 2-year metrics...');
     const bpoCampaigns = await Promise.all(
@@ -1,6 +1,7 @@
 import type { NextApiRequest, NextApiResponse } from "next";
 import { prisma } from "@/lib/prisma";
-import { getEffectiveUser } from "@/lib/effectiveUser";
+import { getEffectiveUser, invalidateAllEffectiveUsers } from "@/lib/effectiveUser";
+import { clearLeaderboardCache } from "@/lib/gamification/leaderboard";
 
 export default async function handler(
   req: NextApiRequest,
@@ -106,6 +107,10 @@ export default async function handler(
     const { logAuditEvent } = await import("@/lib/audit");
 
     results.incentiveDaily = (await prisma.incentiveDaily.deleteMany({ where: { isTest: true } })).count;
+    if (results.incentiveDaily > 0) {
+      const { rebuildIncentiveRollups } = await import("@/lib/incentives/rollups");
+      results.incentiveRollups = await rebuildIncentiveRollups();
+    }
     
     results.incentiveRules = (await prisma.incentiveRule.deleteMany({
       where: { plan: { venture: { isTest: true } } }
@@ -121,6 +126,10 @@ export default async function handler(
       where: { venture: { isTest: true } }
     })).count;
 
+    results.gamificationLeaderboardScores = (await prisma.gamificationLeaderboardScore.deleteMany({
+      where: { venture: { isTest: true } }
+    })).count;
+
     results.gamificationPointsBalance = (await prisma.gamificationPointsBalance.deleteMany({
       where: { user: { isTestUser: true } }
     })).count;
@@ -149,6 +158,8 @@ export default async function handler(
     results.saasCustomers = (await prisma.saasCustomer.deleteMany({
       where: { venture: { isTest: true } }
     })).count;
+    const { invalidateSaasMetrics } = await import("@/lib/saas/metrics");
+    invalidateSaasMetrics();
 
     results.bankSnapshots = (await prisma.bankSnapshot.deleteMany({
       where: { bankAccount: { venture: { isTest: true } } }
@@ -173,6 +184,11 @@ export default async function handler(
       where: { hotel: { venture: { isTest: true } } }
     })).count;
 
+    if (results.hotelReviews > 0 || results.hotelKpiDaily > 0 || results.hotelDailyReports > 0) {
+      const { rebuildHotelRollups } = await import("@/lib/hotels/kpiRollups");
+      results.hotelRollups = await rebuildHotelRollups();
+    }
+
     results.hotelPnlMonthly = (await prisma.hotelPnlMonthly.deleteMany({
       where: { hotel: { venture: { isTest: true } } }
     })).count;
@@ -278,6 +294,8 @@ export default async function handler(
 
 
     results.users = (await prisma.user.deleteMany({ where: { isTestUser: true } })).count;
+    invalidateAllEffectiveUsers();
+    clearLeaderboardCache();
 
     results.offices = (await prisma.office.deleteMany({ where: { isTest: true } })).count;
     results.ventures = (await prisma.venture.deleteMany({ where: { isTest: true } })).count;
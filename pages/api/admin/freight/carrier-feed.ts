@@ -0,0 +1,20 @@
+import type { NextApiRequest, NextApiResponse } from "next";
+import { requireUser } from "@/lib/apiAuth";
+import { isGlobalAdmin } from "@/lib/scope";
+import { getCarrierFeedStats } from "@/lib/freight/carrierFeed";
+
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== "GET") {
+    res.setHeader("Allow", "GET");
+    return res.status(405).json({ error: "Method not allowed" });
+  }
+
+  const user = await requireUser(req, res);
+  if (!user) return;
+
+  if (!isGlobalAdmin(user)) {
+    return res.status(403).json({ error: "Forbidden: Admin access required" });
+  }
+
+  return res.status(200).json({ ok: true, feed: getCarrierFeedStats() });
+}
@@ -0,0 +1,36 @@
+import type { NextApiRequest, NextApiResponse } from "next";
+import { requireUser } from "@/lib/apiAuth";
+import { isGlobalAdmin } from "@/lib/scope";
+import { getWebhookQueueStats } from "@/lib/webhooks/queue";
+import { getWebhookWorkerStats } from "@/lib/webhooks/worker";
+
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== "GET") {
+    return res.status(405).json({ error: "Method not allowed" });
+  }
+
+  const user = await requireUser(req, res);
+  if (!user) return;
+
+  if (!isGlobalAdmin(user)) {
+    return res.status(403).json({ error: "FORBIDDEN" });
+  }
+
+  try {
+    const sources = await getWebhookQueueStats();
+
+    return res.status(200).json({
+      depth: sources.reduce((s, q) => s + q.pending + q.processing, 0),
+      lagMs: sources.reduce((max, q) => Math.max(max, q.lagMs), 0),
+      failed: sources.reduce((s, q) => s + q.failed, 0),
+      sources: sources.map((q) => ({
+        ...q,
+        oldestPendingAt: q.oldestPendingAt ? new Date(q.oldestPendingAt).toISOString() : null,
+      })),
+      worker: getWebhookWorkerStats(),
+    });
+  } catch (err: any) {
+    console.error("/api/admin/jobs/webhook-queue error", err);
+    return res.status(500).json({ error: err.message || "Internal server error" });
+  }
+}
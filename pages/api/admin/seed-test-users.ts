@@ -2,6 +2,7 @@ import type { NextApiRequest, NextApiResponse } from 'next';
 import prisma from '@/lib/prisma';
 import { requireUser } from '@/lib/apiAuth';
 import { canManageUsers } from '@/lib/permissions';
+import { invalidateEffectiveUser } from '@/lib/effectiveUser';
 import { UserRole } from '@prisma/client';
 
 // Department and VentureType are treated as simple string identifiers here to
@@ -139,6 +140,11 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     })
   );
 
+  // Roles and memberships may have changed for users already signed in
+  for (const user of created) {
+    invalidateEffectiveUser(user.id);
+  }
+
   await prisma.task.createMany({
     data: [
       {
@@ -1,6 +1,7 @@
 import type { NextApiRequest, NextApiResponse } from 'next';
 import prisma from '@/lib/prisma';
 import { requireUser } from '@/lib/apiAuth';
+import { invalidateEffectiveUser } from '@/lib/effectiveUser';
 import { canManageUsers } from '@/lib/permissions';
 import type { UserRole } from '@/lib/permissions';
 import { logActivity, ACTIVITY_ACTIONS, ACTIVITY_MODULES } from '@/lib/activityLog';
@@ -164,6 +165,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
 
       return u;
     });
+    invalidateEffectiveUser(userId);
 
     await logActivity({
       userId: current.id,
@@ -1,6 +1,6 @@
 import { NextApiRequest, NextApiResponse } from "next";
 import { prisma } from "@/lib/prisma";
-import { getEffectiveUser } from "@/lib/effectiveUser";
+import { getEffectiveUser, invalidateEffectiveUser } from "@/lib/effectiveUser";
 
 // StaffRole is a simple string union here, decoupled from Prisma's generated enum.
 type StaffRole =
@@ -53,6 +53,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     where: { id: Number(id) },
     data: updateData,
   });
+  invalidateEffectiveUser(updatedUser.id);
 
   if (alias && alias.trim()) {
     const normalizedName = normalize(alias);
@@ -2,6 +2,7 @@ import type { NextApiRequest, NextApiResponse } from "next";
 import prisma from "../../../../lib/prisma";
 import { UserRole } from "@prisma/client";
 import { requireAdminUser } from "../../../../lib/authGuard";
+import { invalidateEffectiveUser } from "../../../../lib/effectiveUser";
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const context = await requireAdminUser(req, res);
@@ -29,6 +30,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         offices: { include: { office: true } },
       },
     });
+    invalidateEffectiveUser(userId);
     res.json({ user });
   } catch (err: any) {
     console.error(err);
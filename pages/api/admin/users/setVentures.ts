@@ -1,6 +1,7 @@
 import type { NextApiRequest, NextApiResponse } from "next";
 import prisma from "../../../../lib/prisma";
 import { requireAdminUser } from "../../../../lib/authGuard";
+import { invalidateEffectiveUser } from "../../../../lib/effectiveUser";
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const context = await requireAdminUser(req, res);
@@ -25,6 +26,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     await prisma.ventureUser.createMany({
       data: ventureIds.map((ventureId) => ({ userId, ventureId })),
     });
+    invalidateEffectiveUser(userId);
 
     const user = await prisma.user.findUnique({
       where: { id: userId },
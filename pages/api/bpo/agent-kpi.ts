@@ -1,5 +1,5 @@
 import type { NextApiRequest, NextApiResponse } from "next";
-import { prisma } from "@/lib/prisma";
+import { readAgentKpiTotals } from "@/lib/bpo/agentMetrics";
 import { requireAdminPanelUser } from "@/lib/apiAuth";
 
 type AgentKpiRow = {
@@ -50,102 +50,21 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       });
     }
 
-    const rows = await prisma.bpoAgentMetric.findMany({
-      where: {
-        date: { gte: start, lte: end },
-      },
-      select: {
-        userId: true,
-        agentName: true,
-        campaignId: true,
-        date: true,
-        handledCalls: true,
-        outboundCalls: true,
-        talkTimeMin: true,
-        demosBooked: true,
-        salesClosed: true,
-        user: {
-          select: {
-            id: true,
-            fullName: true,
-          },
-        },
-        campaign: {
-          select: {
-            id: true,
-            name: true,
-          },
-        },
-      },
-    });
-
-    const keyMap = new Map<string, {
-      agentId: number;
-      agentName: string;
-      campaignId: number | null;
-      campaignName: string | null;
-      totalCalls: number;
-      totalTalkTimeSec: number;
-      totalAppointments: number;
-      totalSales: number;
-      daysSeen: Set<string>;
-    }>();
-
-    for (const r of rows) {
-      const agentId = r.userId ?? 0;
-      const agentName = r.user?.fullName ?? r.agentName ?? `Agent ${agentId}`;
-      const campaignId = r.campaignId ?? null;
-      const campaignName = r.campaign?.name ?? null;
-
-      const key = `${agentId}-${campaignId ?? "none"}`;
-      let agg = keyMap.get(key);
-      if (!agg) {
-        agg = {
-          agentId,
-          agentName,
-          campaignId,
-          campaignName,
-          totalCalls: 0,
-          totalTalkTimeSec: 0,
-          totalAppointments: 0,
-          totalSales: 0,
-          daysSeen: new Set<string>(),
-        };
-        keyMap.set(key, agg);
-      }
-
-      const calls = (r.handledCalls ?? 0) + (r.outboundCalls ?? 0);
-      const talkTimeSec = (r.talkTimeMin ?? 0) * 60;
-
-      agg.totalCalls += calls;
-      agg.totalTalkTimeSec += talkTimeSec;
-      agg.totalAppointments += r.demosBooked ?? 0;
-      agg.totalSales += r.salesClosed ?? 0;
-      agg.daysSeen.add(r.date.toISOString().slice(0, 10));
-    }
-
-    const result: AgentKpiRow[] = [];
-
-    for (const agg of keyMap.values()) {
-      const daysCount = agg.daysSeen.size || 1;
-      const avgTalkTimeSec = agg.totalCalls > 0 ? agg.totalTalkTimeSec / agg.totalCalls : 0;
-      const callsPerDay = agg.totalCalls / daysCount;
-
-      result.push({
-        agentId: agg.agentId,
-        agentName: agg.agentName,
-        campaignId: agg.campaignId,
-        campaignName: agg.campaignName,
-        totalCalls: agg.totalCalls,
-        totalTalkTimeSec: agg.totalTalkTimeSec,
-        totalAppointments: agg.totalAppointments,
-        totalSales: agg.totalSales,
-        avgTalkTimeSec,
-        callsPerDay,
-      });
-    }
-
-    result.sort((a, b) => b.totalCalls - a.totalCalls);
+    // endDate is inclusive.
+    const totals = await readAgentKpiTotals(start, new Date(end.getTime() + 1));
+
+    const result: AgentKpiRow[] = totals.map((t) => ({
+      agentId: t.agentId,
+      agentName: t.agentName,
+      campaignId: t.campaignId,
+      campaignName: t.campaignName,
+      totalCalls: t.totalCalls,
+      totalTalkTimeSec: t.totalTalkTimeSec,
+      totalAppointments: t.totalAppointments,
+      totalSales: t.totalSales,
+      avgTalkTimeSec: t.totalCalls > 0 ? t.totalTalkTimeSec / t.totalCalls : 0,
+      callsPerDay: t.totalCalls / (t.days || 1),
+    }));
 
     return res.status(200).json({ items: result });
   } catch (err) {
@@ -5,6 +5,7 @@ import { getUserScope } from '@/lib/scope';
 import { awardPointsForEvent } from '@/lib/gamification/awardPoints';
 import { logAuditEvent } from '@/lib/audit';
 import { logger } from '@/lib/logger';
+import { recordBpoCall } from '@/lib/bpo/realtimeStats';
 
 /**
  * BPO Call Logs API
@@ -124,6 +125,9 @@ export default async function handler(
         },
       });
 
+      // Keep live floor dashboards current without a reload
+      recordBpoCall(callLog);
+
       // Award gamification points if call is completed (has callEndedAt)
       if (callLog.callEndedAt) {
         awardPointsForEvent(
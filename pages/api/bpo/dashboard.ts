@@ -1,5 +1,5 @@
 import type { NextApiRequest, NextApiResponse } from 'next';
-import prisma from '../../../lib/prisma';
+import { readBpoDashboardTotals } from '@/lib/bpo/agentMetrics';
 import { requireUser } from '@/lib/apiAuth';
 import { canViewPortfolioResource } from "@/lib/permissions";
 
@@ -48,186 +48,48 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     sevenDaysAgo.setDate(sevenDaysAgo.getDate() - 6);
     const sevenStart = startOfDay(sevenDaysAgo);
 
-    const campaigns = await prisma.bpoCampaign.findMany({
-      where: { ventureId, isActive: true },
-      select: { id: true, name: true, clientName: true, officeId: true, vertical: true },
+    const { campaigns, leaderboard: leaders } = await readBpoDashboardTotals({
+      ventureId,
+      from: sevenStart,
+      to: todayEnd,
+      includeTest,
+      leaderboardSize: 10,
     });
 
-    const campaignIds = campaigns.map((c: any) => c.id);
-
-    const baseMetricWhere: any = {
-      campaignId: { in: campaignIds },
-      date: { gte: sevenStart, lte: todayEnd },
-    };
-    if (!includeTest) {
-      baseMetricWhere.isTest = false;
-    }
-
-    const metrics = await prisma.bpoDailyMetric.findMany({
-      where: baseMetricWhere,
-    });
-
-    type CampAgg = {
-      campaignId: number;
-      days: number;
-      talkTimeMin: number;
-      handledCalls: number;
-      outboundCalls: number;
-      leadsCreated: number;
-      demosBooked: number;
-      salesClosed: number;
-      revenue: number;
-      cost: number;
-      avgQaScoreSum: number;
-      qaCount: number;
-    };
-
-    const campMap = new Map<number, CampAgg>();
-
-    for (const m of metrics) {
-      if (!campMap.has(m.campaignId)) {
-        campMap.set(m.campaignId, {
-          campaignId: m.campaignId,
-          days: 0,
-          talkTimeMin: 0,
-          handledCalls: 0,
-          outboundCalls: 0,
-          leadsCreated: 0,
-          demosBooked: 0,
-          salesClosed: 0,
-          revenue: 0,
-          cost: 0,
-          avgQaScoreSum: 0,
-          qaCount: 0,
-        });
-      }
-      const agg = campMap.get(m.campaignId)!;
-      agg.days += 1;
-      agg.talkTimeMin += m.talkTimeMin || 0;
-      agg.handledCalls += m.handledCalls || 0;
-      agg.outboundCalls += m.outboundCalls || 0;
-      agg.leadsCreated += m.leadsCreated || 0;
-      agg.demosBooked += m.demosBooked || 0;
-      agg.salesClosed += m.salesClosed || 0;
-      agg.revenue += m.revenue || 0;
-      agg.cost += m.cost || 0;
-      if (m.avgQaScore != null) {
-        agg.avgQaScoreSum += m.avgQaScore;
-        agg.qaCount += 1;
-      }
-    }
-
-    const campaignCards = campaigns.map((c: any) => {
-      const agg = campMap.get(c.id);
-      const conversion = agg && agg.outboundCalls > 0 ? agg.leadsCreated / agg.outboundCalls : 0;
-      const roi = agg && agg.cost > 0 ? (agg.revenue - agg.cost) / agg.cost : 0;
-      const avgQa = agg && agg.qaCount > 0 ? agg.avgQaScoreSum / agg.qaCount : 0;
-
-      return {
-        id: c.id,
-        name: c.name,
-        clientName: c.clientName,
-        vertical: c.vertical,
-        talkTimeMin: agg?.talkTimeMin || 0,
-        handledCalls: agg?.handledCalls || 0,
-        outboundCalls: agg?.outboundCalls || 0,
-        leadsCreated: agg?.leadsCreated || 0,
-        demosBooked: agg?.demosBooked || 0,
-        salesClosed: agg?.salesClosed || 0,
-        revenue: agg?.revenue || 0,
-        cost: agg?.cost || 0,
-        conversion,
-        roi,
-        avgQa,
-      };
-    });
-
-    const totalTalk = campaignCards.reduce((s: number, c: any) => s + c.talkTimeMin, 0);
-    const totalHandled = campaignCards.reduce((s: number, c: any) => s + c.handledCalls, 0);
-    const totalOutbound = campaignCards.reduce((s: number, c: any) => s + c.outboundCalls, 0);
-    const totalLeads = campaignCards.reduce((s: number, c: any) => s + c.leadsCreated, 0);
-    const totalDemos = campaignCards.reduce((s: number, c: any) => s + c.demosBooked, 0);
-    const totalSales = campaignCards.reduce((s: number, c: any) => s + c.salesClosed, 0);
-    const totalRevenue = campaignCards.reduce((s: number, c: any) => s + c.revenue, 0);
-    const totalCost = campaignCards.reduce((s: number, c: any) => s + c.cost, 0);
+    const campaignCards = campaigns.map((c) => ({
+      id: c.id,
+      name: c.name,
+      clientName: c.clientName,
+      vertical: c.vertical,
+      talkTimeMin: c.talkTimeMin,
+      handledCalls: c.handledCalls,
+      outboundCalls: c.outboundCalls,
+      leadsCreated: c.leadsCreated,
+      demosBooked: c.demosBooked,
+      salesClosed: c.salesClosed,
+      revenue: c.revenue,
+      cost: c.cost,
+      conversion: c.outboundCalls > 0 ? c.leadsCreated / c.outboundCalls : 0,
+      roi: c.cost > 0 ? (c.revenue - c.cost) / c.cost : 0,
+      avgQa: c.qaCount > 0 ? c.qaScoreSum / c.qaCount : 0,
+    }));
+
+    const totalTalk = campaignCards.reduce((s, c) => s + c.talkTimeMin, 0);
+    const totalHandled = campaignCards.reduce((s, c) => s + c.handledCalls, 0);
+    const totalOutbound = campaignCards.reduce((s, c) => s + c.outboundCalls, 0);
+    const totalLeads = campaignCards.reduce((s, c) => s + c.leadsCreated, 0);
+    const totalDemos = campaignCards.reduce((s, c) => s + c.demosBooked, 0);
+    const totalSales = campaignCards.reduce((s, c) => s + c.salesClosed, 0);
+    const totalRevenue = campaignCards.reduce((s, c) => s + c.revenue, 0);
+    const totalCost = campaignCards.reduce((s, c) => s + c.cost, 0);
 
     const portfolioConversion = totalOutbound > 0 ? totalLeads / totalOutbound : 0;
     const portfolioRoi = totalCost > 0 ? (totalRevenue - totalCost) / totalCost : 0;
 
-    const agentMetricWhere: any = {
-      campaignId: { in: campaignIds },
-      date: { gte: sevenStart, lte: todayEnd },
-    };
-    if (!includeTest) {
-      agentMetricWhere.isTest = false;
-    }
-
-    const agentMetrics = await prisma.bpoAgentMetric.findMany({
-      where: agentMetricWhere,
-    });
-
-    type AgentAgg = {
-      userId: number | null;
-      agentName: string | null;
-      outboundCalls: number;
-      leadsCreated: number;
-      demosBooked: number;
-      salesClosed: number;
-    };
-
-    const agentMap = new Map<string, AgentAgg>();
-
-    const keyForAgent = (m: { userId: number | null; agentName: string | null }) =>
-      m.userId ? `user_${m.userId}` : m.agentName || 'UNKNOWN';
-
-    for (const m of agentMetrics) {
-      const key = keyForAgent(m);
-      if (!agentMap.has(key)) {
-        agentMap.set(key, {
-          userId: m.userId,
-          agentName: m.agentName,
-          outboundCalls: 0,
-          leadsCreated: 0,
-          demosBooked: 0,
-          salesClosed: 0,
-        });
-      }
-      const agg = agentMap.get(key)!;
-      agg.outboundCalls += m.outboundCalls || 0;
-      agg.leadsCreated += m.leadsCreated || 0;
-      agg.demosBooked += m.demosBooked || 0;
-      agg.salesClosed += m.salesClosed || 0;
-    }
-
-    const userIds = Array.from(
-      new Set(
-        Array.from(agentMap.values())
-          .map(a => a.userId)
-          .filter(Boolean) as number[]
-      )
-    );
-
-    const users = userIds.length > 0
-      ? await prisma.user.findMany({
-          where: { id: { in: userIds } },
-          select: { id: true, fullName: true },
-        })
-      : [];
-
-    const userMap = new Map(users.map((u: any) => [u.id, u.fullName]));
-
-    const leaderboard = Array.from(agentMap.entries())
-      .map(([key, agg]) => ({
-        key,
-        name: (agg.userId && userMap.get(agg.userId)) || agg.agentName || 'Unknown agent',
-        outboundCalls: agg.outboundCalls,
-        leadsCreated: agg.leadsCreated,
-        demosBooked: agg.demosBooked,
-        salesClosed: agg.salesClosed,
-        leadRate: agg.outboundCalls > 0 ? agg.leadsCreated / agg.outboundCalls : 0,
-      }))
-      .sort((a, b) => b.leadsCreated - a.leadsCreated)
-      .slice(0, 10);
+    const leaderboard = leaders.map((a) => ({
+      ...a,
+      leadRate: a.outboundCalls > 0 ? a.leadsCreated / a.outboundCalls : 0,
+    }));
 
     return res.json({
       summary: {
@@ -0,0 +1,68 @@
+import type { NextApiRequest, NextApiResponse } from 'next';
+import { requireUser } from '@/lib/apiAuth';
+import { getUserScope } from '@/lib/scope';
+import { subscribeRealtimeStats } from '@/lib/bpo/realtimeStats';
+
+/**
+ * SSE variant of /api/bpo/realtime-stats: pushes the same payload as a
+ * `stats` event every BPO_REALTIME_PUSH_MS so floor screens don't poll.
+ */
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== 'GET') {
+    return res.status(405).json({ error: 'Method not allowed' });
+  }
+
+  const user = await requireUser(req, res);
+  if (!user) return;
+
+  const scope = getUserScope(user);
+  const ventureId = req.query.ventureId ? Number(req.query.ventureId) : undefined;
+  const campaignId = req.query.campaignId ? Number(req.query.campaignId) : undefined;
+
+  if (!ventureId) {
+    return res.status(400).json({ error: 'ventureId is required' });
+  }
+
+  if (!scope.allVentures && !scope.ventureIds.includes(ventureId)) {
+    return res.status(403).json({ error: 'Forbidden' });
+  }
+
+  res.setHeader('Content-Type', 'text/event-stream');
+  res.setHeader('Cache-Control', 'no-cache, no-transform');
+  res.setHeader('Connection', 'keep-alive');
+  res.setHeader('X-Accel-Buffering', 'no');
+
+  res.write(`event: connected\ndata: ${JSON.stringify({ ventureId, campaignId: campaignId ?? null })}\n\n`);
+
+  const unsubscribe = subscribeRealtimeStats(ventureId, campaignId, (stats) => {
+    try {
+      res.write(`event: stats\ndata: ${JSON.stringify(stats)}\n\n`);
+      if ('flush' in res && typeof (res as any).flush === 'function') {
+        (res as any).flush();
+      }
+    } catch (error) {
+      console.error(`[SSE Stream] Failed to write BPO stats for venture ${ventureId}:`, error);
+      unsubscribe();
+    }
+  });
+
+  // Send heartbeat every 30 seconds to keep connection alive
+  const heartbeat = setInterval(() => {
+    try {
+      res.write(`:heartbeat\n\n`);
+    } catch {
+      clearInterval(heartbeat);
+    }
+  }, 30000);
+
+  req.on('close', () => {
+    clearInterval(heartbeat);
+    unsubscribe();
+  });
+}
+
+export const config = {
+  api: {
+    bodyParser: false,
+  },
+};
@@ -1,6 +1,18 @@
 import type { NextApiRequest, NextApiResponse } from "next";
-import prisma from "@/lib/prisma";
 import { requireUser } from "@/lib/apiAuth";
+import { getCarrierFeed, parseRegion, recordCarrierFeedNotModified } from "@/lib/freight/carrierFeed";
+
+function queryString(value: string | string[] | undefined): string | undefined {
+  return Array.isArray(value) ? value[0] : value;
+}
+
+function etagMatches(header: string | undefined, etag: string): boolean {
+  if (!header) return false;
+  return header.split(",").some((tag) => {
+    const t = tag.trim().replace(/^W\//, "");
+    return t === "*" || t === etag;
+  });
+}
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const user = await requireUser(req, res);
@@ -11,43 +23,33 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     return res.status(405).json({ error: "Method not allowed" });
   }
 
+  const region = queryString(req.query.region);
+  if (region && parseRegion(region) === null) {
+    return res.status(400).json({ error: "Invalid region" });
+  }
+  const equipment = queryString(req.query.equipment);
+  const sinceParam = queryString(req.query.since);
+  const since = sinceParam != null && sinceParam !== "" ? Number(sinceParam) : null;
+  if (since != null && (!Number.isInteger(since) || since < 0)) {
+    return res.status(400).json({ error: "Invalid since" });
+  }
+
   try {
-    const loads = await prisma.load.findMany({
-      where: {
-        loadStatus: "OPEN",
-        isTest: false,
-      },
-      orderBy: [
-        { pickupDate: "asc" },
-        { createdAt: "desc" },
-      ],
-      take: 50,
-      select: {
-        id: true,
-        pickupCity: true,
-        pickupState: true,
-        dropCity: true,
-        dropState: true,
-        equipmentType: true,
-        weightLbs: true,
-        pickupDate: true,
-        dropDate: true,
-      },
-    });
-
-    const formattedLoads = loads.map((load) => ({
-      id: load.id,
-      originCity: load.pickupCity || "TBD",
-      originState: load.pickupState || "",
-      destCity: load.dropCity || "TBD",
-      destState: load.dropState || "",
-      equipmentType: load.equipmentType || "Van",
-      weight: load.weightLbs ? Number(load.weightLbs) : null,
-      pickupDate: load.pickupDate?.toISOString() || null,
-      dropDate: load.dropDate?.toISOString() || null,
-    }));
-
-    return res.status(200).json({ loads: formattedLoads });
+    const feed = await getCarrierFeed({ region, equipment, since });
+
+    res.setHeader("ETag", feed.etag);
+    res.setHeader("Cache-Control", "private, no-cache");
+    res.setHeader("X-Feed-Version", String(feed.version));
+
+    if (etagMatches(req.headers["if-none-match"], feed.etag)) {
+      recordCarrierFeedNotModified();
+      return res.status(304).end();
+    }
+
+    if (feed.changes) {
+      return res.status(200).json({ version: feed.version, full: false, ...feed.changes });
+    }
+    return res.status(200).json({ version: feed.version, full: true, loads: feed.loads });
   } catch (error: unknown) {
     console.error("Carrier portal loads error:", error);
     return res.status(500).json({ error: "Failed to fetch loads" });
@@ -3,6 +3,14 @@ import prisma from "@/lib/prisma";
 import { getEffectiveUser } from "@/lib/effectiveUser";
 import { getUserScope } from "@/lib/scope";
 import { summarizeParentDashboard } from "@/lib/ai/summarize";
+import {
+  comparisonWindows,
+  computeVentureSummaries,
+  landingWindows,
+  mergeVentureSummaries,
+  readVentureSummaries,
+} from "@/lib/ventureSummary";
+import { DAY_MS } from "@/lib/utils/rollupPeriods";
 
 function parseDateParam(value: string | string[] | undefined): Date | null {
   if (!value || Array.isArray(value)) return null;
@@ -59,111 +67,67 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     const doCompare = compareToPrevious !== "false"; // default true
 
     const scope = getUserScope(user);
-    const ventureWhere: any = {
-      isActive: true,
-      ...(includeTestData ? {} : { isTest: false }),
-    };
-    if (!scope.allVentures) {
-      ventureWhere.id = { in: scope.ventureIds };
-    }
-
-    const [ventures, offices, users, bankSnapshots] = await Promise.all([
-      prisma.venture.findMany({
+    const toExclusive = new Date(toDay.getTime() + 1);
+    const windowDays = Math.round((toExclusive.getTime() - fromDay.getTime()) / DAY_MS);
+
+    // The default landing range is served from the per-venture snapshots;
+    // custom ranges and test data are computed from the source tables.
+    const landing = landingWindows(now)[0];
+    const useSnapshots =
+      !includeTestData &&
+      fromDay.getTime() === landing.from.getTime() &&
+      toExclusive.getTime() === landing.toExclusive.getTime();
+
+    const loadSummaries = async () => {
+      if (useSnapshots) {
+        return readVentureSummaries({
+          ventureIds: scope.allVentures ? null : scope.ventureIds,
+          activeOnly: true,
+        });
+      }
+      const ventureWhere: any = {
+        isActive: true,
+        ...(includeTestData ? {} : { isTest: false }),
+      };
+      if (!scope.allVentures) {
+        ventureWhere.id = { in: scope.ventureIds };
+      }
+      const ventures = await prisma.venture.findMany({
         where: ventureWhere,
         select: { id: true, type: true },
-      }),
-      prisma.office.count({
-        where: {
-          ...(includeTestData ? {} : { isTest: false }),
-          ...(ventureWhere.id ? { ventureId: ventureWhere.id } : {}),
-        },
-      }),
+      });
+      const computed = await computeVentureSummaries(
+        ventures.map((v: any) => v.id),
+        comparisonWindows(fromDay, toExclusive),
+        { includeTest: includeTestData },
+      );
+      return { ventures, summaries: [...computed.values()] };
+    };
+
+    const [{ ventures, summaries }, users] = await Promise.all([
+      loadSummaries(),
       prisma.user.count({
         where: {
           isActive: true,
           ...(includeTestData ? {} : { isTestUser: false }),
         },
       }),
-      prisma.bankAccountSnapshot.findMany({
-        where: {
-          ...(ventureWhere.id ? { ventureId: ventureWhere.id } : {}),
-          date: { lte: toDay },
-        },
-        orderBy: { date: "desc" },
-        take: 100,
-      }),
-    ]);
-
-    const ventureIds = ventures.map((v: any) => v.id);
-
-    const latestByVenture = new Map<number, { balance: number; date: Date }>();
-    for (const snap of bankSnapshots) {
-      if (snap.ventureId == null) continue;
-      const existing = latestByVenture.get(snap.ventureId);
-      if (!existing || snap.date > existing.date) {
-        latestByVenture.set(snap.ventureId, {
-          balance: snap.balance ?? 0,
-          date: snap.date,
-        });
-      }
-    }
-
-    let bankTotal = 0;
-    let bankAsOf: Date | null = null;
-    for (const { balance, date } of latestByVenture.values()) {
-      bankTotal += balance;
-      if (!bankAsOf || date > bankAsOf) bankAsOf = date;
-    }
-
-    const activeVentures = ventures.length;
-    const activeOffices = offices;
-    const approxUsers = users;
-
-    const [
-      logisticsAgg,
-      hospitalityAgg,
-      bpoAgg,
-      saasAgg,
-      incentivesAgg,
-    ] = await Promise.all([
-      getLogisticsAggregate(ventureIds, fromDay, toDay, includeTestData),
-      getHospitalityAggregate(ventureIds, fromDay, toDay, includeTestData),
-      getBpoAggregate(ventureIds, fromDay, toDay, includeTestData),
-      getSaasAggregate(ventureIds, fromDay, toDay, includeTestData),
-      getIncentivesAggregate(ventureIds, fromDay, toDay, includeTestData),
     ]);
 
-    let prevLogistics: any = null;
-    let prevHospitality: any = null;
-    let prevBpo: any = null;
-    let prevSaas: any = null;
-    let prevIncentives: any = null;
-
-    if (doCompare) {
-      const prevTo = new Date(fromDay.getTime() - 1);
-      const prevFrom = new Date(prevTo.getTime());
-      prevFrom.setDate(prevFrom.getDate() - (diffDays - 1));
-
-      [prevLogistics, prevHospitality, prevBpo, prevSaas, prevIncentives] = await Promise.all([
-        getLogisticsAggregate(ventureIds, prevFrom, prevTo, includeTestData),
-        getHospitalityAggregate(ventureIds, prevFrom, prevTo, includeTestData),
-        getBpoAggregate(ventureIds, prevFrom, prevTo, includeTestData),
-        getSaasAggregate(ventureIds, prevFrom, prevTo, includeTestData),
-        getIncentivesAggregate(ventureIds, prevFrom, prevTo, includeTestData),
-      ]);
-    }
+    const current = mergeVentureSummaries(summaries, "current", windowDays);
+    const previous = doCompare ? mergeVentureSummaries(summaries, "previous", windowDays) : null;
 
     const alerts = buildAlerts({
-      logistics: logisticsAgg,
-      hospitality: hospitalityAgg,
-      bpo: bpoAgg,
-      saas: saasAgg,
-      incentives: incentivesAgg,
-      prevLogistics,
-      prevHospitality,
-      prevBpo,
-      prevSaas,
-      prevIncentives,
+      logistics: current.logistics,
+      hospitality: current.hospitality,
+      bpo: current.bpo,
+      saas: current.saas,
+      incentives: current.incentives,
+      prevLogistics: previous?.logistics,
+      prevHospitality: previous?.hospitality,
+      prevBpo: previous?.bpo,
+      prevSaas: previous?.saas,
+      prevIncentives: previous?.incentives,
     });
 
     let aiSummary: string | null = null;
@@ -183,21 +147,16 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
 
     return res.status(200).json({
       portfolio: {
-        activeVentures,
-        activeOffices,
-        approxUsers,
-        bank: bankAsOf
-          ? {
-              total: bankTotal,
-              asOf: bankAsOf.toISOString().slice(0, 10),
-            }
-          : { total: 0, asOf: null },
+        activeVentures: ventures.length,
+        activeOffices: current.offices,
+        approxUsers: users,
+        bank: current.bank.asOf ? current.bank : { total: 0, asOf: null },
       },
-      logistics: logisticsAgg,
-      hospitality: hospitalityAgg,
-      bpo: bpoAgg,
-      saas: saasAgg,
-      incentives: incentivesAgg,
+      logistics: current.logistics,
+      hospitality: current.hospitality,
+      bpo: current.bpo,
+      saas: current.saas,
+      incentives: current.incentives,
       alerts,
       aiSummary,
       from: fromDay.toISOString().slice(0, 10),
@@ -209,349 +168,6 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
   }
 }
 
-async function getLogisticsAggregate(
-  ventureIds: number[],
-  fromDay: Date,
-  toDay: Date,
-  includeTest: boolean,
-) {
-  if (!ventureIds.length) {
-    return {
-      totalLoads: 0,
-      deliveredLoads: 0,
-      marginPct: 0,
-      atRiskLoads: 0,
-    };
-  }
-
-  const where: any = {
-    ventureId: { in: ventureIds },
-    createdAt: { gte: fromDay, lte: toDay },
-  };
-  if (!includeTest) {
-    where.isTest = false;
-  }
-
-  const loads = await prisma.load.findMany({
-    where,
-    select: {
-      status: true,
-      buyRate: true,
-      sellRate: true,
-      billAmount: true,
-      marginAmount: true,
-      atRiskFlag: true,
-    },
-  });
-
-  const totalLoads = loads.length;
-  const deliveredLoads = loads.filter((l: any) => l.status === "DELIVERED").length;
-  const atRiskLoads = loads.filter((l: any) => l.atRiskFlag).length;
-
-  let rev = 0;
-  let margin = 0;
-  for (const l of loads) {
-    const bill = l.billAmount ?? l.sellRate ?? 0;
-    const buy = l.buyRate ?? 0;
-    rev += bill;
-    margin += l.marginAmount ?? bill - buy;
-  }
-
-  const marginPct = rev > 0 ? Number(((margin / rev) * 100).toFixed(1)) : 0;
-
-  return {
-    totalLoads,
-    deliveredLoads,
-    marginPct,
-    atRiskLoads,
-  };
-}
-
-async function getHospitalityAggregate(
-  ventureIds: number[],
-  fromDay: Date,
-  toDay: Date,
-  includeTest: boolean,
-) {
-  if (!ventureIds.length) {
-    return {
-      properties: 0,
-      occupancyPct: 0,
-      adr: 0,
-      revpar: 0,
-      highLossNights: 0,
-    };
-  }
-
-  const hotelWhere: any = {
-    status: "ACTIVE",
-    ventureId: { in: ventureIds },
-  };
-  if (!includeTest) {
-    hotelWhere.isTest = false;
-  }
-
-  const hotels = await prisma.hotelProperty.findMany({
-    where: hotelWhere,
-    select: { id: true },
-  });
-
-  const hotelIds = hotels.map((h: any) => h.id);
-  if (!hotelIds.length) {
-    return {
-      properties: 0,
-      occupancyPct: 0,
-      adr: 0,
-      revpar: 0,
-      highLossNights: 0,
-    };
-  }
-
-  const kpis = await prisma.hotelKpiDaily.findMany({
-    where: {
-      hotelId: { in: hotelIds },
-      date: { gte: fromDay, lte: toDay },
-    },
-    select: {
-      roomsAvailable: true,
-      roomsSold: true,
-      roomRevenue: true,
-      adr: true,
-      revpar: true,
-    },
-  });
-
-  let totalRoomsAvail = 0;
-  let totalRoomsSold = 0;
-  let totalRevenue = 0;
-  let adrSum = 0;
-  let revparSum = 0;
-
-  for (const k of kpis) {
-    totalRoomsAvail += k.roomsAvailable ?? 0;
-    totalRoomsSold += k.roomsSold ?? 0;
-    totalRevenue += k.roomRevenue ?? 0;
-    adrSum += k.adr ?? 0;
-    revparSum += k.revpar ?? 0;
-  }
-
-  const occupancyPct =
-    totalRoomsAvail > 0
-      ? Number(((totalRoomsSold / totalRoomsAvail) * 100).toFixed(1))
-      : 0;
-
-  const adr = kpis.length ? Number((adrSum / kpis.length).toFixed(1)) : 0;
-  const revpar = kpis.length ? Number((revparSum / kpis.length).toFixed(1)) : 0;
-
-  const lossNights = await prisma.hotelDailyReport.count({
-    where: {
-      hotelId: { in: hotelIds },
-      highLossFlag: true,
-      date: { gte: fromDay, lte: toDay },
-    },
-  });
-
-  return {
-    properties: hotelIds.length,
-    occupancyPct,
-    adr,
-    revpar,
-    highLossNights: lossNights,
-  };
-}
-
-async function getBpoAggregate(
-  ventureIds: number[],
-  fromDay: Date,
-  toDay: Date,
-  includeTest: boolean,
-) {
-  if (!ventureIds.length) {
-    return {
-      agents: 0,
-      totalCalls: 0,
-      avgTalkMinutes: 0,
-      utilizationPct: 0,
-    };
-  }
-
-  const agents = await prisma.bpoAgent.count({
-    where: {
-      ventureId: { in: ventureIds },
-      isActive: true,
-    },
-  });
-
-  const where: any = {
-    ventureId: { in: ventureIds },
-    callStartedAt: { gte: fromDay, lte: toDay },
-  };
-  if (!includeTest) {
-    where.isTest = false;
-  }
-
-  const logs = await prisma.bpoCallLog.findMany({
-    where,
-    select: {
-      callStartedAt: true,
-      callEndedAt: true,
-    },
-  });
-
-  let totalCalls = logs.length;
-  let totalTalkSeconds = 0;
-  for (const l of logs) {
-    const startMs = l.callStartedAt?.getTime() ?? 0;
-    const endMs = l.callEndedAt?.getTime() ?? startMs;
-    totalTalkSeconds += Math.max(0, Math.round((endMs - startMs) / 1000));
-  }
-
-  const avgTalkMinutes = totalCalls
-    ? Number(((totalTalkSeconds / totalCalls) / 60).toFixed(1))
-    : 0;
-
-  // Very rough utilization heuristic: talk time vs 6 hours/day per agent in window
-  const days = diffInDays(fromDay, toDay);
-  const theoreticalMinutes = agents * days * 6 * 60;
-  const utilizationPct = theoreticalMinutes
-    ? Number((((totalTalkSeconds / 60) / theoreticalMinutes) * 100).toFixed(1))
-    : 0;
-
-  return {
-    agents,
-    totalCalls,
-    avgTalkMinutes,
-    utilizationPct,
-  };
-}
-
-async function getSaasAggregate(
-  ventureIds: number[],
-  fromDay: Date,
-  toDay: Date,
-  includeTest: boolean,
-) {
-  if (!ventureIds.length) {
-    return {
-      mrr: 0,
-      arr: 0,
-      netGrowthPct: 0,
-      activeCustomers: 0,
-      churnedCustomers: 0,
-    };
-  }
-
-  const whereCustomer: any = {
-    ventureId: { in: ventureIds },
-  };
-  if (!includeTest) {
-    whereCustomer.isTest = false;
-  }
-
-  const customers = await prisma.saasCustomer.findMany({
-    where: whereCustomer,
-    include: {
-      subscriptions: true,
-    },
-  });
-
-  let currentMrr = 0;
-  let activeCustomers = 0;
-  let churnedCustomers = 0;
-  let lastWindowMrr = 0;
-
-  for (const c of customers) {
-    let hasActive = false;
-    for (const s of c.subscriptions) {
-      const isActive = s.isActive;
-      if (isActive) {
-        currentMrr += s.mrr ?? 0;
-        hasActive = true;
-      }
-      const canceledInWindow =
-        s.cancelledAt && s.cancelledAt >= fromDay && s.cancelledAt <= toDay;
-      if (canceledInWindow) {
-        churnedCustomers += 1;
-      }
-      const wasActiveInWindow =
-        s.startedAt <= toDay && (!s.cancelledAt || s.cancelledAt > toDay);
-      if (wasActiveInWindow) {
-        lastWindowMrr += s.mrr ?? 0;
-      }
-    }
-    if (hasActive) activeCustomers += 1;
-  }
-
-  const arr = currentMrr * 12;
-  const netGrowthPct = lastWindowMrr
-    ? Number((((currentMrr - lastWindowMrr) / lastWindowMrr) * 100).toFixed(1))
-    : 0;
-
-  return {
-    mrr: Math.round(currentMrr),
-    arr: Math.round(arr),
-    netGrowthPct,
-    activeCustomers,
-    churnedCustomers,
-  };
-}
-
-type IncentiveSummaryRow = {
-  ventureId: number;
-  userId: number;
-  amount: number | null;
-};
-
-async function getIncentivesAggregate(
-  ventureIds: number[],
-  fromDay: Date,
-  toDay: Date,
-  includeTest: boolean,
-) {
-  if (!ventureIds.length) {
-    return {
-      totalIncentives: 0,
-      venturesWithIncentives: 0,
-      employeesWithIncentives: 0,
-    };
-  }
-
-  const where: any = {
-    ventureId: { in: ventureIds },
-    date: { gte: fromDay, lte: toDay },
-  };
-  if (!includeTest) {
-    where.isTest = false;
-  }
-
-  const rows: IncentiveSummaryRow[] = await prisma.incentiveDaily.findMany({
-    where,
-    select: {
-      ventureId: true,
-      userId: true,
-      amount: true,
-    },
-  });
-
-  const totalIncentives = rows.reduce(
-    (sum: number, r: IncentiveSummaryRow) => sum + (r.amount ?? 0),
-    0,
-  );
-  const venturesWithIncentives = new Set(rows.map((r) => r.ventureId)).size;
-  const employeesWithIncentives = new Set(rows.map((r) => r.userId)).size;
-
-  return {
-    totalIncentives,
-    venturesWithIncentives,
-    employeesWithIncentives,
-  };
-}
-
-function diffInDays(from: Date, to: Date): number {
-  const ms = to.getTime() - from.getTime();
-  return Math.round(ms / (1000 * 60 * 60 * 24)) + 1;
-}
-
 function buildAlerts(params: {
   logistics: { marginPct: number; atRiskLoads: number };
   hospitality: { occupancyPct: number; revpar: number; highLossNights: number };
@@ -0,0 +1,49 @@
+import type { NextApiRequest, NextApiResponse } from "next";
+import { pipeline } from "stream/promises";
+import { openLocalObject } from "@/lib/storage";
+
+// Serves objects from the local storage adapter (STORAGE_PROVIDER=local).
+// Access is granted by the signature from LocalStorageClient.signedUrl, the
+// same way a Supabase signed URL works.
+
+const CONTENT_TYPES: Record<string, string> = {
+  pdf: "application/pdf",
+  doc: "application/msword",
+  docx: "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+  xls: "application/vnd.ms-excel",
+  xlsx: "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+  jpg: "image/jpeg",
+  jpeg: "image/jpeg",
+  png: "image/png",
+  gif: "image/gif",
+  webp: "image/webp",
+};
+
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== "GET") {
+    return res.status(405).json({ error: "Method not allowed" });
+  }
+
+  const segments = Array.isArray(req.query.path) ? req.query.path : [];
+  const [bucket, ...keyParts] = segments;
+  const key = keyParts.join("/");
+  if (!bucket || !key) return res.status(400).json({ error: "Invalid path" });
+
+  let stream;
+  try {
+    stream = await openLocalObject(
+      bucket,
+      key,
+      Number(req.query.expires),
+      String(req.query.signature || "")
+    );
+  } catch {
+    return res.status(400).json({ error: "Invalid path" });
+  }
+  if (!stream) return res.status(404).json({ error: "Not found" });
+
+  const ext = key.split(".").pop()?.toLowerCase() || "";
+  res.setHeader("Content-Type", CONTENT_TYPES[ext] || "application/octet-stream");
+  res.setHeader("Cache-Control", "private, max-age=0");
+  await pipeline(stream, res);
+}
@@ -0,0 +1,105 @@
+import type { NextApiRequest, NextApiResponse } from "next";
+import { prisma } from "@/lib/prisma";
+import { requireUser } from "@/lib/apiAuth";
+import {
+  storageClientForSession,
+  UploadOffsetError,
+  UploadSessionError,
+  type UploadSession,
+} from "@/lib/storage";
+
+export const config = {
+  api: {
+    bodyParser: false,
+  },
+};
+
+/** Read one chunk from the request, refusing bodies larger than `maxBytes`. */
+async function readChunk(req: NextApiRequest, maxBytes: number): Promise<Buffer | null> {
+  const parts: Buffer[] = [];
+  let size = 0;
+  for await (const part of req) {
+    size += part.length;
+    if (size > maxBytes) return null;
+    parts.push(part as Buffer);
+  }
+  return Buffer.concat(parts, size);
+}
+
+/**
+ * GET /api/files/upload-sessions/{sessionId}  → { session } (resume offset in uploadedBytes)
+ * PUT /api/files/upload-sessions/{sessionId}  with header Upload-Offset and one chunk as the body
+ *   → { session, file } where file is set once the last chunk is stored
+ */
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== "GET" && req.method !== "PUT") {
+    return res.status(405).json({ error: "Method not allowed" });
+  }
+
+  const user = await requireUser(req, res);
+  if (!user) return;
+
+  const sessionId = String(req.query.sessionId || "");
+  const client = storageClientForSession(sessionId);
+  if (!client) return res.status(404).json({ error: "Upload session not found" });
+
+  let session: UploadSession | null;
+  try {
+    session = await client.getUploadSession(sessionId);
+  } catch (err) {
+    console.error(err);
+    return res.status(502).json({ error: "Storage unavailable" });
+  }
+  if (!session || session.metadata.uploadedById !== user.id) {
+    return res.status(404).json({ error: "Upload session not found" });
+  }
+
+  if (req.method === "GET") {
+    return res.status(200).json({ session });
+  }
+
+  const offset = Number(req.headers["upload-offset"]);
+  if (!Number.isInteger(offset) || offset < 0) {
+    return res.status(400).json({ error: "Upload-Offset header is required" });
+  }
+
+  const chunk = await readChunk(req, session.chunkSize);
+  if (!chunk || chunk.length === 0) {
+    return res.status(400).json({ error: `Chunks must be 1-${session.chunkSize} bytes` });
+  }
+
+  try {
+    const { session: updated, completed } = await client.uploadChunk(sessionId, offset, chunk);
+    if (!completed) {
+      return res.status(200).json({ session: updated, file: null });
+    }
+
+    const meta = updated.metadata as Record<string, any>;
+    const file = await prisma.file.create({
+      data: {
+        ventureId: meta.ventureId ?? undefined,
+        taskId: meta.taskId ?? undefined,
+        policyId: meta.policyId ?? undefined,
+        fileName: meta.fileName,
+        mimeType: updated.mimeType,
+        sizeBytes: updated.totalBytes,
+        provider: completed.provider,
+        bucket: completed.bucket,
+        path: completed.path,
+        tag: meta.tag ?? null,
+        uploadedById: user.id,
+      },
+    });
+
+    return res.status(200).json({ session: updated, file });
+  } catch (err) {
+    if (err instanceof UploadOffsetError) {
+      return res.status(409).json({ error: err.message, uploadedBytes: err.expectedOffset });
+    }
+    if (err instanceof UploadSessionError) {
+      return res.status(400).json({ error: err.message });
+    }
+    console.error(err);
+    return res.status(500).json({ error: "Chunk upload failed" });
+  }
+}
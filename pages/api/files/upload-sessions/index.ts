@@ -0,0 +1,66 @@
+import type { NextApiRequest, NextApiResponse } from "next";
+import { requireUser } from "@/lib/apiAuth";
+import {
+  INVALID_FILE_TYPE_MESSAGE,
+  MAX_FILE_SIZE,
+  UploadRejectedError,
+  fileSizeExceededMessage,
+  isValidFileType,
+  resolveUploadTarget,
+} from "@/lib/files/uploadRules";
+
+/**
+ * POST /api/files/upload-sessions
+ * Body: { fileName, mimeType, sizeBytes, taskId?, policyId?, ventureId?, tag? }
+ *
+ * Starts a resumable upload. Send the bytes in `chunkSize` pieces to
+ * PUT /api/files/upload-sessions/{sessionId}; after a dropped connection,
+ * GET the session to find the offset to resume from.
+ */
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== "POST") {
+    return res.status(405).json({ error: "Method not allowed" });
+  }
+
+  const user = await requireUser(req, res);
+  if (!user) return;
+
+  const { fileName, mimeType, sizeBytes, taskId, policyId, ventureId, tag } = req.body || {};
+  const size = Number(sizeBytes);
+
+  if (typeof fileName !== "string" || typeof mimeType !== "string" || !Number.isInteger(size) || size <= 0) {
+    return res.status(400).json({ error: "fileName, mimeType and a positive sizeBytes are required" });
+  }
+  if (!isValidFileType(mimeType, fileName)) {
+    return res.status(400).json({ error: INVALID_FILE_TYPE_MESSAGE });
+  }
+  if (size > MAX_FILE_SIZE) {
+    return res.status(400).json({ error: fileSizeExceededMessage(size) });
+  }
+
+  try {
+    const fields: Record<string, string> = {};
+    if (taskId) fields.taskId = String(taskId);
+    if (policyId) fields.policyId = String(policyId);
+    if (ventureId) fields.ventureId = String(ventureId);
+    if (tag) fields.tag = String(tag);
+
+    const target = await resolveUploadTarget(fields, fileName);
+    const session = await target.client.createUploadSession(target.objectKey, mimeType, size, {
+      fileName,
+      ventureId: target.ventureId ?? null,
+      taskId: target.taskId ?? null,
+      policyId: target.policyId ?? null,
+      tag: target.tag,
+      uploadedById: user.id,
+    });
+
+    return res.status(201).json({ session });
+  } catch (err) {
+    if (err instanceof UploadRejectedError) {
+      return res.status(err.status).json({ error: err.message });
+    }
+    console.error(err);
+    return res.status(500).json({ error: "Failed to start upload" });
+  }
+}
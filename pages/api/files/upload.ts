@@ -1,8 +1,17 @@
 import type { NextApiRequest, NextApiResponse } from "next";
 import { prisma } from "@/lib/prisma";
-import { storageClient, createStorageClient } from "@/lib/storage";
+import type { UploadResult } from "@/lib/storage";
+import {
+  INVALID_FILE_TYPE_MESSAGE,
+  MAX_FILE_SIZE,
+  UploadRejectedError,
+  fileSizeExceededMessage,
+  isValidFileType,
+  resolveUploadTarget,
+  type UploadTarget,
+} from "@/lib/files/uploadRules";
 import Busboy from "busboy";
-import { v4 as uuidv4 } from "uuid";
+import { Transform } from "stream";
 import { getServerSession } from "next-auth";
 import { authOptions } from "../auth/[...nextauth]";
 
@@ -19,45 +28,82 @@ async function getCurrentUserId(req: NextApiRequest, res: NextApiResponse): Prom
   return null;
 }
 
-function parseForm(req: NextApiRequest): Promise<{
+type StoredUpload = {
+  target: UploadTarget;
+  fieldsAtFile: Record<string, string>;
+  result: UploadResult;
+  filename: string;
+  mimeType: string;
+  size: number;
+};
+
+/**
+ * Parse the multipart body and stream the file part straight into storage.
+ * Form fields must come before the file part: they decide the bucket and
+ * key, which are needed before the first byte is written.
+ */
+function parseAndStore(req: NextApiRequest): Promise<{
   fields: Record<string, string>;
-  file:
-    | { buffer: Buffer; filename: string; mimeType: string; size: number }
-    | null;
+  stored: StoredUpload | null;
 }> {
   return new Promise((resolve, reject) => {
-    const busboy = Busboy({ headers: req.headers });
+    const busboy = Busboy({
+      headers: req.headers,
+      limits: { files: 1, fileSize: MAX_FILE_SIZE },
+    });
     const fields: Record<string, string> = {};
-    let fileBuffer: Buffer | null = null;
-    let filename = "";
-    let mimeType = "";
+    let filePart: Promise<StoredUpload> | null = null;
 
     busboy.on("file", (_name, file, info) => {
-      filename = info.filename;
-      mimeType = info.mimeType;
-      const chunks: Buffer[] = [];
-      file.on("data", (data) => chunks.push(data));
-      file.on("end", () => {
-        fileBuffer = Buffer.concat(chunks);
-      });
+      const { filename, mimeType } = info;
+      const fieldsAtFile = { ...fields };
+
+      filePart = (async () => {
+        // Validate file type
+        if (!isValidFileType(mimeType, filename)) {
+          throw new UploadRejectedError(400, INVALID_FILE_TYPE_MESSAGE);
+        }
+
+        const target = await resolveUploadTarget(fieldsAtFile, filename);
+
+        let size = 0;
+        const counter = new Transform({
+          transform(chunk, _enc, cb) {
+            size += chunk.length;
+            cb(null, chunk);
+          },
+        });
+        file.on("error", (err) => counter.destroy(err));
+
+        const result = await target.client.upload(
+          target.objectKey,
+          file.pipe(counter),
+          mimeType
+        );
+
+        // busboy stops at the size limit and marks the stream as truncated
+        if (file.truncated) {
+          await target.client.remove(result.bucket, result.path).catch(() => undefined);
+          throw new UploadRejectedError(400, fileSizeExceededMessage());
+        }
+
+        return { target, fieldsAtFile, result, filename, mimeType, size };
+      })();
+
+      // Drain the part if it was rejected before storage consumed it
+      filePart.catch(() => file.resume());
     });
 
     busboy.on("field", (name, val) => {
       fields[name] = val;
     });
 
-    busboy.on("finish", () => {
-      resolve({
-        fields,
-        file: fileBuffer
-          ? {
-              buffer: fileBuffer,
-              filename,
-              mimeType,
-              size: fileBuffer.length,
-            }
-          : null,
-      });
+    busboy.on("finish", async () => {
+      try {
+        resolve({ fields, stored: filePart ? await filePart : null });
+      } catch (err) {
+        reject(err);
+      }
     });
 
     busboy.on("error", reject);
@@ -65,39 +111,6 @@ function parseForm(req: NextApiRequest): Promise<{
   });
 }
 
-// Allowed file types for documents (policies and tasks)
-const ALLOWED_MIME_TYPES = [
-  "application/pdf",
-  "application/msword", // .doc
-  "application/vnd.openxmlformats-officedocument.wordprocessingml.document", // .docx
-  "application/vnd.ms-excel", // .xls
-  "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", // .xlsx
-  "image/jpeg",
-  "image/jpg",
-  "image/png",
-  "image/gif",
-  "image/webp",
-];
-
-const ALLOWED_EXTENSIONS = ["pdf", "doc", "docx", "xls", "xlsx", "jpg", "jpeg", "png", "gif", "webp"];
-
-const MAX_FILE_SIZE = 5 * 1024 * 1024; // 5MB in bytes
-const MAX_FILES_PER_POLICY = 5;
-const MAX_FILES_PER_TASK = 5;
-
-function isValidFileType(mimeType: string, filename: string): boolean {
-  // Check MIME type
-  if (!ALLOWED_MIME_TYPES.includes(mimeType.toLowerCase())) {
-    return false;
-  }
-
-  // Check file extension
-  const ext = filename.includes(".")
-    ? filename.split(".").pop()?.toLowerCase()
-    : "";
-  return ext ? ALLOWED_EXTENSIONS.includes(ext) : false;
-}
-
 export default async function handler(
   req: NextApiRequest,
   res: NextApiResponse
@@ -109,128 +122,42 @@ export default async function handler(
   if (!userId) return res.status(401).json({ error: "Unauthenticated" });
 
   try {
-    const { fields, file } = await parseForm(req);
-    if (!file) return res.status(400).json({ error: "No file provided" });
-
-    // Validate file type
-    if (!isValidFileType(file.mimeType, file.filename)) {
-      return res.status(400).json({
-        error: "Invalid file type. Allowed formats: PDF, Word (.doc, .docx), Excel (.xls, .xlsx), Images (JPG, PNG, GIF, WebP).",
-      });
-    }
-
-    // Validate file size
-    if (file.size > MAX_FILE_SIZE) {
-      return res.status(400).json({
-        error: `File size exceeds 5MB limit. Current size: ${(file.size / 1024 / 1024).toFixed(2)}MB`,
-      });
-    }
+    const { fields, stored } = await parseAndStore(req);
+    if (!stored) return res.status(400).json({ error: "No file provided" });
 
-    const taskId = fields.taskId ? Number(fields.taskId) : undefined;
-    const policyId = fields.policyId ? Number(fields.policyId) : undefined;
-    let ventureId: number | undefined = fields.ventureId
-      ? Number(fields.ventureId)
-      : undefined;
-
-    let task: any = null;
-
-    if (taskId) {
-      task = await prisma.task.findUnique({
-        where: { id: taskId },
-        select: { id: true, ventureId: true },
-      });
-      if (!task) return res.status(400).json({ error: "Invalid taskId" });
-      ventureId = task.ventureId ?? ventureId;
-
-      // Check max files per task
-      const existingFileCount = await prisma.file.count({
-        where: {
-          taskId: taskId,
-          deletedAt: null,
-        },
-      });
-
-      if (existingFileCount >= MAX_FILES_PER_TASK) {
-        return res.status(400).json({
-          error: `Maximum ${MAX_FILES_PER_TASK} files allowed per task. This task already has ${existingFileCount} file(s).`,
-        });
-      }
-    }
-
-    if (policyId) {
-      const policy = await prisma.policy.findUnique({
-        where: { id: policyId },
-        select: { id: true, ventureId: true },
-      });
-      if (!policy) return res.status(400).json({ error: "Invalid policyId" });
-      ventureId = policy.ventureId ?? ventureId;
-
-      // Check max files per policy
-      const existingFileCount = await prisma.file.count({
-        where: {
-          policyId: policyId,
-          deletedAt: null,
-        },
-      });
-
-      if (existingFileCount >= MAX_FILES_PER_POLICY) {
-        return res.status(400).json({
-          error: `Maximum ${MAX_FILES_PER_POLICY} files allowed per policy. This policy already has ${existingFileCount} file(s).`,
-        });
-      }
-    }
-
-    const tag = fields.tag || null;
+    const { target, result: uploadResult } = stored;
 
-    const ext = file.filename.includes(".")
-      ? file.filename.split(".").pop()
-      : "bin";
-
-    let entityType = "general";
-    let entityId = 0;
-    if (taskId) {
-      entityType = "task";
-      entityId = taskId;
-    } else if (policyId) {
-      entityType = "policy";
-      entityId = policyId;
-    }
-
-    const keyParts = [
-      ventureId ? `venture-${ventureId}` : "venture-global",
-      `${entityType}-${entityId}`,
-      `${uuidv4()}.${ext}`,
-    ];
-
-    const objectKey = keyParts.join("/");
-
-    // Use taskFiles bucket for tasks, default bucket for others
-    const client = taskId ? createStorageClient("taskFiles") : storageClient;
-
-    const uploadResult = await client.upload(
-      objectKey,
-      file.buffer,
-      file.mimeType
+    // An attachment field that arrived after the file would have changed
+    // where it belongs; refuse rather than store it unattached.
+    const lateField = ["taskId", "policyId", "ventureId"].find(
+      (name) => fields[name] && !stored.fieldsAtFile[name]
     );
+    if (lateField) {
+      await target.client.remove(uploadResult.bucket, uploadResult.path).catch(() => undefined);
+      return res.status(400).json({ error: `${lateField} must be sent before the file` });
+    }
 
     const created = await prisma.file.create({
       data: {
-        ventureId,
-        taskId,
-        policyId,
-        fileName: file.filename,
-        mimeType: file.mimeType,
-        sizeBytes: file.size,
+        ventureId: target.ventureId,
+        taskId: target.taskId,
+        policyId: target.policyId,
+        fileName: stored.filename,
+        mimeType: stored.mimeType,
+        sizeBytes: stored.size,
         provider: uploadResult.provider,
         bucket: uploadResult.bucket,
         path: uploadResult.path,
-        tag,
+        tag: fields.tag || target.tag,
         uploadedById: userId,
       },
     });
 
     return res.status(200).json({ file: created });
   } catch (err) {
+    if (err instanceof UploadRejectedError) {
+      return res.status(err.status).json({ error: err.message });
+    }
     console.error(err);
     return res.status(500).json({ error: "Upload failed" });
   }
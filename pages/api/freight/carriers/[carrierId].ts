@@ -5,6 +5,7 @@ import { withRequestLogging } from "@/lib/requestLog";
 import { getUserScope } from "@/lib/scope";
 import type { SessionUser } from "@/lib/scope";
 import { parseCarrierDispatchersJson, syncCarrierDispatchersJson } from "@/lib/carriers/dispatchers";
+import { invalidateOutreachEligibility } from "@/lib/outreach/selectCarriersForLoad";
 
 async function handler(req: NextApiRequest, res: NextApiResponse, user: SessionUser) {
   const carrierId = parseInt(req.query.carrierId as string, 10);
@@ -106,6 +107,7 @@ async function handler(req: NextApiRequest, res: NextApiResponse, user: SessionU
       where: { id: carrierId },
       data,
     });
+    invalidateOutreachEligibility();
 
     if (Array.isArray(dispatcherIds)) {
       const existing = await prisma.carrierDispatcher.findMany({
@@ -183,6 +185,7 @@ async function handler(req: NextApiRequest, res: NextApiResponse, user: SessionU
     }
 
     await prisma.carrier.delete({ where: { id: carrierId } });
+    invalidateOutreachEligibility();
 
     withRequestLogging(req, res, { user, ventureId: null, officeId: null }, {
       endpoint: "/freight/carriers/[id]_delete",
@@ -1,7 +1,8 @@
 import type { NextApiRequest, NextApiResponse } from "next";
+import { Prisma } from "@prisma/client";
 import prisma from "../../../lib/prisma";
 import { requireUser } from "@/lib/apiAuth";
-import { applyLoadScope } from "@/lib/scopeLoads";
+import { loadScopeSql } from "@/lib/scopeLoads";
 
 type DailyTrend = {
   date: string;
@@ -52,6 +53,44 @@ const OPEN_STATUSES = ["OPEN", "WORKING", "MAYBE"];
 const AT_RISK_STATUSES = ["AT_RISK"];
 const LOST_STATUSES = ["FELL_OFF", "LOST"];
 
+type DailyRow = {
+  day: Date;
+  total: number;
+  covered: number;
+  coveredOrAssigned: number;
+  open: number;
+  atRisk: number;
+  lost: number;
+};
+
+type AttentionRow = {
+  id: number;
+  reference: string | null;
+  shipperName: string | null;
+  pickupDate: Date | null;
+  createdAt: Date;
+  pickupCity: string | null;
+  pickupState: string | null;
+  dropCity: string | null;
+  dropState: string | null;
+  loadStatus: string;
+  atRiskFlag: boolean;
+  createdByName: string | null;
+  contactCount: number;
+};
+
+type LeaderboardRow = {
+  userId: number;
+  userName: string | null;
+  loadsCovered: number;
+  contactsMade: number;
+  avgMinutes: number | null;
+};
+
+// Everything below is aggregated in Postgres so the response (and memory)
+// stays the same size however wide the date window is.
+const statusIn = (statuses: string[]) => Prisma.sql`l."loadStatus"::text IN (${Prisma.join(statuses)})`;
+
 export default async function handler(
   req: NextApiRequest,
   res: NextApiResponse<CoverageWarRoomResponse | { error: string }>
@@ -70,43 +109,95 @@ export default async function handler(
     const dateFrom = req.query.dateFrom ? new Date(req.query.dateFrom as string) : new Date(Date.now() - 14 * 24 * 60 * 60 * 1000);
     const dateTo = req.query.dateTo ? new Date(req.query.dateTo as string) : new Date();
 
-    const baseWhere: any = {
-      isTest: false,
-      OR: [
-        { pickupDate: { gte: dateFrom, lte: dateTo } },
-        { pickupDate: null, createdAt: { gte: dateFrom, lte: dateTo } },
-      ],
-    };
-
-    if (ventureId) baseWhere.ventureId = ventureId;
-    if (officeId) baseWhere.officeId = officeId;
-
-    const where = applyLoadScope(user, baseWhere);
-
-    const allLoads = await prisma.load.findMany({
-      where,
-      include: {
-        shipper: { select: { name: true } },
-        createdBy: { select: { id: true, fullName: true } },
-        contacts: {
-          include: {
-            madeBy: { select: { id: true, fullName: true } },
-          },
-        },
-        carrier: { select: { id: true } },
-      },
-      orderBy: { pickupDate: "asc" },
-    });
+    const conditions: Prisma.Sql[] = [
+      Prisma.sql`l."isTest" = false`,
+      Prisma.sql`(l."pickupDate" BETWEEN ${dateFrom} AND ${dateTo}
+        OR (l."pickupDate" IS NULL AND l."createdAt" BETWEEN ${dateFrom} AND ${dateTo}))`,
+      loadScopeSql(user),
+    ];
+    if (ventureId) conditions.push(Prisma.sql`l."ventureId" = ${ventureId}`);
+    if (officeId) conditions.push(Prisma.sql`l."officeId" = ${officeId}`);
+    const inWindow = Prisma.join(conditions, " AND ");
 
-    const totalLoads = allLoads.length;
-    const coveredLoads = allLoads.filter((l) => COVERED_STATUSES.includes(l.loadStatus)).length;
-    const openLoads = allLoads.filter((l) => OPEN_STATUSES.includes(l.loadStatus)).length;
-    const atRiskLoads = allLoads.filter((l) => AT_RISK_STATUSES.includes(l.loadStatus) || l.atRiskFlag).length;
-    const lostLoads = allLoads.filter((l) => LOST_STATUSES.includes(l.loadStatus)).length;
+    const isCovered = statusIn(COVERED_STATUSES);
+    const isCoveredOrAssigned = Prisma.sql`(${isCovered} OR l."carrierId" IS NOT NULL)`;
+    const isAtRisk = Prisma.sql`(${statusIn(AT_RISK_STATUSES)} OR l."atRiskFlag")`;
+
+    const [dailyRows, attentionRows, leaderboardRows] = await Promise.all([
+      prisma.$queryRaw<DailyRow[]>`
+        SELECT
+          DATE(COALESCE(l."pickupDate", l."createdAt")) AS "day",
+          COUNT(*)::int AS "total",
+          COUNT(*) FILTER (WHERE ${isCovered})::int AS "covered",
+          COUNT(*) FILTER (WHERE ${isCoveredOrAssigned})::int AS "coveredOrAssigned",
+          COUNT(*) FILTER (WHERE ${statusIn(OPEN_STATUSES)})::int AS "open",
+          COUNT(*) FILTER (WHERE ${isAtRisk})::int AS "atRisk",
+          COUNT(*) FILTER (WHERE ${statusIn(LOST_STATUSES)})::int AS "lost"
+        FROM "Load" l
+        WHERE ${inWindow}
+        GROUP BY 1
+      `,
+      prisma.$queryRaw<AttentionRow[]>`
+        SELECT
+          l."id", l."reference",
+          COALESCE(NULLIF(s."name", ''), l."shipperName") AS "shipperName",
+          l."pickupDate", l."createdAt",
+          l."pickupCity", l."pickupState", l."dropCity", l."dropState",
+          l."loadStatus"::text AS "loadStatus", l."atRiskFlag",
+          u."name" AS "createdByName",
+          (SELECT COUNT(*)::int FROM "CarrierContact" cc WHERE cc."loadId" = l."id") AS "contactCount"
+        FROM "Load" l
+        LEFT JOIN "LogisticsShipper" s ON s."id" = l."shipperId"
+        LEFT JOIN "User" u ON u."id" = l."createdById"
+        WHERE ${inWindow} AND (${statusIn(OPEN_STATUSES)} OR ${isAtRisk})
+        ORDER BY COALESCE(l."pickupDate", l."createdAt") ASC, l."id" ASC
+        LIMIT 50
+      `,
+      // One row per (dispatcher, load): contacts made and the first contact,
+      // then rolled up per dispatcher.
+      prisma.$queryRaw<LeaderboardRow[]>`
+        WITH per_load AS (
+          SELECT
+            cc."madeById" AS "userId",
+            ${isCoveredOrAssigned} AS "covered",
+            COUNT(*) AS "contacts",
+            ROUND(EXTRACT(EPOCH FROM (MIN(cc."createdAt") - l."createdAt")) / 60) AS "minutesToFirst"
+          FROM "CarrierContact" cc
+          JOIN "Load" l ON l."id" = cc."loadId"
+          WHERE ${inWindow}
+          GROUP BY cc."madeById", l."id"
+        )
+        SELECT
+          p."userId",
+          u."name" AS "userName",
+          (COUNT(*) FILTER (WHERE p."covered"))::int AS "loadsCovered",
+          SUM(p."contacts")::int AS "contactsMade",
+          ROUND(AVG(p."minutesToFirst") FILTER (WHERE p."minutesToFirst" >= 0))::int AS "avgMinutes"
+        FROM per_load p
+        LEFT JOIN "User" u ON u."id" = p."userId"
+        GROUP BY p."userId", u."name"
+        ORDER BY "loadsCovered" DESC, "contactsMade" DESC
+        LIMIT 10
+      `,
+    ]);
+
+    const totals = { total: 0, covered: 0, open: 0, atRisk: 0, lost: 0 };
+    for (const row of dailyRows) {
+      totals.total += row.total;
+      totals.covered += row.covered;
+      totals.open += row.open;
+      totals.atRisk += row.atRisk;
+      totals.lost += row.lost;
+    }
+
+    const totalLoads = totals.total;
+    const coveredLoads = totals.covered;
+    const openLoads = totals.open;
+    const atRiskLoads = totals.atRisk;
+    const lostLoads = totals.lost;
     const coverageRatePct = totalLoads > 0 ? Math.round((coveredLoads / totalLoads) * 1000) / 10 : 0;
 
-    const loadsNeedingAttention: LoadNeedingAttention[] = allLoads
-      .filter((l) => [...OPEN_STATUSES, ...AT_RISK_STATUSES].includes(l.loadStatus) || l.atRiskFlag)
+    const loadsNeedingAttention: LoadNeedingAttention[] = attentionRows
       .map((l) => {
         const effectiveDate = l.pickupDate || l.createdAt;
         const hoursToPickup = effectiveDate
@@ -116,87 +207,25 @@ export default async function handler(
         return {
           id: l.id,
           reference: l.reference,
-          shipperName: l.shipper?.name || l.shipperName,
+          shipperName: l.shipperName,
           pickupAt: l.pickupDate?.toISOString() || l.createdAt?.toISOString() || "",
           originCityState: [l.pickupCity, l.pickupState].filter(Boolean).join(", "),
           destCityState: [l.dropCity, l.dropState].filter(Boolean).join(", "),
           status: l.atRiskFlag ? "AT_RISK" : l.loadStatus,
           hoursToPickup,
-          assignedCsrName: l.createdBy?.fullName || null,
-          carriersContactedCount: l.contacts?.length || 0,
+          assignedCsrName: l.createdByName || null,
+          carriersContactedCount: l.contactCount,
         };
       })
-      .sort((a, b) => a.hoursToPickup - b.hoursToPickup)
-      .slice(0, 50);
-
-    const dispatcherMap = new Map<number, {
-      userId: number;
-      userName: string;
-      loadsCovered: Set<number>;
-      contactsMade: number;
-      firstContactTimes: number[];
-    }>();
-
-    for (const load of allLoads) {
-      if (!load.contacts || load.contacts.length === 0) continue;
-
-      for (const contact of load.contacts) {
-        const userId = contact.madeById;
-        const userName = contact.madeBy?.fullName || `User ${userId}`;
-
-        if (!dispatcherMap.has(userId)) {
-          dispatcherMap.set(userId, {
-            userId,
-            userName,
-            loadsCovered: new Set(),
-            contactsMade: 0,
-            firstContactTimes: [],
-          });
-        }
-
-        const entry = dispatcherMap.get(userId)!;
-        entry.contactsMade++;
-
-        if (COVERED_STATUSES.includes(load.loadStatus) || load.carrierId) {
-          entry.loadsCovered.add(load.id);
-        }
-      }
-
-      const firstContactByUser = new Map<number, Date>();
-      for (const contact of load.contacts) {
-        const userId = contact.madeById;
-        const contactTime = new Date(contact.createdAt);
-        if (!firstContactByUser.has(userId) || contactTime < firstContactByUser.get(userId)!) {
-          firstContactByUser.set(userId, contactTime);
-        }
-      }
-
-      for (const [userId, firstContactTime] of firstContactByUser) {
-        const entry = dispatcherMap.get(userId);
-        if (entry && load.createdAt) {
-          const minutesToFirst = Math.round(
-            (firstContactTime.getTime() - new Date(load.createdAt).getTime()) / (1000 * 60)
-          );
-          if (minutesToFirst >= 0) {
-            entry.firstContactTimes.push(minutesToFirst);
-          }
-        }
-      }
-    }
+      .sort((a, b) => a.hoursToPickup - b.hoursToPickup);
 
-    const dispatcherLeaderboard: DispatcherLeaderboardEntry[] = Array.from(dispatcherMap.values())
-      .map((d) => ({
-        userId: d.userId,
-        userName: d.userName,
-        loadsCovered: d.loadsCovered.size,
-        contactsMade: d.contactsMade,
-        avgTimeToFirstContactMinutes:
-          d.firstContactTimes.length > 0
-            ? Math.round(d.firstContactTimes.reduce((a, b) => a + b, 0) / d.firstContactTimes.length)
-            : null,
-      }))
-      .sort((a, b) => b.loadsCovered - a.loadsCovered || b.contactsMade - a.contactsMade)
-      .slice(0, 10);
+    const dispatcherLeaderboard: DispatcherLeaderboardEntry[] = leaderboardRows.map((d) => ({
+      userId: d.userId,
+      userName: d.userName || `User ${d.userId}`,
+      loadsCovered: d.loadsCovered,
+      contactsMade: d.contactsMade,
+      avgTimeToFirstContactMinutes: d.avgMinutes,
+    }));
 
     const startDate = new Date(dateFrom);
     const endDate = new Date(dateTo);
@@ -206,18 +235,9 @@ export default async function handler(
       dailyMap.set(d.toISOString().split("T")[0], { total: 0, covered: 0 });
     }
 
-    for (const load of allLoads) {
-      const effectiveDate = load.pickupDate || load.createdAt;
-      if (!effectiveDate) continue;
-      const dateKey = new Date(effectiveDate).toISOString().split("T")[0];
-      if (!dailyMap.has(dateKey)) {
-        dailyMap.set(dateKey, { total: 0, covered: 0 });
-      }
-      const day = dailyMap.get(dateKey)!;
-      day.total++;
-      if (COVERED_STATUSES.includes(load.loadStatus) || load.carrierId) {
-        day.covered++;
-      }
+    for (const row of dailyRows) {
+      const dateKey = new Date(row.day).toISOString().split("T")[0];
+      dailyMap.set(dateKey, { total: row.total, covered: row.coveredOrAssigned });
     }
 
     const daily: DailyTrend[] = Array.from(dailyMap.entries())
@@ -1,8 +1,17 @@
 import type { NextApiRequest, NextApiResponse } from "next";
+import { Prisma } from "@prisma/client";
 import prisma from "@/lib/prisma";
 import { getEffectiveUser } from "@/lib/effectiveUser";
 import { selectCarriersForLoad } from "@/lib/outreach/selectCarriersForLoad";
 
+type LastMessageRow = {
+  loadId: number;
+  channel: string;
+  status: string;
+  createdAt: Date;
+  recipientCount: number;
+};
+
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   if (req.method !== "GET") {
     res.setHeader("Allow", "GET");
@@ -47,76 +56,36 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       take: 100,
     });
 
-    // Optimize: Batch fetch all outreach messages and replies instead of querying per load
-    // This prevents N+1 query problem and connection pool exhaustion
+    // Latest message and inbound reply count per load, aggregated in SQL so
+    // neither query's size grows with a load's outreach history
     const loadIds = loads.map((l) => l.id);
-    const lastMessagesByLoadId = new Map<number, any>();
+    const lastMessagesByLoadId = new Map<number, LastMessageRow>();
     const replyCountsByLoadId = new Map<number, number>();
-    
-    if (loadIds.length > 0) {
-      // Fetch all last outreach messages in one query
-      // Since we order by createdAt desc, we'll get the latest messages first
-      const allLastMessages = await prisma.outreachMessage.findMany({
-        where: {
-          loadId: { in: loadIds },
-        },
-        orderBy: { createdAt: "desc" },
-        select: {
-          id: true,
-          loadId: true,
-          channel: true,
-          status: true,
-          createdAt: true,
-          _count: { select: { recipients: true } },
-        },
-      });
 
-      // Group by loadId and get the first (latest) message for each load
-      for (const msg of allLastMessages) {
-        if (!lastMessagesByLoadId.has(msg.loadId)) {
-          lastMessagesByLoadId.set(msg.loadId, msg);
-        }
+    if (loadIds.length > 0) {
+      const [lastMessages, replyCounts] = await Promise.all([
+        prisma.$queryRaw<LastMessageRow[]>`
+          SELECT DISTINCT ON (m."loadId")
+            m."loadId", m."channel", m."status", m."createdAt",
+            (SELECT COUNT(*)::int FROM "OutreachRecipient" r WHERE r."messageId" = m."id") AS "recipientCount"
+          FROM "OutreachMessage" m
+          WHERE m."loadId" IN (${Prisma.join(loadIds)})
+          ORDER BY m."loadId", m."createdAt" DESC
+        `,
+        prisma.$queryRaw<Array<{ loadId: number; replies: number }>>`
+          SELECT c."loadId", COUNT(*)::int AS "replies"
+          FROM "OutreachConversation" c
+          JOIN "OutreachReply" r ON r."conversationId" = c."id" AND r."direction" = 'inbound'
+          WHERE c."loadId" IN (${Prisma.join(loadIds)})
+          GROUP BY c."loadId"
+        `,
+      ]);
+
+      for (const msg of lastMessages) {
+        lastMessagesByLoadId.set(msg.loadId, msg);
       }
-
-      // Batch fetch unread reply counts for all loads
-      const conversationsWithLoads = await prisma.outreachConversation.findMany({
-        where: {
-          loadId: { in: loadIds },
-        },
-        select: {
-          loadId: true,
-          id: true,
-        },
-      });
-
-      const conversationIds = conversationsWithLoads.map((c) => c.id);
-      const conversationIdToLoadId = new Map<number, number>();
-      conversationsWithLoads.forEach((c) => {
-        if (c.loadId) {
-          conversationIdToLoadId.set(c.id, c.loadId);
-        }
-      });
-
-      if (conversationIds.length > 0) {
-        const unreadRepliesCounts = await prisma.outreachReply.groupBy({
-          by: ["conversationId"],
-          where: {
-            conversationId: { in: conversationIds },
-            direction: "inbound",
-          },
-          _count: {
-            id: true,
-          },
-        });
-
-        // Map reply counts to loadIds
-        for (const count of unreadRepliesCounts) {
-          const loadId = conversationIdToLoadId.get(count.conversationId);
-          if (loadId) {
-            const current = replyCountsByLoadId.get(loadId) || 0;
-            replyCountsByLoadId.set(loadId, current + count._count.id);
-          }
-        }
+      for (const row of replyCounts) {
+        replyCountsByLoadId.set(row.loadId, row.replies);
       }
     }
 
@@ -134,7 +103,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
           ? {
               channel: lastMessage.channel,
               status: lastMessage.status,
-              recipientCount: lastMessage._count.recipients,
+              recipientCount: lastMessage.recipientCount,
               at: lastMessage.createdAt,
             }
           : null,
@@ -146,7 +115,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     let recommendedCarriers: unknown[] = [];
     let outreachHistory: unknown[] = [];
     let conversations: unknown[] = [];
-    let attribution = null;
+    let attribution: unknown = null;
 
     if (loadId) {
       selectedLoad = await prisma.load.findUnique({
@@ -158,57 +127,56 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       });
 
       if (selectedLoad) {
-        recommendedCarriers = await selectCarriersForLoad({
-          loadId,
-          channel: "email",
-          limit: 50,
-        });
-
-        outreachHistory = await prisma.outreachMessage.findMany({
-          where: { loadId },
-          orderBy: { createdAt: "desc" },
-          select: {
-            id: true,
-            channel: true,
-            subject: true,
-            status: true,
-            provider: true,
-            createdAt: true,
-            _count: { select: { recipients: true } },
-          },
-          take: 20,
-        });
-
-        conversations = await prisma.outreachConversation.findMany({
-          where: { loadId },
-          orderBy: { lastMessageAt: "desc" },
-          include: {
-            carrier: { select: { id: true, name: true, email: true, phone: true } },
-            replies: {
-              orderBy: { createdAt: "asc" },
-              select: {
-                id: true,
-                direction: true,
-                body: true,
-                createdAt: true,
+        [recommendedCarriers, outreachHistory, conversations, attribution] = await Promise.all([
+          selectCarriersForLoad({
+            loadId,
+            channel: "email",
+            limit: 50,
+          }),
+          prisma.outreachMessage.findMany({
+            where: { loadId },
+            orderBy: { createdAt: "desc" },
+            select: {
+              id: true,
+              channel: true,
+              subject: true,
+              status: true,
+              provider: true,
+              createdAt: true,
+              _count: { select: { recipients: true } },
+            },
+            take: 20,
+          }),
+          prisma.outreachConversation.findMany({
+            where: { loadId },
+            orderBy: { lastMessageAt: "desc" },
+            include: {
+              carrier: { select: { id: true, name: true, email: true, phone: true } },
+              replies: {
+                orderBy: { createdAt: "asc" },
+                select: {
+                  id: true,
+                  direction: true,
+                  body: true,
+                  createdAt: true,
+                },
               },
             },
-          },
-        });
-
-        attribution = await prisma.outreachAttribution.findUnique({
-          where: { loadId },
-          select: {
-            id: true,
-            channel: true,
-            timeToFirstReplyMinutes: true,
-            timeToCoverageMinutes: true,
-            margin: true,
-            carrierId: true,
-            createdAt: true,
-            carrier: { select: { id: true, name: true } },
-          },
-        });
+          }),
+          prisma.outreachAttribution.findUnique({
+            where: { loadId },
+            select: {
+              id: true,
+              channel: true,
+              timeToFirstReplyMinutes: true,
+              timeToCoverageMinutes: true,
+              margin: true,
+              carrierId: true,
+              createdAt: true,
+              carrier: { select: { id: true, name: true } },
+            },
+          }),
+        ]);
       }
     }
 
@@ -3,6 +3,7 @@ import { prisma } from "@/lib/prisma";
 import { getEffectiveUser } from "@/lib/effectiveUser";
 import { getUserScope } from "@/lib/scope";
 import { canManageGamificationConfig } from "@/lib/permissions";
+import { invalidateGamificationConfig } from "@/lib/gamification/awardPoints";
 
 export default async function handler(
   req: NextApiRequest,
@@ -58,6 +59,7 @@ export default async function handler(
           config: configData,
         },
       });
+      invalidateGamificationConfig(parsedVentureId);
 
       return res.status(200).json({ config });
     }
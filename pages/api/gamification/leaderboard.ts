@@ -2,6 +2,7 @@ import type { NextApiRequest, NextApiResponse } from "next";
 import { prisma } from "@/lib/prisma";
 import { getEffectiveUser } from "@/lib/effectiveUser";
 import { getUserScope } from "@/lib/scope";
+import { getLeaderboard, LEADERBOARD_PERIODS, type LeaderboardPeriod } from "@/lib/gamification/leaderboard";
 
 export default async function handler(
   req: NextApiRequest,
@@ -16,7 +17,7 @@ export default async function handler(
     return res.status(405).json({ error: "Method not allowed" });
   }
 
-  const { ventureId, officeId, limit = "10" } = req.query;
+  const { ventureId, officeId, limit = "10", period = "all" } = req.query;
 
   if (!ventureId) {
     return res.status(400).json({ error: "ventureId is required" });
@@ -28,29 +29,21 @@ export default async function handler(
     return res.status(403).json({ error: "Forbidden - venture access denied" });
   }
 
+  const parsedPeriod = String(period).toUpperCase() as LeaderboardPeriod;
+  if (!LEADERBOARD_PERIODS.includes(parsedPeriod)) {
+    return res.status(400).json({ error: "period must be one of day, week, month, all" });
+  }
+
   try {
-    const where: { ventureId: number; officeId?: number } = {
+    const board = await getLeaderboard({
       ventureId: parsedVentureId,
-    };
-    if (officeId) {
-      where.officeId = parseInt(officeId as string, 10);
-    }
-
-    const events = await prisma.gamificationEvent.groupBy({
-      by: ["userId"],
-      where,
-      _sum: {
-        points: true,
-      },
-      orderBy: {
-        _sum: {
-          points: "desc",
-        },
-      },
-      take: parseInt(limit as string, 10),
+      officeId: officeId ? parseInt(officeId as string, 10) : null,
+      period: parsedPeriod,
+      limit: Math.min(Math.max(parseInt(limit as string, 10) || 10, 1), 100),
+      userId: user.id,
     });
 
-    const userIds = events.map((e: (typeof events)[number]) => e.userId);
+    const userIds = board.top.map((e) => e.userId);
     const users = await prisma.user.findMany({
       where: { id: { in: userIds } },
       select: { id: true, fullName: true },
@@ -60,14 +53,20 @@ export default async function handler(
       users.map((u: (typeof users)[number]) => [u.id, u.fullName]),
     );
 
-    const leaderboard = events.map((entry: (typeof events)[number], idx: number) => ({
+    const leaderboard = board.top.map((entry) => ({
       userId: entry.userId,
       userName: userMap.get(entry.userId) || "Unknown",
-      totalPoints: entry._sum.points ?? 0,
-      rank: idx + 1,
+      totalPoints: entry.points,
+      rank: entry.rank,
     }));
 
-    return res.status(200).json({ leaderboard });
+    return res.status(200).json({
+      leaderboard,
+      period: board.period.toLowerCase(),
+      periodStart: board.periodStart,
+      totalRanked: board.totalRanked,
+      me: board.me ? { rank: board.me.rank, totalPoints: board.me.points } : null,
+    });
   } catch (error) {
     console.error("Gamification leaderboard error:", error);
     return res.status(500).json({ error: "Internal server error" });
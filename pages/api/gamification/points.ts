@@ -1,6 +1,7 @@
 import type { NextApiRequest, NextApiResponse } from "next";
 import { prisma } from "@/lib/prisma";
 import { getEffectiveUser } from "@/lib/effectiveUser";
+import { leaderboardScoreUpsert, noteLeaderboardAward } from "@/lib/gamification/leaderboard";
 
 export default async function handler(
   req: NextApiRequest,
@@ -49,27 +50,39 @@ export default async function handler(
         });
       }
 
-      const event = await prisma.gamificationEvent.create({
-        data: {
-          userId: parseInt(userId, 10),
-          ventureId: parseInt(ventureId, 10),
-          officeId: officeId ? parseInt(officeId, 10) : null,
-          type: eventType,
-          points: parseInt(points, 10),
-          metadata: metadata ?? null,
-        },
-      });
+      const award = {
+        userId: parseInt(userId, 10),
+        ventureId: parseInt(ventureId, 10),
+        officeId: officeId ? parseInt(officeId, 10) : null,
+        points: parseInt(points, 10),
+        at: new Date(),
+      };
 
-      await prisma.gamificationPointsBalance.upsert({
-        where: { userId: parseInt(userId, 10) },
-        update: {
-          points: { increment: parseInt(points, 10) },
-        },
-        create: {
-          userId: parseInt(userId, 10),
-          points: parseInt(points, 10),
-        },
-      });
+      const [event] = await prisma.$transaction([
+        prisma.gamificationEvent.create({
+          data: {
+            userId: award.userId,
+            ventureId: award.ventureId,
+            officeId: award.officeId,
+            type: eventType,
+            points: award.points,
+            metadata: metadata ?? null,
+            createdAt: award.at,
+          },
+        }),
+        prisma.gamificationPointsBalance.upsert({
+          where: { userId: award.userId },
+          update: {
+            points: { increment: award.points },
+          },
+          create: {
+            userId: award.userId,
+            points: award.points,
+          },
+        }),
+        leaderboardScoreUpsert(award),
+      ]);
+      noteLeaderboardAward(award);
 
       return res.status(201).json({ event });
     }
@@ -4,18 +4,7 @@ import { requireUser } from '@/lib/apiAuth';
 import { canViewPortfolioResource } from "@/lib/permissions";
 
 import { getUserScope } from '../../../lib/scope';
-
-function startOfDay(d: Date) {
-  const x = new Date(d);
-  x.setHours(0, 0, 0, 0);
-  return x;
-}
-
-function endOfDay(d: Date) {
-  const x = new Date(d);
-  x.setHours(23, 59, 59, 999);
-  return x;
-}
+import { readHotelKpiTotals, readHotelReviewSummary, trailingWindow } from '@/lib/hotels/kpiRollups';
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   if (req.method !== 'GET') {
@@ -34,18 +23,11 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     const ventureId = req.query.ventureId ? Number(req.query.ventureId) : undefined;
     const includeTest = req.query.includeTest === 'true';
 
-    const now = new Date();
-    const todayEnd = endOfDay(now);
-
     // Fixed 7-day window for hospitality dashboard (last 7 days including today)
-    const sevenDaysAgo = new Date();
-    sevenDaysAgo.setDate(sevenDaysAgo.getDate() - 6);
-    const sevenStart = startOfDay(sevenDaysAgo);
+    const sevenDays = trailingWindow('7d', 7);
 
     // Fixed 30-day window for review-related metrics
-    const thirtyDaysAgo = new Date();
-    thirtyDaysAgo.setDate(thirtyDaysAgo.getDate() - 29);
-    const thirtyStart = startOfDay(thirtyDaysAgo);
+    const thirtyDays = trailingWindow('30d', 30);
 
     const hotelWhere: any = {
       status: 'ACTIVE',
@@ -68,52 +50,18 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
 
     const hotelIds = hotels.map((h: (typeof hotels)[number]) => h.id);
 
-    const metrics = await prisma.hotelKpiDaily.findMany({
-      where: {
-        hotelId: { in: hotelIds },
-        date: {
-          gte: sevenStart,
-          lte: todayEnd,
-        },
-      },
-    });
-
-    type HotelAgg = {
-      hotelId: number;
-      days: number;
-      occSum: number;
-      adrSum: number;
-      revparSum: number;
-      revenueSum: number;
-    };
-
-    const aggMap = new Map<number, HotelAgg>();
-
-    for (const m of metrics) {
-      if (!aggMap.has(m.hotelId)) {
-        aggMap.set(m.hotelId, {
-          hotelId: m.hotelId,
-          days: 0,
-          occSum: 0,
-          adrSum: 0,
-          revparSum: 0,
-          revenueSum: 0,
-        });
-      }
-      const agg = aggMap.get(m.hotelId)!;
-      agg.days += 1;
-      agg.occSum += m.occupancyPct || 0;
-      agg.adrSum += m.adr || 0;
-      agg.revparSum += m.revpar || 0;
-      agg.revenueSum += m.totalRevenue || 0;
-    }
+    const [kpiTotals, reviews] = await Promise.all([
+      readHotelKpiTotals({ hotelIds }, [sevenDays], { byHotel: true }),
+      readHotelReviewSummary(hotelIds, includeTest, thirtyDays),
+    ]);
 
     const hotelCards = hotels.map((h: (typeof hotels)[number]) => {
-      const agg = aggMap.get(h.id);
+      const agg = kpiTotals.get(`${sevenDays.key}:${h.id}`);
       const avgOcc = agg && agg.days ? agg.occSum / agg.days : 0;
       const avgAdr = agg && agg.days ? agg.adrSum / agg.days : 0;
       const avgRevpar = agg && agg.days ? agg.revparSum / agg.days : 0;
-      const totalRevenue = agg ? agg.revenueSum : 0;
+      const totalRevenue = agg ? agg.totalRevenue : 0;
+      const lossNights = agg ? agg.lossNights : 0;
       return {
         id: h.id,
         name: h.name,
@@ -126,6 +74,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         avgAdr,
         avgRevpar,
         totalRevenue,
+        lossNights,
       };
     });
 
@@ -162,48 +111,12 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       0,
     );
 
-    const reviewWhere: any = {
-      hotelId: { in: hotelIds },
-      ...(includeTest ? {} : { isTest: false }),
-    };
-
-    const allReviews = await prisma.hotelReview.findMany({
-      where: reviewWhere,
-      select: {
-        hotelId: true,
-        rating: true,
-        reviewDate: true,
-        responseText: true,
-        source: true,
-      },
-    });
-
-    const totalReviews = allReviews.length;
-    const ratedReviews = allReviews.filter(
-      (r: (typeof allReviews)[number]) => r.rating != null,
-    );
-    const avgRating =
-      ratedReviews.length > 0
-        ?
-            ratedReviews.reduce(
-              (sum: number, r: (typeof ratedReviews)[number]) => sum + (r.rating || 0),
-              0,
-            ) / ratedReviews.length
-        : null;
-
-    const recentReviews = allReviews.filter(
-      (r: (typeof allReviews)[number]) =>
-        r.reviewDate && r.reviewDate >= thirtyStart && r.reviewDate <= todayEnd,
-    );
-
-    const unrespondedReviews = allReviews.filter(
-      (r: (typeof allReviews)[number]) => !r.responseText,
+    const lossNights7d = hotelCards.reduce(
+      (sum: number, c: (typeof hotelCards)[number]) => sum + c.lossNights,
+      0,
     );
 
-    const sourceCounts: Record<string, number> = {};
-    for (const r of allReviews) {
-      sourceCounts[r.source] = (sourceCounts[r.source] || 0) + 1;
-    }
+    const avgRating = reviews.ratedReviews > 0 ? reviews.ratingSum / reviews.ratedReviews : null;
 
     const topPerformers = [...hotelCards]
       .sort((a, b) => b.avgRevpar - a.avgRevpar)
@@ -222,11 +135,14 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         globalOcc,
         globalAdr,
         totalRevenue7d,
-        totalReviews,
+        lossNights7d,
+        totalReviews: reviews.totalReviews,
         avgRating,
-        recentReviewCount: recentReviews.length,
-        unrespondedCount: unrespondedReviews.length,
-        sourceCounts,
+        recentReviewCount: reviews.recent,
+        unrespondedCount: reviews.unresponded,
+        positiveReviewCount: reviews.positive,
+        negativeReviewCount: reviews.negative,
+        sourceCounts: reviews.sourceCounts,
       },
       hotels: hotelCards,
       topPerformers,
@@ -1,6 +1,7 @@
 import type { NextApiRequest, NextApiResponse } from "next";
 import { prisma } from "@/lib/prisma";
 import { requireAdminPanelUser } from "@/lib/apiAuth";
+import { parseSeverityParam, severitiesAtLeast } from "@/lib/hotels/lossClassification";
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const user = await requireAdminPanelUser(req, res);
@@ -19,8 +20,14 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       page = "1",
       pageSize = "50",
       includeTest,
+      severity,
     } = req.query;
 
+    const minSeverity = parseSeverityParam(severity);
+    if (minSeverity === null) {
+      return res.status(400).json({ error: "Invalid severity" });
+    }
+
     const includeTestData = includeTest === 'true';
     const pageNum = Math.max(1, parseInt(String(page), 10) || 1);
     const take = Math.min(200, Math.max(1, parseInt(String(pageSize), 10) || 50));
@@ -35,6 +42,10 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       highLossFlag: true,
     };
 
+    if (minSeverity) {
+      where.lossSeverity = { in: severitiesAtLeast(minSeverity) };
+    }
+
     if (hotelId && typeof hotelId === "string") {
       where.hotelId = Number(hotelId);
     }
@@ -64,6 +75,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
           totalRoom: true,
           total: true,
           highLossFlag: true,
+          lossSeverity: true,
         },
       }),
       prisma.hotelDailyReport.count({ where }),
@@ -77,6 +89,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       roomsAvailable: r.totalRoom,
       roomRevenue: r.total,
       highLossFlag: r.highLossFlag,
+      lossSeverity: r.lossSeverity,
     }));
 
     return res.status(200).json({
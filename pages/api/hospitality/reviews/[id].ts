@@ -5,6 +5,7 @@ import { getUserScope } from '../../../../lib/scope';
 import { canCreateTasks } from '../../../../lib/permissions';
 import { validateIdOr400, validateTextField } from "@/lib/validation";
 import { logger } from "@/lib/logger";
+import { refreshHotelReviewRollups } from "@/lib/hotels/kpiRollups";
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const { id } = req.query;
@@ -58,6 +59,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
           respondedBy: { select: { id: true, fullName: true } },
         },
       });
+      await refreshHotelReviewRollups(updated.hotelId);
 
       // Award gamification points for hotel review response
       if (safeResponseText && updated.respondedById) {
@@ -3,6 +3,7 @@ import prisma from '../../../../lib/prisma';
 import { requireUser } from '@/lib/apiAuth';
 import { getUserScope } from '../../../../lib/scope';
 import { canCreateTasks } from '../../../../lib/permissions';
+import { refreshHotelReviewRollups } from '@/lib/hotels/kpiRollups';
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const user = await requireUser(req, res);
@@ -123,6 +124,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
           hotel: { select: { id: true, name: true, brand: true } },
         },
       });
+      await refreshHotelReviewRollups(review.hotelId);
 
       return res.status(201).json(review);
     }
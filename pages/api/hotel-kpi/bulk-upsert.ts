@@ -4,6 +4,7 @@ import prisma from "@/lib/prisma";
 import { withUser } from "@/lib/api";
 import { hasPermission } from "@/lib/permissions";
 import { upsertHotelKpiDaily } from "@/lib/kpiHotel";
+import { trackHotelKpiWrites } from "@/lib/hotels/kpiRollups";
 
 export default withUser(async function handler(
   req: NextApiRequest,
@@ -38,6 +39,7 @@ export default withUser(async function handler(
 
     let updated = 0;
     const errors: Array<{ index: number; error: string }> = [];
+    const rollups = trackHotelKpiWrites();
 
     for (let i = 0; i < rows.length; i++) {
       const row = rows[i];
@@ -98,6 +100,7 @@ export default withUser(async function handler(
               ? Number(roomsOutOfOrder)
               : undefined,
         });
+        rollups.touch(parsedHotelId, parsedDate);
 
         updated++;
       } catch (innerErr: any) {
@@ -112,6 +115,8 @@ export default withUser(async function handler(
       }
     }
 
+    await rollups.flush();
+
     return res.status(200).json({ success: true, updated, errors });
   } catch (error) {
     console.error("Hotel KPI bulk upsert error:", error);
@@ -4,6 +4,7 @@ import prisma from "@/lib/prisma";
 import { withUser } from "@/lib/api";
 import { hasPermission } from "@/lib/permissions";
 import { upsertHotelKpiDaily } from "@/lib/kpiHotel";
+import { refreshHotelKpiRollups } from "@/lib/hotels/kpiRollups";
 
 export default withUser(async function handler(
   req: NextApiRequest,
@@ -76,6 +77,7 @@ export default withUser(async function handler(
       roomsOutOfOrder:
         roomsOutOfOrder != null ? Number(roomsOutOfOrder) : undefined,
     });
+    await refreshHotelKpiRollups(parsedHotelId, parsedDate, parsedDate);
 
     return res.status(200).json({ success: true, kpi });
   } catch (error) {
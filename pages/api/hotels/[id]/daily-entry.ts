@@ -3,9 +3,8 @@ import { prisma } from "@/lib/prisma";
 import { requireUser } from "@/lib/apiAuth";
 import { getUserScope } from "@/lib/scope";
 import { ROLE_CONFIG } from "@/lib/permissions";
-
-const LOST_DUES_ABS_THRESHOLD = 500;
-const LOST_DUES_RATIO_THRESHOLD = 0.1;
+import { refreshHotelKpiRollups } from "@/lib/hotels/kpiRollups";
+import { classifyLoss } from "@/lib/hotels/lossClassification";
 
 export default async function handler(
   req: NextApiRequest,
@@ -93,13 +92,7 @@ export default async function handler(
       const adr = sold > 0 ? roomRev / sold : 0;
       const revpar = available > 0 ? roomRev / available : 0;
 
-      let highLossFlag = false;
-      if (lostDuesAmt > 0 && roomRev > 0) {
-        const ratio = lostDuesAmt / roomRev;
-        if (lostDuesAmt >= LOST_DUES_ABS_THRESHOLD || ratio >= LOST_DUES_RATIO_THRESHOLD) {
-          highLossFlag = true;
-        }
-      }
+      const { highLossFlag, lossSeverity } = classifyLoss(paymentTotal, lostDuesAmt);
 
       await prisma.$transaction([
         prisma.hotelKpiDaily.upsert({
@@ -148,6 +141,7 @@ export default async function handler(
             adr,
             revpar: revpar,
             highLossFlag,
+            lossSeverity,
           },
           create: {
             hotelId,
@@ -165,9 +159,11 @@ export default async function handler(
             adr,
             revpar: revpar,
             highLossFlag,
+            lossSeverity,
           },
         }),
       ]);
+      await refreshHotelKpiRollups(hotelId, parsedDate, parsedDate);
 
       // Log audit event for hotel daily entry
       const { logAuditEvent } = await import("@/lib/audit");
@@ -187,6 +183,7 @@ export default async function handler(
           adr,
           revpar,
           highLossFlag,
+          lossSeverity,
         },
       });
 
@@ -202,6 +199,7 @@ export default async function handler(
           adr,
           revpar,
           highLossFlag,
+          lossSeverity,
         },
       });
     } catch (err: any) {
@@ -2,6 +2,12 @@ import type { NextApiRequest, NextApiResponse } from "next";
 import prisma from "@/lib/prisma";
 import { getServerSession } from "next-auth";
 import { authOptions } from "@/pages/api/auth/[...nextauth]";
+import {
+  dayWindow,
+  readHotelKpiTotals,
+  type HotelKpiTotals,
+  type HotelScope,
+} from "@/lib/hotels/kpiRollups";
 
 type PeriodMetrics = {
   label: string;
@@ -79,27 +85,15 @@ export default async function handler(
     const lyYtdEnd = new Date(currentYear - 1, currentMonth, currentDay);
 
     const where: Record<string, unknown> = {};
+    const scope: HotelScope = {};
     if (hotelId) {
       where.hotelId = Number(hotelId);
+      scope.hotelIds = [Number(hotelId)];
     } else if (ventureId) {
       where.ventureId = Number(ventureId);
+      scope.ventureId = Number(ventureId);
     }
 
-    const [mtdData, lyMtdData, ytdData, lyYtdData] = await Promise.all([
-      prisma.hotelKpiDaily.findMany({
-        where: { ...where, date: { gte: mtdStart, lte: mtdEnd } },
-      }),
-      prisma.hotelKpiDaily.findMany({
-        where: { ...where, date: { gte: lyMtdStart, lte: lyMtdEnd } },
-      }),
-      prisma.hotelKpiDaily.findMany({
-        where: { ...where, date: { gte: ytdStart, lte: ytdEnd } },
-      }),
-      prisma.hotelKpiDaily.findMany({
-        where: { ...where, date: { gte: lyYtdStart, lte: lyYtdEnd } },
-      }),
-    ]);
-
     const last30Start = new Date(now);
     last30Start.setDate(last30Start.getDate() - 30);
     const lyLast30Start = new Date(last30Start);
@@ -107,48 +101,33 @@ export default async function handler(
     const lyLast30End = new Date(now);
     lyLast30End.setFullYear(lyLast30End.getFullYear() - 1);
 
-    const [last30Data, lyLast30Data] = await Promise.all([
+    // Period totals come from the weekly/monthly rollups; only the trend needs daily rows
+    const [periodTotals, trendRows] = await Promise.all([
+      readHotelKpiTotals(scope, [
+        dayWindow("MTD", mtdStart, mtdEnd),
+        dayWindow("LY MTD", lyMtdStart, lyMtdEnd),
+        dayWindow("YTD", ytdStart, ytdEnd),
+        dayWindow("LY YTD", lyYtdStart, lyYtdEnd),
+      ]),
       prisma.hotelKpiDaily.findMany({
-        where: { ...where, date: { gte: last30Start, lte: now } },
-        orderBy: { date: "asc" },
-      }),
-      prisma.hotelKpiDaily.findMany({
-        where: { ...where, date: { gte: lyLast30Start, lte: lyLast30End } },
+        where: {
+          ...where,
+          OR: [
+            { date: { gte: last30Start, lte: now } },
+            { date: { gte: lyLast30Start, lte: lyLast30End } },
+          ],
+        },
+        select: { date: true, occupancyPct: true, roomRevenue: true, adr: true, revpar: true },
         orderBy: { date: "asc" },
       }),
     ]);
 
-    // Debug logging - check what data was found
-    if (mtdData.length > 0) {
-      const sample = mtdData[0];
-      console.log('🔍 KPI Comparison Query Debug:', {
-        hotelId: where.hotelId,
-        currentDate: now.toISOString(),
-        mtdRange: { from: mtdStart.toISOString(), to: mtdEnd.toISOString() },
-        ytdRange: { from: ytdStart.toISOString(), to: ytdEnd.toISOString() },
-        last30Range: { from: last30Start.toISOString(), to: now.toISOString() },
-        mtdDataCount: mtdData.length,
-        ytdDataCount: ytdData.length,
-        last30DataCount: last30Data.length,
-        mtdSampleDates: mtdData.slice(0, 3).map(r => r.date.toISOString().split('T')[0]),
-        last30SampleDates: last30Data.slice(0, 5).map(r => r.date.toISOString().split('T')[0]),
-        sampleRecord: {
-          date: sample.date.toISOString().split('T')[0],
-          hasBaseFields: sample.roomRevenue > 0 || sample.roomsSold > 0,
-          roomRevenue: sample.roomRevenue,
-          roomsSold: sample.roomsSold,
-          occupancyPct: sample.occupancyPct,
-          adr: sample.adr,
-          revpar: sample.revpar,
-        },
-      });
-    }
+    const last30Data = trendRows.filter((r) => r.date >= last30Start);
+    const lyLast30Data = trendRows.filter((r) => r.date < last30Start);
 
-    const aggregatePeriod = (
-      data: typeof mtdData,
-      label: string
-    ): PeriodMetrics => {
-      if (data.length === 0) {
+    const aggregatePeriod = (label: string): PeriodMetrics => {
+      const data: HotelKpiTotals | undefined = periodTotals.get(label);
+      if (!data || data.days === 0) {
         return {
           label,
           roomsSold: 0,
@@ -162,48 +141,31 @@ export default async function handler(
         };
       }
 
-      const roomsSold = data.reduce((sum, r) => sum + r.roomsSold, 0);
-      const roomsAvailable = data.reduce((sum, r) => sum + r.roomsAvailable, 0);
-      let roomRevenue = data.reduce((sum, r) => sum + r.roomRevenue, 0);
-      const totalRevenue = data.reduce((sum, r) => sum + r.totalRevenue, 0);
-      
+      const { roomsSold, roomsAvailable, totalRevenue } = data;
+      let roomRevenue = data.roomRevenue;
+
       // Check if we have base fields (Night Audit data) or only calculated fields (STR data)
       const hasBaseFields = roomRevenue > 0 || roomsSold > 0 || roomsAvailable > 0;
-      
+
       let occupancyPct: number;
       let adr: number;
       let revpar: number;
-      
+
       if (hasBaseFields) {
         // Night Audit data - calculate from base fields
         occupancyPct = roomsAvailable > 0 ? (roomsSold / roomsAvailable) * 100 : 0;
         adr = roomsSold > 0 ? roomRevenue / roomsSold : 0;
         revpar = roomsAvailable > 0 ? roomRevenue / roomsAvailable : 0;
       } else {
-        // STR data - use stored calculated values (weighted average)
-        // Calculate averages of the stored occupancyPct, adr, revpar
-        const validOccupancy = data.filter(r => r.occupancyPct > 0);
-        const validAdr = data.filter(r => r.adr > 0);
-        const validRevpar = data.filter(r => r.revpar > 0);
-        
-        occupancyPct = validOccupancy.length > 0
-          ? validOccupancy.reduce((sum, r) => sum + r.occupancyPct, 0) / validOccupancy.length
-          : 0;
-        adr = validAdr.length > 0
-          ? validAdr.reduce((sum, r) => sum + r.adr, 0) / validAdr.length
-          : 0;
-        revpar = validRevpar.length > 0
-          ? validRevpar.reduce((sum, r) => sum + r.revpar, 0) / validRevpar.length
-          : 0;
-        
+        // STR data - average the stored occupancyPct, adr, revpar over days that have them
+        occupancyPct = data.occPositiveDays > 0 ? data.occPositiveSum / data.occPositiveDays : 0;
+        adr = data.adrPositiveDays > 0 ? data.adrPositiveSum / data.adrPositiveDays : 0;
+        revpar = data.revparPositiveDays > 0 ? data.revparPositiveSum / data.revparPositiveDays : 0;
+
         // Estimate roomRevenue from revpar for summary purposes
-        // revpar = revenue / available, so if we have revpar, estimate revenue
-        // Use average rooms available from Night Audit data if available, otherwise assume 150
+        // revpar = revenue / available; STR rows carry no rooms available, so assume 150
         if (revpar > 0) {
-          const avgAvailable = roomsAvailable > 0 
-            ? roomsAvailable / data.length 
-            : (data.find(r => r.roomsAvailable > 0)?.roomsAvailable || 150);
-          roomRevenue = revpar * avgAvailable * data.length;
+          roomRevenue = revpar * 150 * data.days;
         }
       }
 
@@ -216,14 +178,14 @@ export default async function handler(
         occupancyPct,
         adr,
         revpar,
-        daysInPeriod: data.length,
+        daysInPeriod: data.days,
       };
     };
 
-    const mtd = aggregatePeriod(mtdData, "MTD");
-    const lyMtd = aggregatePeriod(lyMtdData, "LY MTD");
-    const ytd = aggregatePeriod(ytdData, "YTD");
-    const lyYtd = aggregatePeriod(lyYtdData, "LY YTD");
+    const mtd = aggregatePeriod("MTD");
+    const lyMtd = aggregatePeriod("LY MTD");
+    const ytd = aggregatePeriod("YTD");
+    const lyYtd = aggregatePeriod("LY YTD");
 
     const calcChange = (
       curr: PeriodMetrics,
@@ -5,6 +5,7 @@ import { canViewPortfolioResource } from "@/lib/permissions";
 
 import { getUserScope } from "../../../lib/scope";
 import { logger } from "@/lib/logger";
+import { parseSeverityParam, severitiesAtLeast } from "@/lib/hotels/lossClassification";
 
 export default async function handler(
   req: NextApiRequest,
@@ -42,6 +43,7 @@ export default async function handler(
     const rawTo = req.query.to as string | undefined;
     const limit = req.query.limit ? Number(req.query.limit) : 100;
     const includeTest = req.query.includeTest === 'true';
+    const minSeverity = parseSeverityParam(req.query.severity);
 
     if (Number.isNaN(ventureId as number) && req.query.ventureId) {
       return res.status(400).json({ error: "Invalid ventureId" });
@@ -54,6 +56,10 @@ export default async function handler(
       return res.status(400).json({ error: "Invalid limit" });
     }
 
+    if (minSeverity === null) {
+      return res.status(400).json({ error: "Invalid severity" });
+    }
+
     let from: Date | undefined;
     let to: Date | undefined;
 
@@ -85,8 +91,11 @@ export default async function handler(
       }
     }
 
+    // Flag and severity are persisted on ingest / by the nightly scan and
+    // indexed with the date, so this is a straight index range read
     const where: any = {
       highLossFlag: true,
+      ...(minSeverity ? { lossSeverity: { in: severitiesAtLeast(minSeverity) } } : {}),
       hotel: {
         ...(includeTest ? {} : { isTest: false }),
       },
@@ -159,6 +168,7 @@ export default async function handler(
         adr: r.adr,
         revpar: r.revpar,
         highLossFlag: r.highLossFlag,
+        lossSeverity: r.lossSeverity,
       };
     });
 
@@ -5,6 +5,7 @@ import csv from "csv-parser";
 import prisma from "@/lib/prisma";
 import { requireUploadPermission } from "@/lib/apiAuth";
 import { logAuditEvent } from "@/lib/audit";
+import { refreshHotelKpiRollups } from "@/lib/hotels/kpiRollups";
 
 export const config = {
   api: {
@@ -138,6 +139,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
             });
           }
 
+          await refreshHotelKpiRollups(propertyId, minDate!, maxDate!);
+
           await logAuditEvent(req, user, {
             domain: "hotels",
             action: "NIGHT_AUDIT_UPLOAD",
@@ -1,9 +1,7 @@
 import type { NextApiRequest, NextApiResponse } from "next";
-import prisma from "../../../lib/prisma";
 import { requireUser } from '@/lib/apiAuth';
-
-const LOST_DUES_ABS_THRESHOLD = 100;
-const LOST_DUES_RATIO_THRESHOLD = 0.05;
+import { refreshHotelKpiRollups } from "@/lib/hotels/kpiRollups";
+import { reclassifyLossNights } from "@/lib/hotels/lossClassification";
 
 export default async function handler(
   req: NextApiRequest,
@@ -29,54 +27,17 @@ export default async function handler(
   const yesterdayEnd = todayMidnight;
 
   try {
-    const reports = await prisma.hotelDailyReport.findMany({
-      where: {
-        date: {
-          gte: yesterdayStart,
-          lt: yesterdayEnd,
-        },
-      },
-    });
-
-    let flaggedCount = 0;
-    let updatedCount = 0;
-
-    for (const r of reports) {
-      const total = r.total ?? 0;
-      const lostDues = r.lostDues ?? 0;
-      const roomSold = r.roomSold ?? 0;
-
-      const adrNet = roomSold > 0 ? (total - lostDues) / roomSold : 0;
-
-      let isHighLoss = false;
-      if (lostDues > 0 && total > 0) {
-        const ratio = lostDues / total;
-        if (
-          lostDues >= LOST_DUES_ABS_THRESHOLD ||
-          ratio >= LOST_DUES_RATIO_THRESHOLD
-        ) {
-          isHighLoss = true;
-        }
-      }
+    const result = await reclassifyLossNights(yesterdayStart, yesterdayEnd);
 
-      if (r.adr !== adrNet || r.highLossFlag !== isHighLoss) {
-        await prisma.hotelDailyReport.update({
-          where: { id: r.id },
-          data: {
-            adr: adrNet,
-            highLossFlag: isHighLoss,
-          },
-        });
-        updatedCount++;
-        if (isHighLoss) flaggedCount++;
-      }
+    for (const hotelId of result.flagChangedHotelIds) {
+      await refreshHotelKpiRollups(hotelId, yesterdayStart, yesterdayStart);
     }
 
     return res.status(200).json({
       ok: true,
-      scanned: reports.length,
-      updated: updatedCount,
-      highLossDays: flaggedCount,
+      scanned: result.scanned,
+      updated: result.updated,
+      highLossDays: result.highLossDays,
     });
   } catch (err) {
     console.error("nightly-loss-scan error", err);
@@ -4,12 +4,11 @@ import csv from "csv-parser";
 import formidable from "formidable";
 import fs from "fs";
 import { requireUploadPermission } from '@/lib/apiAuth';
+import { trackHotelKpiWrites } from '@/lib/hotels/kpiRollups';
+import { classifyLoss } from '@/lib/hotels/lossClassification';
 
 export const config = { api: { bodyParser: false } };
 
-const LOST_DUES_ABS_THRESHOLD = 100;
-const LOST_DUES_RATIO_THRESHOLD = 0.05;
-
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const user = await requireUploadPermission(req, res);
   if (!user) return;
@@ -49,7 +48,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         try {
           let count = 0;
           const errors: string[] = [];
-          
+          const rollups = trackHotelKpiWrites();
+
           for (const row of rows) {
             const date = new Date(row["Date"]);
             if (isNaN(date.getTime())) continue;
@@ -65,13 +65,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
 
             const adrNet = roomSold > 0 ? (total - lostDues) / roomSold : 0;
 
-            let highLossFlag = false;
-            if (lostDues > 0 && total > 0) {
-              const ratio = lostDues / total;
-              if (lostDues >= LOST_DUES_ABS_THRESHOLD || ratio >= LOST_DUES_RATIO_THRESHOLD) {
-                highLossFlag = true;
-              }
-            }
+            const { highLossFlag, lossSeverity } = classifyLoss(total, lostDues);
 
             await prisma.hotelDailyReport.upsert({
               where: {
@@ -91,6 +85,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
                 adr: adrNet,
                 revpar: Number(row["RevPar"] || 0),
                 highLossFlag,
+                lossSeverity,
               },
               create: {
                 hotelId,
@@ -108,6 +103,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
                 adr: adrNet,
                 revpar: Number(row["RevPar"] || 0),
                 highLossFlag,
+                lossSeverity,
               },
             });
 
@@ -150,10 +146,13 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
                 ventureId: hotel.ventureId,
               },
             });
+            rollups.touch(hotelId, date);
 
             count++;
           }
 
+          await rollups.flush();
+
           return res.json({ 
             success: true, 
             count,
@@ -3,6 +3,8 @@ import { getServerSession } from 'next-auth/next';
 import { authOptions } from '../../../auth/[...nextauth]';
 import { prisma } from '@/lib/prisma';
 import { parseFile } from '@/lib/import/parser';
+import { refreshHotelReviewRollups, trackHotelKpiWrites } from '@/lib/hotels/kpiRollups';
+import { classifyLoss } from '@/lib/hotels/lossClassification';
 import fs from 'fs';
 
 function parseDate(value: string): Date | null {
@@ -120,6 +122,8 @@ export default async function handler(
     let successCount = 0;
     let errorCount = 0;
     const errors: { row: number; message: string }[] = [];
+    const hotelRollups = trackHotelKpiWrites();
+    const reviewedHotels = new Set<number>();
 
     for (let rowIndex = 0; rowIndex < parseResult.rows.length; rowIndex++) {
       const row = parseResult.rows[rowIndex];
@@ -163,10 +167,10 @@ export default async function handler(
             await importCarrier(record);
             break;
           case 'HOTEL_KPIS':
-            await importHotelKpi(record);
+            await importHotelKpi(record, hotelRollups);
             break;
           case 'HOTEL_DAILY':
-            await importHotelDailyReport(record);
+            await importHotelDailyReport(record, hotelRollups);
             break;
           case 'FREIGHT_KPIS':
             await importFreightKpi(record);
@@ -175,7 +179,7 @@ export default async function handler(
             await importHotelDispute(record, userId);
             break;
           case 'HOTEL_REVIEWS':
-            await importHotelReview(record);
+            reviewedHotels.add(await importHotelReview(record));
             break;
           case 'BPO_METRICS':
             await importBpoMetric(record);
@@ -193,6 +197,11 @@ export default async function handler(
       }
     }
 
+    await hotelRollups.flush();
+    for (const hotelId of reviewedHotels) {
+      await refreshHotelReviewRollups(hotelId);
+    }
+
     await prisma.importJob.update({
       where: { id: jobId },
       data: {
@@ -317,7 +326,10 @@ async function importCarrier(record: Record<string, unknown>) {
   });
 }
 
-async function importHotelKpi(record: Record<string, unknown>) {
+async function importHotelKpi(
+  record: Record<string, unknown>,
+  rollups: ReturnType<typeof trackHotelKpiWrites>
+) {
   const hotelId = (record.hotelId as number) || (record.propertyId as number);
   const date = record.date as Date;
   const ventureId = record.ventureId as number | undefined;
@@ -381,9 +393,13 @@ async function importHotelKpi(record: Record<string, unknown>) {
       reviewScore: record.reviewScore as number | undefined,
     },
   });
+  rollups.touch(hotelId, date);
 }
 
-async function importHotelDailyReport(record: Record<string, unknown>) {
+async function importHotelDailyReport(
+  record: Record<string, unknown>,
+  rollups: ReturnType<typeof trackHotelKpiWrites>
+) {
   const hotelId = (record.hotelId as number) || (record.propertyId as number);
   const date = record.date as Date;
 
@@ -411,15 +427,7 @@ async function importHotelDailyReport(record: Record<string, unknown>) {
 
   const adrNet = roomSold > 0 ? (total - lostDues) / roomSold : 0;
 
-  const LOST_DUES_ABS_THRESHOLD = 100;
-  const LOST_DUES_RATIO_THRESHOLD = 0.05;
-  let highLossFlag = false;
-  if (lostDues > 0 && total > 0) {
-    const ratio = lostDues / total;
-    if (lostDues >= LOST_DUES_ABS_THRESHOLD || ratio >= LOST_DUES_RATIO_THRESHOLD) {
-      highLossFlag = true;
-    }
-  }
+  const { highLossFlag, lossSeverity } = classifyLoss(total, lostDues);
 
   await prisma.hotelDailyReport.upsert({
     where: {
@@ -439,6 +447,7 @@ async function importHotelDailyReport(record: Record<string, unknown>) {
       adr: adrNet,
       revpar,
       highLossFlag,
+      lossSeverity,
     },
     create: {
       hotelId,
@@ -456,6 +465,7 @@ async function importHotelDailyReport(record: Record<string, unknown>) {
       adr: adrNet,
       revpar,
       highLossFlag,
+      lossSeverity,
     },
   });
 
@@ -496,6 +506,7 @@ async function importHotelDailyReport(record: Record<string, unknown>) {
       otherRevenue: 0,
     },
   });
+  rollups.touch(hotelId, date);
 }
 
 async function importFreightKpi(record: Record<string, unknown>) {
@@ -600,7 +611,7 @@ async function importHotelDispute(record: Record<string, unknown>, userId: numbe
   });
 }
 
-async function importHotelReview(record: Record<string, unknown>) {
+async function importHotelReview(record: Record<string, unknown>): Promise<number> {
   const hotelId = (record.propertyId as number) || (record.hotelId as number);
   const rating = record.rating as number;
   const rawSource = (record.source as string) || 'OTHER';
@@ -620,6 +631,7 @@ async function importHotelReview(record: Record<string, unknown>) {
       responseText: record.responseText as string | undefined,
     },
   });
+  return hotelId;
 }
 
 async function importBpoMetric(record: Record<string, unknown>) {
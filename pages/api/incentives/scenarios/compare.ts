@@ -2,7 +2,8 @@ import type { NextApiRequest, NextApiResponse } from "next";
 import prisma from "@/lib/prisma";
 import { withUser } from "@/lib/api";
 import { getUserScope } from "@/lib/scope";
-import { computeIncentivesForDayWithRules, type EngineRule } from "@/lib/incentives/engine";
+import type { EngineRule } from "@/lib/incentives/engine";
+import { loadMetricCube, simulateRules } from "@/lib/incentives/simulation";
 
 interface CompareRequestBody {
   scenarioIds: number[];
@@ -50,7 +51,7 @@ export default withUser(async function handler(req: NextApiRequest, res: NextApi
       }
     }
 
-    // For v1, we will run a short simulation per scenario using the same engine helper used elsewhere.
+    // For v1, we will run a short simulation per scenario using the same in-memory engine as /api/incentives/simulate.
     // We'll assume each config contains the same shape as /api/incentives/simulate expects.
     const results = [] as any[];
 
@@ -84,30 +85,11 @@ export default withUser(async function handler(req: NextApiRequest, res: NextApi
         continue;
       }
 
-      const days: string[] = [];
-      const start = new Date(fromDate.toISOString().slice(0, 10) + "T00:00:00.000Z");
-      const end = new Date(toDate.toISOString().slice(0, 10) + "T00:00:00.000Z");
-      const diffMs = end.getTime() - start.getTime();
-      const diffDays = diffMs / (1000 * 60 * 60 * 24) + 1;
-
-      for (let i = 0; i < diffDays; i++) {
-        const d = new Date(start.getTime());
-        d.setDate(d.getDate() + i);
-        days.push(d.toISOString().slice(0, 10));
-      }
-
-      const allItems = await Promise.all(
-        days.map((day) =>
-          computeIncentivesForDayWithRules({
-            ventureId,
-            date: day,
-            rules,
-            restrictToUserIds: userIds.length ? userIds : undefined,
-          }),
-        ),
-      );
-
-      const flat = allItems.flat();
+      // Scenarios over the same venture and range share one cached metric cube
+      const cube = await loadMetricCube(ventureId, from, to);
+      const flat = simulateRules(cube, rules, {
+        restrictToUserIds: userIds.length ? userIds : undefined,
+      });
       const totalAmount = flat.reduce((sum, item) => sum + (item.amount ?? 0), 0);
 
       // Simple per-role or per-user summary could be extended later; for now, focus on total.
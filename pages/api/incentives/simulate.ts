@@ -2,7 +2,8 @@ import type { NextApiRequest, NextApiResponse } from "next";
 import prisma from "@/lib/prisma";
 import { getEffectiveUser } from "@/lib/effectiveUser";
 import { getUserScope } from "@/lib/scope";
-import { computeIncentivesForDayWithRules, type EngineRule } from "@/lib/incentives/engine";
+import type { EngineRule } from "@/lib/incentives/engine";
+import { loadMetricCube, simulateRules } from "@/lib/incentives/simulation";
 
 // Lightweight representation of a custom rule coming from the client.
 interface CustomRuleInput {
@@ -159,6 +160,9 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       days.push(dt.toISOString().slice(0, 10));
     }
 
+    // Metrics for the range are loaded once and shared by both rule sets
+    const getCube = () => loadMetricCube(ventureId, days[0], days[days.length - 1]);
+
     // Helper to compute with current plan rules from DB
     async function computeWithCurrentPlan(): Promise<any> {
       const rulesFromDb = await prisma.incentiveRule.findMany({
@@ -175,18 +179,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         });
       }
 
-      const allItems = await Promise.all(
-        days.map((day) =>
-          computeIncentivesForDayWithRules({
-            ventureId,
-            date: day,
-            rules: rulesFromDb,
-            restrictToUserIds: targetUserIds,
-          }),
-        ),
-      );
-
-      const flat = allItems.flat();
+      const cube = await getCube();
+      const flat = simulateRules(cube, rulesFromDb, { restrictToUserIds: targetUserIds });
 
       return buildSimulationView({
         ventureId,
@@ -221,18 +215,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         });
       }
 
-      const allItems = await Promise.all(
-        days.map((day) =>
-          computeIncentivesForDayWithRules({
-            ventureId,
-            date: day,
-            rules: engineRules,
-            restrictToUserIds: targetUserIds,
-          }),
-        ),
-      );
-
-      const flat = allItems.flat();
+      const cube = await getCube();
+      const flat = simulateRules(cube, engineRules, { restrictToUserIds: targetUserIds });
 
       return buildSimulationView({
         ventureId,
@@ -1,7 +1,11 @@
 import type { NextApiRequest, NextApiResponse } from "next";
-import prisma from "@/lib/prisma";
 import { getEffectiveUser } from "@/lib/effectiveUser";
 import { getUserScope } from "@/lib/scope";
+import {
+  parseGranularityParam,
+  parseIncludeParam,
+  readIncentiveRollups,
+} from "@/lib/incentives/rollups";
 import { logger } from "@/lib/logger";
 
 function parseDateParam(value: string | string[] | undefined): Date | null {
@@ -29,6 +33,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
 
   try {
     const { userId: rawUserId, ventureId: rawVentureId, from: rawFrom, to: rawTo } = req.query;
+    const include = parseIncludeParam(req.query.include, { summary: false, series: true });
+    const granularity = parseGranularityParam(req.query.granularity);
 
     if (!rawUserId || typeof rawUserId !== "string") {
       return res.status(400).json({ error: "Invalid userId" });
@@ -46,6 +52,9 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     if (!ventureId || Number.isNaN(ventureId) || ventureId <= 0) {
       return res.status(400).json({ error: "Invalid ventureId" });
     }
+    if (!granularity) {
+      return res.status(400).json({ error: "Invalid granularity" });
+    }
 
     // RBAC: only leadership / finance can view other users' incentives timeseries
     // Cap date window to 90 days to keep timeseries queries safe for production use.
@@ -93,29 +102,22 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       });
     }
 
-    // @ts-ignore - Prisma groupBy types have circular reference issue
-    const grouped = await prisma.incentiveDaily.groupBy({
-      by: ["date"],
-      where: {
-        ventureId,
-        userId: targetUserId,
-        date: { gte: fromDay, lte: toDay },
-      },
-      _sum: { amount: true },
-      orderBy: { date: "asc" },
+    const { items, totalAmount, points } = await readIncentiveRollups({
+      ventureId,
+      userId: targetUserId,
+      from: fromDay,
+      toExclusive: new Date(toDay.getTime() + 1),
+      granularity,
+      include,
     });
 
-    const points = grouped.map((g: any) => ({
-      date: g.date.toISOString().slice(0, 10),
-      amount: Number(g._sum?.amount ?? 0),
-    }));
-
     return res.status(200).json({
       userId: targetUserId,
       ventureId,
       from: fromDay.toISOString().slice(0, 10),
       to: toDay.toISOString().slice(0, 10),
-      points,
+      ...(include.series ? { granularity, points } : {}),
+      ...(include.summary ? { items, totalAmount } : {}),
     });
   } catch (error: any) {
     logger.error("api_request_error", {
@@ -1,8 +1,12 @@
 import type { NextApiRequest, NextApiResponse } from "next";
-import prisma from "@/lib/prisma";
 import { getEffectiveUser } from "@/lib/effectiveUser";
 import { getUserScope } from "@/lib/scope";
 import { logger } from "@/lib/logger";
+import {
+  parseGranularityParam,
+  parseIncludeParam,
+  readIncentiveRollups,
+} from "@/lib/incentives/rollups";
 
 function parseDateParam(value: string | string[] | undefined): Date | null {
   if (!value || Array.isArray(value)) return null;
@@ -31,6 +35,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
 
   try {
     const { ventureId: rawVentureId, from: rawFrom, to: rawTo } = req.query;
+    const include = parseIncludeParam(req.query.include, { summary: true, series: false });
+    const granularity = parseGranularityParam(req.query.granularity);
 
     if (!rawVentureId || typeof rawVentureId !== "string") {
       return res.status(400).json({ error: "Invalid ventureId" });
@@ -40,6 +46,9 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     if (!ventureId || Number.isNaN(ventureId) || ventureId <= 0) {
       return res.status(400).json({ error: "Invalid ventureId" });
     }
+    if (!granularity) {
+      return res.status(400).json({ error: "Invalid granularity" });
+    }
 
     // RBAC: only leadership / finance can view venture-level incentives
     // RBAC: leadership/finance only; capped at 90 days per venture to keep summary queries safe.
@@ -88,78 +97,21 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       });
     }
 
-    const rows = await prisma.incentiveDaily.findMany({
-      where: {
-        ventureId,
-        date: { gte: fromDay, lte: toDay },
-      },
-      include: {
-        user: {
-          select: {
-            id: true,
-            fullName: true,
-            email: true,
-            role: true,
-          },
-        },
-      },
+    // Whole weeks/months come from IncentiveRollup, edge days from IncentiveDaily
+    const { items, totalAmount, points } = await readIncentiveRollups({
+      ventureId,
+      from: fromDay,
+      toExclusive: new Date(toDay.getTime() + 1),
+      granularity,
+      include,
     });
 
-    type VentureUserSummary = {
-      userId: number;
-      userName: string;
-      email: string | null;
-      role: string | null;
-      totalAmount: number;
-      daysWithIncentives: number;
-    };
-
-    const byUser = new Map<number, VentureUserSummary & { dates: Set<string> }>();
-
-    for (const row of rows) {
-      const u = row.user;
-      if (!u) continue;
-
-      const existing = byUser.get(u.id) ?? {
-        userId: u.id,
-        userName: u.fullName || `User #${u.id}`,
-        email: u.email ?? null,
-        role: u.role ?? null,
-        totalAmount: 0,
-        daysWithIncentives: 0,
-        dates: new Set<string>(),
-      };
-
-      const day = row.date.toISOString().slice(0, 10);
-      const amount = row.amount ?? 0;
-
-      existing.totalAmount += amount;
-      if (amount > 0) {
-        existing.dates.add(day);
-      }
-
-      byUser.set(u.id, existing);
-    }
-
-    const items: VentureUserSummary[] = Array.from(byUser.values())
-      .map((u) => ({
-        userId: u.userId,
-        userName: u.userName,
-        email: u.email,
-        role: u.role,
-        totalAmount: u.totalAmount,
-        daysWithIncentives: u.dates.size,
-      }))
-      .sort((a, b) => b.totalAmount - a.totalAmount);
-
-    const totalAmount = items.reduce((sum, i) => sum + i.totalAmount, 0);
-
     return res.status(200).json({
       ventureId,
       from: fromDay.toISOString().slice(0, 10),
       to: toDay.toISOString().slice(0, 10),
-      items,
-      totalAmount,
+      ...(include.summary ? { items, totalAmount } : {}),
+      ...(include.series ? { granularity, points } : {}),
     });
   } catch (error: any) {
     logger.error("api_request_error", {
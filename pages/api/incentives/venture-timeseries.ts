@@ -1,7 +1,11 @@
 import type { NextApiRequest, NextApiResponse } from "next";
-import prisma from "@/lib/prisma";
 import { getEffectiveUser } from "@/lib/effectiveUser";
 import { getUserScope } from "@/lib/scope";
+import {
+  parseGranularityParam,
+  parseIncludeParam,
+  readIncentiveRollups,
+} from "@/lib/incentives/rollups";
 
 function parseDateParam(value: string | string[] | undefined): Date | null {
   if (!value || Array.isArray(value)) return null;
@@ -21,6 +25,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
 
   try {
     const { ventureId: rawVentureId, from: rawFrom, to: rawTo } = req.query;
+    const include = parseIncludeParam(req.query.include, { summary: false, series: true });
+    const granularity = parseGranularityParam(req.query.granularity);
 
     if (!rawVentureId || typeof rawVentureId !== "string") {
       return res.status(400).json({ error: "Invalid ventureId" });
@@ -30,6 +36,9 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     if (!ventureId || Number.isNaN(ventureId) || ventureId <= 0) {
       return res.status(400).json({ error: "Invalid ventureId" });
     }
+    if (!granularity) {
+      return res.status(400).json({ error: "Invalid granularity" });
+    }
 
     // RBAC: only leadership / finance can view venture-level incentives timeseries
     if (
@@ -75,27 +84,20 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       });
     }
 
-    // @ts-ignore - Prisma groupBy types have circular reference issue
-    const grouped = await prisma.incentiveDaily.groupBy({
-      by: ["date"],
-      where: {
-        ventureId,
-        date: { gte: fromDay, lte: toDay },
-      },
-      _sum: { amount: true },
-      orderBy: { date: "asc" },
+    const { items, totalAmount, points } = await readIncentiveRollups({
+      ventureId,
+      from: fromDay,
+      toExclusive: new Date(toDay.getTime() + 1),
+      granularity,
+      include,
     });
 
-    const points = grouped.map((g: any) => ({
-      date: g.date.toISOString().slice(0, 10),
-      amount: Number(g._sum?.amount ?? 0),
-    }));
-
     return res.status(200).json({
       ventureId,
       from: fromDay.toISOString().slice(0, 10),
       to: toDay.toISOString().slice(0, 10),
-      points,
+      ...(include.series ? { granularity, points } : {}),
+      ...(include.summary ? { items, totalAmount } : {}),
     });
   } catch (error: any) {
     console.error("Venture incentives timeseries failed", error);
@@ -3,7 +3,7 @@ import { requireUser } from "@/lib/apiAuth";
 import { isGlobalAdmin, getUserScope } from "@/lib/scope";
 import { withRequestLogging } from "@/lib/requestLog";
 import { runFMCSAAutosyncJob } from "@/lib/jobs/fmcsaAutosyncJob";
-import { syncCarrierFromFMCSAById } from "@/lib/logistics/fmcsaSync";
+import { syncCarrierFromFMCSAById, syncCarriersFromFMCSAByIds } from "@/lib/logistics/fmcsaSync";
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   if (req.method !== "POST") {
@@ -35,11 +35,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
     }
 
     if (Array.isArray(body.carrierIds) && body.carrierIds.length > 0) {
-      const snapshots = [] as any[];
-      for (const id of body.carrierIds) {
-        const snap = await syncCarrierFromFMCSAById(id);
-        snapshots.push(snap);
-      }
+      const snapshots = await syncCarriersFromFMCSAByIds(body.carrierIds.map(Number));
       return res.status(200).json({ mode: "batch", count: snapshots.length, snapshots });
     }
 
@@ -0,0 +1,97 @@
+import type { NextApiRequest, NextApiResponse } from "next";
+import { requireUser } from "@/lib/apiAuth";
+import { isGlobalAdmin } from "@/lib/scope";
+import { KPI_AGGREGATION_JOB_KEY, runKpiAggregationJob } from "@/lib/jobs/kpiAggregationJob";
+import { runJobWithControl } from "@/lib/jobs/jobRunner";
+import { JobName } from "@prisma/client";
+
+const MAX_BACKFILL_DAYS = 366;
+
+function lockHeld(error: string | undefined): boolean {
+  return !!error && error.startsWith("Job already running");
+}
+
+function parseDate(value: unknown): Date | undefined {
+  if (typeof value !== "string" || !value) return undefined;
+  const d = new Date(value);
+  return isNaN(d.getTime()) ? undefined : d;
+}
+
+export default async function handler(req: NextApiRequest, res: NextApiResponse) {
+  if (req.method !== "POST") {
+    return res.status(405).json({ error: "Method not allowed" });
+  }
+
+  const user = await requireUser(req, res);
+  if (!user) return;
+
+  if (!isGlobalAdmin(user)) {
+    return res.status(403).json({ error: "FORBIDDEN" });
+  }
+
+  const body = req.body || {};
+  const ventureId = body.ventureId ? Number(body.ventureId) : undefined;
+  const date = parseDate(body.date);
+  const from = parseDate(body.from);
+  const to = parseDate(body.to);
+  const dryRun = body.dryRun === true;
+
+  if (from) {
+    const end = to || new Date();
+    const days = Math.floor((end.getTime() - from.getTime()) / 86400000) + 1;
+    if (days < 1 || days > MAX_BACKFILL_DAYS) {
+      return res.status(400).json({ error: `Backfill range must be 1-${MAX_BACKFILL_DAYS} days` });
+    }
+  }
+
+  const options = {
+    ventureId,
+    date,
+    from,
+    to,
+    incremental: body.incremental === true ? true : undefined,
+    dryRun,
+  };
+
+  try {
+    if (dryRun) {
+      const result = await runKpiAggregationJob(options);
+      return res.status(200).json({ ok: true, stats: result.stats, jobRunLogId: result.jobRunLogId, dryRun });
+    }
+
+    // Every run takes the lock the scheduled run uses, so they never overlap
+    const run = (onStart?: (jobRunLogId: number) => void) =>
+      runJobWithControl(
+        { jobName: JobName.KPI_AGGREGATION, jobKey: KPI_AGGREGATION_JOB_KEY, timeout: 3600000, onStart },
+        () => runKpiAggregationJob(options)
+      );
+
+    if (from) {
+      // Backfills can take minutes: answer once the job holds the lock; the
+      // returned JobRunLog records the outcome
+      const started = await new Promise<{ jobRunLogId?: number; error?: string }>((resolve) => {
+        run((jobRunLogId) => resolve({ jobRunLogId }))
+          .then((result) => resolve({ error: result.error }))
+          .catch((err) => resolve({ error: err?.message || String(err) }));
+      });
+      if (!started.jobRunLogId) {
+        return res.status(lockHeld(started.error) ? 409 : 500).json({ error: started.error || "KPI aggregation failed" });
+      }
+      return res.status(202).json({ ok: true, status: "RUNNING", jobRunLogId: started.jobRunLogId, dryRun });
+    }
+
+    const result = await run();
+    if (!result.success) {
+      return res.status(lockHeld(result.error) ? 409 : 500).json({ error: result.error || "KPI aggregation failed" });
+    }
+    return res.status(200).json({
+      ok: true,
+      stats: result.result!.stats,
+      jobRunLogId: result.jobRunLogId,
+      dryRun,
+    });
+  } catch (err: any) {
+    console.error("/api/jobs/kpi-aggregation error", err);
+    return res.status(500).json({ error: err.message || "Internal server error" });
+  }
+}
@@ -1,75 +1,24 @@
 import type { NextApiRequest, NextApiResponse } from "next";
-import prisma from "@/lib/prisma";
 import { requireUser } from '@/lib/apiAuth';
 import { getUserScope } from "@/lib/scope";
+import { mergeOpsCounts, readVentureSummaries } from "@/lib/ventureSummary";
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const user = await requireUser(req, res);
   if (!user) return res.status(401).json({ error: "UNAUTHENTICATED" });
 
   const scope = getUserScope(user);
-  const now = new Date();
-  const in30Days = new Date();
-  in30Days.setDate(now.getDate() + 30);
 
-  const taskWhere: any = {
-    isTest: user.isTestUser,
-  };
-
-  if (!scope.allVentures) {
-    taskWhere.ventureId = { in: scope.ventureIds };
-  }
-
-  if (!scope.allOffices && scope.officeIds.length > 0) {
-    taskWhere.OR = [
-      { officeId: null },
-      { officeId: { in: scope.officeIds } },
-    ];
-  }
+  // Task and policy counts come from the per-venture snapshots, filtered by
+  // the viewer's test flag and offices (rows without an office always count).
+  const { summaries } = await readVentureSummaries({
+    ventureIds: scope.allVentures ? null : scope.ventureIds,
+  });
 
-  const policyWhere: any = {
+  const { openTasks, overdueTasks, activePolicies, expiringPolicies } = mergeOpsCounts(summaries, {
     isTest: user.isTestUser,
-  };
-
-  if (!scope.allVentures) {
-    policyWhere.ventureId = { in: scope.ventureIds };
-  }
-
-  if (!scope.allOffices && scope.officeIds.length > 0) {
-    policyWhere.OR = [
-      { officeId: null },
-      { officeId: { in: scope.officeIds } },
-    ];
-  }
-
-  const [openTasks, overdueTasks, activePolicies, expiringPolicies] =
-    await Promise.all([
-      prisma.task.count({
-        where: {
-          ...taskWhere,
-          status: { in: ["OPEN", "IN_PROGRESS", "BLOCKED"] },
-        },
-      }),
-      prisma.task.count({
-        where: {
-          ...taskWhere,
-          status: "OVERDUE",
-        },
-      }),
-      prisma.policy.count({
-        where: {
-          ...policyWhere,
-          status: "ACTIVE",
-        },
-      }),
-      prisma.policy.count({
-        where: {
-          ...policyWhere,
-          status: "ACTIVE",
-          endDate: { gt: now, lte: in30Days },
-        },
-      }),
-    ]);
+    officeIds: !scope.allOffices && scope.officeIds.length > 0 ? scope.officeIds : null,
+  });
 
   return res.json({
     openTasks,
@@ -3,6 +3,7 @@ import prisma from '../../../../lib/prisma';
 import { requireUser } from '@/lib/apiAuth';
 import { getUserScope } from '../../../../lib/scope';
 import { canCreateTasks } from '../../../../lib/permissions';
+import { invalidateSaasMetrics } from '@/lib/saas/metrics';
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const user = await requireUser(req, res);
@@ -125,6 +126,8 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         });
       }
 
+      invalidateSaasMetrics();
+
       const customerWithSubscriptions = await prisma.saasCustomer.findUnique({
         where: { id: customer.id },
         include: {
@@ -3,6 +3,7 @@ import prisma from '../../../../lib/prisma';
 import { requireUser } from '@/lib/apiAuth';
 import { getUserScope } from '../../../../lib/scope';
 import { canCreateTasks } from '../../../../lib/permissions';
+import { invalidateSaasMetrics } from '@/lib/saas/metrics';
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   const { id } = req.query;
@@ -59,6 +60,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
           customer: { select: { id: true, name: true } },
         },
       });
+      invalidateSaasMetrics();
 
       return res.json(updated);
     }
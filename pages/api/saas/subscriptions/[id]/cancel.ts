@@ -2,6 +2,7 @@ import type { NextApiRequest, NextApiResponse } from 'next';
 import prisma from '@/lib/prisma';
 import { requireUser } from '@/lib/apiAuth';
 import { logActivity } from '@/lib/activityLog';
+import { invalidateSaasMetrics } from '@/lib/saas/metrics';
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
   if (req.method !== 'POST') {
@@ -71,6 +72,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         saveOfferAccepted: false,
       },
     });
+    invalidateSaasMetrics();
 
     await logActivity({
       userId: user.id,
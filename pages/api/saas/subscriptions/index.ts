@@ -4,6 +4,7 @@ import { requireUser } from '@/lib/apiAuth';
 import { getUserScope } from '../../../../lib/scope';
 import { canCreateTasks } from '../../../../lib/permissions';
 import { normalizeNonNegativeNumber, validateIdOr400, validateTextField } from "@/lib/validation";
+import { invalidateSaasMetrics } from '@/lib/saas/metrics';
 
 
 export default async function handler(req: NextApiRequest, res: NextApiResponse) {
@@ -132,6 +133,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
           customer: { select: { id: true, name: true } },
         },
       });
+      invalidateSaasMetrics();
 
       return res.status(201).json(subscription);
     }
@@ -1,5 +1,7 @@
 import type { NextApiRequest, NextApiResponse } from "next";
-import { handleInboundEmail } from "@/lib/outreach/inboundHandler";
+import { extractEmail } from "@/lib/outreach/inboundHandler";
+import { enqueueWebhooks, payloadDigest } from "@/lib/webhooks/queue";
+import { kickWebhookWorkers } from "@/lib/webhooks/worker";
 
 export const config = {
   api: {
@@ -15,6 +17,7 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
 
   try {
     const emails = Array.isArray(req.body) ? req.body : [req.body];
+    const events = [];
 
     for (const email of emails) {
       const from = email.from || email.sender || "";
@@ -27,20 +30,25 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
         continue;
       }
 
-      const result = await handleInboundEmail({
-        from,
-        to,
-        subject,
-        body,
-        rawPayload: email,
+      events.push({
+        source: "SENDGRID_INBOUND" as const,
+        idempotencyKey: email["message-id"] || email.headers?.["message-id"] || payloadDigest(email),
+        orderingKey: `email:${extractEmail(from)}`,
+        payload: { from, to, subject, body, rawPayload: email },
       });
+    }
 
-      console.log("[SENDGRID WEBHOOK] Processed inbound email:", result);
+    const { queued, duplicates } = await enqueueWebhooks(events);
+    if (duplicates > 0) {
+      console.log(`[SENDGRID WEBHOOK] Skipped ${duplicates} duplicate inbound email(s)`);
+    }
+    if (queued > 0) {
+      kickWebhookWorkers();
     }
 
     return res.status(200).json({ success: true });
   } catch (error: any) {
-    console.error("[SENDGRID WEBHOOK] Error processing inbound email:", error);
+    console.error("[SENDGRID WEBHOOK] Error queueing inbound email:", error);
     return res.status(500).json({ error: "Internal server error" });
   }
 }
@@ -1,5 +1,7 @@
 import type { NextApiRequest, NextApiResponse } from "next";
-import { handleInboundSms } from "@/lib/outreach/inboundHandler";
+import { normalizePhone } from "@/lib/outreach/inboundHandler";
+import { enqueueWebhook, payloadDigest } from "@/lib/webhooks/queue";
+import { kickWebhookWorkers } from "@/lib/webhooks/worker";
 import twilio from "twilio";
 
 export const config = {
@@ -43,20 +45,31 @@ export default async function handler(req: NextApiRequest, res: NextApiResponse)
       return res.status(400).json({ error: "Missing required fields" });
     }
 
-    const result = await handleInboundSms({
-      from: From,
-      to: To,
-      body: Body,
-      messageSid: MessageSid,
-      rawPayload: req.body,
+    // Acknowledge once the callback is durably queued; the worker pool
+    // handles replies in arrival order per carrier/number pair.
+    const queued = await enqueueWebhook({
+      source: "TWILIO_INBOUND",
+      idempotencyKey: MessageSid || payloadDigest(req.body),
+      orderingKey: `sms:${normalizePhone(From)}:${normalizePhone(To)}`,
+      payload: {
+        from: From,
+        to: To,
+        body: Body,
+        messageSid: MessageSid,
+        rawPayload: req.body,
+      },
     });
 
-    console.log("[TWILIO WEBHOOK] Processed inbound SMS:", result);
+    if (queued.duplicate) {
+      console.log("[TWILIO WEBHOOK] Duplicate inbound SMS:", MessageSid);
+    } else {
+      kickWebhookWorkers();
+    }
 
     res.setHeader("Content-Type", "text/xml");
     return res.status(200).send("<Response></Response>");
   } catch (error: any) {
-    console.error("[TWILIO WEBHOOK] Error processing inbound SMS:", error);
+    console.error("[TWILIO WEBHOOK] Error queueing inbound SMS:", error);
     return res.status(500).json({ error: "Internal server error" });
   }
 }
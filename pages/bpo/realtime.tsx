@@ -112,10 +112,38 @@ function BpoRealtimePage() {
     }
   }, [selectedVentureId, fetchData]);
 
+  // Live updates are pushed over SSE; fall back to polling if the stream drops
   useEffect(() => {
     if (!autoRefresh || !selectedVentureId) return;
-    const interval = setInterval(fetchData, 10000);
-    return () => clearInterval(interval);
+
+    let interval: ReturnType<typeof setInterval> | null = null;
+    const startPolling = () => {
+      if (!interval) interval = setInterval(fetchData, 10000);
+    };
+
+    if (typeof EventSource === 'undefined') {
+      startPolling();
+      return () => {
+        if (interval) clearInterval(interval);
+      };
+    }
+
+    const source = new EventSource(`/api/bpo/realtime-stream?ventureId=${selectedVentureId}`);
+    source.addEventListener('stats', (event) => {
+      setData(JSON.parse((event as MessageEvent).data));
+      setLastUpdated(new Date());
+      setError(null);
+      setLoading(false);
+    });
+    source.onerror = () => {
+      source.close();
+      startPolling();
+    };
+
+    return () => {
+      source.close();
+      if (interval) clearInterval(interval);
+    };
   }, [autoRefresh, selectedVentureId, fetchData]);
 
   const statusColor = (status: string) => {
@@ -28,6 +28,7 @@ interface LossNight {
   adr: number | null;
   revpar: number | null;
   highLossFlag: boolean;
+  lossSeverity: "NONE" | "LOW" | "MEDIUM" | "HIGH";
 }
 
 function formatDate(dateStr: string) {
@@ -209,7 +210,7 @@ export default function LossNightsTab() {
                       : null;
 
                   const lossClass =
-                    lossPct !== null && lossPct >= 0.05
+                    n.lossSeverity === "HIGH" || n.lossSeverity === "MEDIUM"
                       ? "text-red-600 dark:text-red-400 font-semibold"
                       : "text-amber-600 dark:text-amber-400";
 
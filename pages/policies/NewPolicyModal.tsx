@@ -107,8 +107,8 @@ export default function NewPolicyModal({ onClose, onSave }: NewPolicyModalProps)
       setUploadProgress(`Uploading ${i + 1} of ${selectedFiles.length}: ${file.name}`);
       
       const formData = new FormData();
-      formData.append('file', file);
       formData.append('policyId', String(policyId));
+      formData.append('file', file);
 
       const res = await fetch('/api/files/upload', {
         method: 'POST',
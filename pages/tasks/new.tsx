@@ -149,9 +149,9 @@ function NewTaskPage() {
         try {
           const uploadPromises = selectedFiles.map(async (file) => {
             const formData = new FormData();
-            formData.append('file', file);
             formData.append('taskId', String(taskId));
             if (ventureId) formData.append('ventureId', String(ventureId));
+            formData.append('file', file);
 
             const uploadRes = await fetch('/api/files/upload', {
               method: 'POST',
@@ -0,0 +1,89 @@
+/**
+ * Local FMCSA Stand-in
+ *
+ * Minimal HTTP server mimicking the FMCSA QC carrier endpoint
+ * (GET /carriers/:number?webKey=...) with configurable latency and quota,
+ * so FMCSA sync throughput can be benchmarked without the real API.
+ *
+ * Usage: node perf/fmcsa-standin.js [port] [latencyMs] [quotaPerSec]
+ * Defaults: port 4010, 150ms latency, 10 requests/second (429 above that)
+ *
+ * Can also be required: const { startStandin } = require('./fmcsa-standin');
+ */
+
+const http = require('http');
+
+function startStandin({ port = 4010, latencyMs = 150, quotaPerSec = 10 } = {}) {
+  const stats = { requests: 0, ok: 0, notFound: 0, throttled: 0 };
+  let windowStart = Date.now();
+  let windowCount = 0;
+
+  const server = http.createServer((req, res) => {
+    stats.requests++;
+
+    const now = Date.now();
+    if (now - windowStart >= 1000) {
+      windowStart = now;
+      windowCount = 0;
+    }
+    windowCount++;
+
+    if (windowCount > quotaPerSec) {
+      stats.throttled++;
+      res.writeHead(429, { 'Content-Type': 'application/json', 'Retry-After': '1' });
+      res.end(JSON.stringify({ error: 'Too Many Requests' }));
+      return;
+    }
+
+    const match = /^\/carriers\/([^/?]+)/.exec(req.url || '');
+    setTimeout(() => {
+      if (!match) {
+        stats.notFound++;
+        res.writeHead(404, { 'Content-Type': 'application/json' });
+        res.end(JSON.stringify({ content: null }));
+        return;
+      }
+
+      const number = decodeURIComponent(match[1]);
+      const digits = Number(number.replace(/\D/g, '')) || 0;
+      stats.ok++;
+      res.writeHead(200, { 'Content-Type': 'application/json' });
+      res.end(
+        JSON.stringify({
+          carrier: {
+            mcNumber: number,
+            carrierOperation: {
+              carrierOperationCode: digits % 10 === 0 ? 'C' : 'A',
+              carrierOperationDesc: digits % 10 === 0 ? 'INACTIVE' : 'ACTIVE',
+            },
+            safety: { safetyRating: { safetyRatingDesc: 'SATISFACTORY' } },
+          },
+        })
+      );
+    }, latencyMs);
+  });
+
+  return new Promise((resolve) => {
+    server.listen(port, '127.0.0.1', () => {
+      resolve({
+        url: `http://127.0.0.1:${port}`,
+        stats,
+        close: () => new Promise((done) => server.close(() => done())),
+      });
+    });
+  });
+}
+
+module.exports = { startStandin };
+
+if (require.main === module) {
+  const [port, latencyMs, quotaPerSec] = process.argv.slice(2).map(Number);
+  startStandin({
+    port: port || undefined,
+    latencyMs: Number.isFinite(latencyMs) ? latencyMs : undefined,
+    quotaPerSec: quotaPerSec || undefined,
+  }).then(({ url }) => {
+    console.log(`FMCSA stand-in listening on ${url}`);
+    console.log(`Set FMCSA_API_BASE_URL=${url} and FMCSA_WEBKEY=local to use it`);
+  });
+}
@@ -0,0 +1,69 @@
+/**
+ * FMCSA Sync Throughput Benchmark
+ *
+ * Starts the local FMCSA stand-in and measures carriers/second for the
+ * sequential (one call at a time) and pooled fetch paths.
+ *
+ * Usage:
+ *   npx ts-node -r tsconfig-paths/register -O '{"module":"CommonJS"}' perf/fmcsa-sync-bench.ts [carriers] [latencyMs] [quotaPerSec]
+ *
+ * Defaults: 200 carriers, 150ms latency, 10 requests/second quota.
+ */
+
+const { startStandin } = require("./fmcsa-standin");
+
+async function main() {
+  const [countArg, latencyArg, quotaArg] = process.argv.slice(2).map(Number);
+  const count = countArg || 200;
+  const latencyMs = Number.isFinite(latencyArg) ? latencyArg : 150;
+  const quotaPerSec = quotaArg || 10;
+
+  const standin = await startStandin({ port: 4010, latencyMs, quotaPerSec });
+
+  // The client reads its configuration at import time
+  process.env.FMCSA_API_BASE_URL = standin.url;
+  process.env.FMCSA_WEBKEY = process.env.FMCSA_WEBKEY || "local";
+  process.env.FMCSA_RATE_LIMIT_PER_SEC = String(quotaPerSec);
+
+  const { fetchCarrierFromFMCSA, fetchCarriersFromFMCSA, clearFmcsaCache } = await import(
+    "../lib/integrations/fmcsaClient"
+  );
+
+  const numbers = Array.from({ length: count }, (_, i) => `MC${100000 + i}`);
+
+  // Sequential baseline (previous behaviour)
+  clearFmcsaCache();
+  let start = Date.now();
+  for (const mc of numbers) {
+    await fetchCarrierFromFMCSA(mc);
+  }
+  const sequentialMs = Date.now() - start;
+
+  // Pooled + rate limited
+  clearFmcsaCache();
+  start = Date.now();
+  const results = await fetchCarriersFromFMCSA(numbers);
+  const pooledMs = Date.now() - start;
+  const failed = Array.from(results.values()).filter((r) => !r).length;
+
+  // Warm cache
+  start = Date.now();
+  await fetchCarriersFromFMCSA(numbers);
+  const cachedMs = Date.now() - start;
+
+  const rate = (ms: number) => ((count / Math.max(1, ms)) * 1000).toFixed(1);
+  console.log("========================================");
+  console.log(`FMCSA sync benchmark: ${count} carriers, ${latencyMs}ms latency, ${quotaPerSec} req/s quota`);
+  console.log("========================================");
+  console.log(`Sequential : ${sequentialMs}ms (${rate(sequentialMs)} carriers/s)`);
+  console.log(`Pooled     : ${pooledMs}ms (${rate(pooledMs)} carriers/s, ${failed} failed)`);
+  console.log(`Cached     : ${cachedMs}ms (${rate(cachedMs)} carriers/s)`);
+  console.log(`Stand-in   : ${JSON.stringify(standin.stats)}`);
+
+  await standin.close();
+}
+
+main().catch((err) => {
+  console.error("Benchmark failed:", err);
+  process.exit(1);
+});
@@ -0,0 +1,82 @@
+/**
+ * Incentive Simulation Benchmark
+ *
+ * Builds a synthetic metric cube (no database) and times evaluating several
+ * plan variants against it, the work /api/incentives/simulate and
+ * /api/incentives/scenarios/compare do after the cube is loaded.
+ *
+ * Usage:
+ *   npx ts-node -r tsconfig-paths/register -O '{"module":"CommonJS"}' perf/incentive-sim-bench.ts [users] [days] [variants]
+ *
+ * Defaults: 300 users, 90 days, 5 plan variants.
+ */
+
+import type { EngineRule } from "../lib/incentives/engine";
+import { buildMetricCube, dayRange, simulateRules, type CubeMetricRow } from "../lib/incentives/simulation";
+
+function main() {
+  const [usersArg, daysArg, variantsArg] = process.argv.slice(2).map(Number);
+  const userCount = usersArg || 300;
+  const dayCount = daysArg || 90;
+  const variantCount = variantsArg || 5;
+
+  const days = dayRange("2026-01-01", new Date(Date.UTC(2026, 0, dayCount)).toISOString().slice(0, 10));
+  const userIds = Array.from({ length: userCount }, (_, i) => i + 1);
+
+  let start = Date.now();
+  const rows: CubeMetricRow[] = [];
+  for (const day of days) {
+    for (const userId of userIds) {
+      if (userId % 2 === 0) {
+        rows.push({
+          family: "freight",
+          userId,
+          day,
+          metrics: {
+            loads_completed: (userId % 5) + 1,
+            loads_revenue: 1500 + userId,
+            loads_miles: 400,
+            loads_margin: 200 + (userId % 50),
+          },
+        });
+      } else {
+        rows.push({
+          family: "bpo",
+          userId,
+          day,
+          metrics: { bpo_dials: 40 + (userId % 30), bpo_connects: 5 + (userId % 7), bpo_talk_seconds: 3600 },
+        });
+      }
+    }
+  }
+  const cube = buildMetricCube({ ventureId: 1, days, ventureUserIds: userIds, rows });
+  const buildMs = Date.now() - start;
+
+  const variants: EngineRule[][] = Array.from({ length: variantCount }, (_, v) => [
+    { id: 1, metricKey: "loads_margin", calcType: "PERCENT_OF_METRIC", rate: 0.05 + v * 0.01, config: null },
+    { id: 2, metricKey: "loads_completed", calcType: "FLAT_PER_UNIT", rate: 10 + v, config: null },
+    { id: 3, metricKey: "bpo_dials", calcType: "FLAT_PER_UNIT", rate: 0.25, config: null },
+    {
+      id: 4,
+      metricKey: "bpo_connects",
+      calcType: "BONUS_ON_TARGET",
+      rate: null,
+      config: { thresholdValue: 8 + v, bonusAmount: 25 },
+    },
+  ]);
+
+  start = Date.now();
+  const totals = variants.map((rules) =>
+    simulateRules(cube, rules).reduce((sum, item) => sum + item.amount, 0)
+  );
+  const simulateMs = Date.now() - start;
+
+  console.log("========================================");
+  console.log(`Incentive simulation: ${userCount} users x ${days.length} days, ${variantCount} variants`);
+  console.log("========================================");
+  console.log(`Cube build : ${buildMs}ms (${rows.length} user-day rows)`);
+  console.log(`Simulate   : ${simulateMs}ms total, ${(simulateMs / variantCount).toFixed(1)}ms per variant`);
+  console.log(`Totals     : ${totals.map((t) => t.toFixed(0)).join(", ")}`);
+}
+
+main();
@@ -7,8 +7,11 @@ Specifically testing the view-only permission scenario for hotel disputes
 import requests
 import json
 import sys
+import time
 
 BASE_URL = "http://localhost:3000"
+IMPERSONATE_COOKIE = "x-impersonate-user-id"
+EFFECTIVE_USER_CACHE_TTL_SECONDS = 30  # EFFECTIVE_USER_CACHE_TTL_MS default
 
 def test_view_only_permission():
     """Test the view-only permission scenario for hotel disputes POST"""
@@ -51,5 +54,39 @@ def test_view_only_permission():
     
     return response.status_code
 
+def test_role_demotion_takes_effect():
+    """A role change must be enforced on the very next request, not after the effective-user cache TTL"""
+    print("🔒 Testing role demotion with the effective-user cache")
+    print("=" * 80)
+
+    session = requests.Session()
+    users = session.get(f"{BASE_URL}/api/admin/users?limit=500").json().get("users", [])
+    target = next((u for u in users if u.get("role") == "FINANCE"), None)
+    if not target:
+        print("⚠️ No FINANCE user found, skipping")
+        return None
+
+    as_target = {IMPERSONATE_COOKIE: str(target["id"])}
+    endpoint = f"{BASE_URL}/api/incentives/venture-timeseries?ventureId={(target.get('ventureIds') or [1])[0]}"
+
+    before = requests.get(endpoint, cookies=as_target)
+    print(f"GET as FINANCE -> {before.status_code}")
+
+    try:
+        session.patch(f"{BASE_URL}/api/admin/users/{target['id']}", json={"role": "EMPLOYEE"})
+        started = time.time()
+        after = requests.get(endpoint, cookies=as_target)
+        elapsed = time.time() - started
+        print(f"GET as demoted user -> {after.status_code} ({elapsed:.2f}s after role change)")
+
+        if after.status_code == 403 and elapsed < EFFECTIVE_USER_CACHE_TTL_SECONDS:
+            print("✅ Demotion enforced within the cache TTL")
+        else:
+            print("❌ Demoted user still authorized")
+        return after.status_code
+    finally:
+        session.patch(f"{BASE_URL}/api/admin/users/{target['id']}", json={"role": "FINANCE"})
+
 if __name__ == "__main__":
-    test_view_only_permission()
\ No newline at end of file
+    test_view_only_permission()
+    test_role_demotion_takes_effect()
\ No newline at end of file
@@ -0,0 +1,21 @@
+-- Lease-based job locks (replaces session-level advisory locks)
+
+-- 1) Fencing tokens are globally monotonic across all lock keys
+CREATE SEQUENCE IF NOT EXISTS "JobLock_fencing_token_seq";
+
+-- 2) One row per lock key; a row whose expires_at has passed is free to take over
+CREATE TABLE IF NOT EXISTS "JobLock" (
+  "lock_key" TEXT NOT NULL,
+  "owner_id" TEXT NOT NULL,
+  "fencing_token" BIGINT NOT NULL,
+  "acquired_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  "renewed_at" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  "expires_at" TIMESTAMP(3) NOT NULL,
+
+  CONSTRAINT "JobLock_pkey" PRIMARY KEY ("lock_key")
+);
+
+CREATE INDEX IF NOT EXISTS "JobLock_expires_at_idx" ON "JobLock"("expires_at");
+
+-- 3) FMCSA autosync now runs under the job runner
+ALTER TYPE "JobName" ADD VALUE IF NOT EXISTS 'FMCSA_AUTOSYNC';
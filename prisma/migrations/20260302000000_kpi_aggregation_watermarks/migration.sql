@@ -0,0 +1,12 @@
+-- Incremental KPI aggregation: per-venture watermark of the newest load write already aggregated
+
+CREATE TABLE IF NOT EXISTS "KpiAggregationWatermark" (
+  "ventureId" INTEGER NOT NULL,
+  "lastChangeAt" TIMESTAMP(3) NOT NULL,
+  "updatedAt" TIMESTAMP(3) NOT NULL,
+
+  CONSTRAINT "KpiAggregationWatermark_pkey" PRIMARY KEY ("ventureId")
+);
+
+-- Changed-day detection scans loads by (ventureId, updatedAt > watermark)
+CREATE INDEX IF NOT EXISTS "Load_ventureId_updatedAt_idx" ON "Load"("ventureId", "updatedAt");
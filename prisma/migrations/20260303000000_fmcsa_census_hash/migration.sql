@@ -0,0 +1,2 @@
+-- FMCSA census importer: content hash of the census row last merged into each carrier
+ALTER TABLE "Carrier" ADD COLUMN IF NOT EXISTS "fmcsaCensusHash" TEXT;
@@ -0,0 +1,26 @@
+-- Incremental audit runs: issues persist as OPEN across runs until a later run resolves them
+
+ALTER TABLE "AuditRun" ADD COLUMN IF NOT EXISTS "scannedSince" TIMESTAMP(3);
+ALTER TABLE "AuditIssue" ADD COLUMN IF NOT EXISTS "resolvedAt" TIMESTAMP(3);
+
+-- Open-issue lookup per check at the start of every run
+CREATE INDEX IF NOT EXISTS "AuditIssue_status_auditCheckId_idx" ON "AuditIssue"("status", "auditCheckId");
+
+-- Row checks scan rows updated since the previous run
+CREATE INDEX IF NOT EXISTS "Load_updatedAt_idx" ON "Load"("updatedAt");
+CREATE INDEX IF NOT EXISTS "HotelDailyReport_updatedAt_idx" ON "HotelDailyReport"("updatedAt");
+
+-- Earlier runs re-inserted the same finding every time. Keep the newest OPEN
+-- issue per (check, target) and close the older duplicates.
+UPDATE "AuditIssue" a
+SET "status" = 'RESOLVED', "resolvedAt" = NOW()
+FROM (
+  SELECT "id",
+         ROW_NUMBER() OVER (
+           PARTITION BY "auditCheckId", "targetType", "targetId"
+           ORDER BY "id" DESC
+         ) AS rn
+  FROM "AuditIssue"
+  WHERE "status" = 'OPEN'
+) d
+WHERE a."id" = d."id" AND d.rn > 1;
@@ -0,0 +1,34 @@
+-- Customer dedupe blocking keys: normalized phone, email, email domain and name,
+-- kept current by a trigger so every write path (API, imports, seeds) maintains them.
+-- Normalization mirrors lib/freight/customerDedupe.ts.
+
+ALTER TABLE "Customer" ADD COLUMN IF NOT EXISTS "dedupePhone" TEXT;
+ALTER TABLE "Customer" ADD COLUMN IF NOT EXISTS "dedupeEmail" TEXT;
+ALTER TABLE "Customer" ADD COLUMN IF NOT EXISTS "dedupeEmailDomain" TEXT;
+ALTER TABLE "Customer" ADD COLUMN IF NOT EXISTS "dedupeName" TEXT;
+
+CREATE OR REPLACE FUNCTION "Customer_dedupe_keys"() RETURNS TRIGGER AS $$
+DECLARE
+  digits TEXT;
+BEGIN
+  digits := RIGHT(REGEXP_REPLACE(COALESCE(NEW."phone", ''), '\D', '', 'g'), 10);
+  NEW."dedupePhone" := CASE WHEN LENGTH(digits) = 10 THEN digits ELSE NULL END;
+  NEW."dedupeEmail" := NULLIF(LOWER(BTRIM(NEW."email")), '');
+  NEW."dedupeEmailDomain" := NULLIF(LOWER(SPLIT_PART(BTRIM(NEW."email"), '@', 2)), '');
+  NEW."dedupeName" := REGEXP_REPLACE(LOWER(NEW."name"), '[^a-z0-9]', '', 'g');
+  RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "Customer_dedupe_keys_trg" ON "Customer";
+CREATE TRIGGER "Customer_dedupe_keys_trg"
+  BEFORE INSERT OR UPDATE OF "name", "email", "phone" ON "Customer"
+  FOR EACH ROW EXECUTE FUNCTION "Customer_dedupe_keys"();
+
+-- Backfill existing rows through the trigger
+UPDATE "Customer" SET "name" = "name";
+
+CREATE INDEX IF NOT EXISTS "Customer_dedupePhone_idx" ON "Customer"("dedupePhone");
+CREATE INDEX IF NOT EXISTS "Customer_dedupeEmail_idx" ON "Customer"("dedupeEmail");
+CREATE INDEX IF NOT EXISTS "Customer_dedupeEmailDomain_idx" ON "Customer"("dedupeEmailDomain");
+CREATE INDEX IF NOT EXISTS "Customer_dedupeName_idx" ON "Customer"("dedupeName");
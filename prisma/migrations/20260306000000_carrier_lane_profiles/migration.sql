@@ -0,0 +1,143 @@
+-- Carrier lane profiles: delivered-load counts per carrier and lane
+-- (origin/destination ZIP-3, state and city, equipment), maintained by a
+-- trigger on "Load" so carrier search reads a small indexed table instead of
+-- counting loads per carrier. Empty strings stand in for missing key parts so
+-- the unique key also covers them.
+
+CREATE TABLE IF NOT EXISTS "CarrierLaneProfile" (
+    "id" SERIAL NOT NULL,
+    "carrierId" INTEGER NOT NULL,
+    "originZip3" TEXT NOT NULL DEFAULT '',
+    "originState" TEXT NOT NULL DEFAULT '',
+    "originCity" TEXT NOT NULL DEFAULT '',
+    "destZip3" TEXT NOT NULL DEFAULT '',
+    "destState" TEXT NOT NULL DEFAULT '',
+    "destCity" TEXT NOT NULL DEFAULT '',
+    "equipmentType" TEXT NOT NULL DEFAULT '',
+    "deliveredCount" INTEGER NOT NULL DEFAULT 0,
+    "onTimeCount" INTEGER NOT NULL DEFAULT 0,
+    "lastLoadAt" TIMESTAMP(3),
+    "lastDeliveredAt" TIMESTAMP(3),
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "CarrierLaneProfile_pkey" PRIMARY KEY ("id")
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "CarrierLaneProfile_lane_key"
+  ON "CarrierLaneProfile"("carrierId", "originZip3", "destZip3", "originState", "originCity", "destState", "destCity", "equipmentType");
+CREATE INDEX IF NOT EXISTS "CarrierLaneProfile_originZip3_destZip3_idx" ON "CarrierLaneProfile"("originZip3", "destZip3");
+CREATE INDEX IF NOT EXISTS "CarrierLaneProfile_destZip3_idx" ON "CarrierLaneProfile"("destZip3");
+CREATE INDEX IF NOT EXISTS "CarrierLaneProfile_originState_originCity_idx" ON "CarrierLaneProfile"("originState", "originCity");
+CREATE INDEX IF NOT EXISTS "CarrierLaneProfile_carrierId_idx" ON "CarrierLaneProfile"("carrierId");
+
+DO $$ BEGIN
+  ALTER TABLE "CarrierLaneProfile" ADD CONSTRAINT "CarrierLaneProfile_carrierId_fkey"
+    FOREIGN KEY ("carrierId") REFERENCES "Carrier"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Recent-activity lookups in carrier search
+CREATE INDEX IF NOT EXISTS "Load_carrierId_createdAt_idx" ON "Load"("carrierId", "createdAt");
+
+-- Apply one load's contribution (sign = 1 or -1) to its lane profile.
+-- On-time matches lib/freight/carrierSearch.ts: delivered by the drop date,
+-- or either date unknown.
+CREATE OR REPLACE FUNCTION "CarrierLaneProfile_apply"(l "Load", sign INTEGER) RETURNS VOID AS $$
+DECLARE
+  on_time INTEGER;
+BEGIN
+  on_time := CASE
+    WHEN l."dropDate" IS NOT NULL AND l."actualDeliveryAt" IS NOT NULL
+      AND l."actualDeliveryAt" > l."dropDate" THEN 0
+    ELSE 1
+  END;
+
+  INSERT INTO "CarrierLaneProfile" AS p (
+    "carrierId", "originZip3", "originState", "originCity", "destZip3", "destState", "destCity",
+    "equipmentType", "deliveredCount", "onTimeCount", "lastLoadAt", "lastDeliveredAt", "updatedAt"
+  ) VALUES (
+    l."carrierId",
+    CASE WHEN LENGTH(l."pickupZip") >= 3 THEN LEFT(l."pickupZip", 3) ELSE '' END,
+    COALESCE(l."pickupState", ''),
+    COALESCE(l."pickupCity", ''),
+    CASE WHEN LENGTH(l."dropZip") >= 3 THEN LEFT(l."dropZip", 3) ELSE '' END,
+    COALESCE(l."dropState", ''),
+    COALESCE(l."dropCity", ''),
+    COALESCE(l."equipmentType", ''),
+    sign,
+    sign * on_time,
+    CASE WHEN sign > 0 THEN l."createdAt" END,
+    CASE WHEN sign > 0 THEN COALESCE(l."actualDeliveryAt", now()) END,
+    now()
+  )
+  ON CONFLICT ("carrierId", "originZip3", "destZip3", "originState", "originCity", "destState", "destCity", "equipmentType")
+  DO UPDATE SET
+    "deliveredCount" = p."deliveredCount" + EXCLUDED."deliveredCount",
+    "onTimeCount" = p."onTimeCount" + EXCLUDED."onTimeCount",
+    "lastLoadAt" = GREATEST(p."lastLoadAt", EXCLUDED."lastLoadAt"),
+    "lastDeliveredAt" = GREATEST(p."lastDeliveredAt", EXCLUDED."lastDeliveredAt"),
+    "updatedAt" = now();
+
+  -- Dates are high-water marks and are not rolled back on removal; a lane
+  -- with nothing left delivered is dropped entirely.
+  IF sign < 0 THEN
+    DELETE FROM "CarrierLaneProfile"
+    WHERE "carrierId" = l."carrierId" AND "deliveredCount" <= 0;
+  END IF;
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION "Load_carrier_lane_profile"() RETURNS TRIGGER AS $$
+BEGIN
+  IF TG_OP = 'UPDATE' AND
+     ROW(OLD."loadStatus", OLD."carrierId", OLD."pickupZip", OLD."pickupState", OLD."pickupCity",
+         OLD."dropZip", OLD."dropState", OLD."dropCity", OLD."equipmentType", OLD."dropDate", OLD."actualDeliveryAt")
+     IS NOT DISTINCT FROM
+     ROW(NEW."loadStatus", NEW."carrierId", NEW."pickupZip", NEW."pickupState", NEW."pickupCity",
+         NEW."dropZip", NEW."dropState", NEW."dropCity", NEW."equipmentType", NEW."dropDate", NEW."actualDeliveryAt")
+  THEN
+    RETURN NULL;
+  END IF;
+
+  IF TG_OP IN ('UPDATE', 'DELETE') AND OLD."loadStatus" = 'DELIVERED' AND OLD."carrierId" IS NOT NULL THEN
+    PERFORM "CarrierLaneProfile_apply"(OLD, -1);
+  END IF;
+  IF TG_OP IN ('INSERT', 'UPDATE') AND NEW."loadStatus" = 'DELIVERED' AND NEW."carrierId" IS NOT NULL THEN
+    PERFORM "CarrierLaneProfile_apply"(NEW, 1);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "Load_carrier_lane_profile_trg" ON "Load";
+CREATE TRIGGER "Load_carrier_lane_profile_trg"
+  AFTER INSERT OR DELETE OR UPDATE OF "loadStatus", "carrierId", "pickupZip", "pickupState", "pickupCity",
+    "dropZip", "dropState", "dropCity", "equipmentType", "dropDate", "actualDeliveryAt"
+  ON "Load"
+  FOR EACH ROW EXECUTE FUNCTION "Load_carrier_lane_profile"();
+
+-- Backfill from existing delivered loads
+TRUNCATE "CarrierLaneProfile";
+INSERT INTO "CarrierLaneProfile" (
+  "carrierId", "originZip3", "originState", "originCity", "destZip3", "destState", "destCity",
+  "equipmentType", "deliveredCount", "onTimeCount", "lastLoadAt", "lastDeliveredAt", "updatedAt"
+)
+SELECT
+  "carrierId",
+  CASE WHEN LENGTH("pickupZip") >= 3 THEN LEFT("pickupZip", 3) ELSE '' END,
+  COALESCE("pickupState", ''),
+  COALESCE("pickupCity", ''),
+  CASE WHEN LENGTH("dropZip") >= 3 THEN LEFT("dropZip", 3) ELSE '' END,
+  COALESCE("dropState", ''),
+  COALESCE("dropCity", ''),
+  COALESCE("equipmentType", ''),
+  COUNT(*)::INTEGER,
+  COUNT(*) FILTER (
+    WHERE NOT ("dropDate" IS NOT NULL AND "actualDeliveryAt" IS NOT NULL AND "actualDeliveryAt" > "dropDate")
+  )::INTEGER,
+  MAX("createdAt"),
+  MAX(COALESCE("actualDeliveryAt", "updatedAt")),
+  now()
+FROM "Load"
+WHERE "loadStatus" = 'DELIVERED' AND "carrierId" IS NOT NULL
+GROUP BY 1, 2, 3, 4, 5, 6, 7, 8;
@@ -0,0 +1,4 @@
+-- Per-load, per-dispatcher contact lookups for the coverage war room
+-- (contact counts and first contact per load and user).
+CREATE INDEX IF NOT EXISTS "CarrierContact_loadId_madeById_createdAt_idx"
+  ON "CarrierContact"("loadId", "madeById", "createdAt");
@@ -0,0 +1,59 @@
+-- Per-period gamification leaderboards and constant-cost idempotent awards.
+
+-- Idempotency key moves from metadata to an indexed column. Only the first
+-- event per key takes it so the unique index can be built over old duplicates.
+ALTER TABLE "GamificationEvent" ADD COLUMN IF NOT EXISTS "idempotencyKey" TEXT;
+
+UPDATE "GamificationEvent" e
+SET "idempotencyKey" = e."metadata"->>'idempotencyKey'
+WHERE e."id" IN (
+  SELECT MIN("id")
+  FROM "GamificationEvent"
+  WHERE "metadata"->>'idempotencyKey' IS NOT NULL
+  GROUP BY "userId", "ventureId", "type", "metadata"->>'idempotencyKey'
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "GamificationEvent_userId_ventureId_type_idempotencyKey_key"
+  ON "GamificationEvent"("userId", "ventureId", "type", "idempotencyKey");
+
+CREATE TABLE IF NOT EXISTS "GamificationLeaderboardScore" (
+    "id" SERIAL NOT NULL,
+    "ventureId" INTEGER NOT NULL,
+    "officeId" INTEGER NOT NULL DEFAULT 0,
+    "period" TEXT NOT NULL,
+    "periodStart" TIMESTAMP(3) NOT NULL,
+    "userId" INTEGER NOT NULL,
+    "points" INTEGER NOT NULL DEFAULT 0,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "GamificationLeaderboardScore_pkey" PRIMARY KEY ("id")
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "GamificationLeaderboardScore_ventureId_officeId_period_periodStart_userId_key"
+  ON "GamificationLeaderboardScore"("ventureId", "officeId", "period", "periodStart", "userId");
+CREATE INDEX IF NOT EXISTS "GamificationLeaderboardScore_ventureId_officeId_period_periodStart_points_idx"
+  ON "GamificationLeaderboardScore"("ventureId", "officeId", "period", "periodStart", "points" DESC);
+
+DO $$ BEGIN
+  ALTER TABLE "GamificationLeaderboardScore" ADD CONSTRAINT "GamificationLeaderboardScore_ventureId_fkey"
+    FOREIGN KEY ("ventureId") REFERENCES "Venture"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Backfill every board from existing events (UTC periods, ISO weeks)
+TRUNCATE "GamificationLeaderboardScore";
+INSERT INTO "GamificationLeaderboardScore" ("ventureId", "officeId", "period", "periodStart", "userId", "points", "updatedAt")
+SELECT e."ventureId", o."officeId", p."period",
+       CASE p."period"
+         WHEN 'ALL' THEN TIMESTAMP '1970-01-01'
+         ELSE DATE_TRUNC(LOWER(p."period"), e."createdAt")
+       END AS "periodStart",
+       e."userId", SUM(e."points")::INTEGER, now()
+FROM "GamificationEvent" e
+CROSS JOIN (VALUES ('DAY'), ('WEEK'), ('MONTH'), ('ALL')) AS p("period")
+CROSS JOIN LATERAL (
+  SELECT 0 AS "officeId"
+  UNION ALL
+  SELECT e."officeId" WHERE e."officeId" IS NOT NULL
+) o
+GROUP BY 1, 2, 3, 4, 5;
@@ -0,0 +1,4 @@
+-- Quote timeout sweep: range scan of SENT quotes by deadline, and the
+-- follow-up task lookup per timed-out quote.
+CREATE INDEX IF NOT EXISTS "FreightQuote_status_expiresAt_idx" ON "FreightQuote"("status", "expiresAt");
+CREATE INDEX IF NOT EXISTS "Task_quoteId_type_idx" ON "Task"("quoteId", "type");
@@ -0,0 +1,40 @@
+-- Weekly and monthly IncentiveDaily rollups for the incentive summary endpoints.
+
+CREATE TABLE IF NOT EXISTS "IncentiveRollup" (
+    "id" SERIAL NOT NULL,
+    "ventureId" INTEGER NOT NULL,
+    "userId" INTEGER NOT NULL,
+    "period" TEXT NOT NULL,
+    "periodStart" TIMESTAMP(3) NOT NULL,
+    "amount" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "daysWithIncentives" INTEGER NOT NULL DEFAULT 0,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "IncentiveRollup_pkey" PRIMARY KEY ("id")
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "IncentiveRollup_ventureId_userId_period_periodStart_key"
+  ON "IncentiveRollup"("ventureId", "userId", "period", "periodStart");
+CREATE INDEX IF NOT EXISTS "IncentiveRollup_ventureId_period_periodStart_idx"
+  ON "IncentiveRollup"("ventureId", "period", "periodStart");
+
+DO $$ BEGIN
+  ALTER TABLE "IncentiveRollup" ADD CONSTRAINT "IncentiveRollup_userId_fkey"
+    FOREIGN KEY ("userId") REFERENCES "User"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  ALTER TABLE "IncentiveRollup" ADD CONSTRAINT "IncentiveRollup_ventureId_fkey"
+    FOREIGN KEY ("ventureId") REFERENCES "Venture"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Backfill from existing daily rows (UTC periods, ISO weeks)
+TRUNCATE "IncentiveRollup";
+INSERT INTO "IncentiveRollup" ("ventureId", "userId", "period", "periodStart", "amount", "daysWithIncentives", "updatedAt")
+SELECT d."ventureId", d."userId", p."period", DATE_TRUNC(LOWER(p."period"), d."date"),
+       SUM(d."amount"), COUNT(*) FILTER (WHERE d."amount" > 0), CURRENT_TIMESTAMP
+FROM "IncentiveDaily" d
+CROSS JOIN (VALUES ('WEEK'), ('MONTH')) AS p("period")
+GROUP BY d."ventureId", d."userId", p."period", DATE_TRUNC(LOWER(p."period"), d."date");
@@ -0,0 +1,8 @@
+-- Indexes for the venture-scoped SaaS subscription ledger queries.
+
+CREATE INDEX IF NOT EXISTS "SaasCustomer_ventureId_idx"
+  ON "SaasCustomer"("ventureId");
+
+-- First subscription per customer (cohort assignment)
+CREATE INDEX IF NOT EXISTS "SaasSubscription_customerId_startedAt_idx"
+  ON "SaasSubscription"("customerId", "startedAt");
@@ -0,0 +1,114 @@
+-- Weekly/monthly hotel KPI rollups and monthly review rollups for the
+-- hospitality dashboard and KPI comparison endpoints.
+
+CREATE TABLE IF NOT EXISTS "HotelKpiRollup" (
+    "id" SERIAL NOT NULL,
+    "hotelId" INTEGER NOT NULL,
+    "ventureId" INTEGER NOT NULL,
+    "period" TEXT NOT NULL,
+    "periodStart" TIMESTAMP(3) NOT NULL,
+    "days" INTEGER NOT NULL DEFAULT 0,
+    "roomsSold" INTEGER NOT NULL DEFAULT 0,
+    "roomsAvailable" INTEGER NOT NULL DEFAULT 0,
+    "roomRevenue" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "totalRevenue" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "occSum" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "adrSum" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "revparSum" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "occPositiveSum" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "occPositiveDays" INTEGER NOT NULL DEFAULT 0,
+    "adrPositiveSum" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "adrPositiveDays" INTEGER NOT NULL DEFAULT 0,
+    "revparPositiveSum" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "revparPositiveDays" INTEGER NOT NULL DEFAULT 0,
+    "lossNights" INTEGER NOT NULL DEFAULT 0,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "HotelKpiRollup_pkey" PRIMARY KEY ("id")
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "HotelKpiRollup_hotelId_period_periodStart_key"
+  ON "HotelKpiRollup"("hotelId", "period", "periodStart");
+CREATE INDEX IF NOT EXISTS "HotelKpiRollup_ventureId_period_periodStart_idx"
+  ON "HotelKpiRollup"("ventureId", "period", "periodStart");
+
+DO $$ BEGIN
+  ALTER TABLE "HotelKpiRollup" ADD CONSTRAINT "HotelKpiRollup_hotelId_fkey"
+    FOREIGN KEY ("hotelId") REFERENCES "HotelProperty"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+DO $$ BEGIN
+  ALTER TABLE "HotelKpiRollup" ADD CONSTRAINT "HotelKpiRollup_ventureId_fkey"
+    FOREIGN KEY ("ventureId") REFERENCES "Venture"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+CREATE TABLE IF NOT EXISTS "HotelReviewRollup" (
+    "id" SERIAL NOT NULL,
+    "hotelId" INTEGER NOT NULL,
+    "source" TEXT NOT NULL,
+    "isTest" BOOLEAN NOT NULL DEFAULT false,
+    "period" TEXT NOT NULL,
+    "periodStart" TIMESTAMP(3) NOT NULL,
+    "reviews" INTEGER NOT NULL DEFAULT 0,
+    "ratedReviews" INTEGER NOT NULL DEFAULT 0,
+    "ratingSum" DOUBLE PRECISION NOT NULL DEFAULT 0,
+    "positive" INTEGER NOT NULL DEFAULT 0,
+    "negative" INTEGER NOT NULL DEFAULT 0,
+    "unresponded" INTEGER NOT NULL DEFAULT 0,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "HotelReviewRollup_pkey" PRIMARY KEY ("id")
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "HotelReviewRollup_hotelId_source_isTest_period_periodStart_key"
+  ON "HotelReviewRollup"("hotelId", "source", "isTest", "period", "periodStart");
+
+DO $$ BEGIN
+  ALTER TABLE "HotelReviewRollup" ADD CONSTRAINT "HotelReviewRollup_hotelId_fkey"
+    FOREIGN KEY ("hotelId") REFERENCES "HotelProperty"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Edge-of-window review counts
+CREATE INDEX IF NOT EXISTS "HotelReview_hotelId_reviewDate_idx" ON "HotelReview"("hotelId", "reviewDate");
+
+-- Backfill (UTC periods, ISO weeks)
+TRUNCATE "HotelKpiRollup";
+INSERT INTO "HotelKpiRollup" ("hotelId", "ventureId", "period", "periodStart", "days", "roomsSold",
+  "roomsAvailable", "roomRevenue", "totalRevenue", "occSum", "adrSum", "revparSum",
+  "occPositiveSum", "occPositiveDays", "adrPositiveSum", "adrPositiveDays",
+  "revparPositiveSum", "revparPositiveDays", "lossNights", "updatedAt")
+SELECT h."id", h."ventureId", p."period", DATE_TRUNC(LOWER(p."period"), s."date"),
+       SUM(s."kpiDay"), SUM(s."roomsSold"), SUM(s."roomsAvailable"), SUM(s."roomRevenue"),
+       SUM(s."totalRevenue"), SUM(s."occ"), SUM(s."adr"), SUM(s."revpar"),
+       COALESCE(SUM(s."occ") FILTER (WHERE s."occ" > 0), 0), COUNT(*) FILTER (WHERE s."occ" > 0),
+       COALESCE(SUM(s."adr") FILTER (WHERE s."adr" > 0), 0), COUNT(*) FILTER (WHERE s."adr" > 0),
+       COALESCE(SUM(s."revpar") FILTER (WHERE s."revpar" > 0), 0), COUNT(*) FILTER (WHERE s."revpar" > 0),
+       SUM(s."loss"), CURRENT_TIMESTAMP
+FROM (
+  SELECT k."hotelId", k."date", 1 AS "kpiDay", k."roomsSold", k."roomsAvailable",
+         k."roomRevenue", k."totalRevenue", k."occupancyPct" AS "occ", k."adr", k."revpar", 0 AS "loss"
+  FROM "HotelKpiDaily" k
+  UNION ALL
+  SELECT d."hotelId", d."date", 0, 0, 0, 0, 0, 0, 0, 0, 1
+  FROM "HotelDailyReport" d
+  WHERE d."highLossFlag"
+) s
+JOIN "HotelProperty" h ON h."id" = s."hotelId"
+CROSS JOIN (VALUES ('WEEK'), ('MONTH')) AS p("period")
+GROUP BY h."id", h."ventureId", p."period", DATE_TRUNC(LOWER(p."period"), s."date");
+
+TRUNCATE "HotelReviewRollup";
+INSERT INTO "HotelReviewRollup" ("hotelId", "source", "isTest", "period", "periodStart", "reviews",
+  "ratedReviews", "ratingSum", "positive", "negative", "unresponded", "updatedAt")
+SELECT v."hotelId", v."source"::text, v."isTest",
+       CASE WHEN v."reviewDate" IS NULL THEN 'UNDATED' ELSE 'MONTH' END,
+       COALESCE(DATE_TRUNC('month', v."reviewDate"), TIMESTAMP '1970-01-01'),
+       COUNT(*), COUNT(v."rating"), COALESCE(SUM(v."rating"), 0),
+       COUNT(*) FILTER (WHERE v."rating" >= 4), COUNT(*) FILTER (WHERE v."rating" <= 2),
+       COUNT(*) FILTER (WHERE v."responseText" IS NULL OR v."responseText" = ''),
+       CURRENT_TIMESTAMP
+FROM "HotelReview" v
+GROUP BY 1, 2, 3, 4, 5;
@@ -0,0 +1,39 @@
+-- Persisted loss severity on HotelDailyReport so the nightly scan and the
+-- loss-night lists read flagged nights straight off an index.
+
+DO $$ BEGIN
+  CREATE TYPE "HotelLossSeverity" AS ENUM ('NONE', 'LOW', 'MEDIUM', 'HIGH');
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+ALTER TABLE "HotelDailyReport" ADD COLUMN IF NOT EXISTS "lossSeverity" "HotelLossSeverity" NOT NULL DEFAULT 'NONE';
+
+CREATE INDEX IF NOT EXISTS "HotelDailyReport_highLossFlag_date_idx" ON "HotelDailyReport"("highLossFlag", "date");
+
+-- Backfill with the thresholds in lib/hotels/lossClassification.ts
+UPDATE "HotelDailyReport" r
+SET "highLossFlag" = g."severity" <> 'NONE',
+    "lossSeverity" = g."severity"
+FROM (
+  SELECT c."id",
+         CASE WHEN c."lost" <= 0 OR c."total" <= 0 THEN 'NONE'
+              WHEN c."lost" >= 1000 OR c."lost" / c."total" >= 0.2 THEN 'HIGH'
+              WHEN c."lost" >= 500 OR c."lost" / c."total" >= 0.1 THEN 'MEDIUM'
+              WHEN c."lost" >= 100 OR c."lost" / c."total" >= 0.05 THEN 'LOW'
+              ELSE 'NONE' END::"HotelLossSeverity" AS "severity"
+  FROM (
+    SELECT "id", COALESCE("total", 0)::float8 AS "total", COALESCE("lostDues", 0)::float8 AS "lost"
+    FROM "HotelDailyReport"
+  ) c
+) g
+WHERE r."id" = g."id";
+
+-- Keep the hotel KPI rollups' loss-night counts in step with the backfill
+UPDATE "HotelKpiRollup" k
+SET "lossNights" = (
+  SELECT COUNT(*)
+  FROM "HotelDailyReport" d
+  WHERE d."hotelId" = k."hotelId" AND d."highLossFlag"
+    AND d."date" >= k."periodStart"
+    AND d."date" < k."periodStart" + CASE k."period" WHEN 'WEEK' THEN INTERVAL '7 days' ELSE INTERVAL '1 month' END
+);
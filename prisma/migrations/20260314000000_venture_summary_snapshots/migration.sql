@@ -0,0 +1,112 @@
+-- Per-venture landing-page snapshots (lib/ventureSummary.ts). Row triggers on
+-- the source tables mark a venture's snapshot stale; readers refresh stale
+-- rows on demand and the scheduled VENTURE_SUMMARY job rebuilds them after
+-- the UTC day rolls over. No backfill: missing rows are computed on first read.
+
+ALTER TYPE "JobName" ADD VALUE IF NOT EXISTS 'VENTURE_SUMMARY';
+
+CREATE TABLE IF NOT EXISTS "VentureSummarySnapshot" (
+    "ventureId" INTEGER NOT NULL,
+    "windowEnd" TIMESTAMP(3) NOT NULL,
+    "summary" JSONB NOT NULL,
+    "computedAt" TIMESTAMP(3) NOT NULL,
+    "staleAt" TIMESTAMP(3),
+
+    CONSTRAINT "VentureSummarySnapshot_pkey" PRIMARY KEY ("ventureId")
+);
+
+-- Mark the venture(s) of the old and new row stale. TG_ARGV[0] names the
+-- column that leads to the venture: "ventureId" directly, or "hotelId" /
+-- "customerId" through HotelProperty / SaasCustomer. Only the first write
+-- after a refresh claim touches the row; later writes see it already stale.
+CREATE OR REPLACE FUNCTION "VentureSummarySnapshot_mark_stale"() RETURNS TRIGGER AS $$
+DECLARE
+  ids INTEGER[] := ARRAY[]::INTEGER[];
+  r JSONB;
+BEGIN
+  FOREACH r IN ARRAY ARRAY[
+    CASE WHEN TG_OP <> 'INSERT' THEN to_jsonb(OLD) END,
+    CASE WHEN TG_OP <> 'DELETE' THEN to_jsonb(NEW) END
+  ] LOOP
+    CONTINUE WHEN r IS NULL;
+    ids := ids || CASE TG_ARGV[0]
+      WHEN 'hotelId' THEN (SELECT "ventureId" FROM "HotelProperty" WHERE "id" = (r->>'hotelId')::INTEGER)
+      WHEN 'customerId' THEN (SELECT "ventureId" FROM "SaasCustomer" WHERE "id" = (r->>'customerId')::INTEGER)
+      ELSE (r->>'ventureId')::INTEGER
+    END;
+  END LOOP;
+
+  UPDATE "VentureSummarySnapshot"
+  SET "staleAt" = clock_timestamp()
+  WHERE "ventureId" = ANY(ids) AND ("staleAt" IS NULL OR "staleAt" <= "computedAt");
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "Load_venture_summary_trg" ON "Load";
+CREATE TRIGGER "Load_venture_summary_trg"
+  AFTER INSERT OR DELETE OR UPDATE OF "ventureId", "status", "atRiskFlag", "billAmount", "sellRate",
+    "buyRate", "marginAmount", "isTest", "createdAt"
+  ON "Load"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('ventureId');
+
+DROP TRIGGER IF EXISTS "HotelKpiDaily_venture_summary_trg" ON "HotelKpiDaily";
+CREATE TRIGGER "HotelKpiDaily_venture_summary_trg"
+  AFTER INSERT OR UPDATE OR DELETE ON "HotelKpiDaily"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('hotelId');
+
+DROP TRIGGER IF EXISTS "HotelDailyReport_venture_summary_trg" ON "HotelDailyReport";
+CREATE TRIGGER "HotelDailyReport_venture_summary_trg"
+  AFTER INSERT OR DELETE OR UPDATE OF "hotelId", "date", "highLossFlag"
+  ON "HotelDailyReport"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('hotelId');
+
+DROP TRIGGER IF EXISTS "HotelProperty_venture_summary_trg" ON "HotelProperty";
+CREATE TRIGGER "HotelProperty_venture_summary_trg"
+  AFTER INSERT OR DELETE OR UPDATE OF "ventureId", "status", "isTest"
+  ON "HotelProperty"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('ventureId');
+
+DROP TRIGGER IF EXISTS "BpoCallLog_venture_summary_trg" ON "BpoCallLog";
+CREATE TRIGGER "BpoCallLog_venture_summary_trg"
+  AFTER INSERT OR UPDATE OR DELETE ON "BpoCallLog"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('ventureId');
+
+DROP TRIGGER IF EXISTS "BpoAgent_venture_summary_trg" ON "BpoAgent";
+CREATE TRIGGER "BpoAgent_venture_summary_trg"
+  AFTER INSERT OR DELETE OR UPDATE OF "ventureId", "isActive"
+  ON "BpoAgent"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('ventureId');
+
+DROP TRIGGER IF EXISTS "SaasSubscription_venture_summary_trg" ON "SaasSubscription";
+CREATE TRIGGER "SaasSubscription_venture_summary_trg"
+  AFTER INSERT OR UPDATE OR DELETE ON "SaasSubscription"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('customerId');
+
+DROP TRIGGER IF EXISTS "IncentiveDaily_venture_summary_trg" ON "IncentiveDaily";
+CREATE TRIGGER "IncentiveDaily_venture_summary_trg"
+  AFTER INSERT OR UPDATE OR DELETE ON "IncentiveDaily"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('ventureId');
+
+DROP TRIGGER IF EXISTS "BankAccountSnapshot_venture_summary_trg" ON "BankAccountSnapshot";
+CREATE TRIGGER "BankAccountSnapshot_venture_summary_trg"
+  AFTER INSERT OR UPDATE OR DELETE ON "BankAccountSnapshot"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('ventureId');
+
+DROP TRIGGER IF EXISTS "Office_venture_summary_trg" ON "Office";
+CREATE TRIGGER "Office_venture_summary_trg"
+  AFTER INSERT OR DELETE OR UPDATE OF "ventureId", "isTest"
+  ON "Office"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('ventureId');
+
+DROP TRIGGER IF EXISTS "Task_venture_summary_trg" ON "Task";
+CREATE TRIGGER "Task_venture_summary_trg"
+  AFTER INSERT OR DELETE OR UPDATE OF "ventureId", "officeId", "status", "isTest"
+  ON "Task"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('ventureId');
+
+DROP TRIGGER IF EXISTS "Policy_venture_summary_trg" ON "Policy";
+CREATE TRIGGER "Policy_venture_summary_trg"
+  AFTER INSERT OR DELETE OR UPDATE OF "ventureId", "officeId", "status", "endDate", "isTest"
+  ON "Policy"
+  FOR EACH ROW EXECUTE FUNCTION "VentureSummarySnapshot_mark_stale"('ventureId');
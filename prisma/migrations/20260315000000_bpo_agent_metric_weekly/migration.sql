@@ -0,0 +1,133 @@
+-- Weekly BPO agent metric sums (lib/bpo/agentMetrics.ts). BpoAgentMetric has
+-- no writer in the app beyond seeds and imports, so statement triggers keep
+-- the affected (campaign, agent, week) groups current on every write.
+
+CREATE INDEX IF NOT EXISTS "BpoAgentMetric_campaignId_userId_date_idx" ON "BpoAgentMetric"("campaignId", "userId", "date");
+CREATE INDEX IF NOT EXISTS "BpoAgentMetric_date_idx" ON "BpoAgentMetric"("date");
+
+CREATE TABLE IF NOT EXISTS "BpoAgentMetricWeekly" (
+    "id" SERIAL NOT NULL,
+    "campaignId" INTEGER NOT NULL,
+    "agentId" INTEGER NOT NULL,
+    "weekStart" TIMESTAMP(3) NOT NULL,
+    "agentName" TEXT,
+    "days" INTEGER NOT NULL DEFAULT 0,
+    "calls" INTEGER NOT NULL DEFAULT 0,
+    "talkTimeMin" INTEGER NOT NULL DEFAULT 0,
+    "demosBooked" INTEGER NOT NULL DEFAULT 0,
+    "salesClosed" INTEGER NOT NULL DEFAULT 0,
+    "updatedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+    CONSTRAINT "BpoAgentMetricWeekly_pkey" PRIMARY KEY ("id")
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "BpoAgentMetricWeekly_campaignId_agentId_weekStart_key"
+  ON "BpoAgentMetricWeekly"("campaignId", "agentId", "weekStart");
+CREATE INDEX IF NOT EXISTS "BpoAgentMetricWeekly_weekStart_campaignId_agentId_idx"
+  ON "BpoAgentMetricWeekly"("weekStart", "campaignId", "agentId");
+
+DO $$ BEGIN
+  ALTER TABLE "BpoAgentMetricWeekly" ADD CONSTRAINT "BpoAgentMetricWeekly_campaignId_fkey"
+    FOREIGN KEY ("campaignId") REFERENCES "BpoCampaign"("id") ON DELETE CASCADE ON UPDATE CASCADE;
+EXCEPTION WHEN duplicate_object THEN NULL;
+END $$;
+
+-- Recompute the given (campaign, agent, week) groups from the daily rows:
+-- upsert the groups that still have rows, then drop the ones that are empty.
+-- Agent 0 collects rows without a user, matching /api/bpo/agent-kpi.
+CREATE OR REPLACE FUNCTION "BpoAgentMetricWeekly_recompute"(
+  campaign_ids INTEGER[], agent_ids INTEGER[], week_starts TIMESTAMP[]
+) RETURNS VOID AS $$
+BEGIN
+  INSERT INTO "BpoAgentMetricWeekly" AS w (
+    "campaignId", "agentId", "weekStart", "agentName", "days", "calls",
+    "talkTimeMin", "demosBooked", "salesClosed", "updatedAt"
+  )
+  SELECT k."campaignId", k."agentId", k."weekStart",
+         MAX(m."agentName"),
+         COUNT(DISTINCT date_trunc('day', m."date"))::INTEGER,
+         SUM(COALESCE(m."handledCalls", 0) + COALESCE(m."outboundCalls", 0))::INTEGER,
+         SUM(COALESCE(m."talkTimeMin", 0))::INTEGER,
+         SUM(COALESCE(m."demosBooked", 0))::INTEGER,
+         SUM(COALESCE(m."salesClosed", 0))::INTEGER,
+         now()
+  FROM unnest(campaign_ids, agent_ids, week_starts) AS k("campaignId", "agentId", "weekStart")
+  JOIN "BpoAgentMetric" m
+    ON m."campaignId" = k."campaignId"
+   AND (m."userId" = k."agentId" OR (k."agentId" = 0 AND m."userId" IS NULL))
+   AND m."date" >= k."weekStart" AND m."date" < k."weekStart" + INTERVAL '7 days'
+  GROUP BY k."campaignId", k."agentId", k."weekStart"
+  ON CONFLICT ("campaignId", "agentId", "weekStart") DO UPDATE SET
+    "agentName" = EXCLUDED."agentName",
+    "days" = EXCLUDED."days",
+    "calls" = EXCLUDED."calls",
+    "talkTimeMin" = EXCLUDED."talkTimeMin",
+    "demosBooked" = EXCLUDED."demosBooked",
+    "salesClosed" = EXCLUDED."salesClosed",
+    "updatedAt" = now();
+
+  DELETE FROM "BpoAgentMetricWeekly" w
+  USING unnest(campaign_ids, agent_ids, week_starts) AS k("campaignId", "agentId", "weekStart")
+  WHERE w."campaignId" = k."campaignId" AND w."agentId" = k."agentId" AND w."weekStart" = k."weekStart"
+    AND NOT EXISTS (
+      SELECT 1 FROM "BpoAgentMetric" m
+      WHERE m."campaignId" = k."campaignId"
+        AND (m."userId" = k."agentId" OR (k."agentId" = 0 AND m."userId" IS NULL))
+        AND m."date" >= k."weekStart" AND m."date" < k."weekStart" + INTERVAL '7 days'
+    );
+END;
+$$ LANGUAGE plpgsql;
+
+-- One function for the three statement triggers; each branch only reads the
+-- transition tables its trigger declares.
+CREATE OR REPLACE FUNCTION "BpoAgentMetric_weekly"() RETURNS TRIGGER AS $$
+DECLARE
+  c INTEGER[];
+  a INTEGER[];
+  w TIMESTAMP[];
+BEGIN
+  IF TG_OP = 'INSERT' THEN
+    SELECT array_agg(d."campaignId"), array_agg(d."agentId"), array_agg(d."weekStart") INTO c, a, w
+    FROM (SELECT DISTINCT "campaignId", COALESCE("userId", 0) AS "agentId", date_trunc('week', "date") AS "weekStart"
+          FROM new_rows) d;
+  ELSIF TG_OP = 'DELETE' THEN
+    SELECT array_agg(d."campaignId"), array_agg(d."agentId"), array_agg(d."weekStart") INTO c, a, w
+    FROM (SELECT DISTINCT "campaignId", COALESCE("userId", 0) AS "agentId", date_trunc('week', "date") AS "weekStart"
+          FROM old_rows) d;
+  ELSE
+    SELECT array_agg(d."campaignId"), array_agg(d."agentId"), array_agg(d."weekStart") INTO c, a, w
+    FROM (SELECT DISTINCT "campaignId", COALESCE("userId", 0) AS "agentId", date_trunc('week', "date") AS "weekStart"
+          FROM (SELECT "campaignId", "userId", "date" FROM new_rows
+                UNION ALL
+                SELECT "campaignId", "userId", "date" FROM old_rows) r) d;
+  END IF;
+
+  IF c IS NOT NULL THEN
+    PERFORM "BpoAgentMetricWeekly_recompute"(c, a, w);
+  END IF;
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "BpoAgentMetric_weekly_ins_trg" ON "BpoAgentMetric";
+CREATE TRIGGER "BpoAgentMetric_weekly_ins_trg"
+  AFTER INSERT ON "BpoAgentMetric"
+  REFERENCING NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION "BpoAgentMetric_weekly"();
+
+DROP TRIGGER IF EXISTS "BpoAgentMetric_weekly_upd_trg" ON "BpoAgentMetric";
+CREATE TRIGGER "BpoAgentMetric_weekly_upd_trg"
+  AFTER UPDATE ON "BpoAgentMetric"
+  REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION "BpoAgentMetric_weekly"();
+
+DROP TRIGGER IF EXISTS "BpoAgentMetric_weekly_del_trg" ON "BpoAgentMetric";
+CREATE TRIGGER "BpoAgentMetric_weekly_del_trg"
+  AFTER DELETE ON "BpoAgentMetric"
+  REFERENCING OLD TABLE AS old_rows
+  FOR EACH STATEMENT EXECUTE FUNCTION "BpoAgentMetric_weekly"();
+
+-- Backfill from existing history
+SELECT "BpoAgentMetricWeekly_recompute"(array_agg(d."campaignId"), array_agg(d."agentId"), array_agg(d."weekStart"))
+FROM (SELECT DISTINCT "campaignId", COALESCE("userId", 0) AS "agentId", date_trunc('week', "date") AS "weekStart"
+      FROM "BpoAgentMetric") d;
@@ -0,0 +1,30 @@
+-- Durable webhook ingestion queue (lib/webhooks/queue.ts). Provider callbacks
+-- are stored here and acknowledged; workers claim them per orderingKey in
+-- arrival order.
+
+CREATE TABLE IF NOT EXISTS "WebhookEvent" (
+    "id" SERIAL NOT NULL,
+    "source" TEXT NOT NULL,
+    "idempotencyKey" TEXT NOT NULL,
+    "orderingKey" TEXT NOT NULL,
+    "payload" JSONB NOT NULL,
+    "status" TEXT NOT NULL DEFAULT 'PENDING',
+    "attempts" INTEGER NOT NULL DEFAULT 0,
+    "availableAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "lockedAt" TIMESTAMP(3),
+    "lockedBy" TEXT,
+    "lastError" TEXT,
+    "receivedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    "processedAt" TIMESTAMP(3),
+
+    CONSTRAINT "WebhookEvent_pkey" PRIMARY KEY ("id")
+);
+
+CREATE UNIQUE INDEX IF NOT EXISTS "WebhookEvent_source_idempotencyKey_key"
+  ON "WebhookEvent"("source", "idempotencyKey");
+CREATE INDEX IF NOT EXISTS "WebhookEvent_status_availableAt_idx"
+  ON "WebhookEvent"("status", "availableAt");
+CREATE INDEX IF NOT EXISTS "WebhookEvent_orderingKey_id_idx"
+  ON "WebhookEvent"("orderingKey", "id");
+CREATE INDEX IF NOT EXISTS "WebhookEvent_processedAt_idx"
+  ON "WebhookEvent"("processedAt");
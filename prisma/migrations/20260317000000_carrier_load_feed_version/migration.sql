@@ -0,0 +1,35 @@
+-- Version counter for the carrier-portal available-loads feed
+-- (lib/freight/carrierFeed.ts). Bumped whenever a load enters, leaves or
+-- changes inside the feed (open, non-test); processes rebuild their snapshot
+-- when the version moves.
+
+CREATE SEQUENCE IF NOT EXISTS "CarrierLoadFeed_version_seq";
+
+CREATE OR REPLACE FUNCTION "CarrierLoadFeed_bump"() RETURNS TRIGGER AS $$
+BEGIN
+  PERFORM nextval('"CarrierLoadFeed_version_seq"');
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "CarrierLoadFeed_ins_trg" ON "Load";
+CREATE TRIGGER "CarrierLoadFeed_ins_trg"
+  AFTER INSERT ON "Load"
+  FOR EACH ROW
+  WHEN (NEW."loadStatus" = 'OPEN' AND NOT NEW."isTest")
+  EXECUTE FUNCTION "CarrierLoadFeed_bump"();
+
+DROP TRIGGER IF EXISTS "CarrierLoadFeed_upd_trg" ON "Load";
+CREATE TRIGGER "CarrierLoadFeed_upd_trg"
+  AFTER UPDATE OF "loadStatus", "isTest", "pickupCity", "pickupState", "dropCity", "dropState",
+                  "equipmentType", "weightLbs", "pickupDate", "dropDate" ON "Load"
+  FOR EACH ROW
+  WHEN ((OLD."loadStatus" = 'OPEN' AND NOT OLD."isTest") OR (NEW."loadStatus" = 'OPEN' AND NOT NEW."isTest"))
+  EXECUTE FUNCTION "CarrierLoadFeed_bump"();
+
+DROP TRIGGER IF EXISTS "CarrierLoadFeed_del_trg" ON "Load";
+CREATE TRIGGER "CarrierLoadFeed_del_trg"
+  AFTER DELETE ON "Load"
+  FOR EACH ROW
+  WHEN (OLD."loadStatus" = 'OPEN' AND NOT OLD."isTest")
+  EXECUTE FUNCTION "CarrierLoadFeed_bump"();
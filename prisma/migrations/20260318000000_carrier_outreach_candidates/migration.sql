@@ -0,0 +1,18 @@
+-- Outreach candidate prefilter (lib/outreach/selectCarriersForLoad.ts).
+-- Trigram indexes let the equipment / lane substring match run on an index
+-- over outreach-eligible carriers only; the id index serves the "Available"
+-- filler list.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS "Carrier_outreach_equipmentTypes_trgm_idx"
+  ON "Carrier" USING GIN ("equipmentTypes" gin_trgm_ops)
+  WHERE "active" = true AND "blocked" = false AND "fmcsaAuthorized" = true;
+
+CREATE INDEX IF NOT EXISTS "Carrier_outreach_lanesJson_trgm_idx"
+  ON "Carrier" USING GIN ("lanesJson" gin_trgm_ops)
+  WHERE "active" = true AND "blocked" = false AND "fmcsaAuthorized" = true;
+
+CREATE INDEX IF NOT EXISTS "Carrier_outreach_eligible_id_idx"
+  ON "Carrier" ("id")
+  WHERE "active" = true AND "blocked" = false AND "fmcsaAuthorized" = true;
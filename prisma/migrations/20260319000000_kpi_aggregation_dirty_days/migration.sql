@@ -0,0 +1,36 @@
+-- Incremental KPI aggregation: venture-days that lost loads. A deleted load,
+-- or one moved to another day or venture, leaves no newer "updatedAt" on its
+-- old day, so the trigger marks that day for the next incremental run.
+
+CREATE TABLE IF NOT EXISTS "KpiAggregationDirtyDay" (
+  "ventureId" INTEGER NOT NULL,
+  "day" TIMESTAMP(3) NOT NULL,
+  "markedAt" TIMESTAMP(3) NOT NULL DEFAULT CURRENT_TIMESTAMP,
+
+  CONSTRAINT "KpiAggregationDirtyDay_pkey" PRIMARY KEY ("ventureId", "day")
+);
+
+CREATE OR REPLACE FUNCTION "Load_kpi_dirty_day"() RETURNS TRIGGER AS $$
+BEGIN
+  INSERT INTO "KpiAggregationDirtyDay" ("ventureId", "day", "markedAt")
+  VALUES (OLD."ventureId", date_trunc('day', OLD."createdAt"), clock_timestamp())
+  ON CONFLICT ("ventureId", "day") DO UPDATE SET "markedAt" = EXCLUDED."markedAt";
+  RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS "Load_kpi_dirty_day_del_trg" ON "Load";
+CREATE TRIGGER "Load_kpi_dirty_day_del_trg"
+  AFTER DELETE ON "Load"
+  FOR EACH ROW
+  WHEN (OLD."ventureId" IS NOT NULL)
+  EXECUTE FUNCTION "Load_kpi_dirty_day"();
+
+DROP TRIGGER IF EXISTS "Load_kpi_dirty_day_upd_trg" ON "Load";
+CREATE TRIGGER "Load_kpi_dirty_day_upd_trg"
+  AFTER UPDATE OF "ventureId", "createdAt" ON "Load"
+  FOR EACH ROW
+  WHEN (OLD."ventureId" IS NOT NULL
+        AND (OLD."ventureId" IS DISTINCT FROM NEW."ventureId"
+             OR date_trunc('day', OLD."createdAt") <> date_trunc('day', NEW."createdAt")))
+  EXECUTE FUNCTION "Load_kpi_dirty_day"();
@@ -0,0 +1,43 @@
+-- Exact lane match for the outreach candidate query
+-- (lib/outreach/selectCarriersForLoad.ts). Mirrors scoreCarrier: a lane
+-- matches when its origin contains the pickup state or its destination
+-- contains the drop state (substring for strings, element for arrays).
+-- Unparseable or non-array "lanesJson" never matches.
+
+CREATE OR REPLACE FUNCTION "carrier_lane_match"(lanes TEXT, pickup TEXT, dropoff TEXT) RETURNS BOOLEAN AS $$
+DECLARE
+  parsed JSONB;
+BEGIN
+  IF lanes IS NULL OR pickup IS NULL OR dropoff IS NULL THEN
+    RETURN false;
+  END IF;
+
+  BEGIN
+    parsed := lanes::jsonb;
+  EXCEPTION WHEN others THEN
+    RETURN false;
+  END;
+
+  IF jsonb_typeof(parsed) <> 'array' THEN
+    RETURN false;
+  END IF;
+
+  RETURN EXISTS (
+    SELECT 1
+    FROM jsonb_array_elements(parsed) AS lane
+    WHERE jsonb_typeof(lane) = 'object'
+      AND (
+        CASE jsonb_typeof(lane -> 'origin')
+          WHEN 'string' THEN strpos(lane ->> 'origin', pickup) > 0
+          WHEN 'array' THEN jsonb_exists(lane -> 'origin', pickup)
+          ELSE false
+        END
+        OR CASE jsonb_typeof(lane -> 'destination')
+          WHEN 'string' THEN strpos(lane ->> 'destination', dropoff) > 0
+          WHEN 'array' THEN jsonb_exists(lane -> 'destination', dropoff)
+          ELSE false
+        END
+      )
+  );
+END;
+$$ LANGUAGE plpgsql IMMUTABLE;
@@ -11,6 +11,8 @@ import {
   TaskPriority,
   PolicyType,
 } from "@prisma/client";
+import appPrisma from "../lib/prisma";
+import { rebuildHotelRollups } from "../lib/hotels/kpiRollups";
 
 const prisma = new PrismaClient();
 
@@ -643,6 +645,10 @@ async function main() {
     }
   }
   console.log(`   Created ${reviewCount} hotel reviews`);
+
+  // The hotel dashboard and KPI comparison read whole periods from the rollups
+  const hotelRollups = await rebuildHotelRollups();
+  console.log(`   Rebuilt ${hotelRollups} hotel rollups`);
   console.log(`✅ Hotel data complete`);
 
   console.log("\n📞 Creating BPO data...");
@@ -892,4 +898,4 @@ main()
     console.error("❌ Seed failed:", e);
     process.exit(1);
   })
-  .finally(() => prisma.$disconnect());
+  .finally(() => Promise.all([prisma.$disconnect(), appPrisma.$disconnect()]));
@@ -1,4 +1,9 @@
+import "tsconfig-paths/register";
 import { PrismaClient, UserRole, VentureType, LogisticsRole, PolicyType, LoadStatus, TaskStatus, TaskPriority, IncentiveCalcType, ReviewSource } from "@prisma/client";
+import appPrisma from "../lib/prisma";
+import { rebuildIncentiveRollups } from "../lib/incentives/rollups";
+import { rebuildHotelRollups } from "../lib/hotels/kpiRollups";
+import { rebuildLeaderboardScores } from "../lib/gamification/leaderboard";
 
 const prisma = new PrismaClient();
 
@@ -579,6 +584,10 @@ async function main() {
   }
   console.log(`✅ Added ${lyKpiCount} last year KPI records for YoY comparison`);
 
+  // The hotel dashboard and KPI comparison read whole periods from the rollups
+  const hotelRollups = await rebuildHotelRollups();
+  console.log(`✅ Rebuilt ${hotelRollups} hotel rollups`);
+
   // ═══════════════════════════════════════════════════════════════
   // 7. BPO DATA (Campaigns, Agents, Metrics, Call Logs)
   // ═══════════════════════════════════════════════════════════════
@@ -727,6 +736,10 @@ async function main() {
 
   console.log(`✅ Created ${eventCount} gamification events with point balances`);
 
+  // The leaderboard API reads only the per-period score table
+  const leaderboardScores = await rebuildLeaderboardScores();
+  console.log(`✅ Rebuilt ${leaderboardScores} leaderboard scores`);
+
   // ═══════════════════════════════════════════════════════════════
   // 9. SAAS DATA
   // ═══════════════════════════════════════════════════════════════
@@ -1023,6 +1036,10 @@ async function main() {
 
   console.log(`✅ Created ${incentiveCount} incentive daily records`);
 
+  // Venture summaries and timeseries read whole weeks/months from the rollups
+  const incentiveRollups = await rebuildIncentiveRollups();
+  console.log(`✅ Rebuilt ${incentiveRollups} incentive rollups`);
+
   // ═══════════════════════════════════════════════════════════════
   // SUMMARY
   // ═══════════════════════════════════════════════════════════════
@@ -1079,4 +1096,4 @@ main()
     console.error("❌ Seeding failed:", e);
     process.exit(1);
   })
-  .finally(() => prisma.$disconnect());
+  .finally(() => Promise.all([prisma.$disconnect(), appPrisma.$disconnect()]));
@@ -1,18 +1,31 @@
 #!/usr/bin/env ts-node
 import 'tsconfig-paths/register';
+import { JobName } from '@prisma/client';
 import { runFMCSAAutosyncJob } from '../lib/jobs/fmcsaAutosyncJob';
+import { runJobWithControl } from '../lib/jobs/jobRunner';
 
 async function main() {
   console.log('=== FMCSA Autosync Job Started ===');
   console.log('Timestamp:', new Date().toISOString());
-  
-  try {
-    await runFMCSAAutosyncJob();
+
+  const jobKey = `FMCSA_AUTOSYNC:${new Date().toISOString().split('T')[0]}`;
+  const result = await runJobWithControl(
+    {
+      jobName: JobName.FMCSA_AUTOSYNC,
+      jobKey,
+      timeout: 4 * 3600000, // 4 hours (full carrier list against FMCSA)
+    },
+    () => runFMCSAAutosyncJob()
+  );
+
+  console.log('Lock metrics:', result.metrics);
+
+  if (result.success) {
     console.log('=== FMCSA Autosync Job Completed Successfully ===');
     process.exit(0);
-  } catch (error: any) {
+  } else {
     console.error('=== FMCSA Autosync Job Failed ===');
-    console.error('Error:', error.message || error);
+    console.error('Error:', result.error);
     process.exit(1);
   }
 }
@@ -0,0 +1,87 @@
+import * as fs from "fs";
+
+/**
+ * Generate a synthetic FMCSA census CSV for importer benchmarks.
+ *
+ * Usage:
+ *   ts-node scripts/fmcsa-generate-census.ts [outPath] [rows]
+ *
+ * Defaults to 2,000,000 rows (national census size) in data/fmcsa_census_synthetic.csv.
+ * Roughly 5% of rows are inactive and 3% passenger-only, like the real file.
+ */
+
+const HEADER =
+  "DOT_NUMBER,LEGAL_NAME,DBA_NAME,CARRIER_OPERATION,HM_FLAG,PC_FLAG,PHY_STREET,PHY_CITY,PHY_STATE,PHY_ZIP,PHY_COUNTRY,TELEPHONE,EMAIL_ADDRESS,NBR_POWER_UNIT,DRIVER_TOTAL,OP_STATUS,OP_STATUS_DESC,MC_MX_FF_NUMBER";
+
+const CITIES: Array<[string, string, string]> = [
+  ["CHICAGO", "IL", "60601"],
+  ["DALLAS", "TX", "75201"],
+  ["ATLANTA", "GA", "30301"],
+  ["PHOENIX", "AZ", "85001"],
+  ["DENVER", "CO", "80201"],
+  ["MIAMI", "FL", "33101"],
+  ["KANSAS CITY", "MO", "64101"],
+  ["LOS ANGELES", "CA", "90001"],
+  ["DETROIT", "MI", "48201"],
+  ["NASHVILLE", "TN", "37201"],
+];
+
+function row(i: number): string {
+  const dot = 1000000 + i;
+  const [city, state, zip] = CITIES[i % CITIES.length];
+  const inactive = i % 20 === 7;
+  const passenger = i % 33 === 5;
+  const units = (i % 250) + 1;
+  const phone = String(2000000000 + (i % 7999999999)).slice(0, 10);
+  return [
+    dot,
+    `"CARRIER ${i}, LLC"`,
+    i % 3 === 0 ? `CARRIER ${i}` : "",
+    passenger ? "PASSENGER" : "PROPERTY",
+    i % 11 === 0 ? "Y" : "N",
+    passenger ? "Y" : "N",
+    `${(i % 9000) + 100} MAIN ST`,
+    city,
+    state,
+    zip,
+    "US",
+    phone,
+    `dispatch${i}@carrier.example`,
+    units,
+    units + (i % 40),
+    inactive ? "I" : "A",
+    inactive ? "INACTIVE" : "ACTIVE",
+    i % 4 === 0 ? "" : `MC-${500000 + i}`,
+  ].join(",");
+}
+
+async function main() {
+  const outPath = process.argv[2] || "data/fmcsa_census_synthetic.csv";
+  const rows = Number(process.argv[3] || 2000000);
+
+  const out = fs.createWriteStream(outPath);
+  const write = (chunk: string) =>
+    new Promise<void>((resolve) => {
+      if (out.write(chunk)) resolve();
+      else out.once("drain", () => resolve());
+    });
+
+  await write(`${HEADER}\n`);
+
+  const CHUNK = 10000;
+  for (let start = 0; start < rows; start += CHUNK) {
+    const lines: string[] = [];
+    for (let i = start; i < Math.min(rows, start + CHUNK); i++) {
+      lines.push(row(i));
+    }
+    await write(`${lines.join("\n")}\n`);
+  }
+
+  await new Promise<void>((resolve) => out.end(() => resolve()));
+  console.log(`Wrote ${rows} rows to ${outPath}`);
+}
+
+main().catch((err) => {
+  console.error("Generation failed:", err);
+  process.exit(1);
+});
@@ -2,7 +2,8 @@ import { prisma } from "../lib/prisma";
 import { runQuoteTimeoutJob } from "../lib/jobs/quoteTimeoutJob";
 import { runChurnRecalcJob } from "../lib/jobs/churnRecalcJob";
 import { runIncentiveDailyJob } from "../lib/jobs/incentiveDailyJob";
-import { runKpiAggregationJob } from "../lib/jobs/kpiAggregationJob";
+import { KPI_AGGREGATION_JOB_KEY, runKpiAggregationJob } from "../lib/jobs/kpiAggregationJob";
+import { refreshVentureSummaries } from "../lib/ventureSummary";
 import {
   runDormantCustomerRule,
   runQuoteExpiringRule,
@@ -163,19 +164,19 @@ const schedule: ScheduledJob[] = [
     hour: 7,
     minute: 30,
     run: async () => {
-      const yesterday = new Date();
-      yesterday.setDate(yesterday.getDate() - 1);
-      const jobKey = `KPI_AGGREGATION:${yesterday.toISOString().split('T')[0]}`;
       await runJobWithControl(
         {
           jobName: JobName.KPI_AGGREGATION,
-          jobKey,
+          // Same key as admin backfills, so the two never aggregate concurrently
+          jobKey: KPI_AGGREGATION_JOB_KEY,
           timeout: 3600000, // 1 hour
         },
         async () => {
-          const result = await runKpiAggregationJob({ dryRun: false, date: yesterday });
+          // Incremental: only days with load writes since each venture's watermark
+          const result = await runKpiAggregationJob({ dryRun: false, incremental: true });
           console.log(`[${new Date().toISOString()}] KPI Aggregation complete:`, {
             venturesProcessed: result.stats.venturesProcessed,
+            venturesUnchanged: result.stats.venturesUnchanged,
             freightKpisUpdated: result.stats.freightKpisUpdated,
             jobRunLogId: result.jobRunLogId,
           });
@@ -187,6 +188,30 @@ const schedule: ScheduledJob[] = [
       );
     },
   },
+  {
+    // Landing windows roll over at UTC midnight (19:00/20:00 New York);
+    // rebuild every snapshot so the first dashboard load is not a cold read.
+    name: "Venture Summary Refresh",
+    hour: 20,
+    minute: 5,
+    run: async () => {
+      const jobKey = `VENTURE_SUMMARY:${new Date().toISOString().split('T')[0]}`;
+      await runJobWithControl(
+        {
+          jobName: JobName.VENTURE_SUMMARY,
+          jobKey,
+          timeout: 600000, // 10 minutes
+        },
+        async () => {
+          const summaries = await refreshVentureSummaries();
+          console.log(`[${new Date().toISOString()}] Venture Summary Refresh complete:`, {
+            venturesRefreshed: summaries.size,
+          });
+          return { venturesRefreshed: summaries.size };
+        }
+      );
+    },
+  },
 ];
 
 function getNextScheduledJob(): { job: ScheduledJob; runAt: Date } | null {
@@ -0,0 +1,49 @@
+#!/usr/bin/env ts-node
+import 'tsconfig-paths/register';
+import { runWebhookWorkerPool } from '../lib/webhooks/worker';
+import { getWebhookQueueStats } from '../lib/webhooks/queue';
+
+// Dedicated webhook queue worker. The web process already drains the queue
+// after each enqueue; this one also polls, so retries and events left behind
+// by a web process that exited mid-drain are picked up without new traffic.
+
+const POLL_MS = Math.max(100, Number(process.env.WEBHOOK_WORKER_POLL_MS ?? 1000));
+const STATS_EVERY_MS = 60 * 1000;
+
+let stopping = false;
+
+async function main() {
+  console.log(`[${new Date().toISOString()}] Webhook worker started (poll ${POLL_MS}ms)`);
+  let lastStats = 0;
+
+  while (!stopping) {
+    const stats = await runWebhookWorkerPool();
+    if (stats.processed || stats.failed) {
+      console.log(`[${new Date().toISOString()}] Drained webhook queue:`, stats);
+    }
+
+    const now = Date.now();
+    if (now - lastStats >= STATS_EVERY_MS) {
+      lastStats = now;
+      console.log(`[${new Date().toISOString()}] Webhook queue:`, await getWebhookQueueStats());
+    }
+
+    if (!stats.batches) {
+      await new Promise((resolve) => setTimeout(resolve, POLL_MS));
+    }
+  }
+}
+
+for (const signal of ['SIGINT', 'SIGTERM'] as const) {
+  process.on(signal, () => {
+    console.log(`[${new Date().toISOString()}] ${signal} received, finishing current batch`);
+    stopping = true;
+  });
+}
+
+main()
+  .then(() => process.exit(0))
+  .catch((err) => {
+    console.error('Webhook worker error:', err);
+    process.exit(1);
+  });
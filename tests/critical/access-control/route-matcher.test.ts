@@ -0,0 +1,70 @@
+import { ROUTE_REGISTRY, getRouteByPath, getRouteByApiPath, routeAllowsRole } from "@/lib/access-control/routes";
+import { compileRouteRegistry } from "@/lib/access-control/matcher";
+import type { RouteConfig } from "@/lib/access-control/routes";
+
+// Reference implementation: the linear registry scan the compiled matcher replaces
+function linearPath(routes: RouteConfig[], path: string) {
+  return routes.find((route) =>
+    route.exact ? route.path === path : path === route.path || path.startsWith(route.path + "/")
+  );
+}
+
+function linearApiPath(routes: RouteConfig[], apiPath: string) {
+  return routes.find(
+    (route) => !!route.apiPath && (apiPath === route.apiPath || apiPath.startsWith(route.apiPath + "/"))
+  );
+}
+
+function probePaths(): string[] {
+  const probes = new Set<string>(["/", "", "/does-not-exist", "//"]);
+  for (const route of ROUTE_REGISTRY) {
+    for (const base of [route.path, route.apiPath]) {
+      if (!base) continue;
+      probes.add(base);
+      probes.add(base + "/");
+      probes.add(base + "/123");
+      probes.add(base + "/123/edit");
+      probes.add(base + "x");
+      probes.add(base.slice(0, -1));
+      probes.add(base.split("/").slice(0, -1).join("/") || "/");
+    }
+  }
+  return Array.from(probes);
+}
+
+describe("Access Control - Compiled route matcher", () => {
+  test("matches exactly like the linear registry scan for every registered path", () => {
+    for (const probe of probePaths()) {
+      expect([probe, getRouteByPath(probe)?.id]).toEqual([probe, linearPath(ROUTE_REGISTRY, probe)?.id]);
+      expect([probe, getRouteByApiPath(probe)?.id]).toEqual([probe, linearApiPath(ROUTE_REGISTRY, probe)?.id]);
+    }
+  });
+
+  test("role bitmasks agree with the route role lists", () => {
+    const roles = new Set<string>(["EMPLOYEE", "NOT_A_ROLE"]);
+    ROUTE_REGISTRY.forEach((r) => r.roles?.forEach((role) => roles.add(role)));
+
+    for (const route of ROUTE_REGISTRY) {
+      for (const role of roles) {
+        const expected = !route.roles || route.roles.length === 0 || route.roles.includes(role as any);
+        expect([route.id, role, routeAllowsRole(route, role)]).toEqual([route.id, role, expected]);
+      }
+      expect(routeAllowsRole(route, undefined)).toBe(!route.roles || route.roles.length === 0);
+    }
+  });
+
+  test("first route in registry order wins when paths overlap", () => {
+    const routes: RouteConfig[] = [
+      { id: "exact_parent", path: "/a", module: "admin", exact: true },
+      { id: "child", path: "/a/b", module: "admin" },
+      { id: "parent", path: "/a", module: "admin" },
+    ];
+    const compiled = compileRouteRegistry(routes);
+
+    expect(compiled.matchPath("/a")?.id).toBe("exact_parent");
+    expect(compiled.matchPath("/a/b/c")?.id).toBe("child");
+    expect(compiled.matchPath("/a/c")?.id).toBe("parent");
+    expect(compiled.matchPath("/ab")).toBeUndefined();
+    expect(compiled.byId.get("child")?.path).toBe("/a/b");
+  });
+});
@@ -0,0 +1,142 @@
+import { callFreightAssistant, setCompletionProvider } from "@/lib/ai/aiClient";
+import {
+  clearCompletionCache,
+  completionCacheKey,
+  getCompletionCacheStats,
+  PROMPT_TEMPLATE_VERSIONS,
+} from "@/lib/ai/completionCache";
+
+jest.mock("@/lib/config/ai", () => {
+  return {
+    aiConfig: {
+      enabled: true,
+      freightAssistantEnabled: true,
+      freightAssistantModel: "test-model",
+      maxTokensPerRequest: 1000,
+      maxDailyCalls: 10,
+    },
+  };
+});
+
+jest.mock("@/lib/logger", () => ({
+  logger: {
+    info: jest.fn(),
+    warn: jest.fn(),
+    error: jest.fn(),
+  },
+}));
+
+describe("completion cache", () => {
+  const provider = jest.fn();
+
+  beforeEach(() => {
+    clearCompletionCache();
+    provider.mockReset();
+    provider.mockImplementation(async ({ messages }: any) => ({
+      text: `draft for ${messages[1].content.length}`,
+      tokensUsed: 120,
+    }));
+    setCompletionProvider(provider);
+  });
+
+  afterAll(() => {
+    setCompletionProvider(null);
+  });
+
+  it("serves a repeated prompt from cache and records saved tokens", async () => {
+    const opts = { prompt: "Summarize today", assistant: "freight_summary", templateVersion: "1" };
+
+    const first = await callFreightAssistant({ ...opts, userId: "1" });
+    const second = await callFreightAssistant({ ...opts, userId: "2" });
+
+    expect(second).toBe(first);
+    expect(provider).toHaveBeenCalledTimes(1);
+    expect(getCompletionCacheStats()).toEqual([
+      {
+        assistant: "freight_summary",
+        requests: 2,
+        hits: 1,
+        coalesced: 0,
+        misses: 1,
+        hitRate: 50,
+        tokensSaved: 120,
+      },
+    ]);
+  });
+
+  it("coalesces concurrent identical requests into one provider call", async () => {
+    let release: () => void = () => {};
+    provider.mockImplementation(
+      () =>
+        new Promise((resolve) => {
+          release = () => resolve({ text: "shared", tokensUsed: 50 });
+        }),
+    );
+
+    const calls = [1, 2, 3].map(() =>
+      callFreightAssistant({ prompt: "Draft outreach", assistant: "hotel_outreach" }),
+    );
+    release();
+
+    await expect(Promise.all(calls)).resolves.toEqual(["shared", "shared", "shared"]);
+    expect(provider).toHaveBeenCalledTimes(1);
+    expect(getCompletionCacheStats()[0]).toMatchObject({ coalesced: 2, misses: 1, tokensSaved: 100 });
+  });
+
+  it("does not cache provider errors", async () => {
+    provider.mockRejectedValueOnce(new Error("rate limited"));
+
+    const failed = await callFreightAssistant({ prompt: "Explain", assistant: "freight_ops" });
+    const ok = await callFreightAssistant({ prompt: "Explain", assistant: "freight_ops" });
+
+    expect(failed).toContain("AI provider error: rate limited");
+    expect(ok).not.toContain("AI provider error");
+    expect(provider).toHaveBeenCalledTimes(2);
+  });
+
+  it("bypasses the cache when asked to or when the template version changes", async () => {
+    await callFreightAssistant({ prompt: "Risk overview", templateVersion: "1" });
+    await callFreightAssistant({ prompt: "Risk overview", templateVersion: "2" });
+    await callFreightAssistant({ prompt: "Risk overview", templateVersion: "1", cache: false });
+
+    expect(provider).toHaveBeenCalledTimes(3);
+  });
+
+  it("keys on the assistant's registered template version", async () => {
+    const original = PROMPT_TEMPLATE_VERSIONS.freight_ops;
+    try {
+      await callFreightAssistant({ prompt: "Log digest", assistant: "freight_ops" });
+      await callFreightAssistant({ prompt: "Log digest", assistant: "freight_ops" });
+      PROMPT_TEMPLATE_VERSIONS.freight_ops = "bumped";
+      await callFreightAssistant({ prompt: "Log digest", assistant: "freight_ops" });
+    } finally {
+      PROMPT_TEMPLATE_VERSIONS.freight_ops = original;
+    }
+
+    expect(provider).toHaveBeenCalledTimes(2);
+  });
+
+  it("keys on normalized prompt and ignores per-caller context fields", () => {
+    const base = completionCacheKey({
+      model: "m",
+      prompt: "Hello\n\n\n\nworld  ",
+      context: { userId: 1, requestId: "a", draftType: "thank_you", metrics: { b: 2, a: 1 } },
+      templateVersion: "1",
+    });
+
+    expect(
+      completionCacheKey({
+        model: "m",
+        prompt: "Hello\r\n\r\nworld",
+        context: { metrics: { a: 1, b: 2 }, draftType: "thank_you", userId: 2, requestId: "b" },
+        templateVersion: "1",
+      }),
+    ).toBe(base);
+    expect(
+      completionCacheKey({ model: "m", prompt: "Hello\n\nworld", context: { draftType: "escalation" }, templateVersion: "1" }),
+    ).not.toBe(base);
+    expect(completionCacheKey({ model: "other", prompt: "Hello\n\nworld", templateVersion: "1" })).not.toBe(
+      completionCacheKey({ model: "m", prompt: "Hello\n\nworld", templateVersion: "1" }),
+    );
+  });
+});
@@ -0,0 +1,117 @@
+import type { NextApiRequest, NextApiResponse } from "next";
+import handler from "@/pages/api/freight/coverage-war-room";
+
+function createMockReqRes(query: any = {}): {
+  req: Partial<NextApiRequest>;
+  res: Partial<NextApiResponse> & { statusCode: number; jsonData: any };
+} {
+  const req: Partial<NextApiRequest> = { method: "GET", query };
+  const res: any = {};
+  res.statusCode = 200;
+  res.headers = {};
+  res.setHeader = (key: string, value: string) => {
+    res.headers[key] = value;
+  };
+  res.status = (code: number) => {
+    res.statusCode = code;
+    return res;
+  };
+  res.jsonData = null;
+  res.json = (data: any) => {
+    res.jsonData = data;
+    return res;
+  };
+  return { req, res };
+}
+
+jest.mock("@/lib/apiAuth", () => ({
+  requireUser: jest.fn(),
+}));
+
+jest.mock("@/lib/prisma", () => {
+  const prismaMock = {
+    $queryRaw: jest.fn(),
+    load: { findMany: jest.fn() },
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const { requireUser } = jest.requireMock("@/lib/apiAuth");
+const prisma = jest.requireMock("@/lib/prisma").default;
+
+describe("GET /api/freight/coverage-war-room", () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    requireUser.mockResolvedValue({
+      id: 5,
+      role: "CEO",
+      ventureIds: [],
+      officeIds: [],
+      isTestUser: false,
+    });
+  });
+
+  it("builds the response from SQL aggregates without loading rows", async () => {
+    const pickup = new Date(Date.now() + 3 * 60 * 60 * 1000);
+    prisma.$queryRaw
+      .mockResolvedValueOnce([
+        { day: new Date("2026-03-02T00:00:00Z"), total: 4, covered: 1, coveredOrAssigned: 2, open: 2, atRisk: 1, lost: 0 },
+        { day: new Date("2026-03-03T00:00:00Z"), total: 6, covered: 3, coveredOrAssigned: 3, open: 1, atRisk: 0, lost: 2 },
+      ])
+      .mockResolvedValueOnce([
+        {
+          id: 11,
+          reference: "L-11",
+          shipperName: "Acme",
+          pickupDate: pickup,
+          createdAt: new Date("2026-03-01T00:00:00Z"),
+          pickupCity: "Dallas",
+          pickupState: "TX",
+          dropCity: null,
+          dropState: "GA",
+          loadStatus: "OPEN",
+          atRiskFlag: true,
+          createdByName: "Casey",
+          contactCount: 3,
+        },
+      ])
+      .mockResolvedValueOnce([
+        { userId: 9, userName: null, loadsCovered: 2, contactsMade: 7, avgMinutes: 42 },
+      ]);
+
+    const { req, res } = createMockReqRes({ dateFrom: "2026-03-01", dateTo: "2026-03-03" });
+    await handler(req as NextApiRequest, res as NextApiResponse);
+
+    expect(res.statusCode).toBe(200);
+    expect(prisma.load.findMany).not.toHaveBeenCalled();
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(3);
+
+    expect(res.jsonData.summary).toEqual({
+      totalLoads: 10,
+      coveredLoads: 4,
+      openLoads: 3,
+      atRiskLoads: 1,
+      lostLoads: 2,
+      coverageRatePct: 40,
+    });
+    expect(res.jsonData.loadsNeedingAttention[0]).toEqual(
+      expect.objectContaining({
+        id: 11,
+        status: "AT_RISK",
+        originCityState: "Dallas, TX",
+        destCityState: "GA",
+        hoursToPickup: 3,
+        assignedCsrName: "Casey",
+        carriersContactedCount: 3,
+      })
+    );
+    expect(res.jsonData.dispatcherLeaderboard).toEqual([
+      { userId: 9, userName: "User 9", loadsCovered: 2, contactsMade: 7, avgTimeToFirstContactMinutes: 42 },
+    ]);
+
+    const daily = res.jsonData.trends.daily;
+    expect(daily.map((d: any) => d.date)).toEqual(["2026-03-01", "2026-03-02", "2026-03-03"]);
+    expect(daily[0]).toEqual({ date: "2026-03-01", totalLoads: 0, coveredLoads: 0, coverageRatePct: 0 });
+    expect(daily[1]).toEqual({ date: "2026-03-02", totalLoads: 4, coveredLoads: 2, coverageRatePct: 50 });
+  });
+});
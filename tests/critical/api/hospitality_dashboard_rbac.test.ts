@@ -42,6 +42,7 @@ jest.mock("@/lib/prisma", () => {
     hotelProperty: { findMany: jest.fn().mockResolvedValue([]) },
     hotelKpiDaily: { findMany: jest.fn().mockResolvedValue([]) },
     hotelReview: { findMany: jest.fn().mockResolvedValue([]) },
+    $queryRaw: jest.fn().mockResolvedValue([]),
   };
 
   return {
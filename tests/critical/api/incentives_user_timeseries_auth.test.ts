@@ -35,9 +35,7 @@ jest.mock("@/lib/scope", () => ({
 
 jest.mock("@/lib/prisma", () => {
   const prismaMock = {
-    incentiveDaily: {
-      groupBy: jest.fn().mockResolvedValue([]),
-    },
+    $queryRaw: jest.fn().mockResolvedValue([]),
   };
 
   return {
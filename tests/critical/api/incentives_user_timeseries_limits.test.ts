@@ -34,9 +34,7 @@ jest.mock("@/lib/scope", () => ({
 
 jest.mock("@/lib/prisma", () => ({
   default: {
-    incentiveDaily: {
-      groupBy: jest.fn().mockResolvedValue([]),
-    },
+    $queryRaw: jest.fn().mockResolvedValue([]),
   },
 }));
 
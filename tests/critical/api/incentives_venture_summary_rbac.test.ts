@@ -34,9 +34,7 @@ jest.mock("@/lib/scope", () => ({
 
 jest.mock("@/lib/prisma", () => {
   const prismaMock = {
-    incentiveDaily: {
-      findMany: jest.fn().mockResolvedValue([]),
-    },
+    $queryRaw: jest.fn().mockResolvedValue([]),
   };
 
   return {
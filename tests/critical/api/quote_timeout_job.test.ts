@@ -1,84 +1,107 @@
 import { runQuoteTimeoutJob } from "@/lib/jobs/quoteTimeoutJob";
 
-jest.mock("@/lib/prisma", () => ({
-  prisma: {
+jest.mock("@/lib/prisma", () => {
+  const prismaMock: any = {
     freightQuote: {
-      findMany: jest.fn(),
-      update: jest.fn(),
       count: jest.fn(),
     },
+    task: {
+      findMany: jest.fn(),
+      createMany: jest.fn(),
+    },
+    notification: {
+      createMany: jest.fn(),
+    },
     jobRunLog: {
       create: jest.fn(),
     },
-  },
-}));
+    $queryRaw: jest.fn(),
+  };
+  prismaMock.$transaction = jest.fn((fn: any) => fn(prismaMock));
+  return { prisma: prismaMock };
+});
 
 import { prisma } from "@/lib/prisma";
 
+const expired = (id: number, salespersonUserId = 7) => ({
+  id,
+  ventureId: 1,
+  salespersonUserId,
+  customerName: "Acme",
+});
+
 describe("Quote Timeout Job", () => {
   beforeEach(() => {
     jest.clearAllMocks();
+    (prisma.task.findMany as jest.Mock).mockResolvedValue([]);
+    (prisma.task.createMany as jest.Mock).mockImplementation(async ({ data }: any) => ({ count: data.length }));
+    (prisma.notification.createMany as jest.Mock).mockImplementation(async ({ data }: any) => ({ count: data.length }));
+    (prisma.jobRunLog.create as jest.Mock).mockResolvedValue({ id: 1 });
   });
 
-  it("should update SENT quotes with expired expiresAt to NO_RESPONSE", async () => {
-    const mockQuotes = [
-      { id: 1 },
-      { id: 2 },
-    ];
-
-    (prisma.freightQuote.findMany as jest.Mock)
-      .mockResolvedValueOnce(mockQuotes)
-      .mockResolvedValueOnce([]);
-    (prisma.freightQuote.update as jest.Mock).mockResolvedValue({});
-    (prisma.jobRunLog.create as jest.Mock).mockResolvedValue({ id: 1 });
+  it("should update SENT quotes with expired expiresAt to NO_RESPONSE in one statement", async () => {
+    (prisma.$queryRaw as jest.Mock).mockResolvedValueOnce([expired(1), expired(2)]);
 
     const result = await runQuoteTimeoutJob({ ventureId: 1 });
 
     expect(result.stats.scanned).toBe(2);
     expect(result.stats.updated).toBe(2);
-    expect(prisma.freightQuote.update).toHaveBeenCalledTimes(2);
-    expect(prisma.freightQuote.update).toHaveBeenCalledWith({
-      where: { id: 1 },
-      data: expect.objectContaining({ status: "NO_RESPONSE" }),
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    const sql = (prisma.$queryRaw as jest.Mock).mock.calls[0][0].join("?");
+    expect(sql).toContain(`SET "status" = 'NO_RESPONSE'`);
+    expect(sql).toContain("FOR UPDATE SKIP LOCKED");
+  });
+
+  it("should batch follow-up tasks and notifications per chunk", async () => {
+    (prisma.$queryRaw as jest.Mock).mockResolvedValueOnce([expired(1), expired(2, 8)]);
+    (prisma.task.findMany as jest.Mock).mockResolvedValue([{ quoteId: 2 }]);
+
+    const result = await runQuoteTimeoutJob({ ventureId: 1 });
+
+    expect(prisma.task.createMany).toHaveBeenCalledTimes(1);
+    expect(prisma.task.createMany).toHaveBeenCalledWith({
+      data: [expect.objectContaining({ quoteId: 1, type: "QUOTE_FOLLOWUP", assignedTo: 7 })],
     });
+    expect(prisma.notification.createMany).toHaveBeenCalledWith({
+      data: [
+        expect.objectContaining({ userId: 7, entityId: 1, type: "QUOTE_NO_RESPONSE" }),
+        expect.objectContaining({ userId: 8, entityId: 2, type: "QUOTE_NO_RESPONSE" }),
+      ],
+    });
+    expect(result.stats.followupTasksCreated).toBe(1);
+    expect(result.stats.notificationsCreated).toBe(2);
   });
 
   it("should not update in dryRun mode but count quotes", async () => {
     (prisma.freightQuote.count as jest.Mock).mockResolvedValue(5);
-    (prisma.jobRunLog.create as jest.Mock).mockResolvedValue({ id: 1 });
 
     const result = await runQuoteTimeoutJob({ ventureId: 1, dryRun: true });
 
     expect(result.stats.scanned).toBe(5);
     expect(result.stats.updated).toBe(5);
-    expect(prisma.freightQuote.update).not.toHaveBeenCalled();
+    expect(prisma.$queryRaw).not.toHaveBeenCalled();
   });
 
   it("should respect limit option", async () => {
-    const mockQuotes = [{ id: 1 }, { id: 2 }];
+    (prisma.$queryRaw as jest.Mock)
+      .mockResolvedValueOnce([expired(1), expired(2)])
+      .mockResolvedValueOnce([expired(3)]);
 
-    (prisma.freightQuote.findMany as jest.Mock)
-      .mockResolvedValueOnce(mockQuotes)
-      .mockResolvedValueOnce([]);
-    (prisma.freightQuote.update as jest.Mock).mockResolvedValue({});
-    (prisma.jobRunLog.create as jest.Mock).mockResolvedValue({ id: 1 });
+    const result = await runQuoteTimeoutJob({ ventureId: 1, limit: 2 });
 
-    await runQuoteTimeoutJob({ ventureId: 1, limit: 2 });
-
-    expect(prisma.freightQuote.findMany).toHaveBeenCalledWith(
-      expect.objectContaining({
-        take: 2,
-      })
-    );
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect((prisma.$queryRaw as jest.Mock).mock.calls[0]).toContain(2);
+    expect(result.stats.updated).toBe(2);
   });
 
   it("should log job run with stats", async () => {
-    (prisma.freightQuote.findMany as jest.Mock).mockResolvedValue([]);
+    (prisma.$queryRaw as jest.Mock).mockResolvedValue([]);
     (prisma.jobRunLog.create as jest.Mock).mockResolvedValue({ id: 99 });
 
     const result = await runQuoteTimeoutJob({ ventureId: 1 });
 
     expect(result.jobRunLogId).toBe(99);
+    expect(prisma.notification.createMany).not.toHaveBeenCalled();
     expect(prisma.jobRunLog.create).toHaveBeenCalledWith(
       expect.objectContaining({
         data: expect.objectContaining({
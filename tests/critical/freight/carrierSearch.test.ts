@@ -0,0 +1,103 @@
+import { searchCarriersForLoad } from '@/lib/freight/carrierSearch';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    carrier: { findMany: jest.fn() },
+    carrierLaneProfile: { findMany: jest.fn() },
+    load: { groupBy: jest.fn(), findMany: jest.fn(), count: jest.fn(), findFirst: jest.fn() },
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const carrier = (id: number, extra: Record<string, unknown> = {}) => ({
+  id,
+  name: `Carrier ${id}`,
+  active: true,
+  city: null,
+  state: null,
+  postalCode: null,
+  ...extra,
+});
+
+const profile = (carrierId: number, extra: Record<string, unknown>) => ({
+  carrierId,
+  originZip3: '',
+  destZip3: '',
+  originState: '',
+  deliveredCount: 1,
+  onTimeCount: 1,
+  lastLoadAt: null,
+  ...extra,
+});
+
+const input = {
+  originState: 'TX',
+  originZip: '75201',
+  destinationState: 'GA',
+  destinationZip: '30301',
+  equipmentType: 'DRY_VAN',
+};
+
+describe('searchCarriersForLoad lane profiles', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    prisma.load.groupBy.mockResolvedValue([]);
+  });
+
+  it('scores lane, region and origin history from profiles without scanning loads', async () => {
+    prisma.carrier.findMany.mockResolvedValueOnce([carrier(1), carrier(2)]);
+    prisma.carrierLaneProfile.findMany.mockResolvedValue([
+      profile(1, { originZip3: '752', destZip3: '303', originState: 'TX', deliveredCount: 4, onTimeCount: 3, lastLoadAt: new Date('2026-01-05') }),
+      profile(1, { originZip3: '752', destZip3: '303', originState: 'TX', deliveredCount: 1, onTimeCount: 1, lastLoadAt: new Date('2026-02-01') }),
+      profile(1, { originZip3: '752', destZip3: '900', originState: 'TX', deliveredCount: 2, onTimeCount: 2 }),
+      profile(2, { originZip3: '770', destZip3: '303', originState: 'TX', deliveredCount: 3, onTimeCount: 3 }),
+    ]);
+
+    const result = await searchCarriersForLoad(input);
+
+    const one = result.recommendedCarriers.find((c) => c.id === 1)!;
+    expect(one.laneRunCount).toBe(5);
+    expect(one.onTimeRate).toBe(80);
+    expect(one.lastLoadDate).toEqual(new Date('2026-02-01'));
+    expect(one.regionRunCount).toBe(7);
+    expect(one.originPickupCount).toBe(7);
+
+    const two = result.recommendedCarriers.find((c) => c.id === 2)!;
+    expect(two.laneRunCount).toBe(0);
+    expect(two.regionRunCount).toBe(3);
+    expect(two.originPickupCount).toBe(3);
+    expect(two.isNearOrigin).toBe(true);
+
+    expect(prisma.load.findMany).not.toHaveBeenCalled();
+    expect(prisma.load.count).not.toHaveBeenCalled();
+    expect(prisma.load.findFirst).not.toHaveBeenCalled();
+  });
+
+  it('adds carriers with lane history outside the base page and checks recency in one query', async () => {
+    const recent = new Date();
+    prisma.carrier.findMany
+      .mockResolvedValueOnce([carrier(1)])
+      .mockResolvedValueOnce([carrier(50)]);
+    prisma.carrierLaneProfile.findMany.mockResolvedValue([
+      profile(50, { originZip3: '752', destZip3: '303', deliveredCount: 12, onTimeCount: 12 }),
+    ]);
+    prisma.load.groupBy.mockResolvedValue([{ carrierId: 50, _max: { createdAt: recent } }]);
+
+    const result = await searchCarriersForLoad(input);
+
+    expect(prisma.carrier.findMany).toHaveBeenLastCalledWith({
+      where: { active: true, id: { in: [50] } },
+    });
+    expect(prisma.load.groupBy).toHaveBeenCalledTimes(1);
+    expect(prisma.load.groupBy.mock.calls[0][0].where.carrierId).toEqual({ in: [1, 50] });
+
+    const top = result.recommendedCarriers[0];
+    expect(top.id).toBe(50);
+    expect(top.laneScoreRaw).toBe(100);
+    expect(top.isRecentlyActive).toBe(true);
+    expect(top.lastLoadDate).toEqual(recent);
+    expect(result.newCarriers.map((c) => c.id)).toEqual([1]);
+  });
+});
@@ -0,0 +1,133 @@
+import * as fs from 'fs';
+import * as os from 'os';
+import * as path from 'path';
+import {
+  importFmcsaCensus,
+  normalizeCensusRow,
+  parseCsvLine,
+  readCensusCheckpoint,
+  readCensusHeaders,
+  readLinesWithOffsets,
+} from '@/lib/logistics/fmcsaCensusImport';
+
+jest.mock('@/lib/prisma', () => ({
+  __esModule: true,
+  default: {
+    carrier: { findMany: jest.fn() },
+    $transaction: jest.fn(),
+  },
+}));
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const FIXTURE = path.join(__dirname, '../../../data/fmcsa_census_sample.csv');
+
+function mockMerge() {
+  let staged = 0;
+  const tx = {
+    $executeRawUnsafe: jest.fn(async (sql: string, ...params: any[]) => {
+      if (sql.includes('INSERT INTO fmcsa_census_staging')) {
+        staged = params[0].length;
+        return staged;
+      }
+      if (sql.includes('ON CONFLICT ("dotNumber")')) return staged;
+      return 0;
+    }),
+  };
+  (prisma.$transaction as jest.Mock).mockImplementation(async (fn: any) => fn(tx));
+  return tx;
+}
+
+async function storedHashesFor(csvPath: string) {
+  const { headers, dataOffset } = await readCensusHeaders(csvPath);
+  const stored: Array<{ dotNumber: string | null; mcNumber: string | null; fmcsaCensusHash: string }> = [];
+  for await (const { line } of readLinesWithOffsets(csvPath, dataOffset)) {
+    const values = parseCsvLine(line);
+    const row: Record<string, string> = {};
+    headers.forEach((h, i) => (row[h] = values[i] || ''));
+    const carrier = normalizeCensusRow(row);
+    if (carrier) {
+      stored.push({ dotNumber: carrier.dotNumber, mcNumber: carrier.mcNumber, fmcsaCensusHash: carrier.contentHash });
+    }
+  }
+  return stored;
+}
+
+describe('FMCSA census importer', () => {
+  beforeEach(() => jest.clearAllMocks());
+
+  it('parses quoted fields with embedded commas and escaped quotes', () => {
+    expect(parseCsvLine('1,"ACME, LLC","SAY ""HI""",,X')).toEqual(['1', 'ACME, LLC', 'SAY "HI"', '', 'X']);
+  });
+
+  it('skips inactive and passenger-only carriers', () => {
+    expect(normalizeCensusRow({ DOT_NUMBER: '1', OP_STATUS: 'I', CARRIER_OPERATION: 'PROPERTY' })).toBeNull();
+    expect(normalizeCensusRow({ DOT_NUMBER: '1', OP_STATUS: 'A', CARRIER_OPERATION: 'PASSENGER' })).toBeNull();
+    expect(
+      normalizeCensusRow({ DOT_NUMBER: '1', OP_STATUS: 'A', CARRIER_OPERATION: 'PROPERTY', MC_MX_FF_NUMBER: 'MC-12' })
+    ).toEqual(expect.objectContaining({ dotNumber: '1', mcNumber: 'MC12' }));
+  });
+
+  it('stages and merges every new carrier in the sample census in one batch', async () => {
+    (prisma.carrier.findMany as jest.Mock).mockResolvedValue([]);
+    const tx = mockMerge();
+
+    const stats = await importFmcsaCensus(FIXTURE, { checkpointPath: null });
+
+    expect(stats.rowsRead).toBe(22);
+    expect(stats.rowsSkipped).toBe(2);
+    expect(stats.rowsUnchanged).toBe(0);
+    expect(stats.rowsWritten).toBe(20);
+    expect(stats.offset).toBe(fs.statSync(FIXTURE).size);
+    expect(prisma.$transaction).toHaveBeenCalledTimes(1);
+
+    const stagingCall = tx.$executeRawUnsafe.mock.calls.find(([sql]) =>
+      String(sql).includes('INSERT INTO fmcsa_census_staging')
+    );
+    expect(stagingCall).toBeDefined();
+    expect(stagingCall![1]).toHaveLength(20);
+  });
+
+  it('does not write rows whose content hash is unchanged', async () => {
+    (prisma.carrier.findMany as jest.Mock).mockResolvedValue(await storedHashesFor(FIXTURE));
+    mockMerge();
+
+    const stats = await importFmcsaCensus(FIXTURE, { checkpointPath: null });
+
+    expect(stats.rowsUnchanged).toBe(20);
+    expect(stats.rowsWritten).toBe(0);
+    expect(prisma.$transaction).not.toHaveBeenCalled();
+  });
+
+  it('writes a checkpoint per batch and resumes from a byte offset', async () => {
+    (prisma.carrier.findMany as jest.Mock).mockResolvedValue([]);
+    mockMerge();
+
+    const dir = fs.mkdtempSync(path.join(os.tmpdir(), 'fmcsa-census-'));
+    const csvPath = path.join(dir, 'census.csv');
+    fs.copyFileSync(FIXTURE, csvPath);
+
+    const first = await importFmcsaCensus(csvPath, { batchSize: 5 });
+    // 4 full batches + a final checkpoint past the two trailing skipped rows
+    expect(first.batches).toBe(5);
+
+    const checkpoint = readCensusCheckpoint(csvPath);
+    expect(checkpoint?.offset).toBe(fs.statSync(csvPath).size);
+
+    // Resume after the 10th data line
+    const { dataOffset } = await readCensusHeaders(csvPath);
+    let resumeOffset = dataOffset;
+    let n = 0;
+    for await (const { endOffset } of readLinesWithOffsets(csvPath, dataOffset)) {
+      resumeOffset = endOffset;
+      if (++n === 10) break;
+    }
+
+    const resumed = await importFmcsaCensus(csvPath, { resumeFromOffset: resumeOffset, checkpointPath: null });
+    expect(resumed.startOffset).toBe(resumeOffset);
+    expect(resumed.rowsRead).toBe(12);
+    expect(resumed.rowsWritten).toBe(10);
+
+    fs.rmSync(dir, { recursive: true, force: true });
+  });
+});
@@ -0,0 +1,128 @@
+import {
+  invalidateOutreachEligibility,
+  selectCarriersForLoad,
+  selectCarriersForLoads,
+} from '@/lib/outreach/selectCarriersForLoad';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    carrier: { findMany: jest.fn() },
+    load: { findMany: jest.fn(), findUnique: jest.fn() },
+    $queryRaw: jest.fn(),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const carrier = (id: number, extra: Record<string, unknown> = {}) => ({
+  id,
+  name: `Carrier ${id}`,
+  email: `c${id}@example.com`,
+  phone: null,
+  equipmentTypes: null,
+  operatingStatus: 'ACTIVE',
+  fmcsaAuthorized: true,
+  lanesJson: null,
+  ...extra,
+});
+
+const load = (id: number, equipmentType: string, pickupState: string, dropState: string) => ({
+  id,
+  equipmentType,
+  pickupState,
+  dropState,
+});
+
+describe('selectCarriersForLoads', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    invalidateOutreachEligibility();
+    // Lane prefilter: carriers whose equipment or lanes may match
+    prisma.$queryRaw.mockImplementation(async () => [
+      carrier(3, { equipmentTypes: 'Flatbed', lanesJson: JSON.stringify([{ origin: 'TX', destination: 'CA' }]) }),
+      carrier(2, { equipmentTypes: 'Van, Reefer' }),
+      carrier(4, { equipmentTypes: 'Van', lanesJson: '{not json' }),
+    ]);
+    // Fillers: lowest-id eligible carriers
+    prisma.carrier.findMany.mockResolvedValue([carrier(1), carrier(2, { equipmentTypes: 'Van, Reefer' })]);
+  });
+
+  it('ranks each distinct lane once from a bounded candidate set', async () => {
+    prisma.load.findMany.mockResolvedValue([
+      load(10, 'Van', 'TX', 'CA'),
+      load(11, 'VAN', 'TX', 'CA'),
+      load(12, 'Flatbed', 'TX', 'CA'),
+    ]);
+
+    const byLoad = await selectCarriersForLoads({ loadIds: [10, 11, 12], channel: 'email', limit: 3 });
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(2);
+    // Ranked by the exact lane test, not the substring prefilter alone
+    const [, ...values] = prisma.$queryRaw.mock.calls[0];
+    expect(values.some((v: any) => String(v?.sql ?? '').includes('"carrier_lane_match"'))).toBe(true);
+    expect(prisma.carrier.findMany).toHaveBeenCalledTimes(1);
+    expect(prisma.carrier.findMany).toHaveBeenCalledWith(
+      expect.objectContaining({
+        where: { active: true, blocked: false, fmcsaAuthorized: true, email: { not: null } },
+        orderBy: { id: 'asc' },
+        take: 250,
+      })
+    );
+    expect(byLoad.get(10)!.map((c) => c.id)).toEqual([3, 2, 4]);
+    expect(byLoad.get(11)).toBe(byLoad.get(10));
+    expect(byLoad.get(12)!.map((c) => [c.id, c.matchScore])).toEqual([
+      [3, 60],
+      [1, 10],
+      [2, 10],
+    ]);
+    expect(byLoad.get(12)![0].matchReasons).toEqual(['Active Authority', 'Equipment Match', 'Lane Match']);
+
+    await selectCarriersForLoads({ loadIds: [10], channel: 'email', limit: 3 });
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(2);
+    expect(prisma.carrier.findMany).toHaveBeenCalledTimes(1);
+  });
+
+  it('fills from the lowest-id eligible carriers when nothing matches', async () => {
+    prisma.$queryRaw.mockResolvedValue([]);
+    prisma.load.findMany.mockResolvedValue([load(10, 'Tanker', 'NV', 'UT')]);
+
+    const byLoad = await selectCarriersForLoads({ loadIds: [10], channel: 'email', limit: 5 });
+
+    expect(byLoad.get(10)!.map((c) => [c.id, c.matchReasons])).toEqual([
+      [1, ['Active Authority']],
+      [2, ['Active Authority']],
+    ]);
+  });
+
+  it('reloads the candidate sets after invalidation', async () => {
+    prisma.load.findMany.mockResolvedValue([load(10, 'Van', 'TX', 'CA')]);
+
+    await selectCarriersForLoad({ loadId: 10, channel: 'email', limit: 5 });
+    invalidateOutreachEligibility();
+    await selectCarriersForLoad({ loadId: 10, channel: 'email', limit: 5 });
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(2);
+    expect(prisma.carrier.findMany).toHaveBeenCalledTimes(2);
+  });
+
+  it('checks explicit recipients against the database', async () => {
+    prisma.load.findUnique.mockResolvedValue(load(10, 'Van', 'TX', 'CA'));
+    prisma.carrier.findMany.mockResolvedValue([carrier(2, { equipmentTypes: 'Van' })]);
+
+    const carriers = await selectCarriersForLoad({
+      loadId: 10,
+      channel: 'sms',
+      limit: 5,
+      specificCarrierIds: [2, 9],
+    });
+
+    expect(carriers.map((c) => c.id)).toEqual([2]);
+    expect(prisma.carrier.findMany).toHaveBeenCalledWith(
+      expect.objectContaining({
+        where: { active: true, blocked: false, fmcsaAuthorized: true, phone: { not: null }, id: { in: [2, 9] } },
+      })
+    );
+    expect(prisma.load.findMany).not.toHaveBeenCalled();
+  });
+});
@@ -0,0 +1,112 @@
+import {
+  acquireLock,
+  releaseLock,
+  startLeaseRenewal,
+  tryAcquireLock,
+} from '@/lib/jobs/distributedLock';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    $queryRaw: jest.fn(),
+    $executeRaw: jest.fn(),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+describe('distributedLock (lease based)', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    jest.useRealTimers();
+  });
+
+  it('acquires a free lock in one statement and returns a fencing token', async () => {
+    (prisma.$queryRaw as jest.Mock).mockResolvedValue([{ fencing_token: BigInt(42) }]);
+
+    const result = await tryAcquireLock('job:TEST', 30000);
+
+    expect(result.acquired).toBe(true);
+    expect(result.fencingToken).toBe(42);
+    expect(result.lockId).toBe('lease_42');
+    expect(result.leaseMs).toBe(30000);
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+  });
+
+  it('does not wait when the lease is held elsewhere', async () => {
+    (prisma.$queryRaw as jest.Mock).mockResolvedValue([]);
+
+    const result = await acquireLock('job:TEST');
+
+    expect(result.acquired).toBe(false);
+    expect(result.waitMs).toBeGreaterThanOrEqual(0);
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+  });
+
+  it('retries up to maxRetries when asked to', async () => {
+    (prisma.$queryRaw as jest.Mock)
+      .mockResolvedValueOnce([])
+      .mockResolvedValueOnce([{ fencing_token: 7 }]);
+
+    const result = await acquireLock('job:TEST', { maxRetries: 2, retryInterval: 1 });
+
+    expect(result.acquired).toBe(true);
+    expect(result.fencingToken).toBe(7);
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(2);
+  });
+
+  it('reports lock errors without throwing', async () => {
+    (prisma.$queryRaw as jest.Mock).mockRejectedValue(new Error('db down'));
+
+    const result = await acquireLock('job:TEST');
+
+    expect(result.acquired).toBe(false);
+    expect(result.error).toBe('db down');
+  });
+
+  it('renews the lease on a heartbeat and counts renewals', async () => {
+    jest.useFakeTimers();
+    (prisma.$executeRaw as jest.Mock).mockResolvedValue(1);
+
+    const handle = startLeaseRenewal('job:TEST', {
+      acquired: true,
+      fencingToken: 3,
+      leaseMs: 9000,
+    });
+
+    await jest.advanceTimersByTimeAsync(3000);
+    await jest.advanceTimersByTimeAsync(3000);
+    handle.stop();
+
+    expect(handle.renewals).toBe(2);
+    expect(handle.lost).toBe(false);
+  });
+
+  it('marks the lease lost when a renewal finds it taken over', async () => {
+    jest.useFakeTimers();
+    (prisma.$executeRaw as jest.Mock).mockResolvedValue(0);
+    jest.spyOn(console, 'error').mockImplementation(() => {});
+
+    const handle = startLeaseRenewal('job:TEST', {
+      acquired: true,
+      fencingToken: 3,
+      leaseMs: 9000,
+    });
+
+    await jest.advanceTimersByTimeAsync(3000);
+    await jest.advanceTimersByTimeAsync(3000);
+
+    expect(handle.lost).toBe(true);
+    expect(handle.renewals).toBe(0);
+    expect(prisma.$executeRaw).toHaveBeenCalledTimes(1);
+  });
+
+  it('releases only with a fencing token', async () => {
+    (prisma.$executeRaw as jest.Mock).mockResolvedValue(1);
+
+    await releaseLock('job:TEST', 'lease_11');
+    await releaseLock('job:TEST', undefined);
+
+    expect(prisma.$executeRaw).toHaveBeenCalledTimes(1);
+  });
+});
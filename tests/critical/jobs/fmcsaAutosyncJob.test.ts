@@ -7,15 +7,16 @@ jest.mock('@/lib/prisma', () => ({
       findMany: jest.fn(),
       update: jest.fn(),
     },
+    $transaction: jest.fn((ops: Promise<unknown>[]) => Promise.all(ops)),
   },
 }));
 jest.mock('@/lib/integrations/fmcsaClient', () => ({
   fetchCarrierFromFMCSA: jest.fn(),
 }));
-jest.mock('@/lib/logger', () => ({
-  __esModule: true,
-  default: { info: jest.fn(), error: jest.fn() },
-}));
+jest.mock('@/lib/logger', () => {
+  const loggerMock = { info: jest.fn(), error: jest.fn() };
+  return { __esModule: true, default: loggerMock, logger: loggerMock };
+});
 
 const prisma = jest.requireMock('@/lib/prisma').default;
 const { fetchCarrierFromFMCSA } = jest.requireMock('@/lib/integrations/fmcsaClient');
@@ -63,4 +64,34 @@ describe('FMCSA Autosync Job', () => {
       })
     );
   });
+
+  it('retries a failed batch per carrier and counts only committed syncs', async () => {
+    (prisma.carrier.findMany as jest.Mock).mockResolvedValue([
+      { id: 1, mcNumber: 'MC123', name: 'C1' },
+      { id: 2, mcNumber: 'MC456', name: 'C2' },
+    ]);
+    (fetchCarrierFromFMCSA as jest.Mock).mockResolvedValue({
+      mcNumber: 'MC123',
+      status: 'ACTIVE',
+      authorized: true,
+      safetyRating: 'SATISFACTORY',
+      lastUpdated: new Date(),
+    });
+    (prisma.carrier.update as jest.Mock).mockImplementation(({ where }: any) =>
+      where.id === 2 ? Promise.reject(new Error('Record to update not found')) : Promise.resolve({})
+    );
+
+    await runFMCSAAutosyncJob();
+
+    // Two in the failed transaction, then one retry per carrier
+    expect(prisma.carrier.update).toHaveBeenCalledTimes(4);
+    expect(logger.error).toHaveBeenCalledWith(
+      'fmcsa_autosync_write_error',
+      expect.objectContaining({ meta: expect.objectContaining({ carrierId: 2 }) })
+    );
+    expect(logger.info).toHaveBeenCalledWith(
+      'fmcsa_autosync_complete',
+      expect.objectContaining({ meta: expect.objectContaining({ successCount: 1, failureCount: 1 }) })
+    );
+  });
 });
@@ -0,0 +1,136 @@
+import { runKpiAggregationJob } from '@/lib/jobs/kpiAggregationJob';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    venture: { findMany: jest.fn(), count: jest.fn() },
+    kpiAggregationWatermark: { findMany: jest.fn(), upsert: jest.fn() },
+    load: { findMany: jest.fn() },
+    logisticsShipper: { count: jest.fn() },
+    carrierVentureStats: { count: jest.fn() },
+    jobRunLog: { create: jest.fn() },
+    $queryRaw: jest.fn(),
+    $executeRaw: jest.fn(),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+jest.mock('@/lib/kpiFreight', () => ({
+  upsertFreightKpiDaily: jest.fn(),
+}));
+jest.mock('@/lib/logger', () => ({
+  logger: { info: jest.fn(), error: jest.fn(), warn: jest.fn() },
+}));
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+const { upsertFreightKpiDaily } = jest.requireMock('@/lib/kpiFreight');
+
+describe('KPI Aggregation Job', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    prisma.logisticsShipper.count.mockResolvedValue(4);
+    prisma.carrierVentureStats.count.mockResolvedValue(2);
+    prisma.load.findMany.mockResolvedValue([
+      { status: 'DELIVERED', billAmount: 1000, costAmount: 800, billingDate: new Date() },
+      { status: 'LOST', billAmount: null, costAmount: null, billingDate: null },
+    ]);
+    prisma.jobRunLog.create.mockResolvedValue({ id: 99 });
+  });
+
+  it('recomputes only days changed after the watermark and advances it', async () => {
+    prisma.venture.findMany.mockResolvedValue([
+      { id: 1, name: 'Freight A' },
+      { id: 2, name: 'Freight B' },
+    ]);
+    prisma.kpiAggregationWatermark.findMany.mockResolvedValue([
+      { ventureId: 1, lastChangeAt: new Date('2026-01-10T00:00:00Z') },
+      { ventureId: 2, lastChangeAt: new Date('2026-01-10T00:00:00Z') },
+    ]);
+    const latest = new Date('2026-01-12T15:00:00Z');
+    prisma.$queryRaw
+      .mockResolvedValueOnce([
+        { day: new Date('2026-01-09T00:00:00Z'), latest_change_at: new Date('2026-01-11T09:00:00Z') },
+        { day: new Date('2026-01-12T00:00:00Z'), latest_change_at: latest },
+      ])
+      .mockResolvedValueOnce([]);
+
+    const { stats, jobRunLogId } = await runKpiAggregationJob({ incremental: true });
+
+    expect(jobRunLogId).toBe(99);
+    expect(stats.freightKpisUpdated).toBe(2);
+    expect(stats.venturesProcessed).toBe(1);
+    expect(stats.venturesUnchanged).toBe(1);
+    expect(upsertFreightKpiDaily).toHaveBeenCalledTimes(2);
+    expect(upsertFreightKpiDaily).toHaveBeenCalledWith(
+      expect.objectContaining({
+        ventureId: 1,
+        loadsInbound: 2,
+        loadsCovered: 1,
+        loadsLost: 1,
+        totalRevenue: 1000,
+        totalCost: 800,
+        activeShippers: 4,
+        activeCarriers: 2,
+      })
+    );
+    // Venture counts are loaded once per venture, not once per day
+    expect(prisma.logisticsShipper.count).toHaveBeenCalledTimes(1);
+    expect(prisma.kpiAggregationWatermark.upsert).toHaveBeenCalledWith(
+      expect.objectContaining({
+        where: { ventureId: 1 },
+        update: { lastChangeAt: latest },
+      })
+    );
+  });
+
+  it('keeps the watermark when a changed day fails', async () => {
+    prisma.venture.findMany.mockResolvedValue([{ id: 1, name: 'Freight A' }]);
+    prisma.kpiAggregationWatermark.findMany.mockResolvedValue([]);
+    prisma.$queryRaw.mockResolvedValueOnce([
+      { day: new Date('2026-01-12T00:00:00Z'), latest_change_at: new Date('2026-01-12T15:00:00Z') },
+    ]);
+    upsertFreightKpiDaily.mockRejectedValueOnce(new Error('write failed'));
+
+    const { stats } = await runKpiAggregationJob({ incremental: true });
+
+    expect(stats.errors).toHaveLength(1);
+    expect(prisma.kpiAggregationWatermark.upsert).not.toHaveBeenCalled();
+    expect(prisma.jobRunLog.create).toHaveBeenCalledWith(
+      expect.objectContaining({ data: expect.objectContaining({ status: 'PARTIAL' }) })
+    );
+  });
+
+  it('recomputes days that lost loads and clears exactly the dirty marks it read', async () => {
+    prisma.venture.findMany.mockResolvedValue([{ id: 1, name: 'Freight A' }]);
+    prisma.kpiAggregationWatermark.findMany.mockResolvedValue([
+      { ventureId: 1, lastChangeAt: new Date('2026-01-10T00:00:00Z') },
+    ]);
+    const markedAt = new Date('2026-01-12T08:00:00Z');
+    prisma.$queryRaw.mockResolvedValueOnce([
+      { day: new Date('2026-01-05T00:00:00Z'), latest_change_at: null, dirty_marked_at: markedAt },
+    ]);
+
+    const { stats } = await runKpiAggregationJob({ incremental: true });
+
+    expect(stats.freightKpisUpdated).toBe(1);
+    expect(upsertFreightKpiDaily).toHaveBeenCalledWith(
+      expect.objectContaining({ ventureId: 1, date: new Date('2026-01-05T00:00:00Z') })
+    );
+    // Watermark stays put: no newer load write was seen
+    expect(prisma.kpiAggregationWatermark.upsert).not.toHaveBeenCalled();
+    expect(prisma.$executeRaw).toHaveBeenCalledTimes(1);
+    expect(prisma.$executeRaw.mock.calls[0]).toContainEqual([markedAt]);
+  });
+
+  it('backfills every day in an explicit range without touching watermarks', async () => {
+    prisma.venture.findMany.mockResolvedValue([{ id: 1, name: 'Freight A' }]);
+
+    const { stats } = await runKpiAggregationJob({
+      from: new Date('2026-01-01T00:00:00Z'),
+      to: new Date('2026-01-31T00:00:00Z'),
+      concurrency: 4,
+    });
+
+    expect(stats.freightKpisUpdated).toBe(31);
+    expect(prisma.$queryRaw).not.toHaveBeenCalled();
+    expect(prisma.kpiAggregationWatermark.upsert).not.toHaveBeenCalled();
+  });
+});
@@ -0,0 +1,83 @@
+import { readAgentKpiTotals, readBpoDashboardTotals } from '@/lib/bpo/agentMetrics';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    $queryRaw: jest.fn(),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const sqlText = (call: unknown[]) =>
+  JSON.stringify(call, (_key, value) => (typeof value === 'bigint' ? value.toString() : value));
+
+describe('BPO agent metric aggregation', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it('reads whole weeks from the weekly table and edge days from the daily rows', async () => {
+    prisma.$queryRaw.mockResolvedValue([
+      {
+        agentId: 7,
+        agentName: 'Ada',
+        campaignId: 3,
+        campaignName: 'Inbound',
+        totalCalls: BigInt(40),
+        totalTalkTimeSec: 7200,
+        totalAppointments: 2,
+        totalSales: 1,
+        days: 9,
+      },
+    ]);
+
+    // Wed 2026-03-04 .. Fri 2026-03-20 spans two whole ISO weeks
+    const rows = await readAgentKpiTotals(new Date('2026-03-04T00:00:00Z'), new Date('2026-03-21T00:00:00Z'));
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    const text = sqlText(prisma.$queryRaw.mock.calls[0]);
+    expect(text).toContain('BpoAgentMetricWeekly');
+    expect(text).toContain('2026-03-09T00:00:00.000Z');
+    expect(text).toContain('2026-03-16T00:00:00.000Z');
+    expect(rows).toEqual([
+      {
+        agentId: 7,
+        agentName: 'Ada',
+        campaignId: 3,
+        campaignName: 'Inbound',
+        totalCalls: 40,
+        totalTalkTimeSec: 7200,
+        totalAppointments: 2,
+        totalSales: 1,
+        days: 9,
+      },
+    ]);
+  });
+
+  it('skips the weekly table for ranges shorter than a week', async () => {
+    prisma.$queryRaw.mockResolvedValue([]);
+
+    await readAgentKpiTotals(new Date('2026-03-10T00:00:00Z'), new Date('2026-03-13T00:00:00Z'));
+
+    expect(sqlText(prisma.$queryRaw.mock.calls[0])).not.toContain('BpoAgentMetricWeekly');
+  });
+
+  it('loads campaign cards and the leaderboard in parallel queries', async () => {
+    prisma.$queryRaw
+      .mockResolvedValueOnce([{ id: 1, name: 'Inbound', leadsCreated: 5 }])
+      .mockResolvedValueOnce([{ key: 'user_7', name: 'Ada', leadsCreated: 5 }]);
+
+    const result = await readBpoDashboardTotals({
+      ventureId: 2,
+      from: new Date('2026-03-10T00:00:00Z'),
+      to: new Date('2026-03-16T23:59:59.999Z'),
+      includeTest: false,
+      leaderboardSize: 10,
+    });
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(2);
+    expect(result.campaigns).toHaveLength(1);
+    expect(result.leaderboard[0].key).toBe('user_7');
+  });
+});
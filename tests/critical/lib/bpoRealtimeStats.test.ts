@@ -0,0 +1,106 @@
+import { getRealtimeStats, recordBpoCall, resetRealtimeStats } from '@/lib/bpo/realtimeStats';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    bpoCampaign: { findMany: jest.fn() },
+    bpoAgent: { findMany: jest.fn() },
+    bpoDailyMetric: { findMany: jest.fn() },
+    bpoAgentMetric: { findMany: jest.fn() },
+    $queryRaw: jest.fn(),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const NOW = new Date(2026, 2, 10, 14, 0, 0);
+const minutesAgo = (m: number) => new Date(NOW.getTime() - m * 60 * 1000);
+
+const agent = (id: number, userId: number, campaignId: number, campaignName: string) => ({
+  id,
+  campaignId,
+  user: { id: userId, fullName: `User ${userId}`, avatarUrl: null },
+  campaign: { id: campaignId, name: campaignName },
+});
+
+describe('BPO realtime stats aggregator', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    resetRealtimeStats();
+    prisma.bpoCampaign.findMany.mockResolvedValue([
+      { id: 1, name: 'Solar', clientName: 'Acme' },
+      { id: 2, name: 'Roofing', clientName: 'Beta' },
+    ]);
+    prisma.bpoAgent.findMany.mockResolvedValue([
+      agent(10, 100, 1, 'Solar'),
+      agent(11, 101, 1, 'Solar'),
+      agent(12, 102, 2, 'Roofing'),
+    ]);
+    prisma.$queryRaw.mockResolvedValue([
+      {
+        agentId: 10, campaignId: 1, calls: 4, connected: 2, leads: 1, sales: 0,
+        talkMs: 600000, openCalls: 0, lastCallAt: minutesAgo(2), maxId: 40,
+      },
+      {
+        agentId: 12, campaignId: 2, calls: 1, connected: 0, leads: 0, sales: 0,
+        talkMs: 0, openCalls: 0, lastCallAt: minutesAgo(30), maxId: 41,
+      },
+    ]);
+    prisma.bpoDailyMetric.findMany.mockResolvedValue([{ campaignId: 1, demosBooked: 3, revenue: 500 }]);
+    prisma.bpoAgentMetric.findMany.mockResolvedValue([{ campaignId: 1, userId: 101, demosBooked: 2 }]);
+  });
+
+  it('builds the dashboard payload from grouped call totals', async () => {
+    const stats = await getRealtimeStats(7, undefined, NOW);
+
+    expect(stats.agents.map((a) => [a.id, a.status, a.callsToday])).toEqual([
+      [10, 'online', 4],
+      [12, 'offline', 1],
+      [11, 'offline', 0],
+    ]);
+    expect(stats.agents[0]).toMatchObject({ talkTimeMin: 10, connectionRate: 0.5 });
+    expect(stats.agents.find((a) => a.id === 11)!.demosToday).toBe(2);
+    expect(stats.campaigns[0]).toMatchObject({ totalCalls: 4, demos: 3, revenue: 500, activeAgents: 1 });
+    expect(stats.summary).toMatchObject({
+      totalAgents: 3,
+      onlineAgents: 1,
+      totalCallsToday: 5,
+      connectedCallsToday: 2,
+      totalRevenue: 500,
+    });
+  });
+
+  it('folds new calls in without reloading and shares one load across readers', async () => {
+    await Promise.all([getRealtimeStats(7, undefined, NOW), getRealtimeStats(7, 1, NOW)]);
+
+    recordBpoCall({
+      id: 42, agentId: 11, ventureId: 7, campaignId: 1,
+      callStartedAt: minutesAgo(1), callEndedAt: null,
+      isConnected: true, appointmentSet: false, dealWon: true,
+    });
+    // Already counted by the load query
+    recordBpoCall({
+      id: 40, agentId: 10, ventureId: 7, campaignId: 1,
+      callStartedAt: minutesAgo(2), callEndedAt: minutesAgo(1),
+      isConnected: true, appointmentSet: false, dealWon: false,
+    });
+
+    const stats = await getRealtimeStats(7, 1, NOW);
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(stats.agents.map((a) => [a.id, a.status])).toEqual([
+      [11, 'busy'],
+      [10, 'online'],
+    ]);
+    expect(stats.summary).toMatchObject({ totalAgents: 2, totalCallsToday: 5, salesToday: 1, busyAgents: 1 });
+  });
+
+  it('reconciles from the database once the floor is stale', async () => {
+    await getRealtimeStats(7, undefined, NOW);
+    await getRealtimeStats(7, undefined, new Date(NOW.getTime() + 30 * 1000));
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+
+    await getRealtimeStats(7, undefined, new Date(NOW.getTime() + 61 * 1000));
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(2);
+  });
+});
@@ -0,0 +1,123 @@
+import {
+  clearCarrierFeed,
+  getCarrierFeed,
+  getCarrierFeedStats,
+  parseRegion,
+} from '@/lib/freight/carrierFeed';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    load: { findMany: jest.fn() },
+    $queryRaw: jest.fn(),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const NOW = new Date(2026, 2, 10, 14, 0, 0).getTime();
+
+const load = (id: number, pickupState: string, equipmentType: string | null, weightLbs = 40000) => ({
+  id,
+  pickupCity: 'City',
+  pickupState,
+  dropCity: 'Dest',
+  dropState: 'TX',
+  equipmentType,
+  weightLbs,
+  pickupDate: new Date('2026-03-12T00:00:00Z'),
+  dropDate: null,
+});
+
+describe('carrier portal available-loads feed', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    clearCarrierFeed();
+    prisma.$queryRaw.mockResolvedValue([{ version: BigInt(5) }]);
+    prisma.load.findMany.mockResolvedValue([
+      load(1, 'IL', 'Reefer'),
+      load(2, 'GA', null),
+      load(3, 'OH', 'Van'),
+    ]);
+  });
+
+  it('queries each view once per version with its own filter and limit', async () => {
+    await getCarrierFeed({}, NOW);
+    await getCarrierFeed({ region: 'midwest' }, NOW + 10);
+    await getCarrierFeed({ equipment: 'van' }, NOW + 20);
+    await getCarrierFeed({ region: 'ga', equipment: 'Reefer' }, NOW + 30);
+    await getCarrierFeed({ region: 'Midwest' }, NOW + 40);
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(prisma.load.findMany).toHaveBeenCalledTimes(4);
+    const wheres = prisma.load.findMany.mock.calls.map(([args]: any[]) => args.where);
+    expect(prisma.load.findMany.mock.calls.every(([args]: any[]) => args.take === 50)).toBe(true);
+    expect(wheres[0]).toEqual({ loadStatus: 'OPEN', isTest: false });
+    expect(wheres[1].AND).toEqual([
+      { pickupState: { in: expect.arrayContaining(['IL', 'OH']), mode: 'insensitive' } },
+    ]);
+    // Loads without an equipment type are shown as vans
+    expect(wheres[2].AND).toEqual([
+      {
+        OR: [
+          { equipmentType: { equals: 'VAN', mode: 'insensitive' } },
+          { equipmentType: null },
+          { equipmentType: '' },
+        ],
+      },
+    ]);
+    expect(wheres[3].AND).toEqual([
+      { pickupState: { in: ['GA'], mode: 'insensitive' } },
+      { OR: [{ equipmentType: { equals: 'REEFER', mode: 'insensitive' } }] },
+    ]);
+
+    const stats = getCarrierFeedStats();
+    expect(stats).toMatchObject({ requests: 5, hits: 1, builds: 4, views: 4, version: 5 });
+    expect(stats.hitRatio).toBe(0.2);
+  });
+
+  it('keeps the ETag while content is unchanged across versions', async () => {
+    const first = await getCarrierFeed({}, NOW);
+    prisma.$queryRaw.mockResolvedValue([{ version: BigInt(6) }]);
+    const second = await getCarrierFeed({}, NOW + 5000);
+
+    expect(prisma.load.findMany).toHaveBeenCalledTimes(2);
+    expect(second.version).toBe(6);
+    expect(second.etag).toBe(first.etag);
+  });
+
+  it('answers since=N with the changes when the version is still held', async () => {
+    await getCarrierFeed({}, NOW);
+    prisma.$queryRaw.mockResolvedValue([{ version: BigInt(7) }]);
+    prisma.load.findMany.mockResolvedValue([
+      load(1, 'IL', 'Reefer', 42000),
+      load(3, 'OH', 'Van'),
+      load(4, 'TX', 'Flatbed'),
+    ]);
+
+    const delta = await getCarrierFeed({ since: 5 }, NOW + 5000);
+    expect(delta.changes).toEqual({
+      since: 5,
+      upserted: [expect.objectContaining({ id: 1, weight: 42000 }), expect.objectContaining({ id: 4 })],
+      removed: [2],
+    });
+
+    const unknown = await getCarrierFeed({ since: 2 }, NOW + 5010);
+    expect(unknown.changes).toBeUndefined();
+    expect(unknown.loads).toHaveLength(3);
+  });
+
+  it('rebuilds after the max age even when the version has not moved', async () => {
+    await getCarrierFeed({}, NOW);
+    await getCarrierFeed({}, NOW + 10 * 60 * 1000);
+
+    expect(prisma.load.findMany).toHaveBeenCalledTimes(2);
+  });
+
+  it('accepts region names and state codes only', () => {
+    expect(parseRegion('Southeast')).toBe('SOUTHEAST');
+    expect(parseRegion('tx')).toBe('TX');
+    expect(parseRegion('')).toBeUndefined();
+    expect(parseRegion('Gulf Coast')).toBeNull();
+  });
+});
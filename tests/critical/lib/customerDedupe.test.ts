@@ -1,4 +1,34 @@
-import { isStrongMatch } from '@/lib/freight/customerDedupe';
+import {
+  findDuplicateCustomers,
+  findDuplicateCustomersBatch,
+  isStrongMatch,
+} from '@/lib/freight/customerDedupe';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    customer: { findMany: jest.fn() },
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+function row(overrides: Record<string, unknown>) {
+  return {
+    id: 1,
+    name: 'Acme Freight',
+    email: null,
+    phone: null,
+    tmsCustomerCode: null,
+    address: null,
+    ventureId: 1,
+    dedupePhone: null,
+    dedupeEmail: null,
+    dedupeEmailDomain: null,
+    dedupeName: 'acmefreight',
+    ...overrides,
+  };
+}
 
 interface DedupeCandidate {
   id: number;
@@ -47,4 +77,106 @@ describe('customerDedupe', () => {
       expect(isStrongMatch(candidates)).toBe(false);
     });
   });
+
+  describe('findDuplicateCustomers', () => {
+    beforeEach(() => jest.clearAllMocks());
+
+    it('answers every match strategy from one exact and one capped fuzzy lookup', async () => {
+      prisma.customer.findMany.mockResolvedValue([
+        row({ id: 1, tmsCustomerCode: 'TMS1', dedupePhone: '5551234567' }),
+        row({ id: 2, email: 'ops@acme.com', dedupeEmail: 'ops@acme.com', dedupeEmailDomain: 'acme.com' }),
+        row({ id: 3, name: 'ACME', dedupeName: 'acme', dedupeEmailDomain: 'acme.com' }),
+        row({ id: 4, address: '1 Main St, Dallas, TX', dedupeName: 'acmefreight' }),
+        row({ id: 5, ventureId: 2, dedupePhone: '5551234567' }),
+      ]);
+
+      const candidates = await findDuplicateCustomers({
+        name: 'Acme Freight',
+        email: ' Ops@Acme.com ',
+        phone: '(555) 123-4567',
+        tmsCustomerCode: 'TMS1',
+        state: 'TX',
+        ventureId: 1,
+      });
+
+      expect(prisma.customer.findMany).toHaveBeenCalledTimes(2);
+      const [[exact], [fuzzy]] = prisma.customer.findMany.mock.calls;
+      expect(exact.where.ventureId).toBe(1);
+      expect(exact.where.OR).toEqual([
+        { tmsCustomerCode: { in: ['TMS1'] } },
+        { dedupePhone: { in: ['5551234567'] } },
+        { dedupeEmail: { in: ['ops@acme.com'] } },
+      ]);
+      // Exact keys are never capped; only the fuzzy block is
+      expect(exact.take).toBeUndefined();
+      expect(fuzzy.where.OR).toEqual([
+        { dedupeEmailDomain: { in: ['acme.com'] } },
+        { dedupeName: { in: ['acmefreight'] } },
+      ]);
+      expect(fuzzy.take).toBe(200);
+
+      const byId = new Map(candidates.map(c => [c.id, c]));
+      expect(byId.get(1)).toEqual(expect.objectContaining({ score: 100 }));
+      expect(byId.get(1)?.matchReasons).toEqual(['Exact TMS customer code match', 'Phone match']);
+      expect(byId.get(2)?.score).toBe(100);
+      expect(byId.get(3)).toEqual(expect.objectContaining({ score: 70, matchReasons: ['Email domain + similar name'] }));
+      expect(byId.get(4)).toEqual(expect.objectContaining({ score: 60 }));
+      expect(byId.has(5)).toBe(false);
+    });
+
+    it('keeps exact matches when a common domain fills the fuzzy block', async () => {
+      const crowd = Array.from({ length: 200 }, (_, i) =>
+        row({ id: i + 1, name: `Other ${i}`, dedupeName: `other${i}`, dedupeEmailDomain: 'bigco.com' })
+      );
+      prisma.customer.findMany
+        .mockResolvedValueOnce([row({ id: 5000, tmsCustomerCode: 'TMS9' })])
+        .mockResolvedValueOnce(crowd);
+
+      const candidates = await findDuplicateCustomers({
+        name: 'BigCo Logistics',
+        email: 'ap@bigco.com',
+        tmsCustomerCode: 'TMS9',
+      });
+
+      expect(candidates[0]).toEqual(expect.objectContaining({ id: 5000, score: 100 }));
+    });
+
+    it('skips the lookup when there is nothing to block on', async () => {
+      prisma.customer.findMany.mockResolvedValue([]);
+      const candidates = await findDuplicateCustomers({ name: 'Acme', email: 'x@gmail.com' });
+      // exact email is still a key, free-mail domain is not
+      expect(prisma.customer.findMany.mock.calls[0][0].where.OR).toEqual([{ dedupeEmail: { in: ['x@gmail.com'] } }]);
+      expect(candidates).toEqual([]);
+
+      prisma.customer.findMany.mockClear();
+      await findDuplicateCustomers({ name: 'Acme' });
+      expect(prisma.customer.findMany).not.toHaveBeenCalled();
+    });
+  });
+
+  describe('findDuplicateCustomersBatch', () => {
+    beforeEach(() => jest.clearAllMocks());
+
+    it('dedupes a batch with one blocking lookup and flags duplicates within the batch', async () => {
+      prisma.customer.findMany.mockResolvedValue([
+        row({ id: 9, email: 'a@globex.com', dedupeEmail: 'a@globex.com', dedupeEmailDomain: 'globex.com', ventureId: 2 }),
+      ]);
+
+      const results = await findDuplicateCustomersBatch([
+        { name: 'Globex', email: 'a@globex.com', ventureId: 2 },
+        { name: 'Initech', phone: '555-000-1111', ventureId: 1 },
+        { name: 'Initech LLC', phone: '+1 555 000 1111', ventureId: 1 },
+      ]);
+
+      expect(prisma.customer.findMany).toHaveBeenCalledTimes(2);
+      // Mixed ventures: filtered per input, not in the query
+      expect(prisma.customer.findMany.mock.calls[0][0].where.ventureId).toBeUndefined();
+      expect(prisma.customer.findMany.mock.calls[1][0].take).toBe(600);
+
+      expect(results[0].candidates.map(c => c.id)).toEqual([9]);
+      expect(results[1].candidates).toEqual([]);
+      expect(results.map(r => r.duplicateOfIndex)).toEqual([null, null, 1]);
+    });
+  });
 });
+
@@ -0,0 +1,133 @@
+import {
+  getEffectiveUser,
+  getEffectiveUserCacheStats,
+  invalidateAllEffectiveUsers,
+  invalidateEffectiveUser,
+} from '@/lib/effectiveUser';
+
+jest.mock('next-auth', () => ({
+  getServerSession: jest.fn(),
+}));
+jest.mock('@/pages/api/auth/[...nextauth]', () => ({
+  authOptions: {},
+}));
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    user: { findUnique: jest.fn() },
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const { getServerSession } = jest.requireMock('next-auth');
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+function makeReq(cookie: string) {
+  return { headers: { cookie }, cookies: {} } as any;
+}
+
+const res = {} as any;
+
+const ceo = { id: 1, email: 'ceo@test.com', fullName: 'CEO', role: 'CEO', isTestUser: false, ventures: [], offices: [] };
+const employee = {
+  id: 7,
+  email: 'emp@test.com',
+  fullName: 'Emp',
+  role: 'EMPLOYEE',
+  isTestUser: false,
+  ventures: [{ ventureId: 3 }],
+  offices: [{ officeId: 4 }],
+};
+
+describe('getEffectiveUser resolution cache', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    invalidateAllEffectiveUsers();
+    getServerSession.mockResolvedValue({ user: { id: 7 } });
+    prisma.user.findUnique.mockResolvedValue(employee);
+  });
+
+  it('resolves once per session token across a burst of requests', async () => {
+    const req = makeReq('next-auth.session-token=abc');
+
+    const users = await Promise.all(Array.from({ length: 8 }, () => getEffectiveUser(req, res)));
+
+    expect(users.every((u) => u?.id === 7)).toBe(true);
+    expect(users[0]).toEqual(expect.objectContaining({ ventureIds: [3], officeIds: [4] }));
+    expect(getServerSession).toHaveBeenCalledTimes(1);
+    expect(prisma.user.findUnique).toHaveBeenCalledTimes(1);
+
+    await getEffectiveUser(req, res);
+    expect(prisma.user.findUnique).toHaveBeenCalledTimes(1);
+    expect(getEffectiveUserCacheStats().hits).toBeGreaterThan(0);
+  });
+
+  it('keys on the session token and the impersonation target', async () => {
+    getServerSession.mockResolvedValue({ user: { id: 1 } });
+    prisma.user.findUnique.mockImplementation(async ({ where }: any) => (where.id === 1 ? ceo : employee));
+
+    const asSelf = await getEffectiveUser(makeReq('next-auth.session-token=ceo'), res);
+    const asEmployee = await getEffectiveUser(
+      makeReq('next-auth.session-token=ceo; x-impersonate-user-id=7'),
+      res
+    );
+
+    expect(asSelf?.id).toBe(1);
+    expect(asEmployee?.id).toBe(7);
+  });
+
+  it('re-resolves after the user is invalidated', async () => {
+    const req = makeReq('next-auth.session-token=abc');
+    await getEffectiveUser(req, res);
+
+    prisma.user.findUnique.mockResolvedValue({ ...employee, ventures: [] });
+    invalidateEffectiveUser(7);
+
+    const user = await getEffectiveUser(req, res);
+    expect(user?.ventureIds).toEqual([]);
+    expect(prisma.user.findUnique).toHaveBeenCalledTimes(2);
+  });
+
+  it('does not cache a resolution that raced with an invalidation', async () => {
+    const req = makeReq('next-auth.session-token=abc');
+    let release: () => void = () => {};
+    prisma.user.findUnique.mockImplementationOnce(
+      () => new Promise((resolve) => (release = () => resolve(employee)))
+    );
+
+    const pending = getEffectiveUser(req, res);
+    await new Promise((resolve) => setImmediate(resolve));
+    invalidateEffectiveUser(7);
+    release();
+    await pending;
+
+    prisma.user.findUnique.mockResolvedValue({ ...employee, role: 'SALES' });
+    const user = await getEffectiveUser(req, res);
+    expect(user?.role).toBe('SALES');
+  });
+
+  it('does not join a resolution that started before an invalidation', async () => {
+    const req = makeReq('next-auth.session-token=abc');
+    let release: () => void = () => {};
+    prisma.user.findUnique.mockImplementationOnce(
+      () => new Promise((resolve) => (release = () => resolve(employee)))
+    );
+
+    const stale = getEffectiveUser(req, res);
+    await new Promise((resolve) => setImmediate(resolve));
+    invalidateEffectiveUser(7);
+
+    prisma.user.findUnique.mockResolvedValue({ ...employee, role: 'SALES' });
+    const fresh = await getEffectiveUser(req, res);
+    release();
+
+    expect(fresh?.role).toBe('SALES');
+    expect((await stale)?.role).toBe('EMPLOYEE');
+    expect(prisma.user.findUnique).toHaveBeenCalledTimes(2);
+  });
+
+  it('does not cache requests without a session cookie', async () => {
+    await getEffectiveUser(makeReq(''), res);
+    await getEffectiveUser(makeReq(''), res);
+    expect(getServerSession).toHaveBeenCalledTimes(2);
+  });
+});
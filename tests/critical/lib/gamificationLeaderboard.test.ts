@@ -0,0 +1,123 @@
+import { awardPoints } from '@/lib/gamification/awardPoints';
+import {
+  RankedSet,
+  clearLeaderboardCache,
+  getLeaderboard,
+  periodStart,
+} from '@/lib/gamification/leaderboard';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    gamificationEvent: { create: jest.fn(), findFirst: jest.fn() },
+    gamificationPointsBalance: { upsert: jest.fn() },
+    gamificationLeaderboardScore: { findMany: jest.fn() },
+    gamificationConfig: { findUnique: jest.fn() },
+    $executeRaw: jest.fn(),
+    $transaction: jest.fn((ops: any[]) => Promise.all(ops)),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+describe('RankedSet', () => {
+  it('keeps users ordered by points and answers rank and top-N', () => {
+    const set = new RankedSet([
+      { userId: 1, points: 10 },
+      { userId: 2, points: 30 },
+      { userId: 3, points: 20 },
+    ]);
+
+    expect(set.top(2).map((e) => e.userId)).toEqual([2, 3]);
+    expect(set.rank(1)).toBe(3);
+
+    set.add(1, 25);
+    expect(set.top(3)).toEqual([
+      { userId: 1, points: 35, rank: 1 },
+      { userId: 2, points: 30, rank: 2 },
+      { userId: 3, points: 20, rank: 3 },
+    ]);
+
+    set.add(4, 20);
+    expect(set.rank(3)).toBe(3);
+    expect(set.rank(4)).toBe(4);
+    expect(set.rank(99)).toBeNull();
+    expect(set.size).toBe(4);
+  });
+});
+
+describe('periodStart', () => {
+  it('uses UTC days, Monday weeks and calendar months', () => {
+    const at = new Date('2026-03-05T18:30:00Z'); // Thursday
+    expect(periodStart('DAY', at).toISOString()).toBe('2026-03-05T00:00:00.000Z');
+    expect(periodStart('WEEK', at).toISOString()).toBe('2026-03-02T00:00:00.000Z');
+    expect(periodStart('MONTH', at).toISOString()).toBe('2026-03-01T00:00:00.000Z');
+    expect(periodStart('WEEK', new Date('2026-03-08T23:00:00Z')).toISOString()).toBe(
+      '2026-03-02T00:00:00.000Z'
+    );
+  });
+});
+
+describe('awardPoints', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    clearLeaderboardCache();
+    prisma.gamificationEvent.create.mockResolvedValue({ id: 77 });
+    prisma.gamificationPointsBalance.upsert.mockResolvedValue({});
+    prisma.$executeRaw.mockResolvedValue(4);
+  });
+
+  it('writes the event, balance and leaderboards in one transaction without a lookup', async () => {
+    const result = await awardPoints({
+      userId: 5,
+      ventureId: 2,
+      eventType: 'LOAD_COMPLETED',
+      points: 25,
+      idempotencyKey: 'load-1',
+    });
+
+    expect(result).toEqual({ success: true, eventId: 77 });
+    expect(prisma.$transaction).toHaveBeenCalledTimes(1);
+    expect(prisma.$transaction.mock.calls[0][0]).toHaveLength(3);
+    expect(prisma.gamificationEvent.findFirst).not.toHaveBeenCalled();
+    expect(prisma.gamificationEvent.create).toHaveBeenCalledWith({
+      data: expect.objectContaining({ idempotencyKey: 'load-1', metadata: { idempotencyKey: 'load-1' } }),
+    });
+  });
+
+  it('reports a repeated idempotency key as skipped', async () => {
+    prisma.gamificationEvent.create.mockRejectedValue(Object.assign(new Error('unique'), { code: 'P2002' }));
+    prisma.gamificationEvent.findFirst.mockResolvedValue({ id: 12 });
+
+    const result = await awardPoints({
+      userId: 5,
+      ventureId: 2,
+      eventType: 'LOAD_COMPLETED',
+      points: 25,
+      idempotencyKey: 'load-1',
+    });
+
+    expect(result).toEqual({ success: true, eventId: 12, skipped: true });
+    expect(prisma.gamificationEvent.findFirst).toHaveBeenCalledWith({
+      where: { userId: 5, ventureId: 2, type: 'LOAD_COMPLETED', idempotencyKey: 'load-1' },
+      select: { id: true },
+    });
+  });
+
+  it('applies awards to cached boards without reloading them', async () => {
+    prisma.gamificationLeaderboardScore.findMany.mockResolvedValue([
+      { userId: 1, points: 40 },
+      { userId: 5, points: 30 },
+    ]);
+
+    const before = await getLeaderboard({ ventureId: 2, period: 'WEEK', limit: 10, userId: 5 });
+    expect(before.me).toEqual({ userId: 5, points: 30, rank: 2 });
+
+    await awardPoints({ userId: 5, ventureId: 2, eventType: 'QUOTE_CONVERTED', points: 50 });
+
+    const after = await getLeaderboard({ ventureId: 2, period: 'WEEK', limit: 1, userId: 5 });
+    expect(after.top).toEqual([{ userId: 5, points: 80, rank: 1 }]);
+    expect(after.me?.rank).toBe(1);
+    expect(prisma.gamificationLeaderboardScore.findMany).toHaveBeenCalledTimes(1);
+  });
+});
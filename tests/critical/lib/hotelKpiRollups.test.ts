@@ -0,0 +1,131 @@
+import {
+  dayWindow,
+  readHotelKpiTotals,
+  readHotelReviewSummary,
+  trackHotelKpiWrites,
+  trailingWindow,
+} from '@/lib/hotels/kpiRollups';
+import { periodsTouching } from '@/lib/utils/rollupPeriods';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    $queryRaw: jest.fn(),
+    $executeRaw: jest.fn().mockReturnValue('stmt'),
+    $transaction: jest.fn().mockResolvedValue([1, 1]),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const d = (day: string) => new Date(`${day}T00:00:00.000Z`);
+const iso = (date: Date) => date.toISOString().slice(0, 10);
+
+const totalsRow = (key: string, hotelId: number | null, days: number, lossNights = 0) => ({
+  key,
+  hotelId,
+  days,
+  roomsSold: 10 * days,
+  roomsAvailable: 20 * days,
+  roomRevenue: 1000 * days,
+  totalRevenue: 1200 * days,
+  occSum: 50 * days,
+  adrSum: 100 * days,
+  revparSum: 50 * days,
+  occPositiveSum: 50 * days,
+  occPositiveDays: days,
+  adrPositiveSum: 100 * days,
+  adrPositiveDays: days,
+  revparPositiveSum: 50 * days,
+  revparPositiveDays: days,
+  lossNights,
+});
+
+describe('hotel KPI rollups', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it('turns inclusive calendar days into a half-open UTC window', () => {
+    const w = dayWindow('MTD', new Date(2026, 2, 1), new Date(2026, 2, 15));
+    expect([iso(w.from), iso(w.toExclusive)]).toEqual(['2026-03-01', '2026-03-16']);
+
+    const seven = trailingWindow('7d', 7, new Date('2026-03-15T18:30:00.000Z'));
+    expect([iso(seven.from), iso(seven.toExclusive)]).toEqual(['2026-03-09', '2026-03-16']);
+  });
+
+  it('lists every week and month an upload touches', () => {
+    expect(periodsTouching(d('2026-02-27'), d('2026-03-03')).map((p) => [p.period, iso(p.start)])).toEqual([
+      ['WEEK', '2026-02-23'],
+      ['WEEK', '2026-03-02'],
+      ['MONTH', '2026-02-01'],
+      ['MONTH', '2026-03-01'],
+    ]);
+  });
+
+  it('answers several windows with one grouped query', async () => {
+    prisma.$queryRaw.mockResolvedValue([totalsRow('MTD', null, 15, 2), totalsRow('YTD', null, 74)]);
+
+    const totals = await readHotelKpiTotals({ ventureId: 4 }, [
+      dayWindow('MTD', new Date(2026, 2, 1), new Date(2026, 2, 15)),
+      dayWindow('YTD', new Date(2026, 0, 1), new Date(2026, 2, 15)),
+    ]);
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(totals.get('MTD')).toMatchObject({ days: 15, roomsSold: 150, lossNights: 2 });
+    expect(totals.get('YTD')!.roomRevenue).toBe(74000);
+    expect(totals.has('LY MTD')).toBe(false);
+  });
+
+  it('keys per-property totals by window and hotel', async () => {
+    prisma.$queryRaw.mockResolvedValue([totalsRow('7d', 11, 7), totalsRow('7d', 12, 3, 1)]);
+
+    const totals = await readHotelKpiTotals(
+      { hotelIds: [11, 12] },
+      [trailingWindow('7d', 7, new Date('2026-03-15T12:00:00.000Z'))],
+      { byHotel: true },
+    );
+
+    expect(totals.get('7d:11')!.days).toBe(7);
+    expect(totals.get('7d:12')).toMatchObject({ days: 3, lossNights: 1 });
+  });
+
+  it('sums review rollups across sources', async () => {
+    prisma.$queryRaw.mockResolvedValue([
+      { source: 'GOOGLE', reviews: 6, ratedReviews: 5, ratingSum: 21, positive: 4, negative: 1, unresponded: 2, recent: 3 },
+      { source: 'BOOKING', reviews: 2, ratedReviews: 2, ratingSum: 7, positive: 1, negative: 0, unresponded: 0, recent: 0 },
+    ]);
+
+    const summary = await readHotelReviewSummary([11], false, trailingWindow('30d', 30, new Date('2026-03-15T12:00:00.000Z')));
+
+    expect(summary).toEqual({
+      totalReviews: 8,
+      ratedReviews: 7,
+      ratingSum: 28,
+      positive: 5,
+      negative: 1,
+      unresponded: 2,
+      recent: 3,
+      sourceCounts: { GOOGLE: 6, BOOKING: 2 },
+    });
+  });
+
+  it('skips the review query when there are no hotels', async () => {
+    const summary = await readHotelReviewSummary([], true, trailingWindow('30d', 30));
+    expect(summary.totalReviews).toBe(0);
+    expect(prisma.$queryRaw).not.toHaveBeenCalled();
+  });
+
+  it('refreshes each hotel once per batch', async () => {
+    const rollups = trackHotelKpiWrites();
+    rollups.touch(11, d('2026-03-04'));
+    rollups.touch(11, d('2026-03-02'));
+    rollups.touch(12, d('2026-03-10'));
+    rollups.touch(11, d('2026-03-06'));
+
+    await rollups.flush();
+
+    expect(prisma.$transaction).toHaveBeenCalledTimes(2);
+    expect(prisma.$executeRaw).toHaveBeenCalledTimes(4);
+  });
+});
@@ -0,0 +1,61 @@
+import {
+  classifyLoss,
+  parseSeverityParam,
+  reclassifyLossNights,
+  severitiesAtLeast,
+} from '@/lib/hotels/lossClassification';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    $queryRaw: jest.fn(),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+describe('hotel loss classification', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it('grades lost dues by amount or share of the night total', () => {
+    expect(classifyLoss(null, 50)).toEqual({ highLossFlag: false, lossSeverity: 'NONE' });
+    expect(classifyLoss(5000, 0)).toEqual({ highLossFlag: false, lossSeverity: 'NONE' });
+    expect(classifyLoss(5000, 99)).toEqual({ highLossFlag: false, lossSeverity: 'NONE' });
+    expect(classifyLoss(5000, 100)).toEqual({ highLossFlag: true, lossSeverity: 'LOW' });
+    expect(classifyLoss(800, 40)).toEqual({ highLossFlag: true, lossSeverity: 'LOW' });
+    expect(classifyLoss(800, 80)).toEqual({ highLossFlag: true, lossSeverity: 'MEDIUM' });
+    expect(classifyLoss(20000, 1000)).toEqual({ highLossFlag: true, lossSeverity: 'HIGH' });
+    expect(classifyLoss(300, 60)).toEqual({ highLossFlag: true, lossSeverity: 'HIGH' });
+  });
+
+  it('parses a minimum severity filter', () => {
+    expect(parseSeverityParam(undefined)).toBeUndefined();
+    expect(parseSeverityParam('medium')).toBe('MEDIUM');
+    expect(parseSeverityParam('NONE')).toBeNull();
+    expect(parseSeverityParam('severe')).toBeNull();
+    expect(severitiesAtLeast('MEDIUM')).toEqual(['MEDIUM', 'HIGH']);
+  });
+
+  it('reclassifies a day in a single statement', async () => {
+    prisma.$queryRaw.mockResolvedValue([
+      { scanned: 12, updated: 3, highLossDays: 2, flagChangedHotelIds: [4, 9] },
+    ]);
+
+    const result = await reclassifyLossNights(new Date(2026, 2, 9), new Date(2026, 2, 10));
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(result).toEqual({ scanned: 12, updated: 3, highLossDays: 2, flagChangedHotelIds: [4, 9] });
+  });
+
+  it('reports an empty scan when nothing changed', async () => {
+    prisma.$queryRaw.mockResolvedValue([
+      { scanned: 5, updated: 0, highLossDays: 0, flagChangedHotelIds: null },
+    ]);
+
+    const result = await reclassifyLossNights(new Date(2026, 2, 9), new Date(2026, 2, 10));
+    expect(result.flagChangedHotelIds).toEqual([]);
+    expect(result.scanned).toBe(5);
+  });
+});
@@ -0,0 +1,104 @@
+import {
+  parseIncludeParam,
+  periodStartOf,
+  planRollupRead,
+  readIncentiveRollups,
+  refreshIncentiveRollups,
+} from '@/lib/incentives/rollups';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    $queryRaw: jest.fn(),
+    $executeRaw: jest.fn().mockReturnValue('stmt'),
+    $transaction: jest.fn().mockResolvedValue([1, 1]),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const d = (day: string) => new Date(`${day}T00:00:00.000Z`);
+const iso = (date: Date) => date.toISOString().slice(0, 10);
+
+describe('incentive rollups', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it('aligns periods to ISO weeks and calendar months in UTC', () => {
+    expect(iso(periodStartOf('WEEK', d('2026-03-01')))).toBe('2026-02-23');
+    expect(iso(periodStartOf('WEEK', d('2026-03-02')))).toBe('2026-03-02');
+    expect(iso(periodStartOf('MONTH', d('2026-03-31')))).toBe('2026-03-01');
+  });
+
+  it('covers a summary range with months, then weeks, then edge days', () => {
+    // 2026-02-25 .. 2026-04-12 inclusive
+    const plan = planRollupRead(d('2026-02-25'), d('2026-04-13'), null);
+
+    expect(plan.periods.map((p) => [p.period, iso(p.start)])).toEqual([
+      ['MONTH', '2026-03-01'],
+      ['WEEK', '2026-04-06'],
+    ]);
+    expect(plan.days.map(([s, e]) => [iso(s), iso(e)])).toEqual([
+      ['2026-02-25', '2026-03-01'],
+      ['2026-04-01', '2026-04-06'],
+    ]);
+  });
+
+  it('only uses rollups of the requested series granularity', () => {
+    const weekly = planRollupRead(d('2026-03-04'), d('2026-03-20'), 'week');
+    expect(weekly.periods.map((p) => iso(p.start))).toEqual(['2026-03-09']);
+    expect(weekly.days.map(([s, e]) => [iso(s), iso(e)])).toEqual([
+      ['2026-03-04', '2026-03-09'],
+      ['2026-03-16', '2026-03-20'],
+    ]);
+
+    expect(planRollupRead(d('2026-03-04'), d('2026-03-20'), 'month')).toEqual({
+      periods: [],
+      days: [[d('2026-03-04'), d('2026-03-20')]],
+    });
+    expect(planRollupRead(d('2026-03-04'), d('2026-03-20'), 'day').periods).toEqual([]);
+  });
+
+  it('returns summary and series from a single grouped query', async () => {
+    prisma.$queryRaw.mockResolvedValue([
+      { userId: 1, userName: null, email: 'a@x.io', role: 'EMPLOYEE', bucket: null, amount: 40, days: 2, byBucket: 0 },
+      { userId: 2, userName: 'Bea', email: 'b@x.io', role: 'EMPLOYEE', bucket: null, amount: 90, days: 3, byBucket: 0 },
+      { userId: null, userName: null, email: null, role: null, bucket: d('2026-03-09'), amount: 70, days: 3, byBucket: 1 },
+      { userId: null, userName: null, email: null, role: null, bucket: d('2026-03-02'), amount: 60, days: 2, byBucket: 1 },
+    ]);
+
+    const result = await readIncentiveRollups({
+      ventureId: 3,
+      from: d('2026-03-02'),
+      toExclusive: d('2026-03-16'),
+      granularity: 'week',
+      include: { summary: true, series: true },
+    });
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(result.items.map((i) => [i.userId, i.userName, i.totalAmount, i.daysWithIncentives])).toEqual([
+      [2, 'Bea', 90, 3],
+      [1, 'User #1', 40, 2],
+    ]);
+    expect(result.totalAmount).toBe(130);
+    expect(result.points).toEqual([
+      { date: '2026-03-02', amount: 60 },
+      { date: '2026-03-09', amount: 70 },
+    ]);
+  });
+
+  it('refreshes the week and month of a day in one transaction', async () => {
+    await refreshIncentiveRollups(3, d('2026-03-04'));
+
+    expect(prisma.$executeRaw).toHaveBeenCalledTimes(2);
+    expect(prisma.$transaction).toHaveBeenCalledWith(['stmt', 'stmt']);
+  });
+
+  it('falls back to the endpoint default for an empty include', () => {
+    const fallback = { summary: true, series: false };
+    expect(parseIncludeParam(undefined, fallback)).toBe(fallback);
+    expect(parseIncludeParam('bogus', fallback)).toBe(fallback);
+    expect(parseIncludeParam('summary,series', fallback)).toEqual({ summary: true, series: true });
+  });
+});
@@ -0,0 +1,129 @@
+import { computeIncentivesForDayWithRules, type EngineRule } from '@/lib/incentives/engine';
+import { buildMetricCube, dayRange, loadMetricCube, simulateRules } from '@/lib/incentives/simulation';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    user: { findMany: jest.fn() },
+    load: { findMany: jest.fn() },
+    bpoCallLog: { findMany: jest.fn() },
+    hotelReview: { findMany: jest.fn() },
+    hotelKpiDaily: { findMany: jest.fn() },
+    $queryRaw: jest.fn(),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const DAY = '2026-03-02';
+
+const rules: EngineRule[] = [
+  { id: 1, metricKey: 'loads_margin', calcType: 'PERCENT_OF_METRIC', rate: 0.1, config: null },
+  { id: 2, metricKey: 'bpo_dials', calcType: 'FLAT_PER_UNIT', rate: 0.5, config: null },
+  {
+    id: 3,
+    metricKey: 'bpo_dials',
+    calcType: 'BONUS_ON_TARGET',
+    rate: null,
+    config: { metricKey: 'bpo_connects', thresholdValue: 2, bonusAmount: 50 },
+  },
+];
+
+const byKey = (items: { userId: number; ruleId: number }[]) =>
+  [...items].sort((a, b) => a.userId - b.userId || a.ruleId - b.ruleId);
+
+describe('incentive simulation', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it('matches the per-day engine for the same metrics', async () => {
+    const at = (s: number) => new Date(`${DAY}T10:00:${String(s).padStart(2, '0')}.000Z`);
+    prisma.user.findMany.mockResolvedValue([{ id: 1 }, { id: 2 }]);
+    prisma.load.findMany.mockResolvedValue([
+      { createdById: 1, billAmount: 600, miles: 100, marginAmount: 120 },
+      { createdById: 1, billAmount: 400, miles: 50, marginAmount: 80 },
+    ]);
+    prisma.bpoCallLog.findMany.mockResolvedValue([
+      { dialCount: 50, isConnected: false, dealWon: false, callStartedAt: at(0), callEndedAt: null, agent: { userId: 2 } },
+      { dialCount: 4, isConnected: true, dealWon: false, callStartedAt: at(0), callEndedAt: at(30), agent: { userId: 9 } },
+      { dialCount: 3, isConnected: true, dealWon: false, callStartedAt: at(0), callEndedAt: at(20), agent: { userId: 9 } },
+      { dialCount: 3, isConnected: true, dealWon: false, callStartedAt: at(0), callEndedAt: at(10), agent: { userId: 9 } },
+    ]);
+
+    const engine = await computeIncentivesForDayWithRules({ ventureId: 4, date: DAY, rules });
+
+    const cube = buildMetricCube({
+      ventureId: 4,
+      days: [DAY],
+      ventureUserIds: [1, 2],
+      rows: [
+        {
+          family: 'freight',
+          userId: 1,
+          day: DAY,
+          metrics: { loads_completed: 2, loads_revenue: 1000, loads_miles: 150, loads_margin: 200 },
+        },
+        { family: 'bpo', userId: 2, day: DAY, metrics: { bpo_dials: 50, bpo_talk_seconds: 0 } },
+        { family: 'bpo', userId: 9, day: DAY, metrics: { bpo_dials: 10, bpo_connects: 3, bpo_talk_seconds: 60 } },
+      ],
+    });
+    const simulated = simulateRules(cube, rules);
+
+    expect(byKey(simulated)).toEqual(byKey(engine));
+    expect(byKey(simulated).map((i) => [i.userId, i.ruleId, i.amount])).toEqual([
+      [1, 1, 20],
+      [2, 2, 25],
+      [2, 3, 50],
+      [9, 2, 5],
+      [9, 3, 50],
+    ]);
+  });
+
+  it('only counts metric-only users on days they have metrics in a needed family', () => {
+    const days = dayRange('2026-03-01', '2026-03-03');
+    const cube = buildMetricCube({
+      ventureId: 4,
+      days,
+      ventureUserIds: [1],
+      rows: [
+        { family: 'hotel', userId: 7, day: '2026-03-02', metrics: { hotel_reviews_responded: 1 } },
+        { family: 'freight', userId: 8, day: '2026-03-03', metrics: { loads_completed: 1 } },
+      ],
+      hotelDays: [{ day: '2026-03-02', adr: 120, revpar: 90 }],
+    });
+    const adrBonus: EngineRule[] = [
+      { id: 5, metricKey: 'hotel_adr', calcType: 'PERCENT_OF_METRIC', rate: 0.5, config: null },
+    ];
+
+    expect(days).toEqual(['2026-03-01', '2026-03-02', '2026-03-03']);
+    expect(simulateRules(cube, adrBonus).map((i) => [i.userId, i.date, i.amount])).toEqual([
+      [1, '2026-03-02', 60],
+      [7, '2026-03-02', 60],
+    ]);
+    expect(simulateRules(cube, adrBonus, { restrictToUserIds: [7], planId: 11 })).toEqual([
+      { userId: 7, ruleId: 5, amount: 60, date: '2026-03-02', planId: 11 },
+    ]);
+  });
+
+  it('loads the cube with one grouped query per source and caches it', async () => {
+    prisma.user.findMany.mockResolvedValue([{ id: 1 }]);
+    prisma.$queryRaw
+      .mockResolvedValueOnce([{ userId: 1, day: '2026-01-05', loads: 3, revenue: 900, miles: 10, margin: 300 }])
+      .mockResolvedValueOnce([{ userId: 1, day: '2026-01-06', dials: 20, connects: 0, deals: 0, talkSeconds: 0 }])
+      .mockResolvedValueOnce([])
+      .mockResolvedValueOnce([]);
+
+    const first = await loadMetricCube(99, '2026-01-05', '2026-01-06');
+    const second = await loadMetricCube(99, '2026-01-05', '2026-01-06');
+
+    expect(second).toBe(first);
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(4);
+    expect(first.columns.has('bpo_connects')).toBe(false);
+    expect(
+      simulateRules(first, [
+        { id: 1, metricKey: 'loads_margin', calcType: 'PERCENT_OF_METRIC', rate: 0.1, config: null },
+      ]).map((i) => [i.date, i.amount])
+    ).toEqual([['2026-01-05', 30]]);
+  });
+});
@@ -0,0 +1,79 @@
+import { mkdtempSync, readFileSync, rmSync } from 'fs';
+import { tmpdir } from 'os';
+import path from 'path';
+import { Readable } from 'stream';
+
+const root = mkdtempSync(path.join(tmpdir(), 'storage-'));
+process.env.STORAGE_PROVIDER = 'local';
+process.env.LOCAL_STORAGE_DIR = root;
+process.env.LOCAL_STORAGE_CHUNK_BYTES = '4';
+process.env.STORAGE_SIGNING_SECRET = 'test-secret';
+
+// eslint-disable-next-line @typescript-eslint/no-var-requires
+const storage = require('@/lib/storage') as typeof import('@/lib/storage');
+
+describe('local storage adapter', () => {
+  const client = storage.createStorageClient('docs');
+
+  afterAll(() => rmSync(root, { recursive: true, force: true }));
+
+  it('streams uploads to disk and refuses to overwrite', async () => {
+    const body = Readable.from([Buffer.from('hello '), Buffer.from('world')]);
+    const result = await client.upload('venture-1/general-0/a.pdf', body, 'application/pdf');
+
+    expect(result).toEqual({ provider: 'local', bucket: 'docs', path: 'venture-1/general-0/a.pdf' });
+    expect(readFileSync(path.join(root, 'docs/venture-1/general-0/a.pdf'), 'utf8')).toBe('hello world');
+    await expect(client.upload('venture-1/general-0/a.pdf', Buffer.from('x'), 'application/pdf')).rejects.toThrow(
+      'already exists'
+    );
+    await expect(client.upload('../escape.pdf', Buffer.from('x'), 'application/pdf')).rejects.toThrow(
+      'Invalid storage key'
+    );
+  });
+
+  it('resumes a chunked upload from the stored offset', async () => {
+    const session = await client.createUploadSession('venture-1/task-3/b.pdf', 'application/pdf', 10, {
+      uploadedById: 7,
+    });
+    expect(session).toMatchObject({ uploadedBytes: 0, chunkSize: 4, totalBytes: 10 });
+
+    await client.uploadChunk(session.sessionId, 0, Buffer.from('0123'));
+    await expect(client.uploadChunk(session.sessionId, 0, Buffer.from('0123'))).rejects.toBeInstanceOf(
+      storage.UploadOffsetError
+    );
+
+    const resumed = await client.getUploadSession(session.sessionId);
+    expect(resumed).toMatchObject({ uploadedBytes: 4, metadata: { uploadedById: 7 } });
+
+    const middle = await client.uploadChunk(session.sessionId, 4, Buffer.from('4567'));
+    expect(middle.completed).toBeNull();
+    const last = await client.uploadChunk(session.sessionId, 8, Buffer.from('89'));
+
+    expect(last.completed).toEqual({ provider: 'local', bucket: 'docs', path: 'venture-1/task-3/b.pdf' });
+    expect(readFileSync(path.join(root, 'docs/venture-1/task-3/b.pdf'), 'utf8')).toBe('0123456789');
+    expect(await client.getUploadSession(session.sessionId)).toBeNull();
+  });
+
+  it('rejects tampered session tokens', async () => {
+    const session = await client.createUploadSession('c.pdf', 'application/pdf', 4);
+    const [payload] = session.sessionId.split('.');
+
+    expect(await client.getUploadSession(`${payload}.forged`)).toBeNull();
+    expect(storage.storageClientForSession(`${payload}.forged`)).toBeNull();
+    expect(storage.storageClientForSession(session.sessionId)).not.toBeNull();
+  });
+
+  it('serves objects only through unexpired signed URLs', async () => {
+    await client.upload('d.pdf', Buffer.from('pdf'), 'application/pdf');
+    const url = new URL(await client.signedUrl('docs', 'd.pdf', 60), 'http://localhost');
+    const expires = Number(url.searchParams.get('expires'));
+    const signature = url.searchParams.get('signature')!;
+
+    expect(url.pathname).toBe('/api/files/local/docs/d.pdf');
+    const stream = await storage.openLocalObject('docs', 'd.pdf', expires, signature);
+    expect(stream).not.toBeNull();
+    stream!.destroy();
+    expect(await storage.openLocalObject('docs', 'd.pdf', expires + 1, signature)).toBeNull();
+    expect(await storage.openLocalObject('docs', 'd.pdf', Date.now() - 1, signature)).toBeNull();
+  });
+});
@@ -0,0 +1,105 @@
+import { runAudit } from '@/lib/audit/runAudit';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    auditRun: { findFirst: jest.fn(), create: jest.fn(), update: jest.fn() },
+    auditCheck: { findMany: jest.fn() },
+    auditIssue: { findMany: jest.fn(), createMany: jest.fn(), updateMany: jest.fn() },
+    load: { findMany: jest.fn() },
+    hotelDailyReport: { findMany: jest.fn() },
+    $transaction: jest.fn((ops: any[]) => Promise.all(ops)),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const NEGATIVE_MARGIN = { id: 1, key: 'freight.negative_margin_loads', module: 'FREIGHT', severity: 'HIGH' };
+
+describe('runAudit', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    prisma.auditRun.create.mockResolvedValue({ id: 42 });
+    prisma.auditRun.update.mockImplementation(async ({ data }: any) => ({ id: 42, ...data, issues: [] }));
+    prisma.auditCheck.findMany.mockResolvedValue([NEGATIVE_MARGIN]);
+    prisma.auditIssue.createMany.mockImplementation(async ({ data }: any) => ({ count: data.length }));
+    prisma.auditIssue.updateMany.mockResolvedValue({ count: 1 });
+  });
+
+  it('scans only loads changed since the previous run or with an open issue', async () => {
+    const since = new Date('2026-03-01T10:00:00Z');
+    prisma.auditRun.findFirst.mockResolvedValue({ createdAt: since });
+    prisma.auditIssue.findMany.mockResolvedValue([
+      { id: 500, auditCheckId: 1, targetType: 'LOAD', targetId: '7' },
+      { id: 501, auditCheckId: 1, targetType: 'LOAD', targetId: '8' },
+    ]);
+    prisma.load.findMany.mockResolvedValue([
+      // still failing: keeps its open issue
+      { id: 7, billAmount: 100, costAmount: 150, ventureId: 1, officeId: 1 },
+      // newly failing
+      { id: 9, billAmount: 100, costAmount: 120, ventureId: 1, officeId: 1 },
+      // load 8 was fixed and is no longer returned
+    ]);
+
+    const run = await runAudit({});
+
+    const where = prisma.load.findMany.mock.calls[0][0].where;
+    expect(where.AND).toContainEqual({
+      OR: [{ updatedAt: { gt: since } }, { id: { in: [7, 8] } }],
+    });
+    expect(prisma.auditRun.create).toHaveBeenCalledWith({
+      data: expect.objectContaining({ scannedSince: since }),
+    });
+
+    expect(prisma.auditIssue.createMany).toHaveBeenCalledTimes(1);
+    const created = prisma.auditIssue.createMany.mock.calls[0][0].data;
+    expect(created.map((i: any) => i.targetId)).toEqual(['9']);
+    expect(prisma.auditIssue.updateMany).toHaveBeenCalledWith({
+      where: { id: { in: [501] }, status: 'OPEN' },
+      data: { status: 'RESOLVED', resolvedAt: expect.any(Date) },
+    });
+
+    expect(run.stats).toEqual(
+      expect.objectContaining({
+        mode: 'incremental',
+        checksRun: 1,
+        checksFailed: 0,
+        issuesFound: 2,
+        issuesOpened: 1,
+        issuesResolved: 1,
+      })
+    );
+  });
+
+  it('does a full scan when there is no previous run', async () => {
+    prisma.auditRun.findFirst.mockResolvedValue(null);
+    prisma.auditIssue.findMany.mockResolvedValue([]);
+    prisma.load.findMany.mockResolvedValue([]);
+
+    const run = await runAudit({});
+
+    const where = prisma.load.findMany.mock.calls[0][0].where;
+    expect(where.AND).toHaveLength(2);
+    expect(prisma.$transaction).not.toHaveBeenCalled();
+    expect(run.stats.mode).toBe('full');
+    expect(run.overallScore).toBe(100);
+  });
+
+  it('only resolves open issues inside the scope on scoped runs', async () => {
+    prisma.auditRun.findFirst.mockResolvedValue(null);
+    prisma.auditIssue.findMany.mockResolvedValue([
+      { id: 600, auditCheckId: 1, targetType: 'LOAD', targetId: '20' },
+      { id: 601, auditCheckId: 1, targetType: 'LOAD', targetId: '21' },
+    ]);
+    prisma.load.findMany
+      .mockResolvedValueOnce([]) // no failing loads in venture 3
+      .mockResolvedValueOnce([{ id: 20 }]); // only load 20 belongs to venture 3
+
+    await runAudit({ scopeVentureId: 3 });
+
+    expect(prisma.auditIssue.updateMany).toHaveBeenCalledWith({
+      where: { id: { in: [600] }, status: 'OPEN' },
+      data: expect.objectContaining({ status: 'RESOLVED' }),
+    });
+  });
+});
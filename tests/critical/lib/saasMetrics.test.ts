@@ -0,0 +1,140 @@
+import { clearCache } from '@/lib/cache/simple';
+import {
+  denseSeries,
+  getSaasCohorts,
+  getSaasMetrics,
+  invalidateSaasMetrics,
+  monthWindow,
+} from '@/lib/saas/metrics';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    $queryRaw: jest.fn(),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const NOW = new Date(2026, 2, 15, 12, 0, 0);
+
+describe('saas subscription ledger metrics', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+    clearCache();
+  });
+
+  it('bounds each month just after its last second', () => {
+    const { starts, ends, bounds } = monthWindow(NOW, 3);
+
+    expect(starts).toEqual([new Date(2026, 0, 1), new Date(2026, 1, 1), new Date(2026, 2, 1)]);
+    expect(ends[1]).toEqual(new Date(2026, 1, 28, 23, 59, 59));
+    expect(bounds[1].getTime() - ends[1].getTime()).toBe(1);
+  });
+
+  it('carries sparse running totals forward', () => {
+    expect(
+      denseSeries(
+        [
+          { idx: 1, mrr: 10, customers: 1 },
+          { idx: 3, mrr: 1e-12, customers: 0 },
+        ],
+        5
+      ).map((p) => [p.mrr, p.customers])
+    ).toEqual([
+      [0, 0],
+      [10, 1],
+      [10, 1],
+      [0, 0],
+      [0, 0],
+    ]);
+  });
+
+  it('builds the metrics payload from three queries and caches it per scope', async () => {
+    prisma.$queryRaw
+      .mockResolvedValueOnce([
+        {
+          currentMrr: 300,
+          activeSubscriptions: 3,
+          activeCustomers: 2,
+          newMrrThisMonth: 100,
+          churnedThisMonth: 3,
+          churnedMrrThisMonth: 50,
+          totalCustomers: 4,
+        },
+      ])
+      .mockResolvedValueOnce([
+        { kind: 'plan', key: 'Basic', count: 1, mrr: 100 },
+        { kind: 'plan', key: 'Pro', count: 2, mrr: 200 },
+        { kind: 'reason', key: 'Not specified', count: 2, mrr: 20 },
+        { kind: 'reason', key: 'Price', count: 1, mrr: 30 },
+      ])
+      .mockResolvedValueOnce([
+        { idx: 0, mrr: 100, customers: 1 },
+        { idx: 9, mrr: 250.0000000001, customers: 2 },
+        { idx: 11, mrr: 300, customers: 2 },
+      ]);
+
+    const metrics = await getSaasMetrics([7], NOW);
+    const again = await getSaasMetrics([7], NOW);
+
+    expect(again).toBe(metrics);
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(3);
+    expect(metrics.summary).toMatchObject({
+      currentMrr: 300,
+      currentArr: 3600,
+      lastMonthMrr: 250,
+      mrrGrowth: 20,
+      netNewMrr: 50,
+      revenueChurnRate: 20,
+      arpu: 150,
+      totalCustomers: 4,
+    });
+    expect(metrics.monthlyTrend).toHaveLength(12);
+    expect(metrics.monthlyTrend[0]).toEqual({ month: 'Apr 25', mrr: 100, arr: 1200, customers: 1 });
+    expect(metrics.monthlyTrend.map((m) => m.customers)).toEqual([1, 1, 1, 1, 1, 1, 1, 1, 1, 2, 2, 2]);
+    expect(metrics.planBreakdown.map((p) => p.plan)).toEqual(['Basic', 'Pro']);
+    expect(metrics.cancelReasons[0]).toEqual({ reason: 'Not specified', count: 2, mrr: 20 });
+
+    invalidateSaasMetrics();
+    prisma.$queryRaw.mockResolvedValue([]);
+    const fresh = await getSaasMetrics([7], NOW);
+    expect(fresh.summary.currentMrr).toBe(0);
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(6);
+  });
+
+  it('turns per-cohort running totals into retention rows', async () => {
+    prisma.$queryRaw.mockResolvedValueOnce([
+      { cohort: 3, idx: 3, initialCustomers: 2, initialMrr: 200, mrr: 200, customers: 2 },
+      { cohort: 3, idx: 4, initialCustomers: 2, initialMrr: 200, mrr: 100, customers: 1 },
+      { cohort: 5, idx: 5, initialCustomers: 1, initialMrr: 50, mrr: 50, customers: 1 },
+    ]);
+
+    const result = await getSaasCohorts(null, 6, NOW);
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(result.cohorts).toEqual([
+      {
+        cohort: 'Jan 26',
+        cohortDate: new Date(2026, 0, 1),
+        initialCustomers: 2,
+        initialMrr: 200,
+        retention: [100, 50, 50],
+        mrrRetention: [100, 50, 50],
+      },
+      {
+        cohort: 'Mar 26',
+        cohortDate: new Date(2026, 2, 1),
+        initialCustomers: 1,
+        initialMrr: 50,
+        retention: [100],
+        mrrRetention: [100],
+      },
+    ]);
+    expect(result.summary).toEqual({
+      totalCohorts: 2,
+      avgRetentionByMonth: [100, 50, 50],
+      estimatedLtvMonths: 2,
+    });
+  });
+});
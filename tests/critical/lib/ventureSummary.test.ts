@@ -0,0 +1,164 @@
+import {
+  emptyWindowTotals,
+  landingWindows,
+  mergeOpsCounts,
+  mergeVentureSummaries,
+  readVentureSummaries,
+  type VentureSummary,
+} from '@/lib/ventureSummary';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    $queryRaw: jest.fn(),
+    $executeRaw: jest.fn().mockResolvedValue(1),
+    venture: { findMany: jest.fn() },
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+
+const NOW = new Date('2026-03-15T12:00:00.000Z');
+const iso = (date: Date) => date.toISOString().slice(0, 10);
+
+function summary(ventureId: number, overrides: Partial<VentureSummary> = {}): VentureSummary {
+  return {
+    ventureId,
+    offices: 1,
+    properties: 0,
+    agents: 0,
+    mrr: 0,
+    activeCustomers: 0,
+    bank: null,
+    windows: { current: emptyWindowTotals(), previous: emptyWindowTotals() },
+    ops: {},
+    ...overrides,
+  };
+}
+
+describe('venture summary snapshots', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it('covers the trailing 30 UTC days and the 30 before them', () => {
+    const [current, previous] = landingWindows(NOW);
+    expect([iso(current.from), iso(current.toExclusive)]).toEqual(['2026-02-14', '2026-03-16']);
+    expect([iso(previous.from), iso(previous.toExclusive)]).toEqual(['2026-01-15', '2026-02-14']);
+  });
+
+  it('merges venture totals into dashboard sections', () => {
+    const a = summary(1, {
+      agents: 2,
+      mrr: 1000,
+      bank: { balance: 500, date: '2026-03-10' },
+      windows: {
+        current: {
+          ...emptyWindowTotals(),
+          loads: 4,
+          deliveredLoads: 3,
+          loadRevenue: 1000,
+          loadMargin: 150,
+          calls: 10,
+          talkSeconds: 6000,
+          endMrr: 800,
+          incentives: 40,
+          incentiveUserIds: [7, 8],
+        },
+      },
+    });
+    const b = summary(2, {
+      properties: 1,
+      bank: { balance: 250, date: '2026-03-12' },
+      windows: {
+        current: {
+          ...emptyWindowTotals(),
+          kpiDays: 2,
+          roomsAvailable: 100,
+          roomsSold: 60,
+          adrSum: 200,
+          revparSum: 120,
+          lossNights: 1,
+          incentives: 10,
+          incentiveUserIds: [8],
+        },
+      },
+    });
+
+    const merged = mergeVentureSummaries([a, b], 'current', 30);
+
+    expect(merged.offices).toBe(2);
+    expect(merged.bank).toEqual({ total: 750, asOf: '2026-03-12' });
+    expect(merged.logistics).toEqual({ totalLoads: 4, deliveredLoads: 3, marginPct: 15, atRiskLoads: 0 });
+    expect(merged.hospitality).toEqual({ properties: 1, occupancyPct: 60, adr: 100, revpar: 60, highLossNights: 1 });
+    expect(merged.bpo).toEqual({ agents: 2, totalCalls: 10, avgTalkMinutes: 10, utilizationPct: 0.5 });
+    expect(merged.saas).toMatchObject({ mrr: 1000, arr: 12000, netGrowthPct: 25 });
+    expect(merged.incentives).toEqual({ totalIncentives: 50, venturesWithIncentives: 2, employeesWithIncentives: 2 });
+  });
+
+  it('filters task and policy counts by test flag and office', () => {
+    const s = summary(1, {
+      ops: { '0:': [1, 0, 2, 0], '0:5': [3, 1, 0, 0], '0:9': [4, 0, 1, 1], '1:': [9, 9, 9, 9] },
+    });
+
+    expect(mergeOpsCounts([s], { isTest: false, officeIds: null })).toEqual({
+      openTasks: 8,
+      overdueTasks: 1,
+      activePolicies: 3,
+      expiringPolicies: 1,
+    });
+    expect(mergeOpsCounts([s], { isTest: false, officeIds: [5] }).openTasks).toBe(4);
+    expect(mergeOpsCounts([s], { isTest: true, officeIds: null }).openTasks).toBe(9);
+  });
+
+  it('serves fresh snapshots with a single query', async () => {
+    const windowEnd = landingWindows(NOW)[0].toExclusive;
+    prisma.$queryRaw.mockResolvedValueOnce([
+      { id: 1, type: 'LOGISTICS', summary: summary(1), windowEnd, computedAt: NOW, staleAt: null },
+      { id: 2, type: 'HOSPITALITY', summary: summary(2), windowEnd, computedAt: NOW, staleAt: null },
+    ]);
+
+    const result = await readVentureSummaries({ ventureIds: null, activeOnly: true }, NOW);
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(prisma.$executeRaw).not.toHaveBeenCalled();
+    expect(result.ventures).toEqual([
+      { id: 1, type: 'LOGISTICS' },
+      { id: 2, type: 'HOSPITALITY' },
+    ]);
+    expect(result.summaries.map((s) => s.ventureId)).toEqual([1, 2]);
+  });
+
+  it('recomputes only stale or rolled-over snapshots', async () => {
+    const windowEnd = landingWindows(NOW)[0].toExclusive;
+    const yesterday = new Date(windowEnd.getTime() - 24 * 60 * 60 * 1000);
+    prisma.$queryRaw
+      .mockResolvedValueOnce([
+        { id: 1, type: 'LOGISTICS', summary: summary(1), windowEnd, computedAt: NOW, staleAt: null },
+        { id: 2, type: 'SAAS', summary: summary(2), windowEnd, computedAt: NOW, staleAt: NOW },
+        { id: 3, type: 'BPO', summary: summary(3), windowEnd: yesterday, computedAt: NOW, staleAt: null },
+      ])
+      .mockResolvedValueOnce([{ startedAt: NOW }])
+      .mockResolvedValueOnce([
+        { ventureId: 2, offices: 4, properties: 0, agents: 0, mrr: 300, activeCustomers: 3, balance: null, bankDate: null },
+        { ventureId: 3, offices: 1, properties: 0, agents: 5, mrr: 0, activeCustomers: 0, balance: null, bankDate: null },
+      ])
+      .mockResolvedValueOnce([])
+      .mockResolvedValueOnce([])
+      .mockResolvedValueOnce([{ ventureId: 3, key: 'current', calls: 12, talkSeconds: 3600 }])
+      .mockResolvedValueOnce([])
+      .mockResolvedValueOnce([])
+      .mockResolvedValueOnce([{ ventureId: 2, isTest: false, officeId: null, counts: [2, 1, 0, 0] }]);
+
+    const result = await readVentureSummaries({ ventureIds: [1, 2, 3] }, NOW);
+
+    const refreshedIds = prisma.$queryRaw.mock.calls[1].slice(1);
+    expect(refreshedIds).toContainEqual([2, 3]);
+    expect(prisma.$executeRaw).toHaveBeenCalledTimes(1);
+
+    const byId = new Map(result.summaries.map((s) => [s.ventureId, s]));
+    expect(byId.get(1)!.offices).toBe(1);
+    expect(byId.get(2)).toMatchObject({ offices: 4, mrr: 300, ops: { '0:': [2, 1, 0, 0] } });
+    expect(byId.get(3)!.windows.current).toMatchObject({ calls: 12, talkSeconds: 3600 });
+  });
+});
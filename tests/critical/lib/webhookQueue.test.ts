@@ -0,0 +1,111 @@
+import { enqueueWebhook, enqueueWebhooks, payloadDigest } from '@/lib/webhooks/queue';
+import { drainWebhookQueue } from '@/lib/webhooks/worker';
+
+jest.mock('@/lib/prisma', () => {
+  const prismaMock = {
+    $queryRaw: jest.fn(),
+    $executeRaw: jest.fn().mockResolvedValue(1),
+  };
+  return { __esModule: true, default: prismaMock, prisma: prismaMock };
+});
+
+jest.mock('@/lib/outreach/inboundHandler', () => ({
+  handleInboundSms: jest.fn().mockResolvedValue({ success: true }),
+  handleInboundEmail: jest.fn().mockResolvedValue({ success: true }),
+}));
+
+jest.mock('@/lib/webhooks/dispatchInbound', () => ({
+  processDispatchSms: jest.fn(),
+  processDispatchEmail: jest.fn(),
+}));
+
+const prisma = jest.requireMock('@/lib/prisma').default;
+const { handleInboundSms } = jest.requireMock('@/lib/outreach/inboundHandler');
+const { processDispatchSms } = jest.requireMock('@/lib/webhooks/dispatchInbound');
+
+const RECEIVED = new Date('2026-03-16T10:00:00.000Z');
+
+describe('webhook queue', () => {
+  beforeEach(() => {
+    jest.clearAllMocks();
+  });
+
+  it('reports provider retries of a queued callback as duplicates', async () => {
+    prisma.$queryRaw.mockResolvedValueOnce([{ id: 41 }]).mockResolvedValueOnce([]);
+    const event = {
+      source: 'TWILIO_INBOUND' as const,
+      idempotencyKey: 'SM123',
+      orderingKey: 'sms:5551234567:5559876543',
+      payload: { from: '+15551234567' },
+    };
+
+    expect(await enqueueWebhook(event)).toEqual({ id: 41, duplicate: false });
+    expect(await enqueueWebhook(event)).toEqual({ id: null, duplicate: true });
+  });
+
+  it('enqueues a multi-message callback in one statement', async () => {
+    prisma.$queryRaw.mockResolvedValueOnce([{ id: 1 }]);
+
+    const result = await enqueueWebhooks([
+      { source: 'SENDGRID_INBOUND', idempotencyKey: 'a', orderingKey: 'email:x@y.com', payload: {} },
+      { source: 'SENDGRID_INBOUND', idempotencyKey: 'b', orderingKey: 'email:x@y.com', payload: {} },
+    ]);
+
+    expect(prisma.$queryRaw).toHaveBeenCalledTimes(1);
+    expect(result).toEqual({ queued: 1, duplicates: 1 });
+    expect(payloadDigest({ a: 1 })).toBe(payloadDigest({ a: 1 }));
+  });
+
+  it('completes processed events and reschedules failures in batch', async () => {
+    const retryAt = new Date(Date.now() + 5000);
+    prisma.$queryRaw
+      .mockResolvedValueOnce([
+        { id: 1, source: 'TWILIO_INBOUND', orderingKey: 'sms:1:2', payload: { body: 'yes' }, attempts: 1, receivedAt: RECEIVED },
+        { id: 2, source: 'DISPATCH_SMS', orderingKey: 'dispatch-sms:3', payload: { Body: 'eta?' }, attempts: 1, receivedAt: RECEIVED },
+      ])
+      .mockResolvedValueOnce([{ availableAt: retryAt }])
+      .mockResolvedValueOnce([]);
+    processDispatchSms.mockRejectedValueOnce(new Error('No default venture configured'));
+
+    const stats = await drainWebhookQueue('worker-1');
+
+    expect(handleInboundSms).toHaveBeenCalledWith({ body: 'yes' });
+    expect(processDispatchSms).toHaveBeenCalledWith({ Body: 'eta?' }, RECEIVED);
+    expect(stats).toEqual({ batches: 1, processed: 1, failed: 1, nextRetryAt: retryAt });
+
+    expect(prisma.$executeRaw).toHaveBeenCalledTimes(1);
+    expect(prisma.$executeRaw.mock.calls[0]).toContainEqual([1]);
+    expect(prisma.$queryRaw.mock.calls[1]).toContainEqual([2]);
+    expect(prisma.$queryRaw.mock.calls[1]).toContainEqual(['No default venture configured']);
+  });
+
+  it('keeps at most `concurrency` events of a batch in flight', async () => {
+    prisma.$queryRaw
+      .mockResolvedValueOnce([1, 2, 3].map((id) => ({
+        id, source: 'TWILIO_INBOUND', orderingKey: `sms:${id}`, payload: { id }, attempts: 1, receivedAt: RECEIVED,
+      })))
+      .mockResolvedValueOnce([]);
+    let inFlight = 0;
+    let peak = 0;
+    handleInboundSms.mockImplementation(async () => {
+      peak = Math.max(peak, ++inFlight);
+      await new Promise((resolve) => setTimeout(resolve, 5));
+      inFlight--;
+    });
+
+    const stats = await drainWebhookQueue('worker-1', { concurrency: 2 });
+
+    expect(stats.processed).toBe(3);
+    expect(peak).toBe(2);
+    handleInboundSms.mockResolvedValue({ success: true });
+  });
+
+  it('stops when nothing is claimable', async () => {
+    prisma.$queryRaw.mockResolvedValueOnce([]);
+
+    const stats = await drainWebhookQueue('worker-1');
+
+    expect(stats).toEqual({ batches: 0, processed: 0, failed: 0, nextRetryAt: null });
+    expect(prisma.$executeRaw).not.toHaveBeenCalled();
+  });
+});
@@ -18,6 +18,7 @@ jest.mock("@/lib/prisma", () => ({
         },
       ]),
     },
+    $queryRaw: jest.fn().mockResolvedValue([{ version: 1 }]),
   },
 }));
 
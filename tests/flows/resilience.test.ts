@@ -6,6 +6,8 @@
 
 import { withRetry } from '../../lib/resilience/withRetry';
 import { getCircuitBreaker, CircuitBreaker } from '../../lib/resilience/circuitBreaker';
+import { TokenBucket, getTokenBucket } from '../../lib/resilience/tokenBucket';
+import { runWithConcurrency } from '../../lib/utils/workerPool';
 
 describe('Resilience - Retry Logic', () => {
   describe('withRetry()', () => {
@@ -230,4 +232,50 @@ describe('Resilience - Circuit Breaker', () => {
   });
 });
 
+describe('Resilience - Rate Limiting', () => {
+  describe('TokenBucket', () => {
+    it('should allow an initial burst up to capacity', () => {
+      const bucket = new TokenBucket('burst-test', { ratePerSecond: 10, capacity: 3 });
 
+      expect(bucket.tryTake()).toBe(true);
+      expect(bucket.tryTake()).toBe(true);
+      expect(bucket.tryTake()).toBe(true);
+      expect(bucket.tryTake()).toBe(false);
+    });
+
+    it('should pace waiters at the configured rate', async () => {
+      const bucket = new TokenBucket('pace-test', { ratePerSecond: 50, capacity: 1 });
+
+      const start = Date.now();
+      await Promise.all(Array.from({ length: 6 }, () => bucket.take()));
+      const elapsed = Date.now() - start;
+
+      // 1 immediate token + 5 refills at 20ms each
+      expect(elapsed).toBeGreaterThanOrEqual(90);
+      expect(bucket.pending()).toBe(0);
+    });
+
+    it('should return same instance for same name', () => {
+      expect(getTokenBucket('bucket-singleton')).toBe(getTokenBucket('bucket-singleton'));
+    });
+  });
+
+  describe('runWithConcurrency()', () => {
+    it('should cap in-flight calls and keep result order', async () => {
+      let inFlight = 0;
+      let maxInFlight = 0;
+
+      const results = await runWithConcurrency([1, 2, 3, 4, 5, 6], 2, async n => {
+        inFlight++;
+        maxInFlight = Math.max(maxInFlight, inFlight);
+        await new Promise(resolve => setTimeout(resolve, 10));
+        inFlight--;
+        if (n === 4) throw new Error('boom');
+        return n * 10;
+      });
+
+      expect(maxInFlight).toBe(2);
+      expect(results.map(r => (r.ok ? r.value : 'err'))).toEqual([10, 20, 30, 'err', 50, 60]);
+    });
+  });
+});
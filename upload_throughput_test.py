@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Upload throughput test for /api/files/upload and resumable upload sessions.
+
+Run the app against the local storage adapter so no Supabase project is needed:
+
+    STORAGE_PROVIDER=local LOCAL_STORAGE_DIR=/tmp/siox-storage npm run dev
+
+then:
+
+    SESSION_TOKEN=<next-auth.session-token cookie> python3 upload_throughput_test.py [files] [sizeKb]
+"""
+
+import os
+import sys
+import time
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+SESSION_TOKEN = os.environ.get("SESSION_TOKEN", "")
+PDF_HEADER = b"%PDF-1.4\n"
+
+
+def make_session():
+    session = requests.Session()
+    if SESSION_TOKEN:
+        session.cookies.set("next-auth.session-token", SESSION_TOKEN)
+    return session
+
+
+def payload(size_bytes):
+    return PDF_HEADER + os.urandom(max(0, size_bytes - len(PDF_HEADER)))
+
+
+def one_shot_upload(session, data, index):
+    # Fields before the file: the server streams the file as it arrives
+    response = session.post(
+        f"{BASE_URL}/api/files/upload",
+        data={"tag": "throughput-test"},
+        files={"file": (f"throughput-{index}.pdf", data, "application/pdf")},
+        timeout=60,
+    )
+    return response.status_code == 200, response
+
+
+def resumable_upload(session, data, index, drop_after_first_chunk=False):
+    start = session.post(
+        f"{BASE_URL}/api/files/upload-sessions",
+        json={
+            "fileName": f"throughput-resumable-{index}.pdf",
+            "mimeType": "application/pdf",
+            "sizeBytes": len(data),
+            "tag": "throughput-test",
+        },
+        timeout=30,
+    )
+    if start.status_code != 201:
+        return False, start
+
+    upload = start.json()["session"]
+    url = f"{BASE_URL}/api/files/upload-sessions/{upload['sessionId']}"
+    chunk_size = upload["chunkSize"]
+    offset = 0
+    response = start
+
+    while offset < len(data):
+        chunk = data[offset:offset + chunk_size]
+        response = session.put(
+            url,
+            data=chunk,
+            headers={"Upload-Offset": str(offset), "Content-Type": "application/octet-stream"},
+            timeout=60,
+        )
+        if response.status_code != 200:
+            return False, response
+        offset = response.json()["session"]["uploadedBytes"]
+
+        if drop_after_first_chunk:
+            # Simulate a dropped connection: ask the server where to resume
+            drop_after_first_chunk = False
+            status = session.get(url, timeout=30)
+            if status.status_code != 200:
+                return False, status
+            offset = status.json()["session"]["uploadedBytes"]
+
+    return response.json().get("file") is not None, response
+
+
+def run(label, fn, files, size_bytes):
+    session = make_session()
+    blobs = [payload(size_bytes) for _ in range(files)]
+    failures = []
+
+    started = time.perf_counter()
+    for i, blob in enumerate(blobs):
+        ok, response = fn(session, blob, i)
+        if not ok:
+            failures.append((i, response.status_code, response.text[:200]))
+    elapsed = time.perf_counter() - started
+
+    total_mb = files * size_bytes / (1024 * 1024)
+    print(f"{'✅' if not failures else '❌'} {label}: {files} files, {total_mb:.1f}MB in {elapsed:.2f}s "
+          f"({total_mb / max(elapsed, 1e-9):.2f} MB/s, {files / max(elapsed, 1e-9):.1f} files/s)")
+    for failure in failures[:5]:
+        print(f"   file {failure[0]} -> {failure[1]}: {failure[2]}")
+    return not failures
+
+
+def main():
+    files = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    size_kb = int(sys.argv[2]) if len(sys.argv) > 2 else 4096
+
+    print("🚀 UPLOAD THROUGHPUT TEST")
+    print("=" * 50)
+    print(f"Target: {BASE_URL} ({files} files x {size_kb}KB)")
+
+    results = [
+        run("One-shot streaming upload", one_shot_upload, files, size_kb * 1024),
+        run("Resumable chunked upload", resumable_upload, files, size_kb * 1024),
+        run(
+            "Resumable upload with a dropped connection",
+            lambda s, d, i: resumable_upload(s, d, i, drop_after_first_chunk=True),
+            max(1, files // 4),
+            size_kb * 1024,
+        ),
+    ]
+
+    # Oversized files must be rejected without being stored
+    ok, response = one_shot_upload(make_session(), payload(6 * 1024 * 1024), "oversize")
+    rejected = not ok and response.status_code == 400
+    print(f"{'✅' if rejected else '❌'} Oversized upload rejected -> {response.status_code}")
+    results.append(rejected)
+
+    print(f"\nTests passed: {sum(results)}/{len(results)}")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Webhook burst test for the queued provider callbacks.
+
+Replays a campaign-sized burst of Twilio SMS callbacks (plus provider-style
+retries of the same MessageSid) against the webhook routes, checks every one
+is acknowledged quickly, then watches /api/admin/jobs/webhook-queue until the
+queue drains.
+
+Run the app without TWILIO_AUTH_TOKEN (or send no signature header, as this
+script does) so callbacks are accepted unsigned:
+
+    SESSION_TOKEN=<admin next-auth.session-token cookie> python3 webhook_burst_test.py [callbacks] [senders]
+"""
+
+import os
+import sys
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+BASE_URL = os.environ.get("BASE_URL", "http://localhost:3000")
+SESSION_TOKEN = os.environ.get("SESSION_TOKEN", "")
+THREADS = int(os.environ.get("THREADS", "32"))
+ROUTES = ["/api/webhooks/twilio/inbound", "/api/webhooks/dispatch/twilio-sms"]
+ACK_P95_BUDGET_MS = 500
+DRAIN_TIMEOUT_S = 300
+
+
+def make_session():
+    session = requests.Session()
+    if SESSION_TOKEN:
+        session.cookies.set("next-auth.session-token", SESSION_TOKEN)
+    return session
+
+
+def callbacks(count, senders):
+    """Twilio-shaped form payloads; a few senders talk a lot, as in a burst."""
+    run = uuid.uuid4().hex[:8]
+    out = []
+    for i in range(count):
+        sender = i % senders
+        out.append({
+            "route": ROUTES[i % len(ROUTES)],
+            "form": {
+                "MessageSid": f"SMburst{run}{i:06d}",
+                "AccountSid": "ACburst",
+                "From": f"+1555{sender:07d}",
+                "To": "+15550000000",
+                "Body": f"burst {run} message {i} from sender {sender}",
+            },
+        })
+    return out
+
+
+def post(session, callback):
+    started = time.perf_counter()
+    try:
+        response = session.post(f"{BASE_URL}{callback['route']}", data=callback["form"], timeout=30)
+        status = response.status_code
+    except requests.RequestException:
+        status = 0
+    return status, (time.perf_counter() - started) * 1000
+
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def replay(label, batch):
+    session = make_session()
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=THREADS) as pool:
+        results = list(pool.map(lambda c: post(session, c), batch))
+    elapsed = time.perf_counter() - started
+
+    failures = [status for status, _ in results if status != 200]
+    latencies = [ms for _, ms in results]
+    p50, p95 = percentile(latencies, 50), percentile(latencies, 95)
+    ok = not failures and p95 <= ACK_P95_BUDGET_MS
+    print(f"{'✅' if ok else '❌'} {label}: {len(batch)} callbacks in {elapsed:.2f}s "
+          f"({len(batch) / max(elapsed, 1e-9):.0f}/s), ack p50 {p50:.0f}ms p95 {p95:.0f}ms")
+    if failures:
+        print(f"   non-200 responses: {len(failures)} (e.g. {sorted(set(failures))[:5]})")
+    return ok
+
+
+def queue_stats(session):
+    response = session.get(f"{BASE_URL}/api/admin/jobs/webhook-queue", timeout=30)
+    if response.status_code != 200:
+        return None
+    return response.json()
+
+
+def wait_for_drain():
+    if not SESSION_TOKEN:
+        print("⚠️  SESSION_TOKEN not set - skipping queue depth/lag checks")
+        return True
+
+    session = make_session()
+    started = time.perf_counter()
+    peak_depth, peak_lag = 0, 0
+    while time.perf_counter() - started < DRAIN_TIMEOUT_S:
+        stats = queue_stats(session)
+        if stats is None:
+            print("❌ /api/admin/jobs/webhook-queue unavailable")
+            return False
+        peak_depth = max(peak_depth, stats["depth"])
+        peak_lag = max(peak_lag, stats["lagMs"])
+        if stats["depth"] == 0:
+            elapsed = time.perf_counter() - started
+            print(f"✅ Queue drained in {elapsed:.1f}s (peak depth {peak_depth}, peak lag {peak_lag / 1000:.1f}s, "
+                  f"failed {stats['failed']})")
+            for source in stats["sources"]:
+                print(f"   {source['source']}: processed/h {source['processedLastHour']}, "
+                      f"avg lag {source['avgProcessLagMs'] or 0:.0f}ms, p95 {source['p95ProcessLagMs'] or 0:.0f}ms")
+            return True
+        time.sleep(1)
+
+    print(f"❌ Queue not drained after {DRAIN_TIMEOUT_S}s (peak depth {peak_depth})")
+    return False
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    senders = int(sys.argv[2]) if len(sys.argv) > 2 else 50
+
+    print("🚀 WEBHOOK BURST TEST")
+    print("=" * 50)
+    print(f"Target: {BASE_URL} ({count} callbacks from {senders} senders, {THREADS} threads)")
+
+    batch = callbacks(count, senders)
+    results = [replay("Burst", batch)]
+
+    # Providers retry slow or dropped callbacks with the same MessageSid;
+    # these must be acknowledged without being processed again.
+    retries = batch[: max(1, count // 10)]
+    results.append(replay("Provider retries (duplicates)", retries))
+
+    results.append(wait_for_drain())
+
+    print(f"\nTests passed: {sum(results)}/{len(results)}")
+    return 0 if all(results) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())